@@ -436,6 +436,10 @@ ApplicationWindow {
                                         anchors.fill: parent
                                         anchors.margins: 5
                                     }
+
+                                    // Attitude/speed streams only while the HUD is loaded
+                                    Component.onCompleted: droneModel.streamRates.requestRates("hud", {"ATTITUDE": 10, "VFR_HUD": 5})
+                                    Component.onDestruction: droneModel.streamRates.releaseRates("hud")
                                 }
                             }
 
@@ -461,10 +465,10 @@ ApplicationWindow {
                                 languageManager: languageManager
 
                                 // CRITICAL: Throttle updates to prevent UI freezing
-                                altitude: droneModel.isConnected && droneModel.telemetry.alt !== undefined ? droneModel.telemetry.alt : 0
-                                groundSpeed: droneModel.isConnected && droneModel.telemetry.groundspeed !== undefined ? droneModel.telemetry.groundspeed : 0
-                                yaw: droneModel.isConnected && droneModel.telemetry.yaw !== undefined ? droneModel.telemetry.yaw : 0
-                                vibration: droneModel.isConnected && droneModel.telemetry.vibration !== undefined ? droneModel.telemetry.vibration : 0
+                                altitude: droneModel.isConnected && droneModel.liveTelemetry.alt !== undefined ? droneModel.liveTelemetry.alt : 0
+                                groundSpeed: droneModel.isConnected && droneModel.liveTelemetry.groundspeed !== undefined ? droneModel.liveTelemetry.groundspeed : 0
+                                yaw: droneModel.isConnected && droneModel.liveTelemetry.yaw !== undefined ? droneModel.liveTelemetry.yaw : 0
+                                vibration: droneModel.isConnected && droneModel.liveTelemetry.vibration !== undefined ? droneModel.liveTelemetry.vibration : 0
                             }
 
                             StatusBar {
@@ -520,7 +524,9 @@ ApplicationWindow {
                         Component.onCompleted: {
                             mainWindow.mapViewInstance = mapViewComponent
                             console.log("MapView registered with mainWindow")
+                            droneModel.streamRates.requestRates("map", {"GLOBAL_POSITION_INT": 5})
                         }
+                        Component.onDestruction: droneModel.streamRates.releaseRates("map")
                     }
                 }
             }
@@ -262,11 +262,11 @@ ApplicationWindow {
                             spacing: 10
 
                             Label {
-                                text: droneModel && droneModel.telemetry ? 
-                                      "Mode: " + droneModel.telemetry.mode + 
-                                      " | Armed: " + (droneModel.telemetry.armed ? "YES" : "NO") +
-                                      " | Alt: " + droneModel.telemetry.alt.toFixed(1) + "m" +
-                                      " | Battery: " + droneModel.telemetry.battery_remaining.toFixed(0) + "%" : 
+                                text: droneModel && droneModel.liveTelemetry ? 
+                                      "Mode: " + droneModel.liveTelemetry.mode + 
+                                      " | Armed: " + (droneModel.liveTelemetry.armed ? "YES" : "NO") +
+                                      " | Alt: " + droneModel.liveTelemetry.alt.toFixed(1) + "m" +
+                                      " | Battery: " + droneModel.liveTelemetry.battery_remaining.toFixed(0) + "%" : 
                                       "No telemetry data"
                                 color: "white"
                                 font.pixelSize: 12
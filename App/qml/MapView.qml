@@ -120,9 +120,9 @@ Item {
     }
 
     // FIXED: Properly reference droneModel telemetry
-    property real currentLat: (typeof droneModel !== "undefined" && droneModel && droneModel.telemetry) ? droneModel.telemetry.lat || 0 : 0
-    property real currentLon: (typeof droneModel !== "undefined" && droneModel && droneModel.telemetry) ? droneModel.telemetry.lon || 0 : 0
-    property real currentAlt: (typeof droneModel !== "undefined" && droneModel && droneModel.telemetry) ? droneModel.telemetry.rel_alt || 0 : 0
+    property real currentLat: (typeof droneModel !== "undefined" && droneModel && droneModel.liveTelemetry) ? droneModel.liveTelemetry.lat || 0 : 0
+    property real currentLon: (typeof droneModel !== "undefined" && droneModel && droneModel.liveTelemetry) ? droneModel.liveTelemetry.lon || 0 : 0
+    property real currentAlt: (typeof droneModel !== "undefined" && droneModel && droneModel.liveTelemetry) ? droneModel.liveTelemetry.rel_alt || 0 : 0
     property bool isDroneConnected: (typeof droneModel !== "undefined" && droneModel) ? droneModel.isConnected : false
 
     // ADDED: Track initialization state
@@ -243,6 +243,7 @@ Item {
                         let droneMarker;
                         let markers = [];
                         let routePath;
+                        let vehicleMissionPath;
                         let addMarkersMode = false;
                         let lastDroneUpdate = null;
                         let isDroneConnected = false;
@@ -371,6 +372,16 @@ Item {
                             });
                             routePath.setMap(map);
 
+                            // Mission stored on the vehicle (faded until verified)
+                            vehicleMissionPath = new google.maps.Polyline({
+                                path: [],
+                                geodesic: true,
+                                strokeColor: '#00BCD4',
+                                strokeOpacity: 0.9,
+                                strokeWeight: 2
+                            });
+                            vehicleMissionPath.setMap(map);
+
                             // Map click listener
                             map.addListener('click', function(event) {
                                 const lat = event.latLng.lat();
@@ -618,6 +629,12 @@ Item {
                             routePath.setPath(path);
                         }
 
+                        function showVehicleMission(path, verified) {
+                            if (!vehicleMissionPath) return;
+                            vehicleMissionPath.setPath(path.map(p => ({ lat: p[0], lng: p[1] })));
+                            vehicleMissionPath.setOptions({ strokeOpacity: verified ? 0.9 : 0.4 });
+                        }
+
                         function showMarkerPopup(markerData) {
                             console.log("Marker clicked:", markerData);
                         }
@@ -743,6 +760,7 @@ Item {
                 if (message.includes("Map initialized successfully")) {
                     mapInitialized = true
                     checkForInitialCentering()
+                    root.showVehicleMission()
                 }
             }
 
@@ -1223,4 +1241,18 @@ Item {
     function clearAllMarkers() {
         mapWebView.runJavaScript("clearAllMarkers();");
     }
+
+    // Mission stored on the vehicle (droneCommander.vehicleMission)
+    function showVehicleMission() {
+        if (typeof droneCommander === 'undefined' || !droneCommander || !root.mapInitialized) return;
+        var mission = droneCommander.vehicleMission;
+        mapWebView.runJavaScript(`showVehicleMission(${JSON.stringify(mission.path())}, ${mission.verified});`);
+    }
+
+    Connections {
+        target: (typeof droneCommander !== 'undefined' && droneCommander) ? droneCommander.vehicleMission : null
+        ignoreUnknownSignals: true
+        function onModelReset() { root.showVehicleMission() }
+        function onVerifiedChanged() { root.showVehicleMission() }
+    }
 }
@@ -19,6 +19,7 @@ ApplicationWindow {
     property var waypoints: []
     property bool isDragging: false
     property var pendingWaypointData: ""  // ✅ Correct
+    property real missionSimplifyTolerance: 1.0  // metres off the planned path; 0 uploads every marker
 
     QtObject {
         id: theme
@@ -256,8 +257,8 @@ Rectangle {
             anchors.margins: 2
 
             property bool addMarkersMode: false
-            property real currentLat: droneModel.telemetry.lat
-            property real currentLon: droneModel.telemetry.lon
+            property real currentLat: droneModel.liveTelemetry.lat
+            property real currentLon: droneModel.liveTelemetry.lon
             property var markersList: []
 
             url: "data:text/html," + encodeURIComponent(`
@@ -341,6 +342,7 @@ Rectangle {
                         let routePath;
                         let addMarkersMode = false;
                         let isDragging = false;
+                        let loadingMarkers = false;  // setMarkers(): one route update for the batch
                         
                         function initMap() {
                             const initialCenter = { lat: 17.601588777182204, lng: 78.12690006798547 };
@@ -399,8 +401,9 @@ map.addListener('click', function(event) {
     document.getElementById('lat').textContent = lat.toFixed(6);
     document.getElementById('lon').textContent = lng.toFixed(6);
     
-    // Always trigger weather request for clicked location
-    console.log('Weather request for: ' + lat + ', ' + lng);
+    // Always trigger weather request for clicked location (with metres per pixel for waypoint hit testing)
+    const metresPerPixel = 156543.03392 * Math.cos(lat * Math.PI / 180) / Math.pow(2, map.getZoom());
+    console.log('Weather request for: ' + lat + ', ' + lng + ', ' + metresPerPixel);
 
     if (addMarkersMode) {
         addMarker(lat, lng);
@@ -612,10 +615,12 @@ function addMarker(lat, lng, altitude = 10, speed = 5, commandType = 'waypoint',
     };
 
     markers.push(markerData);
-    updateRoutePath();
-    
-    // This tells QML that a marker was added
-    console.log("Marker added at: " + lat + ", " + lng);
+    if (!loadingMarkers) {
+        updateRoutePath();
+
+        // This tells QML that a marker was added
+        console.log("Marker added at: " + lat + ", " + lng);
+    }
 
     // Add event listeners
     marker.addListener('dragstart', function() {
@@ -637,7 +642,7 @@ function addMarker(lat, lng, altitude = 10, speed = 5, commandType = 'waypoint',
         markerData.lat = pos.lat();
         markerData.lng = pos.lng();
         
-        console.log('Waypoint ' + (markerIndex + 1) + ' moved to: ' + 
+        console.log('Waypoint ' + (markerData.index + 1) + ' moved to: ' + 
                   pos.lat().toFixed(6) + ', ' + pos.lng().toFixed(6));
     });
 
@@ -765,6 +770,28 @@ function refreshWaypointDashboard() {
     }));
 }
 
+                        function setMarkers(list) {
+    markers.forEach(markerData => {
+        markerData.marker.setMap(null);
+    });
+    markers = [];
+    loadingMarkers = true;
+    try {
+        list.forEach(m => addMarker(m.lat, m.lng, m.altitude, m.speed, m.commandType, m.holdTime));
+    } finally {
+        loadingMarkers = false;
+    }
+    updateRoutePath();
+    if (markers.length > 0) {
+        const bounds = new google.maps.LatLngBounds();
+        markers.forEach(m => bounds.extend(new google.maps.LatLng(m.lat, m.lng)));
+        map.fitBounds(bounds);
+    }
+
+    // One notification for the whole batch
+    console.log("Markers loaded: " + markers.length);
+}
+
                         // Function to reset map to world view
                         function resetToWorldView() {
                             map.setCenter({ lat: 0, lng: 0 });
@@ -787,19 +814,19 @@ function refreshWaypointDashboard() {
     property bool wasConnected: false
     
     onTriggered: {
-        var isCurrentlyConnected = droneModel.telemetry.lat && droneModel.telemetry.lon && 
-                                  droneModel.telemetry.lat !== 0 && droneModel.telemetry.lon !== 0;
+        var isCurrentlyConnected = droneModel.liveTelemetry.lat && droneModel.liveTelemetry.lon && 
+                                  droneModel.liveTelemetry.lat !== 0 && droneModel.liveTelemetry.lon !== 0;
         
         if (isCurrentlyConnected) {
             mapWebView.runJavaScript(
-                `updateDronePosition(${droneModel.telemetry.lat}, ${droneModel.telemetry.lon});`
+                `updateDronePosition(${droneModel.liveTelemetry.lat}, ${droneModel.liveTelemetry.lon});`
             );
             
             // If drone just connected (transition from disconnected to connected)
             if (!wasConnected) {
                 console.log("Drone just connected - centering at zoom 20");
                 mapWebView.runJavaScript(
-                    `centerOnDrone(${droneModel.telemetry.lat}, ${droneModel.telemetry.lon});`
+                    `centerOnDrone(${droneModel.liveTelemetry.lat}, ${droneModel.liveTelemetry.lon});`
                 );
             }
         }
@@ -839,6 +866,15 @@ onJavaScriptConsoleMessage: function(level, message, lineNumber, sourceId) {
         var coords = message.split(": ")[1].split(", ");
         var lat = parseFloat(coords[0]);
         var lng = parseFloat(coords[1]);
+
+        // A click next to a waypoint opens that waypoint (grid lookup in WaypointListModel)
+        if (coords.length > 2 && !mapWebView.addMarkersMode) {
+            var hit = droneModel.waypointList.nearestWaypoint(lat, lng, 12 * parseFloat(coords[2]));
+            if (hit >= 0) {
+                showMarkerPopupForIndex(hit);
+                return;
+            }
+        }
         console.log("Triggering weather dashboard for:", lat, lng);
         
         // Make sure we're using the correct instance
@@ -851,8 +887,8 @@ onJavaScriptConsoleMessage: function(level, message, lineNumber, sourceId) {
         showMarkerPopupForIndex(index);
     }
     
-    // Listen for marker addition from JavaScript
-    if (message.startsWith("Marker added at:")) {
+    // Listen for marker addition from JavaScript (one at a time or a whole batch)
+    if (message.startsWith("Marker added at:") || message.startsWith("Markers loaded:")) {
         Qt.callLater(function() {
             onWaypointAdded();
         });
@@ -864,6 +900,11 @@ onJavaScriptConsoleMessage: function(level, message, lineNumber, sourceId) {
             onWaypointDeleted();
         });
     }
+
+    var moved = message.match(/^Waypoint (\d+) moved to: ([-\d.]+), ([-\d.]+)$/);
+    if (moved) {
+        droneModel.waypointList.setPosition(parseInt(moved[1]) - 1, parseFloat(moved[2]), parseFloat(moved[3]));
+    }
 }
 
 Popup {
@@ -1198,6 +1239,10 @@ function showWeatherForLocation(lat, lon) {
                 runJavaScript("clearAllMarkers();");
             }
 
+            function setMarkersJS(markers) {
+                runJavaScript(`setMarkers(${JSON.stringify(markers)});`);
+            }
+
             function getAllMarkersJS(callback) {
     runJavaScript("JSON.stringify(getAllMarkers());", callback);
 }
@@ -1284,8 +1329,8 @@ Rectangle {
         if (weatherDashboard.dashboardVisible) {  // Use dashboardVisible instead of visible
             weatherDashboard.hide();
         } else {
-            var lat = droneModel.telemetry.lat || 17.601588777182204;
-            var lon = droneModel.telemetry.lon || 78.12690006798547;
+            var lat = droneModel.liveTelemetry.lat || 17.601588777182204;
+            var lon = droneModel.liveTelemetry.lon || 78.12690006798547;
             weatherDashboard.setLocation(lat, lon);
             weatherDashboard.show();
         }
@@ -1892,6 +1937,7 @@ Popup {
     
     property int waypointCount: 0
     property var waypointsData: []
+    property string simplificationText: ""
     
     background: Rectangle {
         color: theme.cardBackground
@@ -2021,6 +2067,15 @@ function calculateDistance(lat1, lon1, lat2, lon2) {
             color: theme.textSecondary
             anchors.horizontalCenter: parent.horizontalCenter
         }
+
+        Text {
+            visible: missionUploadSuccessPopup.simplificationText !== ""
+            text: missionUploadSuccessPopup.simplificationText
+            font.pixelSize: 11
+            font.family: "Consolas"
+            color: theme.textSecondary
+            anchors.horizontalCenter: parent.horizontalCenter
+        }
         
         // Waypoints List Header
         Rectangle {
@@ -2316,8 +2371,20 @@ function testGetAllMarkers() {
         });
     }
 }
+// Keep droneModel.waypointList equal to the map's markers
+function syncWaypointList() {
+    mapWebView.getAllMarkersJS(function(result) {
+        try {
+            droneModel.waypointList.loadMarkers(result ? JSON.parse(result) : []);
+        } catch (e) {
+            console.log("Error syncing waypoint list:", e);
+        }
+    });
+}
+
 function onWaypointAdded() {
     console.log("Waypoint added, dashboard visible:", waypointDashboard.visible);
+    syncWaypointList();
     if (waypointDashboard.visible) {
         // Add a small delay to ensure the JavaScript markers array is updated
         var timer = Qt.createQmlObject('import QtQuick 2.15; Timer { interval: 300; repeat: false; }', mainWindow);
@@ -2332,6 +2399,7 @@ function onWaypointAdded() {
 
 function onWaypointDeleted() {
     console.log("Waypoint deleted, dashboard visible:", waypointDashboard.visible);
+    syncWaypointList();
     if (waypointDashboard.visible) {
         // Add a small delay to ensure the JavaScript markers array is updated
         var timer = Qt.createQmlObject('import QtQuick 2.15; Timer { interval: 300; repeat: false; }', mainWindow);
@@ -2359,39 +2427,25 @@ function sendMarkers() {
                 return;
             }
 
-            var waypoints = [];
             console.log("Sending " + markersData.length + " markers as waypoints...");
-            
+            // The upload is built from the waypoint list model (commands, hold times) in one call
+            droneModel.waypointList.loadMarkers(markersData);
+
+            // Dense tracks are thinned first; the map shows what is actually uploaded
+            var simplification = droneModel.simplifyWaypoints(missionSimplifyTolerance);
+            missionUploadSuccessPopup.simplificationText = "";
+            if (simplification.removed > 0) {
+                markersData = droneModel.waypointList.toMarkers();
+                mapWebView.setMarkersJS(markersData);
+                missionUploadSuccessPopup.simplificationText = "Simplified from " + simplification.originalCount +
+                    " points (max deviation " + simplification.maxDeviation.toFixed(1) + " m)";
+            }
+
             // Calculate distances and prepare data
             var waypointsWithDistance = [];
             for (var i = 0; i < markersData.length; i++) {
                 var marker = markersData[i];
-                var command = 16;
-                
-                switch(marker.commandType) {
-                    case "takeoff": command = 22; break;
-                    case "land": command = 21; break;
-                    case "return": command = 20; break;
-                    case "loiter": command = 17; break;
-                    case "circle": command = 18; break;
-                    case "follow": command = 19; break;
-                    default: command = 16; break;
-                }
 
-                waypoints.push({
-                    seq: i+1,
-                    frame: 6,
-                    command: command,
-                    autocontinue: 1,
-                    param1: marker.holdTime || 0,
-                    param2: 0,
-                    param3: 0,
-                    param4: 0,
-                    x: marker.lat,
-                    y: marker.lng,
-                    z: marker.altitude || 10
-                });
-                
                 // Prepare waypoint display data with distance calculation
                 var wpData = {
                     lat: marker.lat,
@@ -2428,7 +2482,7 @@ function sendMarkers() {
             }
 
             try {
-                var uploadResult = droneCommander.uploadMission(waypoints);
+                var uploadResult = droneCommander.uploadWaypointList();
                 
                 if (uploadResult === false || uploadResult === null) {
                     throw new Error("Mission upload returned false");
@@ -2613,23 +2667,10 @@ function loadWaypointsData(jsonString) {
         if (!waypointsData.waypoints || !Array.isArray(waypointsData.waypoints))
             throw new Error("Invalid format");
 
-        // Clear and add markers to map
-        if (typeof mapWebView !== "undefined" && mapWebView.clearAllMarkersJS)
-            mapWebView.clearAllMarkersJS();
-
-        if (typeof mapWebView !== "undefined" && mapWebView.addMarkerJS) {
-            for (var i = 0; i < waypointsData.waypoints.length; i++) {
-                var wp = waypointsData.waypoints[i];
-                mapWebView.addMarkerJS(
-                    wp.lat,
-                    wp.lng,
-                    wp.altitude || 10,
-                    wp.speed || 5,
-                    wp.commandType || "waypoint",
-                    wp.holdTime || 0
-                );
-            }
-        }
+        // Load the list in one batch and replace the map's markers with it (one page call)
+        droneModel.waypointList.loadMarkers(waypointsData.waypoints);
+        if (typeof mapWebView !== "undefined" && mapWebView.setMarkersJS)
+            mapWebView.setMarkersJS(droneModel.waypointList.toMarkers());
 
         // Optional: refresh map display
         if (typeof mapWebView !== "undefined")
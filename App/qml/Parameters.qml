@@ -18,7 +18,8 @@ ApplicationWindow {
     Material.primary: Material.Blue
     Material.accent: Material.Teal
 
-    property var allParameters: ({})
+    // Sorted/filtered view of droneCommander.parameterTable, updated row by row
+    property var paramView: (typeof droneCommander !== 'undefined' && droneCommander) ? droneCommander.parameterView : null
     property bool isDroneConnected: true
     property string connectionStatus: isDroneConnected ? "CONNECTED" : "DISCONNECTED"
     property string lastError: ""
@@ -122,7 +123,7 @@ ApplicationWindow {
                 Item { Layout.fillWidth: true }
 
                 Label {
-                    text: paramModel.count + " parameters"
+                    text: (paramView ? paramView.count : 0) + " parameters"
                     color: "#666666"
                     font.pixelSize: 11
                 }
@@ -280,9 +281,7 @@ ApplicationWindow {
                     
                     ListView {
                         id: tableView
-                        model: ListModel {
-                            id: paramModel
-                        }
+                        model: parametersWindowRoot.paramView
                         spacing: 0
 
                         delegate: Rectangle {
@@ -362,7 +361,7 @@ ApplicationWindow {
                                         
                                         onEditingFinished: {
                                             if (text !== model.value) {
-                                                parametersWindowRoot.updateParameterUI(model.name, text, index);
+                                                parametersWindowRoot.updateParameterUI(model.name, text);
                                             }
                                         }
                                     }
@@ -399,7 +398,7 @@ ApplicationWindow {
                                         anchors.left: parent.left
                                         anchors.leftMargin: 8
                                         anchors.verticalCenter: parent.verticalCenter
-                                        text: model.units || ""
+                                        text: parametersWindowRoot.getUnitsForParameter(model.name)
                                         color: "#666666"
                                         font.pixelSize: 10
                                         elide: Text.ElideRight
@@ -418,7 +417,7 @@ ApplicationWindow {
                                         anchors.left: parent.left
                                         anchors.leftMargin: 8
                                         anchors.verticalCenter: parent.verticalCenter
-                                        text: model.range || ""
+                                        text: parametersWindowRoot.getRangeForParameter(model.name)
                                         color: "#666666"
                                         font.pixelSize: 10
                                         elide: Text.ElideRight
@@ -437,7 +436,7 @@ ApplicationWindow {
                                         anchors.left: parent.left
                                         anchors.leftMargin: 8
                                         anchors.verticalCenter: parent.verticalCenter
-                                        text: model.description || ""
+                                        text: parametersWindowRoot.getDescriptionForParameter(model.name)
                                         color: "#666666"
                                         font.pixelSize: 10
                                         elide: Text.ElideRight
@@ -541,85 +540,23 @@ ApplicationWindow {
 
     // Keep all your existing functions unchanged
     function loadParameters() {
-        console.log("Loading mock parameters for UI demo...");
-        
-        allParameters = droneCommander.parameters;
-        
-        updateModel(allParameters);
-
-        isUpdatingParameter = true;
-
-        var loadTimer = Qt.createQmlObject(
-            'import QtQuick 2.15; Timer { 
-                    interval: 1000; 
-                    repeat: false; 
-                    onTriggered: { 
-                        isUpdatingParameter = false;
-                        statusNotification.color = "#10B981";
-                        statusNotification.children[0].text = "Parameters loaded successfully!";
-                        statusNotification.opacity = 1;
-                        hideNotificationTimer.restart();
-                        destroy();
-                    }
-                }', parametersWindowRoot
-            );
+        console.log("Refreshing parameters from drone...");
 
-            loadTimer.start();
+        if (!droneCommander.requestAllParameters()) {
+            return;
+        }
+        statusNotification.color = "#3B82F6";
+        statusNotification.children[0].text = "📡 Requesting parameters...";
+        statusNotification.opacity = 1;
+        hideNotificationTimer.restart();
     }
 
-    function updateModel(params) {
-    console.log("📄 updateModel called");
-    console.log("  - params type:", typeof params);
-    console.log("  - params null?:", params === null);
-    console.log("  - params undefined?:", params === undefined);
-    
-    if (!params || typeof params !== "object") {
-        console.error("❌ Error: params is invalid or undefined.", params);
-        
-        // Show error instead of loading mock data
-        statusNotification.color = "#EF4444";
-        statusNotification.children[0].text = "❌ Invalid parameters data";
+    function showNotification(color, text) {
+        statusNotification.color = color;
+        statusNotification.children[0].text = text;
         statusNotification.opacity = 1;
-        return;
-    }
-    
-    // Convert object to array
-    var paramArray = [];
-    for (var key in params) {
-        if (params.hasOwnProperty(key)) {
-            paramArray.push(params[key]);
-        }
-    }
-    
-    console.log("📊 Converting", paramArray.length, "parameters to model");
-    
-    // Clear existing model
-    paramModel.clear();
-    
-    // Add parameters to model
-    for (var i = 0; i < paramArray.length; i++) {
-        var param = paramArray[i];
-        
-        // Ensure all required fields exist
-        if (!param.name) {
-            console.log("⚠️ Skipping parameter without name:", param);
-            continue;
-        }
-        
-        // Set defaults for missing fields
-        param.value = param.value !== undefined ? param.value : "0";
-        param.type = param.type || "FLOAT";
-        param.default = param.default || "0";
-        param.units = param.units || getUnitsForParameter(param.name);
-        param.range = param.range || getRangeForParameter(param.name);
-        param.description = param.description || getDescriptionForParameter(param.name);
-        param.synced = param.synced !== undefined ? param.synced : true;
-        
-        paramModel.append(param);
+        hideNotificationTimer.restart();
     }
-    
-    console.log("✅ Model updated with", paramModel.count, "parameters");
-}
 
     function getDescriptionForParameter(paramName) {
         // Extract parameter group and generate description
@@ -1107,99 +1044,62 @@ ApplicationWindow {
     }
 
     function filterParameters() {
-        var searchText = searchBar.text.toLowerCase();
+        if (paramView) {
+            paramView.filterText = searchBar.text.trim();
+        }
+    }
 
-        if (searchText.trim() === "") {
-            updateModel(allParameters);
-            return;
+    // Descriptions are searched along with the names; sent once per parameter set
+    function indexDescriptions() {
+        if (!paramView) return;
+        var table = droneCommander.parameterTable;
+        var descriptions = {};
+        for (var i = 0; i < table.count; i++) {
+            var name = table.get(i).name;
+            descriptions[name] = getDescriptionForParameter(name);
         }
-        var parametersArray = Object.values(allParameters);
-        
-        var filtered = parametersArray.filter(function(p) {
-            return p.name && p.name.toLowerCase().includes(searchText);
-        });
-        
-        updateModel(filtered);
+        paramView.setDescriptions(descriptions);
     }
 
-    function updateParameterUI(paramName, newValue, modelIndex) {
-        console.log("UI Demo: Updating parameter " + paramName + " to " + newValue);
-        
-        isUpdatingParameter = true;
-        
-        var currentItem = paramModel.get(modelIndex);
-        paramModel.set(modelIndex, {
-            "name": currentItem.name,
-            "value": newValue,
-            "type": currentItem.type,
-            "description": currentItem.description,
-            "synced": false,
-            "default": currentItem.default,
-            "units": currentItem.units,
-            "range": currentItem.range
-        });
+    function updateParameterUI(paramName, newValue) {
+        var value = parseFloat(newValue);
+        if (isNaN(value)) {
+            showNotification("#EF4444", "❌ '" + newValue + "' is not a number");
+            return;
+        }
+        console.log("Updating parameter " + paramName + " to " + value);
 
-        var updateTimer = Qt.createQmlObject('import QtQuick 2.15; Timer {}', parametersWindowRoot);
-        updateTimer.interval = 1500;
-        updateTimer.repeat = false;
-        updateTimer.triggered.connect(function() {
-            isUpdatingParameter = false;
-            
-            var currentItem = paramModel.get(modelIndex);
-            paramModel.set(modelIndex, {
-                "name": currentItem.name,
-                "value": currentItem.value,
-                "type": currentItem.type,
-                "description": currentItem.description,
-                "synced": true,
-                "default": currentItem.default,
-                "units": currentItem.units,
-                "range": currentItem.range
-            });
-            
-            statusNotification.color = "#10B981";
-            statusNotification.children[0].text = "Parameter '" + paramName + "' updated successfully!";
-            statusNotification.opacity = 1;
-            hideNotificationTimer.restart();
-            
-            updateTimer.destroy();
-        });
-        updateTimer.start();
+        // Confirmed or rejected later through parameterWriteFinished
+        if (!droneCommander.setParameter(paramName, value)) {
+            showNotification("#EF4444", "❌ Failed to update '" + paramName + "'");
+        }
     }
 
     function sendAllParametersUI() {
-        console.log("UI Demo: Sending all parameters to drone...");
-        
-        isUpdatingParameter = true;
-        
-        var sendTimer = Qt.createQmlObject('import QtQuick 2.15; Timer {}', parametersWindowRoot);
-        sendTimer.interval = 2000;
-        sendTimer.repeat = false;
-        sendTimer.triggered.connect(function() {
-            isUpdatingParameter = false;
-            
-            for (let i = 0; i < paramModel.count; i++) {
-                let currentItem = paramModel.get(i);
-                paramModel.set(i, {
-                    "name": currentItem.name,
-                    "value": currentItem.value,
-                    "type": currentItem.type,
-                    "description": currentItem.description,
-                    "synced": true,
-                    "default": currentItem.default,
-                    "units": currentItem.units,
-                    "range": currentItem.range
-                });
+        // Write the rows whose last update did not go through
+        var pending = [];
+        for (let i = 0; i < paramView.count; i++) {
+            let p = paramView.get(i);
+            if (!p.synced) {
+                pending.push(p);
             }
-            
-            statusNotification.color = "#10B981";
-            statusNotification.children[0].text = "All parameters sent to drone successfully!";
-            statusNotification.opacity = 1;
-            hideNotificationTimer.restart();
-            
-            sendTimer.destroy();
-        });
-        sendTimer.start();
+        }
+        console.log("Writing " + pending.length + " unsynced parameters to drone...");
+
+        var failed = 0;
+        for (let j = 0; j < pending.length; j++) {
+            if (!droneCommander.setParameter(pending[j].name, parseFloat(pending[j].value))) {
+                failed++;
+            }
+        }
+
+        // Each write reports through parameterWriteFinished when the vehicle answers
+        if (failed > 0) {
+            showNotification("#EF4444", "❌ " + failed + " of " + pending.length + " parameters not written");
+        } else {
+            showNotification("#10B981", pending.length > 0 ? "Writing " + pending.length + " parameters to drone..."
+                                                           : "All parameters are in sync");
+        }
     }
 
     function saveParameters() {
@@ -1210,10 +1110,10 @@ ApplicationWindow {
         
         paramData += "# Drone Parameters Configuration\n";
         paramData += "# Generated on: " + new Date().toLocaleString() + "\n";
-        paramData += "# Total parameters: " + paramModel.count + "\n\n";
+        paramData += "# Total parameters: " + paramView.count + "\n\n";
         
-        for (let i = 0; i < paramModel.count; i++) {
-            let p = paramModel.get(i);
+        for (let i = 0; i < paramView.count; i++) {
+            let p = paramView.get(i);
             paramData += p.name + "," + p.value + "\n";
         }
 
@@ -1229,8 +1129,8 @@ ApplicationWindow {
         console.log("UI Demo: Exporting parameters...");
         
         var data = {};
-        for (let i = 0; i < paramModel.count; i++) {
-            let p = paramModel.get(i);
+        for (let i = 0; i < paramView.count; i++) {
+            let p = paramView.get(i);
             data[p.name] = parseFloat(p.value);
         }
         
@@ -1268,53 +1168,23 @@ ApplicationWindow {
         // STEP 2: Connect to parametersUpdated signal
         // ==========================================
         try {
+            // The table updates itself; the signal only reports a finished load
             droneCommander.parametersUpdated.connect(function() {
-                console.log("🔥 parametersUpdated signal received!");
-                
-                // Small delay to ensure Python property is ready
-                Qt.createQmlObject('import QtQuick 2.15; Timer { 
-                    interval: 50; 
-                    repeat: false; 
-                    running: true;
-                    onTriggered: { 
-                        console.log("⏰ Processing received parameters...");
-                        
-                        // Get parameters from droneCommander
-                        var params = droneCommander.parameters;
-                        
-                        if (!params || typeof params !== "object") {
-                            console.log("❌ ERROR: parameters property is invalid");
-                            return;
-                        }
-                        
-                        var paramCount = Object.keys(params).length;
-                        console.log("📊 Received " + paramCount + " real parameters from drone");
-                        
-                        if (paramCount === 0) {
-                            console.log("⚠️ WARNING: Empty parameters object");
-                            statusNotification.color = "#F59E0B";
-                            statusNotification.children[0].text = "⚠️ No parameters received";
-                            statusNotification.opacity = 1;
-                            return;
-                        }
-                        
-                        // ✅ Update the model with REAL parameters
-                        allParameters = params;
-                        updateModel(allParameters);
-                        
-                        console.log("✅ Model updated with " + paramCount + " real parameters!");
-                        
-                        // Show success notification
-                        statusNotification.color = "#10B981";
-                        statusNotification.children[0].text = "✅ Loaded " + paramCount + " parameters!";
-                        statusNotification.opacity = 1;
-                        hideNotificationTimer.restart();
-                        
-                        destroy();
-                    }
-                }', parametersWindowRoot);
+                var paramCount = droneCommander.parameterTable.count;
+                console.log("🔥 parametersUpdated: " + paramCount + " parameters");
+
+                if (paramCount === 0) {
+                    showNotification("#F59E0B", "⚠️ No parameters received");
+                    return;
+                }
+                indexDescriptions();
+                showNotification("#10B981", "✅ Loaded " + paramCount + " parameters!");
             });
             
+            droneCommander.parameterWriteFinished.connect(function(name, confirmed, message) {
+                showNotification(confirmed ? "#10B981" : "#EF4444", confirmed ? message : "❌ " + message);
+            });
+
             console.log("✅ Signal connected successfully");
             
         } catch (error) {
@@ -1328,32 +1198,16 @@ ApplicationWindow {
         // ==========================================
         // STEP 3: Check if parameters already exist
         // ==========================================
-        console.log("🔍 Checking for existing parameters...");
-        try {
-            var existingParams = droneCommander.parameters;
+        var existingCount = droneCommander.parameterTable.count;
+        if (existingCount > 0) {
+            console.log("✅ Found " + existingCount + " existing parameters - showing them");
+            indexDescriptions();
+            showNotification("#10B981", "✅ Loaded " + existingCount + " parameters!");
             
-            if (existingParams && typeof existingParams === "object") {
-                var existingCount = Object.keys(existingParams).length;
-                
-                if (existingCount > 0) {
-                    console.log("✅ Found " + existingCount + " existing parameters - loading immediately");
-                    allParameters = existingParams;
-                    updateModel(allParameters);
-                    
-                    statusNotification.color = "#10B981";
-                    statusNotification.children[0].text = "✅ Loaded " + existingCount + " parameters!";
-                    statusNotification.opacity = 1;
-                    hideNotificationTimer.restart();
-                    
-                    // Don't request again - we already have them!
-                    return;
-                } else {
-                    console.log("🔭 No existing parameters found - will request from drone");
-                }
-            }
-        } catch (error) {
-            console.log("⚠️ Could not check existing parameters:", error);
+            // Don't request again - we already have them!
+            return;
         }
+        console.log("🔭 No existing parameters found - will request from drone");
         
         // ==========================================
         // STEP 4: Request parameters from drone
@@ -1381,7 +1235,7 @@ ApplicationWindow {
                     repeat: false; 
                     running: true;
                     onTriggered: { 
-                        if (paramModel.count === 0) {
+                        if (droneCommander.parameterTable.count === 0) {
                             console.log("⏱️ TIMEOUT: No parameters received after 60 seconds");
                             console.log("❌ This usually means:");
                             console.log("   1. Drone is not connected");
@@ -26,16 +26,16 @@ Rectangle {
     property color statusMessageColor: statusMessageIndicator.messageColor
 
     function activeUasSet() {
-        rollPitchIndicator.rollAngle = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.roll: 0.0)
-        rollPitchIndicator.pitchAngle = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.pitch: 0)
-        pitchIndicator.rollAngle = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.roll: 0)
-        pitchIndicator.pitchAngle = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.pitch: 0)
-        speedIndicator.groundspeed = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.groundspeed: 0)
-        informationIndicator.groundSpeed = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.groundspeed: 0)
-        informationIndicator.airSpeed = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.airspeed: 0 )
-        compassIndicator.heading = Qt.binding(() => droneModel.isConnected?(droneModel.telemetry.yaw < 0 ? droneModel.telemetry.yaw + 360 : droneModel.telemetry.yaw): 0)
-        speedIndicator.airspeed = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.airspeed: 0)
-        altIndicator.alt = Qt.binding(() => droneModel.isConnected? droneModel.telemetry.rel_alt: 0)
+        rollPitchIndicator.rollAngle = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.roll: 0.0)
+        rollPitchIndicator.pitchAngle = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.pitch: 0)
+        pitchIndicator.rollAngle = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.roll: 0)
+        pitchIndicator.pitchAngle = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.pitch: 0)
+        speedIndicator.groundspeed = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.groundspeed: 0)
+        informationIndicator.groundSpeed = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.groundspeed: 0)
+        informationIndicator.airSpeed = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.airspeed: 0 )
+        compassIndicator.heading = Qt.binding(() => droneModel.isConnected?(droneModel.liveTelemetry.yaw < 0 ? droneModel.liveTelemetry.yaw + 360 : droneModel.liveTelemetry.yaw): 0)
+        speedIndicator.airspeed = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.airspeed: 0)
+        altIndicator.alt = Qt.binding(() => droneModel.isConnected? droneModel.liveTelemetry.rel_alt: 0)
 
        
     }
@@ -6,7 +6,7 @@ Row {
     spacing: 10
     
     // ✅ CRITICAL: Bind directly to drone's armed status - auto-updates!
-    property bool isArmed: droneModel.telemetry.armed
+    property bool isArmed: droneModel.liveTelemetry.armed
     
     MessageDialog { 
         id: modeChangeDialog
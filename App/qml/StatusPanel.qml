@@ -26,13 +26,13 @@ Rectangle {
     property var languageManager: null
     
     // FIXED: Add dynamic flight mode property that updates from telemetry
-    property string flightMode: droneModel.telemetry.mode || "UNKNOWN"
+    property string flightMode: droneModel.liveTelemetry.mode || "UNKNOWN"
 
     // FIXED: Add connection to update when telemetry changes
     Connections {
-        target: droneModel
-        function onTelemetryChanged() {
-            root.flightMode = droneModel.telemetry.mode || "UNKNOWN"
+        target: droneModel.liveTelemetry
+        function onStatusChanged() {
+            root.flightMode = droneModel.liveTelemetry.mode || "UNKNOWN"
         }
     }
 
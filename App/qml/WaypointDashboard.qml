@@ -11,6 +11,8 @@ Rectangle {
     property int selectedWaypointIndex: -1
     property var waypointData: null
     property var waypoints: []
+    property var vehicleMission: (typeof droneCommander !== 'undefined' && droneCommander) ? droneCommander.vehicleMission : null
+    property var missionCheck: (typeof droneModel !== 'undefined' && droneModel) ? droneModel.missionCheck.report : null
     
     // Signal to notify main window of command execution
     signal executeWaypointCommand(int index, string commandType, var waypointData)
@@ -163,6 +165,48 @@ Rectangle {
                         }
                     }
                     
+                    // Mission check (re-run on every edit)
+                    Rectangle {
+                        Layout.fillWidth: true
+                        Layout.preferredHeight: checkColumn.implicitHeight + 8
+                        visible: missionCheck !== null && missionCheck.legs > 0
+                        color: "#1e1e1e"
+                        border.color: missionCheck && !missionCheck.valid ? "#FF5722" : "#4a4a4a"
+                        border.width: 1
+                        radius: 2
+                        
+                        Column {
+                            id: checkColumn
+                            anchors.left: parent.left
+                            anchors.right: parent.right
+                            anchors.verticalCenter: parent.verticalCenter
+                            anchors.margins: 8
+                            spacing: 2
+                            
+                            Text {
+                                text: missionCheck ? formatDistance(missionCheck.totalDistance) + " · "
+                                                     + formatDuration(missionCheck.flightTime)
+                                                     + (missionCheck.batteryUsed >= 0
+                                                        ? " · " + missionCheck.batteryUsed.toFixed(0) + "% battery" : "")
+                                                   : ""
+                                font.pixelSize: 9
+                                font.bold: true
+                                color: missionCheck && missionCheck.valid ? "#4CAF50" : "#FF5722"
+                            }
+                            
+                            Repeater {
+                                model: missionCheck ? missionCheck.errors.concat(missionCheck.warnings) : []
+                                delegate: Text {
+                                    width: checkColumn.width
+                                    text: (index < missionCheck.errors.length ? "✖ " : "⚠ ") + modelData
+                                    wrapMode: Text.WordWrap
+                                    font.pixelSize: 8
+                                    color: index < missionCheck.errors.length ? "#FF5722" : "#FFC107"
+                                }
+                            }
+                        }
+                    }
+                    
                     // Waypoint List
                     Repeater {
                         model: waypoints.length
@@ -534,6 +578,65 @@ Rectangle {
                             color: "#888888"
                         }
                     }
+                    
+                    // Mission stored on the vehicle
+                    Rectangle {
+                        Layout.fillWidth: true
+                        Layout.preferredHeight: 25
+                        visible: vehicleMission !== null && vehicleMission.count > 0
+                        color: "#333333"
+                        border.color: "#4a4a4a"
+                        border.width: 1
+                        radius: 2
+                        
+                        Text {
+                            anchors.left: parent.left
+                            anchors.leftMargin: 8
+                            anchors.verticalCenter: parent.verticalCenter
+                            text: vehicleMission ? "On Vehicle (" + vehicleMission.count + ")"
+                                                   + (vehicleMission.verified ? "" : " - checking...") : ""
+                            font.pixelSize: 10
+                            font.bold: true
+                            color: "#00BCD4"
+                        }
+                    }
+                    
+                    Repeater {
+                        model: vehicleMission
+                        delegate: Rectangle {
+                            Layout.fillWidth: true
+                            Layout.preferredHeight: 22
+                            color: "#2a2a2a"
+                            radius: 2
+                            opacity: vehicleMission.verified ? 1.0 : 0.6
+                            
+                            RowLayout {
+                                anchors.fill: parent
+                                anchors.leftMargin: 8
+                                anchors.rightMargin: 8
+                                spacing: 6
+                                
+                                Text {
+                                    text: seq
+                                    font.pixelSize: 8
+                                    font.bold: true
+                                    color: current ? "#FF9800" : "#888888"
+                                }
+                                Text {
+                                    text: commandName
+                                    font.pixelSize: 8
+                                    color: "#FFFFFF"
+                                    Layout.fillWidth: true
+                                    elide: Text.ElideRight
+                                }
+                                Text {
+                                    text: altitude.toFixed(1) + "m"
+                                    font.pixelSize: 8
+                                    color: "#CCCCCC"
+                                }
+                            }
+                        }
+                    }
                 }
             }
         }
@@ -679,6 +782,7 @@ Rectangle {
                 }
             `);
             
+            droneModel.waypointList.setValue(index, "commandType", commandType);
             if (waypoints && waypoints[index]) {
                 waypoints[index].commandType = commandType;
                 var tempWaypoints = waypoints.slice();
@@ -695,6 +799,7 @@ Rectangle {
                     markers[${index}].altitude = ${altitude};
                 }
             `);
+            droneModel.waypointList.setValue(index, "altitude", altitude);
             if (waypoints && waypoints[index]) {
                 waypoints[index].altitude = altitude;
             }
@@ -708,6 +813,7 @@ Rectangle {
                     markers[${index}].speed = ${speed};
                 }
             `);
+            droneModel.waypointList.setValue(index, "speed", speed);
             if (waypoints && waypoints[index]) {
                 waypoints[index].speed = speed;
             }
@@ -769,6 +875,15 @@ Rectangle {
         return index === 0 ? "Home" : "Waypoint";
     }
     
+    function formatDistance(metres) {
+        return metres < 1000 ? metres.toFixed(0) + " m" : (metres / 1000).toFixed(2) + " km";
+    }
+    
+    function formatDuration(seconds) {
+        var minutes = Math.floor(seconds / 60);
+        return minutes > 0 ? minutes + " min " + Math.round(seconds % 60) + " s" : Math.round(seconds) + " s";
+    }
+    
     function getWaypointAltitude(index) {
         if (waypoints && waypoints[index]) {
             return waypoints[index].altitude || 10;
@@ -0,0 +1,275 @@
+"""
+Async Commands - coroutine API for long vehicle operations
+One asyncio event loop runs in a dedicated thread next to Qt. Operations
+(arm, set_mode, takeoff, mission upload, parameter fetch...) are coroutines
+that await hub messages and COMMAND_ACK futures, so any number of concurrent
+waits costs no threads. Tasks are named and cancellable; pyqtSlots in
+DroneCommander only schedule them.
+"""
+import asyncio
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from pymavlink import mavutil
+
+from modules.mavlink_hub import MessageSubscription
+
+
+class CommandError(Exception):
+    """A vehicle operation failed; the message is meant for the operator"""
+
+
+class AsyncSubscription(MessageSubscription):
+    """Hub subscription delivered into the event loop: get()/wait_for() are awaitable"""
+
+    def __init__(self, hub, loop, msg_types=None, sysid=None, compid=None, maxsize=256):
+        if isinstance(msg_types, str):
+            msg_types = [msg_types]
+        super().__init__(hub, msg_types, sysid, compid, maxsize)
+        self._loop = loop
+        self._maxsize = maxsize
+        self._pending = asyncio.Queue()
+
+    def put(self, msg):
+        """Called by the hub from the reader thread"""
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, msg)
+        except RuntimeError:
+            pass    # loop already closed
+
+    def _deliver(self, msg):
+        if self._pending.qsize() >= self._maxsize:
+            self._pending.get_nowait()
+            self.dropped += 1
+        self._pending.put_nowait(msg)
+
+    async def get(self, timeout=None):
+        """Next message, or None on timeout"""
+        try:
+            return await asyncio.wait_for(self._pending.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def get_nowait(self):
+        try:
+            return self._pending.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def drain(self):
+        messages = []
+        while not self._pending.empty():
+            messages.append(self._pending.get_nowait())
+        return messages
+
+    async def wait_for(self, predicate=None, timeout=None):
+        """Next message satisfying predicate, or None on timeout"""
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - self._loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            msg = await self.get(remaining)
+            if msg is None:
+                return None
+            if predicate is None or predicate(msg):
+                return msg
+
+
+class _GuiInvoker(QObject):
+    """Runs callables on the thread this object lives in (the GUI thread)"""
+    invoke = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.invoke.connect(lambda fn: fn())
+
+
+class AsyncLoopThread:
+    """asyncio event loop hosted in a daemon thread; create it on the GUI thread"""
+
+    def __init__(self, name='MAVLinkAsync'):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._tasks = {}          # name -> concurrent.futures.Future of the running task
+        self._lock = threading.Lock()
+        self._gui = _GuiInvoker()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+            self.loop.close()
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        print("[AsyncLoop] ✅ Event loop running")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.cancel_all()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+        self._thread = None
+
+    def submit(self, coro, name=None):
+        """
+        Schedule a coroutine from any thread; returns a concurrent.futures.Future.
+        A named task replaces (cancels) a running task of the same name.
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if name is not None:
+            with self._lock:
+                previous = self._tasks.get(name)
+                self._tasks[name] = future
+            if previous is not None and not previous.done():
+                print(f"[AsyncLoop] Replacing running task '{name}'")
+                previous.cancel()
+            future.add_done_callback(lambda f, name=name: self._forget(name, f))
+        return future
+
+    def _forget(self, name, future):
+        with self._lock:
+            if self._tasks.get(name) is future:
+                del self._tasks[name]
+
+    def running(self, name):
+        with self._lock:
+            future = self._tasks.get(name)
+        return future is not None and not future.done()
+
+    def cancel(self, name):
+        with self._lock:
+            future = self._tasks.get(name)
+        if future is not None and not future.done():
+            print(f"[AsyncLoop] Cancelling '{name}'")
+            future.cancel()
+            return True
+        return False
+
+    def cancel_all(self):
+        with self._lock:
+            futures = list(self._tasks.values())
+        for future in futures:
+            future.cancel()
+
+    def call_in_gui(self, fn):
+        """Run fn on the GUI thread (for QObjects with timers, e.g. StreamRateManager)"""
+        self._gui.invoke.emit(fn)
+
+
+class VehicleCommands:
+    """
+    Coroutine operations on one connected vehicle. Construct on any thread;
+    await on the AsyncLoopThread's loop.
+    """
+
+    def __init__(self, drone, message_hub, commands, loop_thread, feedback=None, stream_rates=None):
+        self.drone = drone
+        self.hub = message_hub
+        self.commands = commands
+        self.loop_thread = loop_thread
+        self._feedback = feedback
+        self._stream_rates = stream_rates
+
+    # ---------- building blocks ----------
+
+    def feedback(self, text):
+        if self._feedback is not None:
+            self._feedback(text)
+
+    def stream(self, msg_types, maxsize=512):
+        """Awaitable subscription to this vehicle's messages; close() it when done"""
+        subscription = AsyncSubscription(self.hub, self.loop_thread.loop, msg_types,
+                                         sysid=self.drone.target_system, maxsize=maxsize)
+        return self.hub.register(subscription)
+
+    async def command(self, command, params=(), **options):
+        """COMMAND_LONG through the command manager; returns its CommandOutcome"""
+        return await asyncio.wrap_future(self.commands.send(command, params, **options))
+
+    @property
+    def autopilot(self):
+        """MAV_AUTOPILOT of the last HEARTBEAT, or None before one arrived"""
+        return self.drone.field('HEARTBEAT', 'autopilot', None)
+
+    def request_heartbeat(self):
+        """Ask for a HEARTBEAT now instead of waiting for the next periodic one"""
+        self.commands.send(mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE,
+                           (mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT,), max_attempts=1)
+
+    def request_rates(self, consumer, rates):
+        if self._stream_rates is not None:
+            self.loop_thread.call_in_gui(lambda: self._stream_rates.request(consumer, rates))
+
+    def release_rates(self, consumer):
+        if self._stream_rates is not None:
+            self.loop_thread.call_in_gui(lambda: self._stream_rates.release(consumer))
+
+    # ---------- operations ----------
+
+    async def arm(self):
+        return await self.command(mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, (1,))
+
+    async def disarm(self):
+        return await self.command(mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, (0,))
+
+    async def set_mode(self, mode_name):
+        mode_id = self.drone.mode_mapping().get(mode_name.upper())
+        if mode_id is None:
+            raise CommandError(f"Unknown mode '{mode_name}'.")
+        # MAV_CMD_DO_SET_MODE (instead of SET_MODE) so the ACK names the command
+        return await self.command(mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+                                  (mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, mode_id))
+
+    async def land(self, lat, lon):
+        return await self.command(mavutil.mavlink.MAV_CMD_NAV_LAND, (0, 0, 0, 0, lat, lon, 0))
+
+    async def takeoff(self, target_altitude, **options):
+        from modules.takeoff_sequence import run_takeoff
+        return await run_takeoff(self, target_altitude, **options)
+
+    async def upload_mission(self, items, **options):
+        from modules.mission_transfer import upload_mission
+        return await upload_mission(self, items, **options)
+
+    async def identity(self):
+        """Cache key of this autopilot from AUTOPILOT_VERSION, or None"""
+        from modules.param_sync import request_identity
+        return await request_identity(self)
+
+    async def sync_mission(self, items, cache, **options):
+        from modules.mission_sync import sync_mission, HAS_OPAQUE_ID
+        # Without opaque_id the cache is never used: skip the identity round trip
+        key = await self.identity() if HAS_OPAQUE_ID else None
+        return await sync_mission(self, items, cache, key, **options)
+
+    async def load_mission(self, cache, **options):
+        from modules.mission_sync import load_mission, HAS_OPAQUE_ID
+        key = await self.identity() if HAS_OPAQUE_ID else None
+        return await load_mission(self, cache, key, **options)
+
+    async def fetch_params(self, **options):
+        from modules.param_transfer import fetch_params
+        return await fetch_params(self, **options)
+
+    async def set_param(self, name, value, param_type, **options):
+        from modules.param_transfer import set_param
+        return await set_param(self, name, value, param_type, **options)
+
+    async def download_params(self, **options):
+        from modules.param_ftp import download_params
+        return await download_params(self, **options)
+
+    async def load_params(self, cache, **options):
+        from modules.param_sync import load_params
+        return await load_params(self, cache, **options)
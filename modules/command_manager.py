@@ -0,0 +1,315 @@
+"""
+Command Manager - COMMAND_LONG transactions resolved by COMMAND_ACK
+Every command returns a Future that completes with a CommandOutcome when the
+matching COMMAND_ACK (command id + vehicle system/component) arrives, after
+retransmissions with an incrementing confirmation field, or on timeout.
+COMMAND_ACK does not say which transmission it answers, so only one command
+with the same id per target is in flight; later ones wait their turn.
+"""
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtProperty, QTimer
+from pymavlink import mavutil
+
+
+# Upper bounds (ms) of the ack latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def command_name(command):
+    entry = mavutil.mavlink.enums['MAV_CMD'].get(command)
+    return entry.name if entry is not None else str(command)
+
+
+def result_name(result):
+    if result is None:
+        return 'TIMEOUT'
+    entry = mavutil.mavlink.enums['MAV_RESULT'].get(result)
+    return entry.name.replace('MAV_RESULT_', '') if entry is not None else str(result)
+
+
+class CommandOutcome:
+    """Final state of one command transaction"""
+
+    def __init__(self, command, result, attempts, latency, progress=None, reason=None):
+        self.command = command
+        self.result = result          # MAV_RESULT, or None when no final ACK arrived
+        self.attempts = attempts
+        self.latency = latency        # seconds from first transmission to final ACK
+        self.progress = progress      # last IN_PROGRESS percentage, if any
+        self.reason = reason          # why there is no result ('timeout', 'link lost')
+
+    @property
+    def accepted(self):
+        return self.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
+
+    def describe(self):
+        if self.result is None:
+            return f"{self.reason or 'timeout'} after {self.attempts} attempts"
+        return f"{result_name(self.result)} in {1000 * self.latency:.0f} ms"
+
+
+class _Transaction:
+
+    def __init__(self, command, params, target_system, target_component, ack_timeout, max_attempts):
+        self.command = command
+        self.params = params
+        self.target_system = target_system
+        self.target_component = target_component
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max_attempts
+        self.future = Future()
+        self.attempts = 0
+        self.sent_at = None
+        self.first_sent_at = None
+        self.deadline = None
+        self.answered = False
+        self.progress = None
+
+    @property
+    def key(self):
+        return (self.command, self.target_system, self.target_component)
+
+
+class _LatencyHistogram:
+
+    def __init__(self, samples=256):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=samples)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency_ms):
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and latency_ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.recent.append(latency_ms)
+        self.count += 1
+        self.total += latency_ms
+        self.max = max(self.max, latency_ms)
+
+    def percentile(self, fraction):
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+    def summary(self):
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': self.max,
+            'histogram': dict(zip(labels, self.buckets)),
+        }
+
+
+class CommandManager(QObject):
+    commandProgress = pyqtSignal(str, int)        # command name, percent (-1 unknown) on IN_PROGRESS
+    commandFinished = pyqtSignal(str, str)        # command name, result / failure description
+    statsChanged = pyqtSignal()
+    _wake = pyqtSignal()                          # start polling from any thread
+
+    def __init__(self, ack_timeout=1.0, max_attempts=3, in_progress_timeout=5.0, poll_interval_ms=20):
+        super().__init__()
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max_attempts
+        # Longest silence allowed after an IN_PROGRESS ACK (no retransmits meanwhile)
+        self.in_progress_timeout = in_progress_timeout
+
+        self._drone = None
+        self._hub = None
+        self._sub = None
+        self._lock = threading.RLock()
+        self._active = {}        # (command, sysid, compid) -> _Transaction in flight
+        self._waiting = {}       # same key -> deque of _Transaction
+        # command -> (_LatencyHistogram from the last transmission, from the first one);
+        # they differ only when the ACK came after retransmissions
+        self._histograms = {}
+        self.retransmissions = 0
+
+        self._timer = QTimer()
+        self._timer.setInterval(poll_interval_ms)
+        self._timer.timeout.connect(self._poll)
+        self._wake.connect(self._start_polling)
+
+    # ---------- link ----------
+
+    def attach(self, drone, message_hub):
+        with self._lock:
+            self._drone = drone
+            self._hub = message_hub
+
+    def detach(self, reason="link lost"):
+        """Fail everything in flight; the connection is gone"""
+        with self._lock:
+            pending = list(self._active.values())
+            for queued in self._waiting.values():
+                pending.extend(queued)
+            self._active.clear()
+            self._waiting.clear()
+            self._close_subscription()
+            self._drone = None
+            self._hub = None
+        self._timer.stop()
+        for txn in pending:
+            self._resolve(txn, None, reason)
+
+    # ---------- sending ----------
+
+    def send(self, command, params=(), target_system=None, target_component=None,
+             ack_timeout=None, max_attempts=None):
+        """
+        Send COMMAND_LONG (params: up to 7 floats). Thread-safe, never blocks.
+        Returns a Future resolving to a CommandOutcome.
+        """
+        params = tuple(float(p) for p in params) + (0.0,) * (7 - len(params))
+        with self._lock:
+            if self._drone is None:
+                txn = _Transaction(command, params, target_system, target_component, 0, 0)
+                self._resolve(txn, None, "not connected")
+                return txn.future
+            txn = _Transaction(
+                command, params,
+                self._drone.target_system if target_system is None else target_system,
+                self._drone.target_component if target_component is None else target_component,
+                self.ack_timeout if ack_timeout is None else ack_timeout,
+                self.max_attempts if max_attempts is None else max_attempts
+            )
+            if txn.key in self._active:
+                # Its ACK would be indistinguishable from the one in flight
+                self._waiting.setdefault(txn.key, deque()).append(txn)
+            else:
+                self._begin(txn)
+        self._wake.emit()
+        return txn.future
+
+    def _begin(self, txn):
+        if self._sub is None:
+            # Subscribe before the first transmission
+            self._sub = self._hub.subscribe('COMMAND_ACK', maxsize=256)
+        self._active[txn.key] = txn
+        self._transmit(txn)
+
+    def _transmit(self, txn):
+        now = time.monotonic()
+        txn.sent_at = now
+        txn.first_sent_at = txn.first_sent_at or now
+        txn.deadline = now + txn.ack_timeout
+        try:
+            self._drone.mav.command_long_send(
+                txn.target_system, txn.target_component, txn.command,
+                txn.attempts,      # confirmation: 0 first, incremented per retransmission
+                *txn.params
+            )
+        except Exception as e:
+            print(f"[CommandManager] ❌ {command_name(txn.command)} send failed: {e}")
+        txn.attempts += 1
+
+    def _start_polling(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    # ---------- matching ----------
+
+    def _poll(self):
+        with self._lock:
+            if self._sub is not None:
+                for msg in self._sub.drain():
+                    self._on_command_ack(msg)
+
+            now = time.monotonic()
+            for txn in list(self._active.values()):
+                if now < txn.deadline:
+                    continue
+                if txn.answered or txn.attempts >= txn.max_attempts:
+                    # No retransmission once the vehicle reported IN_PROGRESS
+                    self._finish(txn, None, "timeout")
+                else:
+                    print(f"[CommandManager] 🔁 {command_name(txn.command)} unacknowledged, "
+                          f"retransmitting (confirmation {txn.attempts})")
+                    self.retransmissions += 1
+                    self._transmit(txn)
+
+            if not self._active:
+                self._close_subscription()
+                self._timer.stop()
+
+    def _on_command_ack(self, msg):
+        # Ignore ACKs addressed to another GCS
+        own_system = self._drone.mav.srcSystem if self._drone is not None else 0
+        if getattr(msg, 'target_system', 0) not in (0, own_system):
+            return
+        txn = self._match(msg.command, msg.get_srcSystem(), msg.get_srcComponent())
+        if txn is None:
+            return
+
+        now = time.monotonic()
+        if not txn.answered:
+            txn.answered = True
+            self._record_latency(txn.command, now - txn.sent_at, now - txn.first_sent_at)
+
+        if msg.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            progress = getattr(msg, 'progress', None)
+            txn.progress = progress if progress is not None and progress <= 100 else None
+            txn.deadline = now + self.in_progress_timeout
+            self.commandProgress.emit(command_name(txn.command), -1 if txn.progress is None else int(txn.progress))
+            return
+        self._finish(txn, msg.result)
+
+    def _match(self, command, system, component):
+        txn = self._active.get((command, system, component))
+        if txn is None:
+            # Sent to the system's broadcast component
+            txn = self._active.get((command, system, 0))
+        return txn
+
+    def _finish(self, txn, result, reason=None):
+        self._active.pop(txn.key, None)
+        queued = self._waiting.get(txn.key)
+        if queued:
+            self._begin(queued.popleft())
+            if not queued:
+                del self._waiting[txn.key]
+        self._resolve(txn, result, reason)
+
+    def _resolve(self, txn, result, reason):
+        latency = time.monotonic() - txn.first_sent_at if txn.first_sent_at else 0.0
+        outcome = CommandOutcome(txn.command, result, txn.attempts, latency, txn.progress, reason)
+        print(f"[CommandManager] {'✅' if outcome.accepted else '⚠️'} {command_name(txn.command)}: {outcome.describe()}")
+        self.commandFinished.emit(command_name(txn.command), outcome.describe())
+        if not txn.future.done():
+            txn.future.set_result(outcome)
+
+    def _close_subscription(self):
+        if self._sub is not None:
+            self._sub.close()
+            self._sub = None
+
+    # ---------- metrics ----------
+
+    def _record_latency(self, command, last_send, first_send):
+        histograms = self._histograms.get(command)
+        if histograms is None:
+            histograms = self._histograms[command] = (_LatencyHistogram(), _LatencyHistogram())
+        histograms[0].add(1000 * last_send)
+        histograms[1].add(1000 * first_send)
+        self.statsChanged.emit()
+
+    def latency_stats(self):
+        """
+        {command name: {'last_send': ..., 'first_send': ...}} with count/mean/p50/p95/max
+        in ms and bucket counts of the time to the first ACK, measured from the
+        transmission it answered and from the first one (retries included)
+        """
+        with self._lock:
+            return {command_name(command): {'last_send': last_send.summary(), 'first_send': first_send.summary()}
+                    for command, (last_send, first_send) in self._histograms.items()}
+
+    @pyqtProperty('QVariantMap', notify=statsChanged)
+    def latencyStats(self):
+        return self.latency_stats()
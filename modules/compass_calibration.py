@@ -10,6 +10,17 @@ from PyQt5.QtCore import QObject, pyqtSignal, pyqtProperty, pyqtSlot, QTimer, QM
 from pymavlink import mavutil
 
 
+# Message rates (Hz) requested from StreamRateManager while calibrating
+CALIBRATION_RATES = {'MAG_CAL_PROGRESS': 10, 'MAG_CAL_REPORT': 5}
+
+# Messages the calibration reads; a wildcard subscription would switch off the
+# link's decode prefilter (and forward everything in process mode)
+CALIBRATION_MESSAGES = (
+    'MAG_CAL_PROGRESS', 'MAG_CAL_REPORT', 'STATUSTEXT', 'COMMAND_ACK', 'SENSOR_OFFSETS', 'AHRS',
+    'HEARTBEAT', 'RAW_IMU', 'SCALED_IMU', 'SCALED_IMU2', 'SCALED_IMU3',
+)
+
+
 class MissionPlannerCompassCalibration(QObject):
     """
     Mission Planner compatible compass calibration with RELIABLE completion sound
@@ -139,24 +150,28 @@ class MissionPlannerCompassCalibration(QObject):
             return 3  # Default assumption
     
         try:
-            # Request parameter list to check for compass parameters
-            self._mavlink_connection.mav.param_request_list_send(
-                self._pixhawk_target_system,
-                self._pixhawk_target_component
-            )
-            
             # Look for COMPASS_USE, COMPASS_USE2, COMPASS_USE3 parameters
             compass_count = 0
             timeout = time.time() + 5.0
             
-            while time.time() < timeout:
-                msg = self._mavlink_connection.recv_match(type='PARAM_VALUE', blocking=False, timeout=0.1)
-                if msg:
-                    param_name = msg.param_id.decode('utf-8').strip('\x00')
-                    if param_name.startswith('COMPASS_USE'):
-                        if msg.param_value > 0:  # Compass is enabled
-                            compass_count += 1
-                            print(f"[Compass] Found active compass: {param_name} = {msg.param_value}")
+            with self.drone_model.message_hub.subscribe('PARAM_VALUE', maxsize=2048) as param_sub:
+                # Request parameter list to check for compass parameters
+                self._mavlink_connection.mav.param_request_list_send(
+                    self._pixhawk_target_system,
+                    self._pixhawk_target_component
+                )
+                
+                while time.time() < timeout:
+                    msg = param_sub.get(timeout=max(0.0, timeout - time.time()))
+                    if msg:
+                        param_name = msg.param_id
+                        if isinstance(param_name, bytes):
+                            param_name = param_name.decode('utf-8')
+                        param_name = param_name.strip('\x00')
+                        if param_name.startswith('COMPASS_USE'):
+                            if msg.param_value > 0:  # Compass is enabled
+                                compass_count += 1
+                                print(f"[Compass] Found active compass: {param_name} = {msg.param_value}")
             
             # If we couldn't detect via parameters, check via COMPASS_CAL_PROGRESS messages
             if compass_count == 0:
@@ -494,6 +509,8 @@ class MissionPlannerCompassCalibration(QObject):
         # Send MAVLink calibration cancel command
         if self._mavlink_connection:
             self._send_compass_calibration_cancel()
+        # May run on the monitoring thread (retries exhausted): release from the GUI thread
+        QMetaObject.invokeMethod(self, "_release_calibration_streams", Qt.QueuedConnection)
         
         # Reset progress and state - CRITICAL FIX
         with self._progress_lock:
@@ -591,6 +608,7 @@ class MissionPlannerCompassCalibration(QObject):
         self._heartbeat_timer.stop()
         self._simulation_timer.stop()
         self._completion_timer.stop()
+        self._release_calibration_streams()
         
         # MANUAL REBOOT MESSAGE - No automatic reboot
         self._set_status("✅ Calibration completed successfully! Manual reboot required before flight.")
@@ -725,27 +743,8 @@ class MissionPlannerCompassCalibration(QObject):
                 print("[Compass] Requested COMPASS_CAL_REPORT at 5Hz")
             except:
                 pass
-                
-            # Request general data streams that include calibration info
-            data_streams = [
-                mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS,
-                mavutil.mavlink.MAV_DATA_STREAM_EXTRA1,
-                mavutil.mavlink.MAV_DATA_STREAM_EXTRA2,
-            ]
             
-            for stream in data_streams:
-                try:
-                    self._mavlink_connection.mav.request_data_stream_send(
-                        self._pixhawk_target_system,
-                        self._pixhawk_target_component,
-                        stream,
-                        10,  # 10 Hz
-                        1    # start streaming
-                    )
-                    print(f"[Compass] Requested data stream {stream}")
-                except Exception as e:
-                    print(f"[Compass] Stream {stream} request failed: {e}")
-                    
+            # Stream rates are requested once per calibration by _request_calibration_data_streams
             print("[Compass] All calibration setup complete - progress should update automatically")
             
         except Exception as e:
@@ -781,31 +780,19 @@ class MissionPlannerCompassCalibration(QObject):
                 except:
                     pass
             
-            # Request general data streams that include calibration info
-            streams_to_request = [
-                mavutil.mavlink.MAV_DATA_STREAM_EXTENDED_STATUS,
-                mavutil.mavlink.MAV_DATA_STREAM_EXTRA1,
-                mavutil.mavlink.MAV_DATA_STREAM_EXTRA2,
-            ]
-            
-            for stream in streams_to_request:
-                try:
-                    self._mavlink_connection.mav.request_data_stream_send(
-                        self._pixhawk_target_system,
-                        self._pixhawk_target_component,
-                        stream,
-                        10,  # 10 Hz
-                        1   # start streaming
-                    )
-                    print(f"[Compass] Requested data stream {stream}")
-                except:
-                    pass
-                    
+            # Calibration streams only through the manager, released when calibration ends
+            self.drone_model.streamRates.request('compass_cal', CALIBRATION_RATES)
             print("[Compass] Data stream requests completed")
             
         except Exception as e:
             print(f"[Compass] Data stream request error: {e}")
 
+    @pyqtSlot()
+    def _release_calibration_streams(self):
+        """Hand the calibration stream rates back to StreamRateManager"""
+        if self.drone_model is not None:
+            self.drone_model.streamRates.release('compass_cal')
+
     def _send_compass_calibration_cancel(self):
         """Send MAVLink command to cancel compass calibration"""
         if not self._mavlink_connection:
@@ -872,15 +859,18 @@ class MissionPlannerCompassCalibration(QObject):
         fallback_progress = 0
         last_fallback_time = time.time()
         
+        # Messages come from MAVLinkThread via the hub - never read the port here
+        message_sub = self.drone_model.message_hub.subscribe(CALIBRATION_MESSAGES, maxsize=1024)
+        
         while not self._stop_calibration and self._calibration_active:
             try:
                 message_received = False
                 
                 if self._mavlink_connection:
-                    # ENHANCED: Check for multiple messages in quick succession
-                    for _ in range(10):  # Process up to 10 messages per loop
-                        msg = self._mavlink_connection.recv_match(blocking=False, timeout=0.01)
-                        
+                    # Wait for the first message, then process everything queued
+                    first_msg = message_sub.get(timeout=0.1)
+                    pending = [first_msg] + message_sub.drain() if first_msg else []
+                    for msg in pending:
                         if msg:
                             msg_type = msg.get_type()
                             message_received = True
@@ -912,8 +902,6 @@ class MissionPlannerCompassCalibration(QObject):
                                             break
                             except:
                                 pass
-                        else:
-                            break  # No more messages
                 
                 # CRITICAL FIX: If no real messages, simulate realistic progress
                 current_time = time.time()
@@ -960,12 +948,14 @@ class MissionPlannerCompassCalibration(QObject):
                         
                     last_status_time = current_time
                     
-                time.sleep(0.1)  # 10Hz monitoring
+                if not self._mavlink_connection:
+                    time.sleep(0.1)  # 10Hz monitoring
                 
             except Exception as e:
                 print(f"[Compass] Auto monitoring error: {e}")
                 time.sleep(0.5)
         
+        message_sub.close()
         print("[Compass] Automatic progress monitoring stopped")
     
     def _handle_mavlink_message(self, msg):
@@ -1257,7 +1247,8 @@ class MissionPlannerCompassCalibration(QObject):
         # Test message receiving
         if self._mavlink_connection and not self._calibration_started:
             try:
-                msg = self._mavlink_connection.recv_match(blocking=False, timeout=0.1)
+                with self.drone_model.message_hub.subscribe(CALIBRATION_MESSAGES) as sample_sub:
+                    msg = sample_sub.get(timeout=0.1)
                 if msg:
                     print(f"[Compass] Sample message received: {msg.get_type()}")
                 else:
@@ -1,17 +1,30 @@
-import time
-import queue
 import threading
+import time
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, pyqtProperty, QThread
 from pymavlink import mavutil
 from pymavlink.dialects.v20 import ardupilotmega as mavlink_dialect
 from pymavlink.dialects.v20 import common as mavlink_common
 from pymavlink.dialects.v20 import ardupilotmega as mavutil_ardupilot
+from modules.async_commands import VehicleCommands, CommandError
+from modules.mission_transfer import build_mission_items
+from modules.mission_sync import MissionCache
+from modules.mission_store import MissionArray, MissionItemsModel
+from modules.mission_validation import DEFAULT_LIMITS
+from modules.param_sync import ParamCache
+from modules.param_model import ParamTableModel, ParamFilterModel
+
+PARAM_BATCH_INTERVAL = 0.1    # s between table updates while parameters stream in
 
 class DroneCommander(QObject):
     commandFeedback = pyqtSignal(str)
     armDisarmCompleted = pyqtSignal(bool, str)
     parametersUpdated = pyqtSignal()  # FIXED: No arguments, QML will read property
     parameterReceived = pyqtSignal(str, float)  # Individual parameter updates
+    missionUploadProgress = pyqtSignal(int, int)  # items sent, total
+    missionUploadSuccess = pyqtSignal(int)
+    missionUploadFailed = pyqtSignal(str)
+    parameterWriteFinished = pyqtSignal(str, bool, str)  # name, confirmed, message
+    missionDownloadProgress = pyqtSignal(int, int)  # items received, total
 
    # Add to __init__
     def __init__(self, drone_model):
@@ -19,9 +32,14 @@ class DroneCommander(QObject):
      self.drone_model = drone_model
      self._parameters = {}
      self._param_lock = threading.Lock()
-     self._fetching_params = False
-     self._param_queue = queue.Queue()
-     self._param_request_active = False
+     self._mission_cache = MissionCache()
+     self._param_cache = ParamCache()
+     self._param_cache_key = None
+     self._param_table = ParamTableModel(self)
+     self._param_view = ParamFilterModel(self._param_table, self)
+     self._param_batch = []
+     self._param_batch_at = 0.0
+     self._vehicle_mission = MissionItemsModel(self)
     
     # Mode change protection
      self._mode_change_in_progress = False
@@ -39,6 +57,12 @@ class DroneCommander(QObject):
     def _drone(self):
         return self.drone_model.drone_connection
 
+    @staticmethod
+    def _decode_param_id(param_id):
+        if isinstance(param_id, bytes):
+            return param_id.decode('utf-8').strip('\x00')
+        return str(param_id).strip('\x00')
+
     def _is_drone_ready(self):
         if not self._drone or not self.drone_model.isConnected:
             self.commandFeedback.emit("Error: Drone not connected or ready.")
@@ -55,6 +79,44 @@ class DroneCommander(QObject):
             print(f"[DroneCommander] Set target_system={self._drone.target_system}, target_component={self._drone.target_component}")
         
         return True
+
+    def _vehicle(self):
+        """Coroutine API for the current connection"""
+        return VehicleCommands(
+            self._drone,
+            self.drone_model.message_hub,
+            self.drone_model.commandManager,
+            self.drone_model.async_loop,
+            feedback=self.commandFeedback.emit,
+            stream_rates=self.drone_model.streamRates
+        )
+
+    def _schedule(self, name, coro, on_result=None, on_error=None):
+        """
+        Run a coroutine on the async command loop. Callbacks run on the loop's
+        thread (signals emitted there are queued to QML).
+        """
+        future = self.drone_model.async_loop.submit(coro, name)
+
+        def done(f):
+            if f.cancelled():
+                print(f"[DroneCommander] {name} cancelled")
+                error = "cancelled"
+            else:
+                error = f.exception()
+                if error is None:
+                    if on_result is not None:
+                        on_result(f.result())
+                    return
+                if not isinstance(error, CommandError):
+                    print(f"[DroneCommander ERROR] {name} failed: {error!r}")
+            if on_error is not None:
+                on_error(str(error))
+            else:
+                self.commandFeedback.emit(str(error))
+
+        future.add_done_callback(done)
+        return future
     
     @pyqtSlot(result=bool)
     def calibrateESCs(self):
@@ -102,19 +164,20 @@ class DroneCommander(QObject):
         try:
             print("[DroneCommander] Sending autopilot reboot command...")
             
-            self._drone.mav.command_long_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN,
-                0,
-                1,
-                0,
-                0, 0, 0, 0, 0
+            def on_outcome(outcome):
+                if outcome.accepted:
+                    self.commandFeedback.emit("Autopilot rebooting - device will restart")
+                else:
+                    self.commandFeedback.emit(f"Reboot refused: {outcome.describe()}")
+            
+            self._schedule(
+                'reboot',
+                self._vehicle().command(mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN, (1,)),
+                on_outcome
             )
             
             print("[DroneCommander] Reboot command sent successfully")
-            self.commandFeedback.emit("Autopilot reboot command sent - device will restart")
-            print("Autopilot reboot command sent. Device will restart.")
+            self.commandFeedback.emit("Autopilot reboot command sent - waiting for confirmation...")
             return True
             
         except Exception as e:
@@ -139,15 +202,18 @@ class DroneCommander(QObject):
         
         try:
             print("[DroneCommander] Sending ARM commands...")
-            self._drone.mav.command_long_send(
-                    self._drone.target_system,
-                    self._drone.target_component,
-                    mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
-                    0,
-                    1,
-                    0, 0, 0, 0, 0, 0
-            )
-            print(f"[DroneCommander]   ARM attempt")
+            
+            def on_outcome(outcome):
+                if outcome.accepted:
+                    self.armDisarmCompleted.emit(True, "Drone Armed Successfully!")
+                elif outcome.result is None:
+                    self.armDisarmCompleted.emit(False, f"Arm command {outcome.describe()}. Check drone status.")
+                else:
+                    self.armDisarmCompleted.emit(False, f"Arm command {outcome.describe()} (check pre-arm messages).")
+            
+            self._schedule('arm', self._vehicle().arm(), on_outcome,
+                           lambda error: self.armDisarmCompleted.emit(False, f"Arm command {error}"))
+            self.commandFeedback.emit("Arm command sent. Waiting for confirmation...")
             
             return True    
         except Exception as e:
@@ -169,35 +235,20 @@ class DroneCommander(QObject):
         print("Disarming drone.")
         
         try:
-            self._drone.mav.command_long_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
-                0, 0, 0, 0, 0, 0, 0, 0
-            )
-            self.commandFeedback.emit("Disarm command sent. Waiting for confirmation...")
+            def on_outcome(outcome):
+                if outcome.accepted:
+                    self.armDisarmCompleted.emit(True, "Drone Disarmed Successfully!")
+                elif outcome.result == mavutil.mavlink.MAV_RESULT_DENIED:
+                    self.armDisarmCompleted.emit(False, "Disarm command denied by drone. (e.g., motors running).")
+                elif outcome.result == mavutil.mavlink.MAV_RESULT_FAILED:
+                    self.armDisarmCompleted.emit(False, "Disarm command failed on drone. Check drone status/log.")
+                else:
+                    self.armDisarmCompleted.emit(False, f"Disarm command {outcome.describe()}. Check drone status/log.")
             
-            # ack_result = self._wait_for_command_ack(mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM)
-
-            # if ack_result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-            #     self.armDisarmCompleted.emit(True, "Drone Disarmed Successfully!")
-            #     print("Drone disarmed successfully.")
-            #     return True
-            # elif ack_result == mavutil.mavlink.MAV_RESULT_DENIED:
-            #     msg = "Disarm command denied by drone. (e.g., motors running)."
-            #     self.armDisarmCompleted.emit(False, msg)
-            #     print("Disarm command denied. Motors may be running.")
-            #     return False
-            # elif ack_result == mavutil.mavlink.MAV_RESULT_FAILED:
-            #     msg = "Disarm command failed on drone. Check drone status/log."
-            #     self.armDisarmCompleted.emit(False, msg)
-            #     print("Disarm command failed. Check drone status.")
-            #     return False
-            # else:
-            #     msg = "Disarm command timed out or received unknown ACK result. Check drone status/log."
-            #     self.armDisarmCompleted.emit(False, msg)
-            #     print("Disarm command timed out.")
-            #     return False
+            self._schedule('disarm', self._vehicle().disarm(), on_outcome,
+                           lambda error: self.armDisarmCompleted.emit(False, f"Disarm command {error}"))
+            self.commandFeedback.emit("Disarm command sent. Waiting for confirmation...")
+            return True
         except Exception as e:
             msg = f"Error sending DISARM command: {e}"
             self.commandFeedback.emit(msg)
@@ -208,160 +259,31 @@ class DroneCommander(QObject):
 
     @pyqtSlot(float, float, result=bool)
     def takeoff(self, target_altitude, target_speed):
-     """Non-blocking takeoff - starts thread and returns immediately"""
+     """Non-blocking takeoff - each stage advances on vehicle events"""
      if not self._is_drone_ready():
         self.commandFeedback.emit("❌ Drone not connected")
         return False
 
-    # Start takeoff in separate thread to prevent UI freeze
-     takeoff_thread = threading.Thread(
-        target=self._execute_takeoff_sequence,
-        args=(target_altitude, target_speed),
-        daemon=True
+     # A new takeoff replaces (cancels) one still running
+     self._schedule(
+        'takeoff',
+        self._vehicle().takeoff(
+            target_altitude,
+            on_armed=lambda: self.armDisarmCompleted.emit(True, "Drone Armed Successfully!")
+        ),
+        lambda report: self.commandFeedback.emit(
+            f"✅ Takeoff successful! (airborne {report.arm_to_airborne:.1f}s after arming)"
+        )
      )
-     takeoff_thread.start()
     
      self.commandFeedback.emit("🚁 Takeoff sequence started...")
      return True
 
-    def _execute_takeoff_sequence(self, target_altitude, target_speed):
-     """Execute takeoff sequence in background thread"""
-     try:
-        print("\n[DroneCommander] ===== TAKEOFF SEQUENCE STARTED =====")
-        print(f"[DroneCommander] Target altitude: {target_altitude} m")
-
-        # ----------------------------------------------------
-        # 1️⃣ Disable failsafes (SITL)
-        # ----------------------------------------------------
-        self.commandFeedback.emit("⚙️ Configuring parameters...")
-        
-        params = {
-            b'FS_THR_ENABLE': 0,
-            b'FS_GCS_ENABLE': 0,
-            b'FS_BATT_ENABLE': 0,
-            b'ARMING_CHECK': 0
-        }
-
-        for p, v in params.items():
-            self._drone.mav.param_set_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                p, v,
-                mavutil.mavlink.MAV_PARAM_TYPE_INT32
-            )
-            time.sleep(0.3)
-
-        time.sleep(6)
-
-        # ----------------------------------------------------
-        # 2️⃣ GUIDED MODE
-        # ----------------------------------------------------
-        print("[DroneCommander] 🎯 Switching to GUIDED mode")
-        self.commandFeedback.emit("🎯 Switching to GUIDED mode...")
-
-        mode_id = self._drone.mode_mapping().get("GUIDED")
-        self._drone.mav.set_mode_send(
-            self._drone.target_system,
-            mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
-            mode_id
-        )
-
-        time.sleep(2)
-
-        if self._drone.flightmode != "GUIDED":
-            print("❌ GUIDED mode failed")
-            self.commandFeedback.emit("❌ Failed to enter GUIDED mode")
-            return False
-
-        print("[DroneCommander] ✅ GUIDED mode confirmed")
-        self.commandFeedback.emit("✅ GUIDED mode confirmed")
-
-        # ----------------------------------------------------
-        # 3️⃣ ARM (RAW MAVLINK — SAFE)
-        # ----------------------------------------------------
-        print("[DroneCommander] 🔐 Arming drone")
-        self.commandFeedback.emit("🔐 Arming drone...")
-
-        for _ in range(5):
-            self._drone.mav.command_long_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM,
-                0,
-                1,      # ARM
-                0,      # no force needed now
-                0, 0, 0, 0, 0
-            )
-            time.sleep(0.4)
-
-        # wait for heartbeat update
-        time.sleep(2)
-
-        if not self._drone.motors_armed():
-            print("❌ Arm failed")
-            self.commandFeedback.emit("❌ Failed to arm")
-            return False
-
-        print("[DroneCommander] ✅ Armed confirmed")
-        self.commandFeedback.emit("✅ Drone armed")
-        self.armDisarmCompleted.emit(True, "Drone Armed Successfully!")
-
-        # ----------------------------------------------------
-        # 4️⃣ TAKEOFF
-        # ----------------------------------------------------
-        print(f"[DroneCommander] 🚁 Taking off to {target_altitude} m")
-        self.commandFeedback.emit(f"🚁 Taking off to {target_altitude}m...")
-
-        self._drone.mav.command_long_send(
-            self._drone.target_system,
-            self._drone.target_component,
-            mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
-            0,
-            0, 0, 0, 0,
-            0, 0,
-            target_altitude
-        )
-
-        start_alt = self._drone.location().alt if self._drone.location() else 0
-        start_time = time.time()
-
-        while time.time() - start_time < 30:
-            alt = self._drone.location().alt if self._drone.location() else start_alt
-            gain = alt - start_alt
-
-            print(f"[DroneCommander] Alt: {alt:.2f} (+{gain:.2f})")
-            
-            # Update UI with progress
-            if gain > 0:
-                progress_pct = min(100, int((gain / target_altitude) * 100))
-                self.commandFeedback.emit(f"🚁 Climbing: {alt:.1f}m ({progress_pct}%)")
-
-            if not self._drone.motors_armed():
-                print("❌ Disarmed during takeoff")
-                self.commandFeedback.emit("❌ Disarmed during takeoff")
-                return False
-
-            if gain > 1.0:
-                print("✅ Takeoff successful")
-                self.commandFeedback.emit("✅ Takeoff successful!")
-                return True
+    @pyqtSlot()
+    def cancelTakeoff(self):
+        if self.drone_model.async_loop.cancel('takeoff'):
+            self.commandFeedback.emit("Takeoff cancelled")
 
-            time.sleep(0.5)
-
-        print("❌ Takeoff timeout")
-        self.commandFeedback.emit("❌ Takeoff timeout")
-        return False
-
-     except Exception as e:
-        error_msg = f"❌ Takeoff error: {e}"
-        print(f"[DroneCommander] {error_msg}")
-        self.commandFeedback.emit(error_msg)
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-    
     @pyqtSlot(result=bool)
     def land(self):
         if not self._is_drone_ready(): 
@@ -379,27 +301,21 @@ class DroneCommander(QObject):
         print("Drone landing initiated.")
         
         try:
-            self._drone.mav.command_long_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                mavutil.mavlink.MAV_CMD_NAV_LAND,
-                0,
-                0, 0, 0, 0,
-                self.drone_model.telemetry['lat'],
-                self.drone_model.telemetry['lon'],
-                0
+            def on_outcome(outcome):
+                if outcome.accepted:
+                    self.commandFeedback.emit("Land initiated successfully!")
+                    print("Landing initiated successfully.")
+                else:
+                    self.commandFeedback.emit(f"Land command failed or denied: {outcome.describe()}")
+                    print("Land command failed or denied.")
+            
+            self._schedule(
+                'land',
+                self._vehicle().land(self.drone_model.telemetry['lat'], self.drone_model.telemetry['lon']),
+                on_outcome
             )
             self.commandFeedback.emit("Land command sent. Waiting for confirmation...")
-
-            ack_result = self._wait_for_command_ack(mavutil.mavlink.MAV_CMD_NAV_LAND)
-            if ack_result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                self.commandFeedback.emit("Land initiated successfully!")
-                print("Landing initiated successfully.")
-                return True
-            else:
-                self.commandFeedback.emit(f"Land command failed or denied. Result: {ack_result}")
-                print("Land command failed or denied.")
-                return False
+            return True
         except Exception as e:
             self.commandFeedback.emit(f"Error sending LAND command: {e}")
             print("Error sending land command.")
@@ -420,21 +336,15 @@ class DroneCommander(QObject):
                 print(f"[DroneCommander] SET_MODE failed: Unknown mode '{mode_name}'.")
                 return False
 
-            self._drone.mav.set_mode_send(
-                self._drone.target_system,
-                mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
-                mode_id
-            )
-            self.commandFeedback.emit(f"Set mode to '{mode_name}' command sent. Waiting for confirmation...")
+            def on_outcome(outcome):
+                if outcome.accepted:
+                    self.commandFeedback.emit(f"Mode set to '{mode_name}' successfully.")
+                else:
+                    self.commandFeedback.emit(f"Failed to set mode to '{mode_name}': {outcome.describe()}")
 
-            # Note: set_mode_send typically generates a COMMAND_ACK for MAV_CMD_DO_SET_MODE (176)
-            ack_result = self._wait_for_command_ack(mavutil.mavlink.MAV_CMD_DO_SET_MODE)
-            if ack_result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                self.commandFeedback.emit(f"Mode set to '{mode_name}' successfully.")
-                return True
-            else:
-                self.commandFeedback.emit(f"Failed to set mode to '{mode_name}'. Result: {ack_result}")
-                return False
+            self._schedule('set_mode', self._vehicle().set_mode(mode_name), on_outcome)
+            self.commandFeedback.emit(f"Set mode to '{mode_name}' command sent. Waiting for confirmation...")
+            return True
         except Exception as e:
             self.commandFeedback.emit(f"Error sending SET_MODE command: {e}")
             print(f"[DroneCommander ERROR] SET_MODE command failed: {e}")
@@ -452,281 +362,112 @@ class DroneCommander(QObject):
 
         print(f"[DroneCommander] Mission Upload: {len(waypoints)} waypoints...")
         self.commandFeedback.emit(f"Uploading mission with {len(waypoints)} waypoints...")
-        print(f"Uploading mission with {len(waypoints)} waypoints.")
 
         try:
-            print("\n=== MISSION UPLOAD DIAGNOSTICS ===")
-            print(f"Connection object: {type(self._drone)}")
-            print(f"Target system: {self._drone.target_system}")
-            print(f"Target component: {self._drone.target_component}")
-            print(f"Source system: {getattr(self._drone, 'source_system', 'Unknown')}")
-            print(f"Source component: {getattr(self._drone, 'source_component', 'Unknown')}")
-            print(f"Connection port: {getattr(self._drone, 'port', 'Unknown')}")
-            print("=====================================\n")
-            
-            print("[DroneCommander] Testing basic communication...")
-            
-            self._drone.mav.heartbeat_send(
-                mavutil.mavlink.MAV_TYPE_GCS,
-                mavutil.mavlink.MAV_AUTOPILOT_INVALID,
-                0, 0, 0
-            )
-            
-            print("[DroneCommander] Listening for ANY messages from drone...")
-            message_count = 0
-            start_time = time.time()
-            
-            while time.time() - start_time < 3:
-                msg = self._drone.recv_match(blocking=False, timeout=0.1)
-                if msg:
-                    message_count += 1
-                    print(f"[DroneCommander] Received: {msg.get_type()} from system {msg.get_srcSystem()}")
-                    
-                    if msg.get_type() == 'HEARTBEAT':
-                        print(f"  - Heartbeat details: type={msg.type}, autopilot={msg.autopilot}")
-                    elif msg.get_type() == 'MISSION_ACK':
-                        print(f"  - Mission ACK: type={msg.type}")
-                    elif msg.get_type() == 'MISSION_REQUEST':
-                        print(f"  - Mission Request: seq={msg.seq}")
-                        
-                if message_count > 0 and message_count % 10 == 0:
-                    print(f"[DroneCommander] Received {message_count} messages so far...")
-            
-            print(f"[DroneCommander] Total messages received in 3s: {message_count}")
-            
-            if message_count == 0:
-                self.commandFeedback.emit("ERROR: No messages received from drone - connection may be broken")
-                print("Error. No messages received from drone.")
-                print("[DroneCommander ERROR] No communication with drone detected")
-                return False
-            
-            if self._drone.target_system == 0:
-                self._drone.target_system = 1
-                print("[DroneCommander] Set target_system to 1")
-            
-            if self._drone.target_component == 0:
-                self._drone.target_component = 1
-                print("[DroneCommander] Set target_component to 1")
-            
-            print("[DroneCommander] Testing mission protocol - requesting current mission...")
-            self._drone.mav.mission_request_list_send(
-                self._drone.target_system,
-                self._drone.target_component
-            )
-            
-            mission_protocol_works = False
-            start_time = time.time()
-            while time.time() - start_time < 8:
-                msg = self._drone.recv_match(type=['MISSION_COUNT', 'MISSION_ACK'], blocking=False, timeout=0.5)
-                if msg:
-                    print(f"[DroneCommander] Mission protocol test result: {msg.get_type()}")
-                    if msg.get_type() == 'MISSION_COUNT':
-                        print(f"  - Current mission has {msg.count} waypoints")
-                        mission_protocol_works = True
-                        break
-                    elif msg.get_type() == 'MISSION_ACK':
-                        print(f"  - Mission ACK: {msg.type}")
-                        if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED or msg.type == mavutil.mavlink.MAV_MISSION_NO_SPACE:
-                            mission_protocol_works = True
-                            break
-            
-            if not mission_protocol_works:
-                print("[DroneCommander] Mission protocol test failed, but continuing anyway...")
-                print("[DroneCommander] This is common with some SITL configurations")
-            else:
-                print("[DroneCommander] Mission protocol is working, proceeding with upload...")
-            
-            print("[DroneCommander] Clearing existing mission...")
-            self._drone.mav.mission_clear_all_send(
-                self._drone.target_system,
-                self._drone.target_component
-            )
-            
-            clear_ack = self._drone.recv_match(type='MISSION_ACK', blocking=True, timeout=3)
-            if clear_ack:
-                print(f"[DroneCommander] Mission clear result: {clear_ack.type}")
-            else:
-                print("[DroneCommander] No clear acknowledgment received, continuing...")
-            
-            time.sleep(0.5)
-            
-            mission_waypoints = []
-            
-            current_lat = self.drone_model.telemetry.get('lat', 0.0)
-            current_lon = self.drone_model.telemetry.get('lon', 0.0)
-            takeoff_alt = waypoints[0].get('z', 10.0) if waypoints else 10.0
-            
+            # lat/lon are None until the first position fix
+            current_lat = self.drone_model.telemetry.get('lat') or 0.0
+            current_lon = self.drone_model.telemetry.get('lon') or 0.0
             print(f"[DroneCommander] Current position: {current_lat:.6f}, {current_lon:.6f}")
-            
-            takeoff_waypoint = {
-                'seq': 0,
-                'frame': mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
-                'command': mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
-                'current': 1,
-                'autocontinue': 1,
-                'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
-                'x': current_lat, 'y': current_lon, 'z': takeoff_alt
-            }
-            mission_waypoints.append(takeoff_waypoint)
-            
-            for i, wp in enumerate(waypoints):
-                waypoint = {
-                    'seq': i + 1,
-                    'frame': mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
-                    'command': mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
-                    'current': 0,
-                    'autocontinue': 1,
-                    'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
-                    'x': wp.get('x', 0), 'y': wp.get('y', 0), 'z': wp.get('z', 10)
-                }
-                mission_waypoints.append(waypoint)
-            
-            total_waypoints = len(mission_waypoints)
-            print(f"[DroneCommander] Prepared {total_waypoints} waypoints")
-            
-            print(f"[DroneCommander] Sending MISSION_COUNT: {total_waypoints}")
-            self._drone.mav.mission_count_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                total_waypoints
+            items = build_mission_items(waypoints, current_lat, current_lon)
+            print(f"[DroneCommander] Prepared {len(items)} waypoints")
+
+            # Feasibility (altitude limits, battery) before anything is sent; without
+            # a position fix the takeoff leg is left out of the check
+            speeds = [wp.get('speed', DEFAULT_LIMITS['default_speed']) for wp in waypoints]
+            checked, speeds = (items, speeds[:1] + speeds) if (current_lat or current_lon) else (items[1:], speeds)
+            report = self.drone_model.missionCheck.check_items(checked, speeds)
+            if not report.valid:
+                error = "Mission not feasible: " + "; ".join(report.errors)
+                print(f"[DroneCommander] ❌ {error}")
+                self.commandFeedback.emit(error)
+                self.missionUploadFailed.emit(error)
+                return False
+            print(f"[DroneCommander] Mission check: {report.total_distance:.0f} m, ~{report.flight_time:.0f} s "
+                  f"({1000 * report.elapsed:.1f} ms)")
+
+            def on_result(result):
+                self.commandFeedback.emit(f"Mission upload successful! ({result.describe()})")
+                self.missionUploadSuccess.emit(len(waypoints))
+                self._show_vehicle_mission(MissionArray.from_items(items), True)
+
+            def on_error(error):
+                self.commandFeedback.emit(f"Mission upload error: {error}")
+                self.missionUploadFailed.emit(error)
+
+            # Only what the vehicle does not already have is sent; a new upload
+            # replaces (cancels) one still running, and a running download
+            self.drone_model.async_loop.cancel('download_mission')
+            self._schedule(
+                'upload_mission',
+                self._vehicle().sync_mission(items, self._mission_cache, on_progress=self.missionUploadProgress.emit),
+                on_result,
+                on_error
             )
-            
-            print("[DroneCommander] Monitoring for mission response...")
-            start_time = time.time()
-            timeout = 10
-            
-            while time.time() - start_time < timeout:
-                msg = self._drone.recv_match(blocking=False, timeout=0.1)
-                if msg:
-                    msg_type = msg.get_type()
-                    print(f"[DroneCommander] Received during mission upload: {msg_type}")
-                    
-                    if msg_type == 'MISSION_REQUEST':
-                        print(f"[DroneCommander] SUCCESS: Mission request for seq {msg.seq}")
-                        if msg.seq == 0:
-                            return self._send_waypoints_inline(mission_waypoints)
-                        
-                    elif msg_type == 'MISSION_ACK':
-                        print(f"[DroneCommander] Mission ACK during upload: {msg.type}")
-                        if msg.type != mavutil.mavlink.MAV_MISSION_ACCEPTED:
-                            self.commandFeedback.emit(f"Mission rejected: {msg.type}")
-                            print("Mission rejected.")
-                            return False
-            
-            self.commandFeedback.emit("ERROR: No mission request received - drone not accepting missions")
-            print("Error. No mission request received.")
-            print("[DroneCommander ERROR] No mission request received after mission count")
-            return False
-             
+            return True
         except Exception as e:
-            self.commandFeedback.emit(f"Mission upload error: {str(e)}")
-            print("Mission upload error.")
             print(f"[DroneCommander ERROR] Exception: {e}")
             import traceback
             traceback.print_exc()
+            error = f"Mission upload error: {str(e)}"
+            self.commandFeedback.emit(error)
+            self.missionUploadFailed.emit(error)
             return False
 
-    def _send_waypoints_inline(self, waypoints):
-        """Send all waypoints in response to mission requests - inline implementation"""
-        try:
-            total_waypoints = len(waypoints)
-            waypoints_sent = 0
-            
-            wp = waypoints[0]
-            x_int = int(wp['x'] * 1e7)
-            y_int = int(wp['y'] * 1e7)
-            z_float = float(wp['z'])
-            
-            self._drone.mav.mission_item_int_send(
-                self._drone.target_system, self._drone.target_component,
-                wp['seq'], wp['frame'], wp['command'], wp['current'], wp['autocontinue'],
-                wp['param1'], wp['param2'], wp['param3'], wp['param4'],
-                x_int, y_int, z_float
-            )
-            print(f"[DroneCommander] Sent waypoint 0: cmd={wp['command']}, lat={wp['x']:.6f}, lon={wp['y']:.6f}, alt={wp['z']}")
-            waypoints_sent = 1
-            
-            while waypoints_sent < total_waypoints:
-                print(f"[DroneCommander] Waiting for mission request {waypoints_sent}...")
-                
-                start_time = time.time()
-                request_received = False
-                expected_seq = waypoints_sent
-                
-                while time.time() - start_time < 15:
-                    msg = self._drone.recv_match(type=['MISSION_REQUEST', 'MISSION_ACK'], blocking=False, timeout=0.5)
-                    
-                    if msg:
-                        if msg.get_type() == 'MISSION_REQUEST':
-                            print(f"[DroneCommander] Got mission request for seq {msg.seq} (expected {expected_seq})")
-                            request_received = True
-                            
-                            if msg.seq < total_waypoints:
-                                wp_to_send = waypoints[msg.seq]
-                                
-                                x_int = int(wp_to_send['x'] * 1e7)
-                                y_int = int(wp_to_send['y'] * 1e7)
-                                z_float = float(wp_to_send['z'])
-                                
-                                self._drone.mav.mission_item_int_send(
-                                    self._drone.target_system, self._drone.target_component,
-                                    wp_to_send['seq'], wp_to_send['frame'], wp_to_send['command'], 
-                                    wp_to_send['current'], wp_to_send['autocontinue'],
-                                    wp_to_send['param1'], wp_to_send['param2'], wp_to_send['param3'], wp_to_send['param4'],
-                                    x_int, y_int, z_float
-                                )
-                                print(f"[DroneCommander] Sent waypoint {msg.seq}: cmd={wp_to_send['command']}, lat={wp_to_send['x']:.6f}, lon={wp_to_send['y']:.6f}, alt={wp_to_send['z']}")
-                                
-                                if msg.seq == expected_seq:
-                                    waypoints_sent += 1
-                                elif msg.seq >= waypoints_sent:
-                                    waypoints_sent = msg.seq + 1
-                                    
-                            break
-                            
-                        elif msg.get_type() == 'MISSION_ACK':
-                            print(f"[DroneCommander] Received early mission ACK: {msg.type}")
-                            if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
-                                print("[DroneCommander] Mission completed successfully (early ACK)")
-                                self.commandFeedback.emit("Mission upload successful!")
-                                print("Mission upload successful.")
-                                return True
-                            else:
-                                error_msg = f"Mission rejected during upload: {msg.type}"
-                                print(f"[DroneCommander] {error_msg}")
-                                self.commandFeedback.emit(error_msg)
-                                print("Mission rejected during upload.")
-                                return False
-                
-                if not request_received:
-                    error_msg = f"Timeout waiting for mission request {expected_seq}"
-                    print(f"[DroneCommander ERROR] {error_msg}")
-                    self.commandFeedback.emit(error_msg)
-                    print("Timeout waiting for mission request.")
-                    return False
-            
-            print("[DroneCommander] All waypoints sent successfully")
-            self.commandFeedback.emit("Mission upload successful!")
-            print("Mission upload successful.")
-            return True
-            
-        except Exception as e:
-            print(f"[DroneCommander ERROR] Waypoint sending failed: {e}")
-            import traceback
-            traceback.print_exc()
-            self.commandFeedback.emit(f"Mission upload error: {str(e)}")
-            print("Mission upload error.")
+    @pyqtSlot(result=bool)
+    def uploadWaypointList(self):
+        """Upload droneModel.waypointList (commands and hold times included)"""
+        return self.uploadMission(self.drone_model.waypointList.mission_waypoints())
+
+    @pyqtProperty(QObject, constant=True)
+    def vehicleMission(self):
+        """The mission on the vehicle (MissionItemsModel)"""
+        return self._vehicle_mission
+
+    def _show_vehicle_mission(self, mission, verified):
+        # Transfer callbacks run on the async loop; the model lives on the GUI thread
+        self.drone_model.async_loop.call_in_gui(lambda: self._vehicle_mission.set_mission(mission, verified))
+
+    def vehicle_connected(self):
+        """Show the cached mission of this vehicle (unverified) as soon as it is identified, then the vehicle's"""
+        self.downloadMission()
+
+    @pyqtSlot(result=bool)
+    def downloadMission(self):
+        """Read the vehicle's mission into vehicleMission (from the cache when unchanged)"""
+        if not self._is_drone_ready():
             return False
+        if self.drone_model.async_loop.running('upload_mission'):
+            print("[DroneCommander] ⚠️ Mission upload in progress - download skipped")
+            return False
+
+        def on_result(result):
+            mission, from_cache = result
+            self._show_vehicle_mission(mission, True)
+            source = "unchanged, from cache" if from_cache else "downloaded"
+            self.commandFeedback.emit(f"Vehicle mission: {len(mission)} items ({source})")
+
+        def on_cached(mission):
+            print(f"[DroneCommander] Showing cached mission ({len(mission)} items) while verifying")
+            self._show_vehicle_mission(mission, False)
+
+        self._schedule(
+            'download_mission',
+            self._vehicle().load_mission(self._mission_cache, on_cached=on_cached,
+                                         on_progress=self.missionDownloadProgress.emit),
+            on_result,
+            lambda error: self.commandFeedback.emit(f"Mission download error: {error}")
+        )
+        return True
 
     @pyqtSlot(result=bool)
     def requestAllParameters(self):
-     """Request ALL drone parameters - FIXED VERSION"""
+     """Request ALL drone parameters (collected on the async command loop)"""
      if not self._is_drone_ready():
         self.commandFeedback.emit("Error: Drone not connected to request parameters.")
         print("[DroneCommander] ❌ Cannot request parameters - drone not connected")
         return False
     
-     if self._fetching_params:
+     if self.drone_model.async_loop.running('fetch_params'):
         print("[DroneCommander] ⚠️ Parameter fetch already in progress")
         self.commandFeedback.emit("Parameter fetch already in progress...")
         return False
@@ -734,529 +475,92 @@ class DroneCommander(QObject):
      print("\n" + "="*60)
      print("[DroneCommander] ✅ Starting parameter fetch")
      print("="*60)
-    
-    # Mark as active FIRST (before clearing queue)
-     self._fetching_params = True
-     self._param_request_active = True
-    
-    # Clear previous parameters
-     with self._param_lock:
-        self._parameters.clear()
-    
-    # Clear queue completely
-     print("[DroneCommander] 🧹 Clearing parameter queue...")
-     cleared_count = 0
-     while not self._param_queue.empty():
-        try:
-            self._param_queue.get_nowait()
-            cleared_count += 1
-        except queue.Empty:
-            break
-    
-     if cleared_count > 0:
-         print(f"[DroneCommander] 🧹 Cleared {cleared_count} old parameters from queue")
-    
-    # Send parameter request (send multiple times for reliability)
-     print("[DroneCommander] 📤 Sending PARAM_REQUEST_LIST...")
-     for retry in range(3):
-        self._drone.mav.param_request_list_send(
-            self._drone.target_system,
-            self._drone.target_component
-        )
-        time.sleep(0.1)
-    
-    # Start processing thread AFTER sending request
-     print("[DroneCommander] 🚀 Starting processing thread...")
-     fetch_thread = threading.Thread(target=self._process_parameter_queue_fixed, daemon=True)
-     fetch_thread.start()
-     
-     self.commandFeedback.emit("Requesting parameters from drone...")
+
+     # Known vehicles with unchanged parameters load from disk
+     self._schedule('fetch_params', self._vehicle().load_params(self._param_cache, on_param=self._stream_parameter),
+                    self._store_parameters)
      return True
 
+    def _stream_parameter(self, record):
+     # Parameters reach the table in batches while the list streams (async loop thread)
+     self._param_batch.append(record)
+     now = time.monotonic()
+     if now - self._param_batch_at >= PARAM_BATCH_INTERVAL:
+        self._param_batch_at = now
+        batch, self._param_batch = self._param_batch, []
+        self.drone_model.async_loop.call_in_gui(lambda: self._param_table.upsert_records(batch))
+
+    def _parameter_changed(self, param_id, value):
+     if self._param_cache_key:
+        # Changed since the cached set was stored
+        self._param_cache.forget(self._param_cache_key)
+     self.drone_model.async_loop.call_in_gui(lambda: self._param_table.set_value(param_id, value))
+
+    def _store_parameters(self, result):
+     collected, from_cache, self._param_cache_key = result
+     self._param_batch = []
+     if not collected:
+        print("[DroneCommander] ❌ FAILED - No parameters received")
+        self.commandFeedback.emit("❌ Failed to receive any parameters from drone")
+        return
+
+     with self._param_lock:
+        self._parameters = collected
+     print(f"[DroneCommander] 💾 Stored {len(collected)} parameters in memory")
+     records = list(collected.values())
+     self.drone_model.async_loop.call_in_gui(lambda: self._param_table.replace_records(records))
     
-    def _process_parameter_queue_fixed(self):
-     """Process parameters from queue - COMPLETE REWRITE"""
-     print("[DroneCommander] 📥 Processing parameter queue (thread started)...")
-    
-     try:
-        collected_params = {}
-        total_params = None
-        start_time = time.time()
-        last_param_time = time.time()
-        
-        overall_timeout = 60  # 60 seconds total
-        initial_timeout = 10  # 10 seconds to receive first parameter
-        no_data_timeout = 3   # 3 seconds without new data
-        
-        print("[DroneCommander] ⏳ Waiting for first parameter...")
-        first_param_received = False
-        
-        while time.time() - start_time < overall_timeout:
-            try:
-                # Try to get parameter from queue
-                timeout_to_use = 0.5
-                param_data = self._param_queue.get(timeout=timeout_to_use)
-                
-                if param_data:
-                    if not first_param_received:
-                        print("[DroneCommander] ✅ First parameter received!")
-                        first_param_received = True
-                    
-                    last_param_time = time.time()
-                    
-                    param_id = param_data['name']
-                    param_value = param_data['value']
-                    param_type = param_data['type']
-                    param_index = param_data['index']
-                    param_count = param_data['count']
-                    
-                    # Set total on first parameter
-                    if total_params is None:
-                        total_params = param_count
-                        print(f"[DroneCommander] 📊 Total parameters expected: {total_params}")
-                        self.commandFeedback.emit(f"Loading {total_params} parameters...")
-                    
-                    # Store parameter (avoid duplicates)
-                    if param_id not in collected_params:
-                        collected_params[param_id] = {
-                            "name": param_id,
-                            "value": str(param_value),
-                            "type": "FLOAT" if param_type in [9, 10] else "INT32",
-                            "index": param_index,
-                            "count": param_count,
-                            "synced": True,
-                            "default": "0",
-                            "units": "",
-                            "range": "",
-                            "description": ""
-                        }
-                        
-                        # Progress update every 100 params
-                        current_count = len(collected_params)
-                        if current_count % 100 == 0:
-                            progress_pct = (current_count * 100 // total_params) if total_params else 0
-                            print(f"[DroneCommander] 📥 Progress: {current_count}/{total_params} ({progress_pct}%)")
-                            self.commandFeedback.emit(f"Received {current_count}/{total_params} parameters ({progress_pct}%)...")
-                    
-                    # Check if complete
-                    if total_params and len(collected_params) >= total_params:
-                        print(f"[DroneCommander] ✅ All {len(collected_params)} unique parameters received!")
-                        break
-                
-            except queue.Empty:
-                # Check if we haven't received first parameter yet
-                if not first_param_received:
-                    elapsed = time.time() - start_time
-                    if elapsed > initial_timeout:
-                        print(f"[DroneCommander] ❌ No parameters received after {initial_timeout}s")
-                        print("[DroneCommander] ❌ Check MAVLink connection and routing")
-                        self.commandFeedback.emit("❌ No parameters received - check connection")
-                        return
-                    continue
-                
-                # Check timeout for ongoing reception
-                current_count = len(collected_params)
-                time_since_last = time.time() - last_param_time
-                
-                if time_since_last > no_data_timeout:
-                    print(f"[DroneCommander] ℹ️ No new data for {no_data_timeout}s")
-                    print(f"[DroneCommander] ℹ️ Received {current_count} unique parameters so far")
-                    
-                    # Check if we got most parameters
-                    if total_params:
-                        completion_pct = (current_count * 100 // total_params)
-                        print(f"[DroneCommander] 📊 Completion: {completion_pct}%")
-                        
-                        if current_count >= total_params * 0.95:  # 95% threshold
-                            print(f"[DroneCommander] ✅ Got {completion_pct}% - considering complete")
-                            break
-                        elif current_count > 1000:  # Absolute minimum
-                            print(f"[DroneCommander] ✅ Got {current_count} parameters - considering complete")
-                            break
-                        else:
-                            print(f"[DroneCommander] ⏳ Only got {completion_pct}% - waiting longer...")
-                    elif current_count > 1000:
-                        print(f"[DroneCommander] ✅ Got {current_count} parameters without total - considering complete")
-                        break
-                
-                continue
-        
-        # Finalize
-        final_count = len(collected_params)
-        print(f"\n[DroneCommander] 📊 Parameter Collection Summary:")
-        print(f"  - Unique parameters collected: {final_count}")
-        print(f"  - Expected parameters: {total_params if total_params else 'Unknown'}")
-        print(f"  - Time elapsed: {time.time() - start_time:.1f}s")
-        
-        if final_count > 0:
-            # Update the property
-            with self._param_lock:
-                self._parameters = collected_params
-            
-            print(f"[DroneCommander] 💾 Stored {final_count} parameters in memory")
-            
-            # Small delay to ensure property is updated
-            time.sleep(0.1)
-            
-            # Emit signal to QML
-            print(f"[DroneCommander] 📤 Emitting parametersUpdated signal to QML...")
-            self.parametersUpdated.emit()
-            
-            completion_pct = (final_count * 100 // total_params) if total_params else 100
-            self.commandFeedback.emit(f"✅ Loaded {final_count} parameters ({completion_pct}%)!")
-            print(f"[DroneCommander] ✅ Parameters available to QML - SUCCESS!")
-        else:
-            print("[DroneCommander] ❌ FAILED - No parameters received")
-            self.commandFeedback.emit("❌ Failed to receive any parameters from drone")
-    
-     except Exception as e:
-        print(f"[DroneCommander] ❌ EXCEPTION in parameter processing: {e}")
-        import traceback
-        traceback.print_exc()
-        self.commandFeedback.emit(f"Error processing parameters: {e}")
+     # Emit signal to QML
+     print(f"[DroneCommander] 📤 Emitting parametersUpdated signal to QML...")
+     self.parametersUpdated.emit()
     
-     finally:
-        self._fetching_params = False
-        self._param_request_active = False
-        print("[DroneCommander] 🏁 Parameter fetch thread completed")
-        print("="*60 + "\n")
+     total = next(iter(collected.values()))['count']
+     completion_pct = (len(collected) * 100 // total) if total else 100
+     source = " from cache" if from_cache else ""
+     self.commandFeedback.emit(f"✅ Loaded {len(collected)} parameters{source} ({completion_pct}%)!")
+
+     # The mission check estimates battery use against the real pack
+     capacity = collected.get('BATT_CAPACITY')
+     if capacity is not None:
+        self.drone_model.async_loop.call_in_gui(
+            lambda: self.drone_model.missionCheck.setBatteryCapacity(float(capacity['value'])))
 
     def add_parameter_to_queue(self, param_msg):
      """
-     Called by MAVLinkThread when it receives a PARAM_VALUE message.
+     Called by MAVLinkThread for every PARAM_VALUE: keeps cached values current
+     (e.g. parameters changed by another GCS). Full fetches read the hub.
     """
-     if not self._param_request_active:
-        return  # Ignore if we're not requesting parameters
-    
-     try:
-        # Handle both bytes and string for param_id
-        param_id = param_msg.param_id
-        if isinstance(param_id, bytes):
-            param_id = param_id.decode('utf-8').strip('\x00')
-        elif isinstance(param_id, str):
-            param_id = param_id.strip('\x00')
-        else:
-            param_id = str(param_id).strip('\x00')
-        
-        param_value = float(param_msg.param_value)
-        param_type = int(param_msg.param_type)
-        param_index = int(param_msg.param_index)
-        param_count = int(param_msg.param_count)
-        
-        param_data = {
-            'name': param_id,
-            'value': param_value,
-            'type': param_type,
-            'index': param_index,
-            'count': param_count
-        }
-        
-        # Add to queue (non-blocking)
-        self._param_queue.put(param_data)
-        
-     except Exception as e:
-        print(f"[DroneCommander] ⚠️ Error queuing parameter: {e}")
+     param_id = self._decode_param_id(param_msg.param_id)
+     with self._param_lock:
+        entry = self._parameters.get(param_id)
+        if entry is not None:
+            value = str(float(param_msg.param_value))
+            if value != entry['value']:
+                self._parameter_changed(param_id, float(param_msg.param_value))
+            entry['value'] = value
          
-    def _fetch_parameters_blocking(self):
-     """BLOCKING parameter fetch - dedicated thread with exclusive message access"""
-     print("[DroneCommander] 🔄 REQUESTING PARAMETERS (BLOCKING MODE)")
-    
-     try:
-        # Step 1: Temporarily pause main telemetry thread (if possible)
-        print("[DroneCommander] 📤 Sending PARAM_REQUEST_LIST...")
-        
-        # Send request with retries
-        for retry in range(3):
-            self._drone.mav.param_request_list_send(
-                self._drone.target_system,
-                self._drone.target_component
-            )
-            time.sleep(0.2)
-        
-        # Step 2: Dedicated parameter collection
-        print("[DroneCommander] ⏳ Collecting parameters...")
-        
-        collected_params = {}
-        total_params = None
-        start_time = time.time()
-        last_param_time = time.time()
-        no_data_timeout = 8  # 8 seconds without new data
-        overall_timeout = 90  # 90 seconds total
-        
-        consecutive_failures = 0
-        max_consecutive_failures = 50  # Allow 50 empty reads before giving up
-        
-        while time.time() - start_time < overall_timeout:
-            try:
-                # CRITICAL: Use blocking=True with timeout to get exclusive access
-                msg = self._drone.recv_match(
-                    type='PARAM_VALUE', 
-                    blocking=True,  # BLOCKING - this is the key fix
-                    timeout=0.5
-                )
-                
-                if msg:
-                    # Reset counters on successful read
-                    consecutive_failures = 0
-                    last_param_time = time.time()
-                    
-                    # Extract parameter info
-                    param_id = msg.param_id.decode('utf-8').strip('\x00')
-                    param_value = float(msg.param_value)
-                    param_type = int(msg.param_type)
-                    param_index = int(msg.param_index)
-                    param_count = int(msg.param_count)
-                    
-                    # Set total on first message
-                    if total_params is None:
-                        total_params = param_count
-                        print(f"[DroneCommander] 📊 Total parameters: {total_params}")
-                        self.commandFeedback.emit(f"Loading {total_params} parameters...")
-                    
-                    # Store parameter (avoid duplicates)
-                    if param_id not in collected_params:
-                        collected_params[param_id] = {
-                            "name": param_id,
-                            "value": str(param_value),
-                            "type": "FLOAT" if param_type in [9, 10] else "INT32",
-                            "index": param_index,
-                            "count": param_count,
-                            "synced": True,
-                            "default": "0",
-                            "units": "",
-                            "range": "",
-                            "description": ""
-                        }
-                        
-                        # Progress update every 25 params
-                        if len(collected_params) % 25 == 0:
-                            print(f"[DroneCommander] 📥 Progress: {len(collected_params)}/{total_params if total_params else '?'}")
-                            self.commandFeedback.emit(f"Received {len(collected_params)} parameters...")
-                            if total_params:
-                                self.parameterProgress.emit(len(collected_params), total_params)
-                    
-                    # Check if complete
-                    if total_params and len(collected_params) >= total_params:
-                        print(f"[DroneCommander] ✅ All {len(collected_params)} parameters received!")
-                        break
-                
-                else:
-                    # No message received
-                    consecutive_failures += 1
-                    
-                    # Check if we have some parameters and timed out
-                    if len(collected_params) > 0:
-                        time_since_last = time.time() - last_param_time
-                        if time_since_last > no_data_timeout:
-                            print(f"[DroneCommander] ⏹️ No new data for {no_data_timeout}s - assuming complete")
-                            break
-                    
-                    # Check consecutive failures
-                    if consecutive_failures >= max_consecutive_failures:
-                        if len(collected_params) > 0:
-                            print(f"[DroneCommander] ⚠️ {consecutive_failures} empty reads - assuming complete with {len(collected_params)} params")
-                            break
-                        else:
-                            print(f"[DroneCommander] ❌ No parameters received after {consecutive_failures} attempts")
-                            break
-                
-            except Exception as e:
-                print(f"[DroneCommander] ⚠️ recv_match exception: {e}")
-                consecutive_failures += 1
-                time.sleep(0.1)
-                continue
-        
-        # Step 3: Store results
-        final_count = len(collected_params)
-        print(f"\n[DroneCommander] 📊 Final Results: {final_count} parameters")
-        
-        if final_count > 0:
-            # Update shared storage
-            with self._param_lock:
-                self._parameters = collected_params
-            
-            # Emit to QML
-            print(f"[DroneCommander] 📤 Emitting parametersUpdated signal...")
-            self.parametersUpdated.emit()
-            self.commandFeedback.emit(f"✅ Loaded {final_count} parameters!")
-            print(f"[DroneCommander] ✅ Parameters available to QML")
-        else:
-            print("[DroneCommander] ❌ No parameters received")
-            self.commandFeedback.emit("❌ No parameters received from drone")
-    
-     except Exception as e:
-        print(f"[DroneCommander] ❌ ERROR during parameter fetch: {e}")
-        import traceback
-        traceback.print_exc()
-        self.commandFeedback.emit(f"Error fetching parameters: {e}")
-    
-     finally:
-        self._fetching_params = False
-        print("="*60 + "\n")
-    
-    def _fetch_parameters_improved(self):
-        """Improved parameter fetching with proper error handling"""
-        print("\n" + "="*60)
-        print("[DroneCommander] 🔄 REQUESTING PARAMETERS")
-        print("="*60)
-        
-        try:
-            with self._param_lock:
-                self._parameters.clear()
-            
-            # Step 1: Send parameter request list
-            print("[DroneCommander] 📤 Sending PARAM_REQUEST_LIST...")
-            self._drone.mav.param_request_list_send(
-                self._drone.target_system,
-                self._drone.target_component
-            )
-            
-            # Step 2: Wait for initial response
-            print("[DroneCommander] ⏳ Waiting for initial response...")
-            start_time = time.time()
-            first_param_received = False
-            
-            while time.time() - start_time < 5:  # 5 second timeout for first param
-                try:
-                    msg = self._drone.recv_match(type='PARAM_VALUE', blocking=False, timeout=0.1)
-                    
-                    if msg:
-                        first_param_received = True
-                        print(f"[DroneCommander] ✅ First parameter received!")
-                        
-                        # Process this first parameter
-                        self._process_param_message(msg)
-                        break
-                    
-                    time.sleep(0.05)
-                except Exception as e:
-                    # Ignore recv_match errors from thread conflicts
-                    time.sleep(0.1)
-                    continue
-            
-            if not first_param_received:
-                print("[DroneCommander] ❌ No response from drone - check connection")
-                self.commandFeedback.emit("❌ No parameter response from drone")
-                self._fetching_params = False
-                return
-            
-            # Step 3: Continue receiving parameters
-            print("[DroneCommander] 📥 Receiving parameters...")
-            
-            total_params = None
-            last_received_time = time.time()
-            no_data_timeout = 5  # 5 seconds without new data = done
-            overall_timeout = 60  # 60 seconds total timeout
-            
-            while time.time() - start_time < overall_timeout:
-                try:
-                    msg = self._drone.recv_match(type='PARAM_VALUE', blocking=False, timeout=0.1)
-                    
-                    if msg:
-                        last_received_time = time.time()
-                        
-                        # Get total param count from first message
-                        if total_params is None:
-                            total_params = msg.param_count
-                            print(f"[DroneCommander] 📊 Total parameters: {total_params}")
-                        
-                        # Process parameter
-                        self._process_param_message(msg)
-                        
-                        # Check if we got all parameters
-                        current_count = len(self._parameters)
-                        if total_params and current_count >= total_params:
-                            print(f"[DroneCommander] ✅ All {current_count} parameters received!")
-                            break
-                        
-                        # Progress logging every 50 params
-                        if current_count % 50 == 0:
-                            print(f"[DroneCommander] 📥 Progress: {current_count} parameters")
-                            self.commandFeedback.emit(f"Received {current_count} parameters...")
-                    
-                    # Check for timeout
-                    if time.time() - last_received_time > no_data_timeout:
-                        current_count = len(self._parameters)
-                        if current_count > 0:
-                            print(f"[DroneCommander] ⏹️ Timeout - received {current_count} parameters")
-                            break
-                    
-                    time.sleep(0.02)
-                    
-                except Exception as e:
-                    # Ignore thread conflict errors
-                    time.sleep(0.05)
-                    continue
-            
-            # Step 4: Finalize and emit results
-            final_count = len(self._parameters)
-            print(f"\n[DroneCommander] 📊 Final Results:")
-            print(f"  ✅ Received: {final_count} parameters")
-            
-            if final_count > 0:
-                # Emit signal to QML (QML will read the property)
-                print(f"[DroneCommander] 📤 Emitting parametersUpdated signal...")
-                self.parametersUpdated.emit()
-                
-                self.commandFeedback.emit(f"✅ Loaded {final_count} parameters!")
-                print(f"[DroneCommander] ✅ Parameters emitted to QML")
-            else:
-                print("[DroneCommander] ❌ No parameters received")
-                self.commandFeedback.emit("❌ No parameters received from drone")
-        
-        except Exception as e:
-            print(f"[DroneCommander] ❌ ERROR during parameter fetch: {e}")
-            import traceback
-            traceback.print_exc()
-            self.commandFeedback.emit(f"Error fetching parameters: {e}")
-        
-        finally:
-            self._fetching_params = False
-            print("="*60 + "\n")
-    
-    def _process_param_message(self, msg):
-        """Process a single PARAM_VALUE message"""
-        try:
-            param_id = msg.param_id.decode('utf-8').strip('\x00')
-            param_value = float(msg.param_value)  # Always convert to float
-            param_type = int(msg.param_type)
-            param_index = int(msg.param_index)
-            param_count = int(msg.param_count)
-            
-            # Don't add duplicates
-            if param_id not in self._parameters:
-                with self._param_lock:
-                    self._parameters[param_id] = {
-                        "name": param_id,
-                        "value": str(param_value),  # Convert to string for QML
-                        "type": "FLOAT" if param_type in [9, 10] else "INT32",
-                        "index": param_index,
-                        "count": param_count,
-                        "synced": True,
-                        "default": "0",
-                        "units": "",
-                        "range": "",
-                        "description": ""
-                    }
-                
-                # Emit individual parameter update
-                self.parameterReceived.emit(param_id, param_value)
-        
-        except Exception as e:
-            print(f"[DroneCommander] ⚠️ Error processing parameter: {e}")
-    
     @pyqtProperty('QVariant', notify=parametersUpdated)
     def parameters(self):
      """Return parameters as QVariant (dictionary) for QML"""
      with self._param_lock:
-        result = dict(self._parameters)
-    
-     print(f"[DroneCommander] 📤 Returning {len(result)} parameters to QML")
-     return result
+        return dict(self._parameters)
+
+    @pyqtProperty(QObject, constant=True)
+    def parameterTable(self):
+     """All parameters (ParamTableModel), updated row by row"""
+     return self._param_table
+
+    @pyqtProperty(QObject, constant=True)
+    def parameterView(self):
+     """parameterTable filtered and sorted for Parameters.qml (ParamFilterModel)"""
+     return self._param_view
     
     @pyqtSlot(str, float, result=bool)
     def setParameter(self, param_id, param_value):
-        """Set a single parameter on the drone"""
+        """
+        Write one parameter without blocking; the table row is updated when
+        the vehicle echoes the new value (parameterWriteFinished reports the outcome)
+        """
         if not self._is_drone_ready():
             self.commandFeedback.emit("Error: Drone not connected.")
             return False
@@ -1265,58 +569,39 @@ class DroneCommander(QObject):
         self.commandFeedback.emit(f"Setting '{param_id}' to {param_value}...")
         
         try:
-            # Convert param_id to bytes
-            param_id_bytes = param_id.encode('utf-8')
-            
             # Determine parameter type
             param_type = mavutil.mavlink.MAV_PARAM_TYPE_REAL32
-            if param_id in self._parameters:
-                stored_type = self._parameters[param_id].get('type', 'FLOAT')
-                if stored_type == 'INT32':
+            with self._param_lock:
+                entry = self._parameters.get(param_id)
+                if entry is not None and entry.get('type', 'FLOAT') == 'INT32':
                     param_type = mavutil.mavlink.MAV_PARAM_TYPE_INT32
                     param_value = int(param_value)
-            
-            # Send parameter set command
-            self._drone.mav.param_set_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                param_id_bytes,
-                param_value,
-                param_type
-            )
-            
-            # Wait for acknowledgment
-            start_time = time.time()
-            timeout = 3
-            
-            while time.time() - start_time < timeout:
-                msg = self._drone.recv_match(type='PARAM_VALUE', blocking=False, timeout=0.1)
-                
-                if msg:
-                    received_id = msg.param_id.decode('utf-8').strip('\x00')
-                    if received_id == param_id:
-                        received_value = float(msg.param_value)
-                        
-                        # Update local cache
-                        with self._param_lock:
-                            if param_id in self._parameters:
-                                self._parameters[param_id]['value'] = str(received_value)
-                        
-                        # Check if value matches
-                        if abs(received_value - param_value) < 0.001:
-                            self.commandFeedback.emit(f"✅ Parameter '{param_id}' set to {received_value}")
-                            self.parametersUpdated.emit()
-                            return True
-                        else:
-                            self.commandFeedback.emit(f"⚠️ Value mismatch: expected {param_value}, got {received_value}")
-                            self.parametersUpdated.emit()
-                            return False
-                
-                time.sleep(0.05)
-            
-            self.commandFeedback.emit(f"⏱️ Timeout setting parameter '{param_id}'")
-            return False
-        
+
+            # The edited value shows as unsynced until the echo confirms it
+            self._param_table.set_value(param_id, param_value, False)
+
+            def on_result(msg):
+                received_value = float(msg.param_value)
+                with self._param_lock:
+                    entry = self._parameters.get(param_id)
+                    if entry is not None:
+                        entry['value'] = str(received_value)
+                self._parameter_changed(param_id, received_value)
+                self.commandFeedback.emit(f"✅ Parameter '{param_id}' set to {received_value}")
+                self.parameterWriteFinished.emit(param_id, True, f"Parameter '{param_id}' updated successfully!")
+
+            def on_error(error):
+                if error == "cancelled":
+                    return      # replaced by a newer edit, which reports
+                self.commandFeedback.emit(error)
+                self.parameterWriteFinished.emit(param_id, False, error)
+
+            # A newer edit of the same parameter replaces a write still waiting
+            self._schedule(f'set_param:{param_id}',
+                           self._vehicle().set_param(param_id, param_value, param_type),
+                           on_result, on_error)
+            return True
+
         except Exception as e:
             error_msg = f"Error setting parameter: {e}"
             print(f"[DroneCommander] ❌ {error_msg}")
@@ -1,7 +1,19 @@
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, pyqtProperty, QTimer, QThread
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, pyqtProperty, QThread
 from pymavlink import mavutil
 from modules.mavlink_thread import MAVLinkThread
 from modules.drone_commander import DroneCommander  # ← ADD THIS IMPORT
+from modules.mavlink_hub import MAVLinkMessageHub
+from modules.mavlink_process import MAVLinkProcessLink
+from modules.telemetry import Telemetry, FIELD_GROUPS
+from modules.vehicle_setup import VehicleSetupPipeline
+from modules.stream_rates import StreamRateManager
+from modules.link_supervisor import LinkSupervisor
+from modules.command_manager import CommandManager
+from modules.outbound_writer import OutboundWriter
+from modules.async_commands import AsyncLoopThread
+from modules.waypoint_model import WaypointListModel
+from modules.mission_validation import MissionValidator
+from modules.path_simplify import simplify_path
 import time
 
 class ConnectionWorker(QThread):
@@ -9,12 +21,13 @@ class ConnectionWorker(QThread):
     connectionSuccess = pyqtSignal(object)  # Sends drone connection object
     connectionFailed = pyqtSignal(str)  # Sends error message
     
-    def __init__(self, uri, baud, target_system=1, target_component=1):
+    def __init__(self, uri, baud, target_system=1, target_component=1, heartbeat_timeout=10):
         super().__init__()
         self.uri = uri
         self.baud = baud
         self.target_system = target_system
         self.target_component = target_component
+        self.heartbeat_timeout = heartbeat_timeout
         self._should_stop = False
     
     def run(self):
@@ -27,12 +40,18 @@ class ConnectionWorker(QThread):
                 return
             
             print("[ConnectionWorker] Waiting for heartbeat...")
-            drone.wait_heartbeat(timeout=10)
+            heartbeat = drone.wait_heartbeat(timeout=self.heartbeat_timeout)
             
             if self._should_stop:
                 drone.close()
                 return
             
+            if heartbeat is None:
+                drone.close()
+                print("[ConnectionWorker] ❌ No heartbeat received")
+                self.connectionFailed.emit("No heartbeat received")
+                return
+            
             print(f"[ConnectionWorker] ✅ Connection established!")
             print(f"[ConnectionWorker] System ID: {drone.target_system}, Component ID: {drone.target_component}")
             
@@ -52,6 +71,7 @@ class DroneModel(QObject):
     telemetryChanged = pyqtSignal()
     statusTextsChanged = pyqtSignal()
     droneConnectedChanged = pyqtSignal()
+    linkStateChanged = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -76,14 +96,46 @@ class DroneModel(QObject):
             'satellites_visible': 0,
             'gps_fix_type': 0
         }
+        # Per-field view of the same data for QML (one notify signal per field group)
+        self._live_telemetry = Telemetry(self._telemetry)
         self._status_texts = []
         self._drone = None
         self._thread = None
+        self._writer = None
         self._drone_commander = None  # ← ADD THIS
+        self._message_hub = MAVLinkMessageHub()
+        self._telemetry_rate_hz = 30.0  # Max telemetryUpdated batches per second
+        # Run link I/O and decoding in a separate process (immune to GUI stalls)
+        self._use_link_process = False
+        self._link_process = None
+        self._setup_pipeline = None
+        # Stream rates follow the panels that are on screen (HUD, map, calibration...)
+        self._stream_rates = StreamRateManager()
+        # Status bar / status panel are always visible
+        self._stream_rates.request('status', {'SYS_STATUS': 2, 'VFR_HUD': 2, 'GLOBAL_POSITION_INT': 2})
+        # COMMAND_LONG transactions (arm, land, mode...) resolved by COMMAND_ACK
+        self._commands = CommandManager()
+        # Long operations (takeoff, mission upload, parameter fetch) run as coroutines here
+        self._async = AsyncLoopThread()
+        # The mission being planned; outlives connections like the map markers do
+        self._waypoint_list = WaypointListModel(self)
+        # Checked again on every edit and battery update
+        self._mission_check = MissionValidator(self._waypoint_list, self._telemetry, self)
+        self._live_telemetry.batteryChanged.connect(self._mission_check.revalidate)
         self._is_connected = False
-        self._connection_monitor = QTimer()
-        self._connection_monitor.timeout.connect(self._check_connection_health)
         self._connection_worker = None
+        self._uri = None
+        self._baud = None
+        
+        # Heartbeat-loss detection and automatic reconnect (in-process link)
+        self._link_state = LinkSupervisor.DISCONNECTED
+        self._supervisor = LinkSupervisor(
+            lambda uri, baud, timeout: ConnectionWorker(uri, baud, heartbeat_timeout=max(1.0, timeout))
+        )
+        self._supervisor.linkStateChanged.connect(self._set_link_state)
+        self._supervisor.linkLost.connect(self._on_link_lost)
+        self._supervisor.reconnected.connect(self._on_reconnected)
+        self._setup_incomplete = False
         
         # State tracking
         self._prev_mode = None
@@ -130,12 +182,24 @@ class DroneModel(QObject):
             self.cleanup()
             time.sleep(0.5)
         
+        self._uri = uri
+        self._baud = baud
+        
         # Cancel any existing connection attempt
         if self._connection_worker and self._connection_worker.isRunning():
             print("[DroneModel] Stopping previous connection attempt...")
             self._connection_worker.stop()
             self._connection_worker.wait(2000)
         
+        if self._use_link_process:
+            # The link process opens the connection and waits for the heartbeat itself
+            self._link_process = MAVLinkProcessLink(uri, baud, poll_rate_hz=self._telemetry_rate_hz)
+            self._link_process.connectionSuccess.connect(self._on_connection_success)
+            self._link_process.connectionFailed.connect(self._on_connection_failed)
+            self._link_process.start()
+            print("[DroneModel] ✅ Link process started (non-blocking)")
+            return True
+        
         # Create connection worker thread
         self._connection_worker = ConnectionWorker(uri, baud)
         self._connection_worker.connectionSuccess.connect(self._on_connection_success)
@@ -156,9 +220,6 @@ class DroneModel(QObject):
         self.droneConnectedChanged.emit()
         self.addStatusText("✅ Drone connected successfully")
         
-        # Configure the drone (this is fast, won't block)
-        self._configure_drone()
-        
         # ==========================================
         # ✅ CREATE DRONE COMMANDER FIRST
         # ==========================================
@@ -166,27 +227,103 @@ class DroneModel(QObject):
         self._drone_commander = DroneCommander(self)
         print("[DroneModel] ✅ DroneCommander created")
         
+        if self._link_process is not None:
+            # Telemetry arrives through shared memory, events through the hub
+            self._link_process.attach(self._drone_commander, self._message_hub)
+            self._link_process.telemetryUpdated.connect(self.updateTelemetry)
+            self._link_process.statusTextChanged.connect(self._handleRawStatusText)
+            self._link_process.linkClosed.connect(self.disconnectDrone)
+            if hasattr(self, '_calibration_model'):
+                self._link_process.current_msg.connect(self._calibration_model.handle_mavlink_message)
+                self._calibration_model.mav = self._drone
+            print("[DroneModel] ✅ Link process attached with parameter support")
+        else:
+            self._start_mavlink_thread()
+            self._supervisor.start(self._uri, self._baud, self._message_hub, self._drone.target_system)
+        self._set_link_state(LinkSupervisor.CONNECTED)
+        
+        # Configure the drone (acknowledged, runs in the background)
+        self._configure_drone()
+        self._stream_rates.attach(self._drone, self._message_hub)
+        self._commands.attach(self._drone, self._message_hub)
+        self._drone_commander.vehicle_connected()
+        
+        print("[DroneModel] ✅ Setup complete!")
+    
+    def _start_mavlink_thread(self):
+        # Every outbound frame (GUI, worker threads, calibration...) is written by one thread
+        self._writer = OutboundWriter(self._drone)
+        self._writer.install()
+        
         # ==========================================
         # ✅ PASS DRONE_COMMANDER TO MAVLINK THREAD
         # ==========================================
         print("[DroneModel] 🧵 Creating MAVLinkThread with DroneCommander...")
         self._thread = MAVLinkThread(
             self._drone,
-            drone_commander=self._drone_commander  # ← CRITICAL: Pass it here!
+            drone_commander=self._drone_commander,  # ← CRITICAL: Pass it here!
+            message_hub=self._message_hub,
+            telemetry_rate_hz=self._telemetry_rate_hz
         )
+        # A read error hands the link over to the supervisor
+        self._thread.on_disconnect_callback = self._supervisor.link_error
         
         self._thread.telemetryUpdated.connect(self.updateTelemetry)
         self._thread.statusTextChanged.connect(self._handleRawStatusText)
         if hasattr(self, '_calibration_model'):
             self._thread.current_msg.connect(self._calibration_model.handle_mavlink_message)
+            self._thread.addConsumerTypes(['COMMAND_LONG'])
 
             self._calibration_model.mav = self._drone
         
         self._thread.start()
         print("[DroneModel] ✅ MAVLinkThread started with parameter support")
-        
-        self._connection_monitor.start(5000)
-        print("[DroneModel] ✅ Setup complete!")
+    
+    def _stop_mavlink_thread(self):
+        if self._thread:
+            print("[DroneModel]   ⏸️ Stopping MAVLink thread...")
+            self._thread.stop()
+            self._thread.wait(2000)
+            self._thread = None
+            print("[DroneModel]   ✓ MAVLink thread stopped")
+        if self._writer:
+            self._writer.uninstall()
+            self._writer = None
+    
+    def _on_link_lost(self, reason):
+        """Heartbeat loss or read error: release the dead connection, keep the session"""
+        self.addStatusText("⚠️ Link lost - reconnecting...")
+        self._setup_incomplete = self._setup_pipeline is not None and self._setup_pipeline.running
+        if self._setup_pipeline:
+            self._setup_pipeline.cancel()
+            self._setup_pipeline = None
+        self._async.cancel_all()
+        self._stream_rates.detach()
+        self._commands.detach()
+        self._stop_mavlink_thread()
+        if self._drone:
+            try:
+                self._drone.close()
+            except Exception as e:
+                print(f"[DroneModel]   ⚠️ Close error: {e}")
+            self._drone = None
+    
+    def _on_reconnected(self, drone, offline_seconds):
+        """Same vehicle back: restart the reader and resync stream rates (parameters stay cached)"""
+        self._drone = drone
+        self._start_mavlink_thread()
+        if self._setup_incomplete:
+            self._configure_drone()
+        self._stream_rates.attach(self._drone, self._message_hub)
+        self._commands.attach(self._drone, self._message_hub)
+        self._drone_commander.vehicle_connected()
+        self.addStatusText(f"✅ Link restored after {offline_seconds:.1f}s")
+    
+    def _set_link_state(self, state):
+        if state != self._link_state:
+            print(f"[DroneModel] Link state: {self._link_state} → {state}")
+            self._link_state = state
+            self.linkStateChanged.emit()
     
     def _on_connection_failed(self, error_message):
         """Called when connection fails in background thread"""
@@ -195,75 +332,30 @@ class DroneModel(QObject):
         
         self._is_connected = False
         self.droneConnectedChanged.emit()
+        
+        if self._link_process is not None:
+            self._link_process.stop()
+            self._link_process = None
+    
+    @pyqtSlot(bool)
+    def setUseLinkProcess(self, enabled):
+        """Select out-of-process link I/O for the next connection"""
+        self._use_link_process = bool(enabled)
+        print(f"[DroneModel] Link process {'enabled' if enabled else 'disabled'}")
     
     def _configure_drone(self):
-        """Configure drone parameters (fast, non-blocking operations)"""
-        try:
-            # Disable safety switch
-            print("[DroneModel] Disabling safety switch requirement...")
-            self._drone.mav.param_set_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                b'BRD_SAFETYENABLE',
-                0,
-                mavutil.mavlink.MAV_PARAM_TYPE_INT8
-            )
-            time.sleep(0.2)
-            self.addStatusText("🔓 Safety switch bypassed")
-            
-            # Disable RC mode switching
-            print("[DroneModel] 🔒 Disabling RC flight mode switching...")
-            self._drone.mav.param_set_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                b'FLTMODE_CH',
-                0,
-                mavutil.mavlink.MAV_PARAM_TYPE_INT8
-            )
-            time.sleep(0.5)
-            
-            # Save parameters
-            print("[DroneModel] 💾 Saving parameters...")
-            self._drone.mav.command_long_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE,
-                0, 1, 0, 0, 0, 0, 0, 0
-            )
-            time.sleep(0.5)
-            
-            self.addStatusText("🔒 RC mode switch DISABLED")
-            self.addStatusText("💾 Settings saved")
-            
-        except Exception as e:
-            print(f"[DroneModel] Configuration warning: {e}")
+        """Send setup parameters and message rates; results arrive via signals"""
+        self._setup_pipeline = VehicleSetupPipeline(self._drone, self._message_hub)
+        self._setup_pipeline.stepConfirmed.connect(self.addStatusText)
+        self._setup_pipeline.setupFinished.connect(self._on_setup_finished)
+        self._setup_pipeline.start()
+
+    def _on_setup_finished(self, success, failed_steps):
+        if success:
+            self.addStatusText("📡 Telemetry streams active")
+        else:
+            print(f"[DroneModel] Configuration warning: not acknowledged: {failed_steps}")
             self.addStatusText("⚠️ Some parameters not configured")
-        
-        # Configure message rates
-        print("[DroneModel] Configuring message rates...")
-        message_rates = [
-            (33, 200000),   # GLOBAL_POSITION_INT at 5Hz
-            (30, 100000),   # ATTITUDE at 10Hz
-            (74, 200000),   # VFR_HUD at 5Hz
-            (1, 500000),    # SYS_STATUS at 2Hz
-            (24, 500000),   # GPS_RAW_INT at 2Hz
-            (193, 1000000), # EKF_STATUS_REPORT at 1Hz
-        ]
-        
-        for msg_id, interval in message_rates:
-            self._drone.mav.command_long_send(
-                self._drone.target_system,
-                self._drone.target_component,
-                mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
-                0, msg_id, interval, 0, 0, 0, 0, 0
-            )
-            time.sleep(0.1)
-        
-        self.addStatusText("📡 Telemetry streams active")
-
-    def _check_connection_health(self):
-        if not self._is_connected or not self._drone:
-            self._connection_monitor.stop()
 
     def _handleRawStatusText(self, text):
         """Filter and process raw status messages from MAVLink"""
@@ -276,17 +368,21 @@ class DroneModel(QObject):
         self.addStatusText(text)
 
     def updateTelemetry(self, data):
+        """Apply a partial telemetry update (only the keys that changed)"""
         try:
-            updated = False
+            changed = {}
             for key, value in data.items():
                 if self._telemetry.get(key) != value:
                     old_value = self._telemetry.get(key)
                     self._telemetry[key] = value
-                    updated = True
+                    changed[key] = value
                     self._detect_status_changes(key, old_value, value)
             
-            if updated:
-                self.telemetryChanged.emit()
+            if changed:
+                self._live_telemetry.update(changed)
+                # Live fields notify through liveTelemetry; the whole-dict signal is for the rest
+                if any(key not in FIELD_GROUPS for key in changed):
+                    self.telemetryChanged.emit()
         except Exception as e:
             print(f"[DroneModel ERROR] {e}")
 
@@ -441,10 +537,51 @@ class DroneModel(QObject):
         """Expose DroneCommander to QML"""
         return self._drone_commander
 
+    @pyqtProperty(QObject, constant=True)
+    def streamRates(self):
+        """Panels request/release telemetry rates here (requestRates/releaseRates)"""
+        return self._stream_rates
+
+    @property
+    def async_loop(self):
+        """Event loop thread for DroneCommander's coroutine operations"""
+        return self._async
+
+    @pyqtProperty(QObject, constant=True)
+    def commandManager(self):
+        """Command transactions: outcomes, IN_PROGRESS updates and ACK latency stats"""
+        return self._commands
+
     @pyqtProperty('QVariant', notify=telemetryChanged)
     def telemetry(self):
         return self._telemetry
 
+    @pyqtProperty(QObject, constant=True)
+    def waypointList(self):
+        """Planned waypoints (WaypointListModel) - batch edits and nearest-waypoint lookup"""
+        return self._waypoint_list
+
+    @pyqtSlot(float, result='QVariantMap')
+    def simplifyWaypoints(self, tolerance):
+        """Thin waypointList (Douglas-Peucker, cross-track tolerance in metres); returns count and max deviation"""
+        points = self._waypoint_list.points
+        result = simplify_path(points['lat'], points['lon'], points['altitude'], tolerance,
+                               command=points['command'], hold_time=points['hold_time'])
+        if result.removed:
+            self._waypoint_list.set_points(points[result.keep])
+        print(f"[DroneModel] {result.describe()}")
+        return result.summary()
+
+    @pyqtProperty(QObject, constant=True)
+    def missionCheck(self):
+        """Feasibility of waypointList (MissionValidator): distance, flight time, battery, limit violations"""
+        return self._mission_check
+
+    @pyqtProperty(QObject, constant=True)
+    def liveTelemetry(self):
+        """Per-field telemetry for QML bindings (roll, lat, battery_remaining, ...)"""
+        return self._live_telemetry
+
     @pyqtProperty('QVariantList', notify=statusTextsChanged)
     def statusTexts(self):
         return self._status_texts
@@ -453,26 +590,50 @@ class DroneModel(QObject):
     def isConnected(self):
         return self._is_connected
 
+    @pyqtProperty(str, notify=linkStateChanged)
+    def linkState(self):
+        """connected / lost / reconnecting / disconnected"""
+        return self._link_state
+
     @property
     def drone_connection(self):
         return self._drone
 
+    @property
+    def message_hub(self):
+        """Subscribe here instead of calling recv_match on drone_connection"""
+        return self._message_hub
+
     def cleanup(self):
         """Clean up all drone resources"""
         print("[DroneModel] 🧹 Cleanup starting...")
         
-        # Stop connection monitor
-        if self._connection_monitor.isActive():
-            self._connection_monitor.stop()
-            print("[DroneModel]   ✓ Connection monitor stopped")
+        # No reconnect attempts after an operator disconnect
+        self._supervisor.stop()
+        self._set_link_state(LinkSupervisor.DISCONNECTED)
+        
+        # Abandon an unfinished vehicle setup
+        if self._setup_pipeline:
+            self._setup_pipeline.cancel()
+            self._setup_pipeline = None
+        
+        self._async.cancel_all()
+        self._stream_rates.detach()
+        self._commands.detach("disconnected")
         
         # Stop MAVLink thread
-        if self._thread:
-            print("[DroneModel]   ⏸️ Stopping MAVLink thread...")
-            self._thread.stop()
-            self._thread.wait(2000)
-            self._thread = None
-            print("[DroneModel]   ✓ MAVLink thread stopped")
+        self._stop_mavlink_thread()
+        
+        # Stop the link process (also closes its connection)
+        if self._link_process:
+            print("[DroneModel]   ⏸️ Stopping link process...")
+            self._link_process.stop()
+            self._link_process = None
+            self._drone = None
+            print("[DroneModel]   ✓ Link process stopped")
+        
+        # Release message subscribers of the old link
+        self._message_hub.clear()
         
         # Close drone connection
         if self._drone:
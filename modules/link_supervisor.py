@@ -0,0 +1,150 @@
+"""
+Link Supervisor - detects a dead link and reconnects with backoff
+Loss is declared when no vehicle HEARTBEAT arrives within heartbeat_timeout
+or the reader thread reports a read error. The same URI is then reopened
+with exponential backoff until the vehicle answers again.
+"""
+import time
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+
+
+class LinkSupervisor(QObject):
+    CONNECTED = 'connected'
+    LOST = 'lost'
+    RECONNECTING = 'reconnecting'
+    DISCONNECTED = 'disconnected'
+
+    linkStateChanged = pyqtSignal(str)
+    linkLost = pyqtSignal(str)                 # reason - release the dead connection now
+    reconnected = pyqtSignal(object, float)    # new connection, seconds without link
+    _linkError = pyqtSignal(str)               # queued hop from the reader thread
+
+    def __init__(self, connection_factory, heartbeat_timeout=1.5, initial_backoff=0.25,
+                 max_backoff=8.0, check_interval_ms=100):
+        super().__init__()
+        # connection_factory(uri, baud, heartbeat_timeout) -> ConnectionWorker-like QThread
+        self._connection_factory = connection_factory
+        self.heartbeat_timeout = heartbeat_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self.state = self.DISCONNECTED
+        self._uri = None
+        self._baud = None
+        self._hub = None
+        self._sub = None
+        self._last_heartbeat = None
+        self._lost_at = None
+        self._backoff = initial_backoff
+        self._worker = None
+        self.attempts = 0
+        self.last_recovery_time = None
+
+        self._check_timer = QTimer()
+        self._check_timer.setInterval(check_interval_ms)
+        self._check_timer.timeout.connect(self._check_heartbeat)
+        self._retry_timer = QTimer()
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.timeout.connect(self._attempt)
+        self._linkError.connect(self._on_link_error)
+
+    def start(self, uri, baud, message_hub, target_system=None):
+        """Supervise a freshly connected link"""
+        self._uri = uri
+        self._baud = baud
+        self._hub = message_hub
+        self._watch(target_system)
+
+    def stop(self):
+        """Operator disconnect - no further reconnect attempts"""
+        self._check_timer.stop()
+        self._retry_timer.stop()
+        self._close_subscription()
+        self._stop_worker()
+        self._set_state(self.DISCONNECTED)
+
+    def link_error(self, reason="read error"):
+        """Thread-safe: called by the reader thread when the link fails"""
+        self._linkError.emit(reason)
+
+    # ---------- monitoring ----------
+
+    def _watch(self, target_system):
+        self._close_subscription()
+        self._sub = self._hub.subscribe('HEARTBEAT', sysid=target_system, maxsize=16)
+        self._last_heartbeat = time.monotonic()
+        self._backoff = self.initial_backoff
+        self._set_state(self.CONNECTED)
+        self._check_timer.start()
+
+    def _check_heartbeat(self):
+        if self.state != self.CONNECTED or self._sub is None:
+            return
+        if self._sub.drain():
+            self._last_heartbeat = time.monotonic()
+        elif time.monotonic() - self._last_heartbeat > self.heartbeat_timeout:
+            self._declare_lost(f"no heartbeat for {self.heartbeat_timeout:.1f}s")
+
+    def _on_link_error(self, reason):
+        if self.state == self.CONNECTED:
+            self._declare_lost(reason)
+
+    def _declare_lost(self, reason):
+        print(f"[LinkSupervisor] ⚠️ Link lost: {reason}")
+        self._check_timer.stop()
+        self._close_subscription()
+        # Outage started when the last heartbeat was seen
+        self._lost_at = self._last_heartbeat or time.monotonic()
+        self.attempts = 0
+        self._set_state(self.LOST)
+        self.linkLost.emit(reason)
+        self._attempt()
+
+    # ---------- reconnecting ----------
+
+    def _attempt(self):
+        if self.state not in (self.LOST, self.RECONNECTING):
+            return
+        self.attempts += 1
+        self._set_state(self.RECONNECTING)
+        print(f"[LinkSupervisor] 🔄 Reconnect attempt {self.attempts} to {self._uri}...")
+        self._worker = self._connection_factory(self._uri, self._baud, self.heartbeat_timeout)
+        self._worker.connectionSuccess.connect(self._on_attempt_success)
+        self._worker.connectionFailed.connect(self._on_attempt_failed)
+        self._worker.start()
+
+    def _on_attempt_failed(self, error):
+        self._worker = None
+        if self.state != self.RECONNECTING:
+            return
+        delay = self._backoff
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+        print(f"[LinkSupervisor] Attempt {self.attempts} failed ({error}) - retrying in {delay:.2f}s")
+        self._retry_timer.start(int(delay * 1000))
+
+    def _on_attempt_success(self, drone):
+        self._worker = None
+        if self.state != self.RECONNECTING:
+            drone.close()
+            return
+        offline = time.monotonic() - self._lost_at
+        self.last_recovery_time = offline
+        print(f"[LinkSupervisor] ✅ Link restored after {offline:.2f}s ({self.attempts} attempts)")
+        self._watch(drone.target_system)
+        self.reconnected.emit(drone, offline)
+
+    def _stop_worker(self):
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker.wait(2000)
+            self._worker = None
+
+    def _close_subscription(self):
+        if self._sub is not None:
+            self._sub.close()
+            self._sub = None
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.linkStateChanged.emit(state)
@@ -0,0 +1,227 @@
+"""
+MAVFTP - file reads over FILE_TRANSFER_PROTOCOL
+A file is opened read-only and fetched with BurstReadFile: one request and
+the vehicle streams the file in 239-byte chunks. Chunks lost on the way are
+tracked by offset and read back with ReadFile, several in flight. The
+payload layout and opcodes follow the MAVLink FTP specification.
+"""
+import asyncio
+import struct
+import time
+
+from modules.async_commands import CommandError
+
+
+HEADER = struct.Struct('<HBBBBBBI')     # seq, session, opcode, size, req_opcode, burst_complete, padding, offset
+PAYLOAD_SIZE = 251
+MAX_DATA = PAYLOAD_SIZE - HEADER.size   # 239
+
+# Opcodes
+OP_NONE = 0
+OP_TERMINATE_SESSION = 1
+OP_RESET_SESSIONS = 2
+OP_LIST_DIRECTORY = 3
+OP_OPEN_FILE_RO = 4
+OP_READ_FILE = 5
+OP_BURST_READ_FILE = 15
+OP_ACK = 128
+OP_NACK = 129
+
+# NACK error codes (first data byte)
+ERR_NONE = 0
+ERR_FAIL = 1
+ERR_FAIL_ERRNO = 2
+ERR_INVALID_DATA_SIZE = 3
+ERR_INVALID_SESSION = 4
+ERR_NO_SESSIONS_AVAILABLE = 5
+ERR_EOF = 6
+ERR_UNKNOWN_COMMAND = 7
+ERR_FILE_EXISTS = 8
+ERR_FILE_PROTECTED = 9
+ERR_FILE_NOT_FOUND = 10
+
+ERROR_NAMES = {
+    ERR_FAIL: "failed", ERR_FAIL_ERRNO: "failed (errno)", ERR_INVALID_DATA_SIZE: "invalid data size",
+    ERR_INVALID_SESSION: "invalid session", ERR_NO_SESSIONS_AVAILABLE: "no sessions available",
+    ERR_EOF: "end of file", ERR_UNKNOWN_COMMAND: "unknown command", ERR_FILE_EXISTS: "file exists",
+    ERR_FILE_PROTECTED: "file protected", ERR_FILE_NOT_FOUND: "file not found",
+}
+
+
+class FtpError(CommandError):
+    """A MAVFTP request was refused or went unanswered"""
+
+
+class FtpPacket:
+    """One FILE_TRANSFER_PROTOCOL payload"""
+
+    __slots__ = ('seq', 'session', 'opcode', 'req_opcode', 'burst_complete', 'offset', 'data')
+
+    def __init__(self, seq, session, opcode, data=b'', req_opcode=OP_NONE, burst_complete=0, offset=0):
+        self.seq = seq
+        self.session = session
+        self.opcode = opcode
+        self.req_opcode = req_opcode
+        self.burst_complete = burst_complete
+        self.offset = offset
+        self.data = bytes(data)
+
+    def encode(self, size=None):
+        """251-byte payload; size defaults to the length of data"""
+        size = len(self.data) if size is None else size
+        header = HEADER.pack(self.seq & 0xFFFF, self.session, self.opcode, size, self.req_opcode,
+                             self.burst_complete, 0, self.offset)
+        return list((header + self.data).ljust(PAYLOAD_SIZE, b'\0'))
+
+    @classmethod
+    def decode(cls, payload):
+        payload = bytes(payload)
+        seq, session, opcode, size, req_opcode, burst_complete, _, offset = HEADER.unpack_from(payload)
+        return cls(seq, session, opcode, payload[HEADER.size:HEADER.size + size], req_opcode,
+                   burst_complete, offset)
+
+    @property
+    def error(self):
+        """NACK error code"""
+        return self.data[0] if self.data else ERR_FAIL
+
+
+class FtpSession:
+    """Requests of one client on the vehicle's FTP server"""
+
+    def __init__(self, vehicle, events):
+        self.vehicle = vehicle
+        self.events = events
+        self.session = 0
+        self._seq = 0
+
+    def send(self, opcode, data=b'', offset=0, size=None):
+        drone = self.vehicle.drone
+        self._seq += 1
+        packet = FtpPacket(self._seq, self.session, opcode, data, offset=offset)
+        drone.mav.file_transfer_protocol_send(0, drone.target_system, drone.target_component,
+                                              packet.encode(size))
+
+    async def reply(self, req_opcode, timeout):
+        """ACK/NACK answering req_opcode, or None"""
+        msg = await self.events.wait_for(
+            lambda m: FtpPacket.decode(m.payload).req_opcode == req_opcode, timeout=timeout)
+        return None if msg is None else FtpPacket.decode(msg.payload)
+
+    async def request(self, opcode, data=b'', offset=0, size=None, timeout=1.0, retries=2):
+        """Send until answered; returns the ACK, raises FtpError on NACK or silence"""
+        for _ in range(retries):
+            self.send(opcode, data, offset, size)
+            packet = await self.reply(opcode, timeout)
+            if packet is None:
+                continue
+            if packet.opcode == OP_NACK:
+                raise FtpError(f"MAVFTP {opcode} refused: {ERROR_NAMES.get(packet.error, packet.error)}")
+            return packet
+        raise FtpError("No MAVFTP answer from vehicle")
+
+
+async def read_file(vehicle, path, request_timeout=1.0, window=8, max_attempts=5, open_timeout=1.0,
+                    open_retries=2, on_progress=None):
+    """
+    Contents of path on the vehicle. Burst reads fetch the file; chunks they
+    lost are re-read with ReadFile, up to window in flight. Raises FtpError
+    when the vehicle has no FTP server, refuses the file or stops answering.
+    """
+    loop = asyncio.get_running_loop()
+    start = time.monotonic()
+    with vehicle.stream('FILE_TRANSFER_PROTOCOL', maxsize=4096) as events:
+        ftp = FtpSession(vehicle, events)
+        session = None      # id from the OpenFileRO ACK
+        chunks = {}         # chunk index -> data
+        total = None
+        bursts = 0
+        stalled = 0         # bursts in a row from the same offset
+        last_tail = None
+        reads = {}          # chunk index -> ReadFile attempts
+
+        def complete():
+            return total is not None and len(chunks) >= total
+
+        def accept(packet):
+            nonlocal total
+            if packet.session != ftp.session or packet.opcode != OP_ACK or packet.offset % MAX_DATA:
+                return
+            chunk = packet.offset // MAX_DATA
+            if chunk in chunks or (total is not None and chunk >= total):
+                return
+            chunks[chunk] = packet.data
+            if len(packet.data) < MAX_DATA:
+                total = chunk + 1       # short chunk: the last one
+            if on_progress is not None:
+                on_progress(len(chunks), total or 0)
+
+        try:
+            opened = await ftp.request(OP_OPEN_FILE_RO, path.encode('ascii'),
+                                       timeout=open_timeout, retries=open_retries)
+            session = ftp.session = opened.session
+            # Virtual files (@PARAM) may report no size; their end is found by reading
+            size = struct.unpack_from('<I', opened.data.ljust(4, b'\0'))[0]
+            total = -(-size // MAX_DATA) if size else None
+
+            while not complete():
+                tail = max(chunks) + 1 if chunks else 0
+                if total is None or tail < total:
+                    # Burst from the first chunk after the last one received
+                    bursts += 1
+                    stalled = stalled + 1 if tail == last_tail else 1
+                    last_tail = tail
+                    if stalled > max_attempts:
+                        raise FtpError(f"MAVFTP burst read of {path} stalled after {tail * MAX_DATA} bytes")
+                    ftp.send(OP_BURST_READ_FILE, offset=tail * MAX_DATA, size=MAX_DATA)
+                    while not complete():
+                        msg = await events.get(timeout=request_timeout)
+                        if msg is None:
+                            break
+                        packet = FtpPacket.decode(msg.payload)
+                        if packet.req_opcode != OP_BURST_READ_FILE:
+                            continue
+                        if packet.opcode == OP_NACK:
+                            if packet.error != ERR_EOF:
+                                raise FtpError(f"MAVFTP read of {path} refused: "
+                                               f"{ERROR_NAMES.get(packet.error, packet.error)}")
+                            if total is None:
+                                total = max(tail, max(chunks) + 1 if chunks else 0,
+                                            -(-packet.offset // MAX_DATA))
+                            break
+                        accept(packet)
+                        if packet.burst_complete:
+                            break
+                    continue
+
+                # Chunks the bursts lost: ReadFile each, several in flight
+                in_flight = {}
+                while not complete():
+                    now = loop.time()
+                    for chunk, requested_at in list(in_flight.items()):
+                        if chunk in chunks or now - requested_at > request_timeout:
+                            del in_flight[chunk]
+                    for chunk in range(total):
+                        if len(in_flight) >= window:
+                            break
+                        if chunk not in chunks and chunk not in in_flight:
+                            reads[chunk] = reads.get(chunk, 0) + 1
+                            if reads[chunk] > max_attempts:
+                                raise FtpError(f"MAVFTP read of {path}: no answer for offset {chunk * MAX_DATA}")
+                            ftp.send(OP_READ_FILE, offset=chunk * MAX_DATA, size=MAX_DATA)
+                            in_flight[chunk] = now
+                    msg = await events.get(timeout=max(0.0, min(in_flight.values()) + request_timeout - now))
+                    if msg is not None:
+                        packet = FtpPacket.decode(msg.payload)
+                        if packet.req_opcode == OP_READ_FILE:
+                            accept(packet)
+        finally:
+            # Only the session this read opened: after a failed open, session 0
+            # may belong to another client or transfer
+            if session is not None:
+                ftp.send(OP_TERMINATE_SESSION)
+
+    data = b''.join(chunks[chunk] for chunk in range(total))
+    print(f"[MAVFTP] ✅ Read {path}: {len(data)} bytes in {time.monotonic() - start:.2f}s "
+          f"({bursts} bursts, {sum(reads.values())} chunk re-reads)")
+    return data
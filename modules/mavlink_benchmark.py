@@ -0,0 +1,1629 @@
+#!/usr/bin/env python3
+"""
+MAVLink performance benchmarks
+Run from the project root:  python -m modules.mavlink_benchmark [name ...]
+No drone needed - frames are generated locally and sent over UDP loopback.
+"""
+
+import sys
+import os
+import math
+import random
+import time
+import struct
+import socket
+import threading
+import argparse
+import tempfile
+import multiprocessing
+
+# Add parent directory to path if running from modules directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pymavlink import mavutil
+from modules.mavlink_thread import MAVLinkThread
+from modules.mavlink_process import TelemetryBlock, DEFAULT_FORWARD_TYPES, _link_process_main
+from modules.mavlink_hub import MAVLinkMessageHub
+from modules.vehicle_setup import VehicleSetupPipeline, DEFAULT_PARAM_WRITES
+from modules.vehicle_simulator import SimulatedLink, free_udp_port
+from modules.stream_rates import StreamRateManager, DROPPABLE_STREAMS
+from modules.link_supervisor import LinkSupervisor
+from modules.command_manager import CommandManager
+from modules.outbound_writer import OutboundWriter
+from modules.takeoff_sequence import TAKEOFF_PARAMS
+from modules.async_commands import AsyncLoopThread, VehicleCommands
+from modules.mission_transfer import build_mission_items
+from modules.mission_sync import MissionCache
+
+
+def make_telemetry_frames(count):
+    """Encode a realistic mix of telemetry frames (MAVLink v2)"""
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    mav.robust_parsing = True
+    frames = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            msg = mav.attitude_encode(i, 0.01 * (i % 50), -0.02, 1.5, 0.0, 0.0, 0.0)
+        elif kind == 1:
+            msg = mav.global_position_int_encode(i, 174000000 + i, 784000000 + i, 550000, 10000 + i, 0, 0, 0, 9000)
+        elif kind == 2:
+            msg = mav.vfr_hud_encode(0.0, 2.5, 90, 50, 10.0 + (i % 7), 0.1)
+        elif kind == 3:
+            msg = mav.sys_status_encode(0, 0, 0, 500, 12600 - (i % 10), 1200, 80, 0, 0, 0, 0, 0, 0)
+        else:
+            msg = mav.heartbeat_encode(
+                mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
+                0, mavutil.mavlink.MAV_STATE_STANDBY
+            )
+        frames.append(msg.pack(mav))
+    return frames
+
+
+class _LegacySpinThread(MAVLinkThread):
+    """The receive loop as it was before the selectors rewrite"""
+
+    def run(self):
+        while self.running:
+            msg = self.drone.recv_match(blocking=False, timeout=1)
+            if msg:
+                self._handle_message(msg)
+
+
+def _run_receive_loop(thread_cls, frames, rate_hz, idle_seconds):
+    port = free_udp_port()
+    drone = mavutil.mavlink_connection(f'udpin:127.0.0.1:{port}')
+    thread = thread_cls(drone)
+
+    received = [0]
+    handle_message = thread._handle_message
+
+    def counting_handler(msg):
+        received[0] += 1
+        handle_message(msg)
+
+    thread._handle_message = counting_handler
+
+    cpu = {}
+
+    def worker():
+        start = time.thread_time()
+        thread.run()
+        cpu['total'] = time.thread_time() - start
+
+    reader = threading.Thread(target=worker, daemon=True)
+    reader.start()
+
+    # Idle phase: the link is open but silent
+    time.sleep(idle_seconds)
+
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    interval = 1.0 / rate_hz
+    send_start = time.perf_counter()
+    next_send = send_start
+    for frame in frames:
+        sender.sendto(frame, ('127.0.0.1', port))
+        next_send += interval
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    wall = time.perf_counter() - send_start + idle_seconds
+
+    deadline = time.time() + 5
+    while received[0] < len(frames) and time.time() < deadline:
+        time.sleep(0.01)
+
+    thread.running = False
+    reader.join(timeout=2)
+    sender.close()
+    drone.close()
+    return received[0], cpu.get('total', float('nan')), wall
+
+
+def bench_receive_loop(message_count=10000, rate_hz=1000, idle_seconds=2.0):
+    """CPU time per 10k messages: spinning recv_match loop vs selectors loop"""
+    print("\n" + "=" * 60)
+    print(f"Receive loop: {message_count} msgs @ {rate_hz} Hz after {idle_seconds:.0f}s idle")
+    print("=" * 60)
+
+    frames = make_telemetry_frames(message_count)
+    results = {}
+    for label, cls in (("before (recv_match spin)", _LegacySpinThread), ("after (selectors)", MAVLinkThread)):
+        received, cpu, wall = _run_receive_loop(cls, frames, rate_hz, idle_seconds)
+        per_10k = cpu * 10000 / max(received, 1)
+        results[label] = per_10k
+        print(f"  {label:28s} received={received:6d}  reader CPU={cpu:7.3f}s "
+              f"({100 * cpu / wall:5.1f}% of one core)  CPU per 10k msgs={per_10k:7.3f}s")
+    return results
+
+
+def _legacy_handle_message(thread, msg):
+    """The to_dict() + if/elif chain decoding used before the handler table"""
+    msg_type = msg.get_type()
+    msg_dict = msg.to_dict()
+    telemetry = thread.current_telemetry_components
+    changed = False
+
+    if msg_type == "HEARTBEAT":
+        pass
+    elif msg_type == "COMMAND_ACK":
+        pass
+    elif msg_type == "GLOBAL_POSITION_INT":
+        new = (msg_dict['lat'] / 1e7, msg_dict['lon'] / 1e7, msg_dict['alt'] / 1000.0, msg_dict['relative_alt'] / 1000.0)
+        if (telemetry['lat'], telemetry['lon'], telemetry['alt'], telemetry['rel_alt']) != new:
+            telemetry.update({'lat': new[0], 'lon': new[1], 'alt': new[2], 'rel_alt': new[3]})
+            changed = True
+    elif msg_type == "ATTITUDE":
+        new = (math.degrees(msg_dict['roll']), math.degrees(msg_dict['pitch']), math.degrees(msg_dict['yaw']))
+        if (telemetry['roll'], telemetry['pitch'], telemetry['yaw']) != new:
+            telemetry.update({'roll': new[0], 'pitch': new[1], 'yaw': new[2]})
+            changed = True
+    elif msg_type == "VFR_HUD":
+        new = (msg_dict['heading'], msg_dict['groundspeed'], msg_dict['airspeed'])
+        if (telemetry['heading'], telemetry['groundspeed'], telemetry['airspeed']) != new:
+            telemetry.update({'heading': new[0], 'groundspeed': new[1], 'airspeed': new[2]})
+            changed = True
+    elif msg_type == "SYS_STATUS":
+        voltage = msg_dict.get('voltage_battery')
+        voltage = voltage / 1000.0 if voltage not in (None, 65535) else None
+        current = msg_dict.get('current_battery')
+        current = current / 100.0 if current not in (None, -1) else None
+        remaining = msg_dict.get('battery_remaining')
+        remaining = None if remaining == -1 else remaining
+        if (telemetry['battery_remaining'], telemetry['voltage_battery'], telemetry['current_battery']) != (remaining, voltage, current):
+            telemetry.update({'battery_remaining': remaining, 'voltage_battery': voltage, 'current_battery': current})
+            changed = True
+
+    if changed:
+        thread.telemetryUpdated.emit(telemetry.copy())
+
+
+def bench_decode_handlers(messages_per_type=50000):
+    """Messages/second through the telemetry handlers, per message type"""
+    print("\n" + "=" * 60)
+    print(f"Telemetry handlers: {messages_per_type} decoded messages per type")
+    print("=" * 60)
+
+    parser = mavutil.mavlink.MAVLink(None)
+    decoded = {}
+    for frame in make_telemetry_frames(1000):
+        msg = parser.parse_char(frame)
+        decoded.setdefault(msg.get_type(), []).append(msg)
+
+    thread = MAVLinkThread(None)
+    results = {}
+    for msg_type in ('ATTITUDE', 'GLOBAL_POSITION_INT', 'VFR_HUD', 'SYS_STATUS'):
+        samples = decoded[msg_type]
+        batch = (samples * (messages_per_type // len(samples) + 1))[:messages_per_type]
+        rates = {}
+        for label, handle in (("before", lambda m: _legacy_handle_message(thread, m)),
+                              ("after", thread._handle_message)):
+            start = time.perf_counter()
+            for msg in batch:
+                handle(msg)
+            rates[label] = len(batch) / (time.perf_counter() - start)
+        results[msg_type] = rates
+        print(f"  {msg_type:20s} before={rates['before']:10.0f} msg/s  after={rates['after']:10.0f} msg/s  "
+              f"speedup={rates['after'] / rates['before']:4.2f}x")
+    return results
+
+
+def _udp_blaster(port, rate_hz, duration):
+    """Sender process: streams telemetry frames to the port at rate_hz"""
+    frames = make_telemetry_frames(1000)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    interval = 1.0 / rate_hz
+    next_send = time.perf_counter()
+    end = next_send + duration
+    i = 0
+    while next_send < end:
+        sender.sendto(frames[i % len(frames)], ('127.0.0.1', port))
+        i += 1
+        next_send += interval
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    sender.close()
+
+
+def _block_gui_thread(seconds):
+    """Stand-in for a stalled GUI thread: long C calls that never release the GIL"""
+    data = [((i * 7919) % 1000003) / 3.0 for i in range(1000000)]
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sorted(data)
+
+
+def bench_link_process(rate_hz=2000, block_seconds=3.0):
+    """Decoded msgs/s while the GUI thread is busy: in-process thread vs link process"""
+    print("\n" + "=" * 60)
+    print(f"Link I/O under a blocked GUI thread: {rate_hz} msgs/s offered, {block_seconds:.0f}s stall")
+    print("=" * 60)
+
+    ctx = multiprocessing.get_context('spawn')
+    results = {}
+
+    # In-process reader thread (competes with the GUI thread for the GIL)
+    port = free_udp_port()
+    drone = mavutil.mavlink_connection(f'udpin:127.0.0.1:{port}')
+    thread = MAVLinkThread(drone)
+    received = [0]
+    handle_message = thread._handle_message
+
+    def counting_handler(msg):
+        received[0] += 1
+        handle_message(msg)
+
+    thread._handle_message = counting_handler
+    reader = threading.Thread(target=thread.run, daemon=True)
+    reader.start()
+    blaster = ctx.Process(target=_udp_blaster, args=(port, rate_hz, block_seconds + 2.0), daemon=True)
+    blaster.start()
+    time.sleep(1.0)
+    start_count = received[0]
+    start = time.perf_counter()
+    _block_gui_thread(block_seconds)
+    results['thread'] = (received[0] - start_count) / (time.perf_counter() - start)
+    blaster.join()
+    thread.running = False
+    reader.join(timeout=2)
+    drone.close()
+
+    # Link process (decodes outside this interpreter; telemetry via shared memory)
+    port = free_udp_port()
+    block = TelemetryBlock(create=True)
+    parent_conn, child_conn = ctx.Pipe(duplex=True)
+    link = ctx.Process(
+        target=_link_process_main,
+        args=(f'udpin:127.0.0.1:{port}', 57600, block.name, child_conn, DEFAULT_FORWARD_TYPES),
+        daemon=True
+    )
+    link.start()
+    blaster = ctx.Process(target=_udp_blaster, args=(port, rate_hz, block_seconds + 6.0), daemon=True)
+    blaster.start()
+    if parent_conn.poll(10) and parent_conn.recv()[0] == 'connected':
+        time.sleep(1.0)
+        start_count = block.read()[1]
+        start = time.perf_counter()
+        _block_gui_thread(block_seconds)
+        results['process'] = (block.read()[1] - start_count) / (time.perf_counter() - start)
+    else:
+        results['process'] = float('nan')
+        print("  ❌ Link process did not connect")
+    parent_conn.send(('stop', None))
+    link.join(timeout=3)
+    if link.is_alive():
+        link.terminate()
+    blaster.terminate()
+    block.close()
+
+    for label in ('thread', 'process'):
+        rate = results[label]
+        print(f"  {label:8s} decoded={rate:8.0f} msg/s  ({100 * rate / rate_hz:5.1f}% of offered)")
+    return results
+
+
+def record_high_rate_tlog(path, seconds=10):
+    """Write a synthetic tlog with ArduPilot-like stream rates (~450 msgs/s, mostly unused types)"""
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    with open(path, 'wb') as log:
+        usec = int(time.time() * 1e6)
+        for tick in range(seconds * 50):
+            t_ms = tick * 20
+            msgs = [
+                mav.raw_imu_encode(t_ms * 1000, 1, 2, -1000, 3, 4, 5, 200, 100, -300),
+                mav.scaled_imu2_encode(t_ms, 1, 2, -1000, 3, 4, 5, 200, 100, -300),
+                mav.servo_output_raw_encode(t_ms * 1000, 0, 1500, 1500, 1500, 1500, 0, 0, 0, 0),
+                mav.ahrs_encode(0.0, 0.0, 0.0, 1.0, 0.0, 0.01, 0.01),
+                mav.attitude_encode(t_ms, 0.01 * (tick % 50), -0.02, 1.5, 0.0, 0.0, 0.0),
+            ]
+            if tick % 5 == 0:
+                msgs += [
+                    mav.global_position_int_encode(t_ms, 174000000 + tick, 784000000 + tick, 550000, 10000, 0, 0, 0, 9000),
+                    mav.vfr_hud_encode(0.0, 2.5, 90, 50, 10.0, 0.1),
+                    mav.meminfo_encode(0, 40000),
+                    mav.power_status_encode(5000, 5000, 0),
+                    mav.system_time_encode(usec + t_ms * 1000, t_ms),
+                    mav.vibration_encode(t_ms * 1000, 1.0, 1.0, 1.0, 0, 0, 0),
+                    mav.ekf_status_report_encode(0x1FF, 0.1, 0.1, 0.1, 0.1, 0.0),
+                    mav.gps_raw_int_encode(t_ms * 1000, 3, 174000000, 784000000, 550000, 100, 100, 250, 9000, 12),
+                    mav.rc_channels_encode(t_ms, 8, *([1500] * 8 + [0] * 10), 255),
+                    mav.nav_controller_output_encode(0.0, 0.0, 90, 90, 0, 0.0, 0.0, 0.0),
+                ]
+            if tick % 25 == 0:
+                msgs.append(mav.sys_status_encode(0, 0, 0, 500, 12600, 1200, 80, 0, 0, 0, 0, 0, 0))
+            if tick % 50 == 0:
+                msgs.append(mav.heartbeat_encode(
+                    mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                    mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, 0, mavutil.mavlink.MAV_STATE_STANDBY))
+            for msg in msgs:
+                log.write(struct.pack('>Q', usec + t_ms * 1000) + msg.pack(mav))
+
+
+def load_tlog_frames(path):
+    """Raw frames of every message in a tlog"""
+    log = mavutil.mavlink_connection(path)
+    frames = []
+    while True:
+        msg = log.recv_msg()
+        if msg is None:
+            break
+        if msg.get_type() != 'BAD_DATA':
+            frames.append(bytes(msg.get_msgbuf()))
+    log.close()
+    return frames
+
+
+def bench_prefilter(tlog=None, rate_hz=5000):
+    """Reader CPU replaying a recorded high-rate stream, with and without the header prefilter"""
+    print("\n" + "=" * 60)
+    if tlog is None:
+        tlog = os.path.join(tempfile.mkdtemp(), 'high_rate.tlog')
+        record_high_rate_tlog(tlog)
+    frames = load_tlog_frames(tlog)
+    print(f"Header prefilter: {len(frames)} frames from {os.path.basename(tlog)} replayed @ {rate_hz} Hz")
+    print("=" * 60)
+
+    results = {}
+    for label, prefilter in (("decode all", False), ("prefilter", True)):
+        port = free_udp_port()
+        drone = mavutil.mavlink_connection(f'udpin:127.0.0.1:{port}')
+        thread = MAVLinkThread(drone, prefilter=prefilter)
+        handled = [0]
+        handle_message = thread._handle_message
+
+        def counting_handler(msg, handle_message=handle_message):
+            handled[0] += 1
+            handle_message(msg)
+
+        thread._handle_message = counting_handler
+
+        def seen():
+            skipped = thread._prefilter.skipped_total if thread._prefilter is not None else 0
+            return handled[0] + skipped
+
+        cpu = {}
+
+        def worker():
+            start = time.thread_time()
+            thread.run()
+            cpu['total'] = time.thread_time() - start
+
+        reader = threading.Thread(target=worker, daemon=True)
+        reader.start()
+        time.sleep(0.2)
+
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        interval = 1.0 / rate_hz
+        next_send = time.perf_counter()
+        for frame in frames:
+            sender.sendto(frame, ('127.0.0.1', port))
+            next_send += interval
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        deadline = time.time() + 5
+        while seen() < len(frames) and time.time() < deadline:
+            time.sleep(0.01)
+
+        thread.running = False
+        reader.join(timeout=2)
+        sender.close()
+        drone.close()
+
+        results[label] = cpu.get('total', float('nan'))
+        print(f"  {label:12s} decoded={handled[0]:6d}  skipped={seen() - handled[0]:6d}  reader CPU={results[label]:6.3f}s")
+        if prefilter:
+            top = sorted(thread.skippedMessageCounts().items(), key=lambda item: -item[1])[:5]
+            print("  skipped by type: " + ", ".join(f"{name}={count}" for name, count in top))
+
+    saved = 1.0 - results['prefilter'] / results['decode all']
+    print(f"  CPU saved by prefilter: {100 * saved:5.1f}%")
+    return results
+
+
+# The fixed profile _configure_drone applied on every connect: (msgid, interval in us)
+LEGACY_MESSAGE_RATES = [
+    (33, 200000),   # GLOBAL_POSITION_INT at 5Hz
+    (30, 100000),   # ATTITUDE at 10Hz
+    (74, 200000),   # VFR_HUD at 5Hz
+    (1, 500000),    # SYS_STATUS at 2Hz
+    (24, 500000),   # GPS_RAW_INT at 2Hz
+    (193, 1000000), # EKF_STATUS_REPORT at 1Hz
+]
+
+
+def _legacy_configure_drone(drone):
+    """The fixed-sleep setup used before the acknowledged pipeline"""
+    for param_id, value, param_type, _ in DEFAULT_PARAM_WRITES:
+        drone.mav.param_set_send(drone.target_system, drone.target_component,
+                                 param_id.encode('ascii'), value, param_type)
+        time.sleep(0.2 if param_id == 'BRD_SAFETYENABLE' else 0.5)
+    drone.mav.command_long_send(drone.target_system, drone.target_component,
+                                mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE, 0, 1, 0, 0, 0, 0, 0, 0)
+    time.sleep(0.5)
+    for msg_id, interval in LEGACY_MESSAGE_RATES:
+        drone.mav.command_long_send(drone.target_system, drone.target_component,
+                                    mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL, 0, msg_id, interval, 0, 0, 0, 0, 0)
+        time.sleep(0.1)
+
+
+def bench_vehicle_setup(latency=0.05):
+    """Connect-to-ready time: fixed sleeps vs acknowledged pipeline (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+    print("\n" + "=" * 60)
+    print(f"Vehicle setup on connect: simulated vehicle, {1000 * latency:.0f} ms one-way latency")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    results = {}
+    link = SimulatedLink(latency=latency)
+    start = time.perf_counter()
+    _legacy_configure_drone(link.drone)
+    results['fixed sleeps'] = (time.perf_counter() - start, None)
+    link.close()
+
+    cases = (
+        ("pipeline", {}),
+        ("pipeline (lossy)", {'drop_first': {'PARAM_SET': 1, 'COMMAND_LONG': 2}}),
+    )
+    for label, vehicle_kwargs in cases:
+        link = SimulatedLink(latency=latency, **vehicle_kwargs)
+        drone, vehicle, hub = link.drone, link.vehicle, link.hub
+        pipeline = VehicleSetupPipeline(drone, hub, message_rates=LEGACY_MESSAGE_RATES)
+        loop = QEventLoop()
+        outcome = {}
+
+        def finished(success, failed, outcome=outcome, loop=loop):
+            outcome['success'] = success
+            loop.quit()
+
+        pipeline.setupFinished.connect(finished)
+        QTimer.singleShot(10000, loop.quit)
+        start = time.perf_counter()
+        pipeline.start()
+        loop.exec_()
+        results[label] = (time.perf_counter() - start, outcome.get('success'))
+        confirmed = vehicle.params['BRD_SAFETYENABLE'] == 0 and len(vehicle.message_intervals) == len(LEGACY_MESSAGE_RATES)
+        link.close()
+        if not confirmed:
+            print(f"  ⚠️ {label}: vehicle did not receive every setting")
+
+    for label, (elapsed, success) in results.items():
+        status = "unconfirmed" if success is None else ("all acknowledged" if success else "FAILED")
+        print(f"  {label:18s} connect-to-ready={1000 * elapsed:7.0f} ms  ({status})")
+    return results
+
+
+def _frame_bytes(msgid):
+    """On-the-wire size of a MAVLink v2 frame of this message (zero-filled payload)"""
+    msg_class = mavutil.mavlink.mavlink_map[msgid]
+    return 12 + msg_class.unpacker.size
+
+
+def _stream_bandwidth(intervals):
+    """Bytes/s for {msgid: interval_us}; disabled (<= 0) streams cost nothing"""
+    return sum(_frame_bytes(msgid) * 1e6 / interval for msgid, interval in intervals.items() if interval > 0)
+
+
+def bench_stream_rates(latency=0.05, assumed_default_hz=4):
+    """Link bandwidth per screen and SET/GET_MESSAGE_INTERVAL traffic (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+    print("\n" + "=" * 60)
+    print(f"Stream rates: bandwidth per screen, default streams assumed at {assumed_default_hz} Hz")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    defaults = {getattr(mavutil.mavlink, 'MAVLINK_MSG_ID_' + name): int(1e6 / assumed_default_hz)
+                for name in DROPPABLE_STREAMS}
+    legacy = dict(defaults)
+    legacy.update(dict(LEGACY_MESSAGE_RATES))
+
+    screens = (
+        ("parameters screen", {'status': {'SYS_STATUS': 2, 'VFR_HUD': 2, 'GLOBAL_POSITION_INT': 2}}),
+        ("flight view", {'status': {'SYS_STATUS': 2, 'VFR_HUD': 2, 'GLOBAL_POSITION_INT': 2},
+                         'hud': {'ATTITUDE': 10, 'VFR_HUD': 5},
+                         'map': {'GLOBAL_POSITION_INT': 5}}),
+    )
+    results = {'fixed profile': _stream_bandwidth(legacy)}
+    print(f"  {'fixed profile':18s} {results['fixed profile']:7.0f} B/s (any screen)")
+    for label, requests in screens:
+        manager = StreamRateManager()
+        for consumer, rates in requests.items():
+            manager.request(consumer, rates)
+        intervals = dict(defaults)
+        intervals.update(manager.desired_intervals())
+        results[label] = _stream_bandwidth(intervals)
+        print(f"  {label:18s} {results[label]:7.0f} B/s "
+              f"({100 * (1 - results[label] / results['fixed profile']):4.1f}% less)")
+
+    def settle(manager, timeout=5.0):
+        loop = QEventLoop()
+        deadline = time.monotonic() + timeout
+
+        def check():
+            if not manager._jobs or time.monotonic() > deadline:
+                loop.quit()
+            else:
+                QTimer.singleShot(10, check)
+
+        QTimer.singleShot(10, check)
+        loop.exec_()
+
+    for label, vehicle_kwargs in (("clean link", {}), ("lossy link", {'drop_first': {'COMMAND_LONG:511': 3}})):
+        link = SimulatedLink(latency=latency, **vehicle_kwargs)
+        drone, vehicle, hub = link.drone, link.vehicle, link.hub
+        manager = StreamRateManager()
+        for consumer, rates in screens[1][1].items():
+            manager.request(consumer, rates)
+
+        manager.attach(drone, hub)
+        settle(manager)
+        first = (manager.commands_sent, manager.commands_skipped)
+        # Reconnect to the same vehicle: every interval is queried, none re-set
+        manager.attach(drone, hub)
+        settle(manager)
+        second = (manager.commands_sent - first[0], manager.commands_skipped - first[1])
+
+        wanted = manager.desired_intervals()
+        mismatched = [msgid for msgid, interval in wanted.items() if vehicle.message_intervals.get(msgid) != interval]
+        manager.detach()
+        link.close()
+        print(f"  {label:18s} connect: {first[0]:2d} commands sent   reconnect: {second[0]:2d} sent, "
+              f"{second[1]:2d} skipped   vehicle {'matches' if not mismatched else f'MISMATCH {mismatched}'}")
+        results[label] = (first, second, mismatched)
+    return results
+
+
+def bench_link_recovery(outage=2.0, heartbeat_hz=5.0, heartbeat_timeout=1.5):
+    """Heartbeat-loss detection and time-to-recovery after a vehicle outage (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+    from modules.drone_module import ConnectionWorker
+
+    print("\n" + "=" * 60)
+    print(f"Link recovery: {outage:.1f} s vehicle outage, heartbeat {heartbeat_hz:.0f} Hz, "
+          f"loss timeout {heartbeat_timeout:.1f} s")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    link = SimulatedLink(heartbeat_hz=heartbeat_hz)
+    hub = link.hub
+    supervisor = LinkSupervisor(
+        lambda uri, baud, timeout: ConnectionWorker(uri, baud, heartbeat_timeout=max(1.0, timeout)),
+        heartbeat_timeout=heartbeat_timeout
+    )
+    times = {}
+    states = []
+    loop = QEventLoop()
+
+    def stop_vehicle():
+        times['vehicle stopped'] = time.monotonic()
+        link.vehicle.stop()
+        QTimer.singleShot(int(outage * 1000), resume_vehicle)
+
+    def resume_vehicle():
+        times['vehicle resumed'] = time.monotonic()
+        link.restart_vehicle()
+
+    def lost(reason):
+        times['loss detected'] = time.monotonic()
+        # What DroneModel does: stop the reader and release the socket
+        link.stop_reader()
+
+    def reconnected(drone, offline):
+        times['reconnected'] = time.monotonic()
+        link.start_reader(drone)
+        # Telemetry flowing again through the same hub
+        sub = hub.subscribe('HEARTBEAT', maxsize=4)
+
+        def check():
+            if sub.drain():
+                times['telemetry flowing'] = time.monotonic()
+                sub.close()
+                loop.quit()
+            else:
+                QTimer.singleShot(5, check)
+
+        check()
+
+    supervisor.linkStateChanged.connect(states.append)
+    supervisor.linkLost.connect(lost)
+    supervisor.reconnected.connect(reconnected)
+    supervisor.start(f'udpin:127.0.0.1:{link.port}', 57600, hub, link.drone.target_system)
+    QTimer.singleShot(1000, stop_vehicle)
+    QTimer.singleShot(int((outage + 15) * 1000), loop.quit)
+    loop.exec_()
+    supervisor.stop()
+    link.close()
+
+    if 'reconnected' not in times:
+        print(f"  ❌ Link not recovered (states: {' → '.join(states)})")
+        return times
+    detection = times['loss detected'] - times['vehicle stopped']
+    recovery = times['reconnected'] - times['vehicle resumed']
+    offline = times['telemetry flowing'] - times['vehicle stopped']
+    print(f"  states: {' → '.join(states)}")
+    print(f"  loss detected after      {1000 * detection:7.0f} ms  (last heartbeat ≤ {1000 / heartbeat_hz:.0f} ms earlier)")
+    print(f"  reconnected after resume {1000 * recovery:7.0f} ms  ({supervisor.attempts} attempts)")
+    print(f"  total time without link  {1000 * offline:7.0f} ms  (outage {1000 * outage:.0f} ms)")
+    return {'detection': detection, 'recovery': recovery, 'offline': offline, 'attempts': supervisor.attempts}
+
+
+def _wait_futures(futures, timeout=15.0):
+    """Run the Qt event loop until every future is done (or timeout)"""
+    from PyQt5.QtCore import QEventLoop, QTimer
+
+    loop = QEventLoop()
+    deadline = time.monotonic() + timeout
+
+    def check():
+        if all(future.done() for future in futures) or time.monotonic() > deadline:
+            loop.quit()
+        else:
+            QTimer.singleShot(5, check)
+
+    QTimer.singleShot(0, check)
+    loop.exec_()
+
+
+def bench_command_transactions(latency=0.05, rounds=20):
+    """Command outcomes, retransmissions and send->ACK latency (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication
+
+    print("\n" + "=" * 60)
+    print(f"Command transactions: {rounds} arm/disarm/mode rounds, {1000 * latency:.0f} ms one-way latency")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    arm = mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM
+    set_mode = mavutil.mavlink.MAV_CMD_DO_SET_MODE
+    calibrate = mavutil.mavlink.MAV_CMD_PREFLIGHT_CALIBRATION
+    custom = mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
+
+    cases = (
+        ("clean link", {}),
+        ("lossy link", {'drop_first': {f'COMMAND_LONG:{arm}': 5, f'COMMAND_LONG:{set_mode}': 3}}),
+    )
+    results = {}
+    for label, vehicle_kwargs in cases:
+        link = SimulatedLink(latency=latency, in_progress={calibrate: 1.0}, **vehicle_kwargs)
+        drone, vehicle, hub = link.drone, link.vehicle, link.hub
+        manager = CommandManager(ack_timeout=0.3)
+        manager.attach(drone, hub)
+
+        outcomes = []
+        slowest_send = 0.0
+        for index in range(rounds):
+            start = time.perf_counter()
+            futures = [manager.send(arm, (1,)), manager.send(set_mode, (custom, 4)),
+                       manager.send(set_mode, (custom, 5)), manager.send(arm, (0,))]
+            slowest_send = max(slowest_send, (time.perf_counter() - start) / len(futures))
+            _wait_futures(futures)
+            outcomes.extend(future.result() for future in futures if future.done())
+
+        progress = []
+        manager.commandProgress.connect(lambda name, percent: progress.append(percent))
+        long_running = manager.send(calibrate, (0, 0, 1))
+        _wait_futures([long_running])
+
+        stats = manager.latency_stats()
+        accepted = sum(outcome.accepted for outcome in outcomes)
+        vehicle_ok = vehicle.custom_mode == 5 and not vehicle.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+        manager.detach()
+        link.close()
+
+        print(f"  {label}: {accepted}/{len(outcomes)} accepted, {manager.retransmissions} retransmissions, "
+              f"send() ≤ {1e6 * slowest_send:.0f} µs, vehicle {'in final state' if vehicle_ok else 'MISMATCH'}")
+        for name, summary in stats.items():
+            last_send, first_send = summary['last_send'], summary['first_send']
+            print(f"    {name:32s} n={last_send['count']:3d}  p50={last_send['p50_ms']:6.1f} ms  "
+                  f"p95={last_send['p95_ms']:6.1f} ms  max={last_send['max_ms']:6.1f} ms  "
+                  f"(from first send: p95={first_send['p95_ms']:6.1f} ms  max={first_send['max_ms']:6.1f} ms)")
+        calibration = long_running.result() if long_running.done() else None
+        print(f"    IN_PROGRESS updates {progress} -> "
+              f"{calibration.describe() if calibration else 'unresolved'}")
+        results[label] = (accepted, len(outcomes), manager.retransmissions, stats)
+    return results
+
+
+class _RadioLink:
+    """Serial radio stand-in: bytes leave in order at baud/10 bytes per second"""
+
+    def __init__(self, baud):
+        self.rate = baud / 10.0
+        self.mav = mavutil.mavlink.MAVLink(self, srcSystem=255, srcComponent=190)
+        self._parser = mavutil.mavlink.MAVLink(None)
+        self._lock = threading.Lock()
+        self.busy_until = 0.0
+        self.delivered = []       # (time the frame is through the radio, message)
+        self.writes = 0
+
+    def write(self, buf):
+        with self._lock:
+            self.writes += 1
+            start = max(time.monotonic(), self.busy_until)
+            offset = 0
+            for msg in self._parser.parse_buffer(bytes(buf)) or []:
+                offset += len(msg.get_msgbuf())
+                self.delivered.append((start + offset / self.rate, msg))
+            self.busy_until = start + len(buf) / self.rate
+
+
+def bench_outbound_writer(baud=57600, param_count=200):
+    """Disarm latency behind a bulk parameter upload on a radio link; write() coalescing"""
+    print("\n" + "=" * 60)
+    print(f"Outbound writer: DISARM during a {param_count}-parameter upload, {baud}-baud radio")
+    print("=" * 60)
+
+    results = {}
+    for label in ("direct writes", "outbound writer"):
+        radio = _RadioLink(baud)
+        writer = None
+        if label == "outbound writer":
+            writer = OutboundWriter(radio, link_rate=radio.rate)
+            writer.install()
+
+        def upload():
+            for index in range(param_count):
+                radio.mav.param_set_send(1, 1, f'PARAM_{index:04d}'.encode('ascii'), float(index),
+                                         mavutil.mavlink.MAV_PARAM_TYPE_REAL32)
+
+        bulk = threading.Thread(target=upload)
+        start = time.monotonic()
+        bulk.start()
+        time.sleep(0.2)
+        disarm_sent = time.monotonic()
+        radio.mav.command_long_send(1, 1, mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 0, 0, 0, 0, 0, 0, 0, 0)
+        bulk.join()
+        if writer is not None:
+            writer.uninstall(flush_timeout=30)
+
+        disarm_at = next(at for at, msg in radio.delivered if msg.get_type() == 'COMMAND_LONG')
+        upload_done = max(at for at, msg in radio.delivered if msg.get_type() == 'PARAM_SET')
+        results[label] = {
+            'disarm_latency': disarm_at - disarm_sent,
+            'upload_time': upload_done - start,
+            'frames': len(radio.delivered),
+            'writes': radio.writes,
+        }
+        print(f"  {label:16s} DISARM through radio after {1000 * (disarm_at - disarm_sent):7.1f} ms   "
+              f"upload done in {upload_done - start:5.2f} s   "
+              f"{len(radio.delivered)} frames in {radio.writes} write() calls")
+        if writer is not None:
+            for name, counters in writer.stats().items():
+                print(f"    {name:8s} {counters['frames']:4d} frames {counters['bytes']:6d} B  "
+                      f"{counters['bytes_per_s']:6.0f} B/s  max queued {counters['max_wait_ms']:7.1f} ms")
+
+    # Coalescing on an unthrottled (UDP) link: frames from several threads at once
+    radio = _RadioLink(1e9)
+    writer = OutboundWriter(radio)
+    writer.install()
+    senders = [threading.Thread(target=lambda: [radio.mav.param_request_read_send(1, 1, b'', i) for i in range(250)])
+               for _ in range(4)]
+    for sender in senders:
+        sender.start()
+    for sender in senders:
+        sender.join()
+    writer.uninstall()
+    print(f"  coalescing (UDP, 4 threads): {len(radio.delivered)} frames in {radio.writes} write() calls")
+    results['coalescing'] = (len(radio.delivered), radio.writes)
+    return results
+
+
+def _legacy_takeoff(drone, hub, target_altitude):
+    """The fixed-sleep takeoff used before the event-driven sequence; returns (armed_at, airborne_at)"""
+    for param_id, value in TAKEOFF_PARAMS:
+        drone.mav.param_set_send(drone.target_system, drone.target_component, param_id.encode('ascii'),
+                                 value, mavutil.mavlink.MAV_PARAM_TYPE_INT32)
+        time.sleep(0.3)
+    time.sleep(6)
+    drone.mav.set_mode_send(drone.target_system, mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
+                            drone.mode_mapping().get('GUIDED'))
+    drone.mav.command_long_send(drone.target_system, drone.target_component, mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+                                0, mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
+                                drone.mode_mapping().get('GUIDED'), 0, 0, 0, 0, 0)
+    time.sleep(2)
+    with hub.subscribe('HEARTBEAT') as heartbeats:
+        armed_at = None
+        for _ in range(5):
+            drone.mav.command_long_send(drone.target_system, drone.target_component,
+                                        mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 0, 1, 0, 0, 0, 0, 0, 0)
+            time.sleep(0.4)
+            if armed_at is None and any(m.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+                                        for m in heartbeats.drain()):
+                armed_at = time.monotonic()
+        time.sleep(2)
+    drone.mav.command_long_send(drone.target_system, drone.target_component, mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
+                                0, 0, 0, 0, 0, 0, 0, target_altitude)
+    # location() polled every 0.5 s
+    with hub.subscribe('GLOBAL_POSITION_INT') as positions:
+        start_alt = None
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            latest = positions.latest()
+            alt = latest.relative_alt / 1000.0 if latest else 0.0
+            start_alt = alt if start_alt is None else start_alt
+            if alt - start_alt > 1.0:
+                return armed_at, time.monotonic()
+            time.sleep(0.5)
+    return armed_at, None
+
+
+def bench_takeoff(latency=0.05, target_altitude=10.0):
+    """Command-to-airborne time: fixed sleeps vs event-driven coroutine (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication
+
+    print("\n" + "=" * 60)
+    print(f"Takeoff to {target_altitude:.0f} m: simulated vehicle, {1000 * latency:.0f} ms one-way latency, "
+          f"1 Hz heartbeat, 2.5 m/s climb")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    results = {}
+    link = SimulatedLink(latency=latency)
+    drone, hub = link.drone, link.hub
+    start = time.monotonic()
+    armed_at, airborne_at = _legacy_takeoff(drone, hub, target_altitude)
+    results['fixed sleeps'] = (start, armed_at, airborne_at)
+    link.close()
+
+    loop_thread = AsyncLoopThread()
+    for label, vehicle_kwargs in (("event-driven", {}), ("event-driven (lossy)", {'drop_first': {'PARAM_SET': 2}})):
+        link = SimulatedLink(latency=latency, **vehicle_kwargs)
+        drone, hub = link.drone, link.hub
+        commands = CommandManager()
+        commands.attach(drone, hub)
+        vehicle = VehicleCommands(drone, hub, commands, loop_thread)
+        future = loop_thread.submit(vehicle.takeoff(target_altitude))
+        _wait_futures([future], timeout=45)
+        report = future.result() if future.done() and not future.exception() else None
+        results[label] = (report.started_at, report.armed_at, report.airborne_at) if report else (0, 0, None)
+        commands.detach()
+        link.close()
+    loop_thread.stop()
+
+    for label, (start, armed_at, airborne_at) in results.items():
+        if airborne_at is None:
+            print(f"  {label:22s} ❌ never airborne")
+            continue
+        print(f"  {label:22s} command→armed {armed_at - start:5.2f} s   armed→airborne {airborne_at - armed_at:5.2f} s   "
+              f"command→airborne {airborne_at - start:5.2f} s")
+    return results
+
+
+def bench_concurrent_waits(waiters=500, vehicles=5):
+    """Cost of many concurrent message waits: thread per wait vs coroutines on one loop"""
+    print("\n" + "=" * 60)
+    print(f"Concurrent waits: {waiters} waits for the next HEARTBEAT of {vehicles} vehicles")
+    print("=" * 60)
+    hub = MAVLinkMessageHub()
+    encoders = [mavutil.mavlink.MAVLink(None, srcSystem=sysid, srcComponent=1) for sysid in range(1, vehicles + 1)]
+    parser = mavutil.mavlink.MAVLink(None)
+
+    def beat():
+        for mav in encoders:
+            msg = parser.decode(bytearray(mav.heartbeat_encode(2, 3, 0, 0, 0).pack(mav)))
+            hub.dispatch(msg)
+
+    def measure(label, start_waits, all_done):
+        baseline = threading.active_count()
+        start = time.perf_counter()
+        start_waits()
+        setup = time.perf_counter() - start
+        peak = threading.active_count() - baseline
+        start = time.perf_counter()
+        while not all_done():
+            beat()
+            time.sleep(0.001)
+        resolve = time.perf_counter() - start
+        print(f"  {label:18s} extra threads {peak:4d}   start {1000 * setup:7.1f} ms   "
+              f"all resolved {1000 * resolve:6.1f} ms after the heartbeat")
+        return peak, setup, resolve
+
+    results = {}
+    done = []
+    lock = threading.Lock()
+
+    def blocking_wait(sysid):
+        with hub.subscribe('HEARTBEAT', sysid=sysid) as sub:
+            if sub.get(timeout=10):
+                with lock:
+                    done.append(sysid)
+
+    threads = [threading.Thread(target=blocking_wait, args=(1 + i % vehicles,), daemon=True) for i in range(waiters)]
+
+    def start_threads():
+        for thread in threads:
+            thread.start()
+        # Every thread subscribed before the first heartbeat
+        while sum(len(subs) for subs in hub._by_type.values()) < waiters:
+            time.sleep(0.001)
+
+    results['thread per wait'] = measure("thread per wait", start_threads, lambda: len(done) == waiters)
+
+    loop_thread = AsyncLoopThread()
+    loop_thread.start()
+    vehicle_views = [VehicleCommands(type('Drone', (), {'target_system': sysid})(), hub, None, loop_thread)
+                     for sysid in range(1, vehicles + 1)]
+
+    async def async_wait(vehicle):
+        stream = vehicle.stream('HEARTBEAT')
+        try:
+            return await stream.get(timeout=10)
+        finally:
+            stream.close()
+
+    futures = []
+
+    def start_coroutines():
+        futures.extend(loop_thread.submit(async_wait(vehicle_views[i % vehicles])) for i in range(waiters))
+        while sum(len(subs) for subs in hub._by_type.values()) < waiters:
+            time.sleep(0.001)
+
+    results['coroutines'] = measure("coroutines", start_coroutines,
+                                    lambda: all(f.done() for f in futures))
+    loop_thread.stop()
+    return results
+
+
+def _survey_items(count):
+    """Takeoff + a lawnmower survey of count - 1 waypoints"""
+    waypoints = [{'x': 47.3977420 + 1e-4 * (i // 20), 'y': 8.5455940 + 1e-4 * (i % 20 if (i // 20) % 2 == 0 else 19 - i % 20),
+                  'z': 30.0} for i in range(count - 1)]
+    return build_mission_items(waypoints, 47.3977420, 8.5455940)
+
+
+def _legacy_upload_mission(drone, hub, items):
+    """The blocking upload used before the mission engine: listen, probe, clear, then lock-step items"""
+    with hub.subscribe(maxsize=1000) as traffic:
+        deadline = time.monotonic() + 3
+        while time.monotonic() < deadline:
+            traffic.get(timeout=max(0.0, deadline - time.monotonic()))
+    with hub.subscribe(['MISSION_COUNT', 'MISSION_ACK', 'MISSION_REQUEST']) as mission_sub:
+        drone.mav.mission_request_list_send(drone.target_system, drone.target_component)
+        mission_sub.wait_for(lambda m: m.get_type() in ('MISSION_COUNT', 'MISSION_ACK'), timeout=8)
+        drone.mav.mission_clear_all_send(drone.target_system, drone.target_component)
+        mission_sub.wait_for(lambda m: m.get_type() == 'MISSION_ACK', timeout=3)
+        time.sleep(0.5)
+        drone.mav.mission_count_send(drone.target_system, drone.target_component, len(items))
+        while True:
+            msg = mission_sub.get(timeout=15)
+            if msg is None:
+                return False
+            if msg.get_type() == 'MISSION_ACK':
+                return msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED
+            if msg.get_type() == 'MISSION_REQUEST':
+                item = items[msg.seq]
+                drone.mav.mission_item_int_send(
+                    drone.target_system, drone.target_component,
+                    item['seq'], item['frame'], item['command'], item['current'], item['autocontinue'],
+                    item['param1'], item['param2'], item['param3'], item['param4'],
+                    int(item['x'] * 1e7), int(item['y'] * 1e7), float(item['z'])
+                )
+
+
+def bench_mission_upload(item_count=200, latency=0.01, loss=0.03):
+    """Mission upload time: legacy blocking upload vs the streaming engine (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication
+
+    print("\n" + "=" * 60)
+    print(f"Mission upload: {item_count} items, {1000 * latency:.0f} ms one-way latency "
+          f"(round-trip bound {latency * (item_count + 1):.2f} s)")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    items = _survey_items(item_count)
+
+    def stored_correctly(vehicle):
+        stored = vehicle.missions.get(mavutil.mavlink.MAV_MISSION_TYPE_MISSION, [])
+        return (len(stored) == len(items)
+                and all(m.seq == item['seq'] and m.x == round(item['x'] * 1e7) and m.y == round(item['y'] * 1e7)
+                        for m, item in zip(stored, items)))
+
+    results = {}
+    link = SimulatedLink(latency=latency, mission_request_int=False)
+    start = time.perf_counter()
+    ok = _legacy_upload_mission(link.drone, link.hub, items)
+    results['legacy (MISSION_REQUEST)'] = (time.perf_counter() - start, ok and stored_correctly(link.vehicle))
+    link.close()
+
+    loop_thread = AsyncLoopThread()
+    cases = (
+        ("engine (MISSION_REQUEST)", {'mission_request_int': False}),
+        ("engine (REQUEST_INT)", {}),
+        (f"engine ({100 * loss:.0f}% loss)", {'loss': loss}),
+    )
+    for label, vehicle_kwargs in cases:
+        link = SimulatedLink(latency=latency, **vehicle_kwargs)
+        vehicle = link.vehicle_commands(loop_thread)
+        start = time.perf_counter()
+        future = loop_thread.submit(vehicle.upload_mission(items))
+        _wait_futures([future], timeout=120)
+        elapsed = time.perf_counter() - start
+        ok = future.done() and not future.exception() and stored_correctly(link.vehicle)
+        results[label] = (elapsed, ok)
+        link.close()
+    loop_thread.stop()
+
+    print()
+    for label, (elapsed, ok) in results.items():
+        print(f"  {label:26s} {elapsed:6.2f} s   {'✅ stored intact' if ok else '❌ failed'}")
+    return results
+
+
+def bench_mission_sync(item_count=300, latency=0.05):
+    """Repeated uploads of one survey: plain full upload vs sync (simulated vehicle, no opaque_id: always full)"""
+    from PyQt5.QtCore import QCoreApplication
+
+    print("\n" + "=" * 60)
+    print(f"Mission sync: {item_count}-item survey, {1000 * latency:.0f} ms one-way latency")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    items = _survey_items(item_count)
+    edited = [dict(item) for item in items]
+    edited[item_count // 2]['z'] = 45.0          # operator raises one waypoint
+
+    link = SimulatedLink(latency=latency, uid=0x1234)
+    drone, vehicle, hub = link.drone, link.vehicle, link.hub
+    loop_thread = AsyncLoopThread()
+    view = link.vehicle_commands(loop_thread)
+    cache = MissionCache(tempfile.mkdtemp())
+
+    def run(coro):
+        start = time.perf_counter()
+        future = loop_thread.submit(coro)
+        _wait_futures([future], timeout=120)
+        return time.perf_counter() - start, future.result() if future.done() and not future.exception() else None
+
+    def replace_on_vehicle():
+        # Another GCS uploads a different (shorter) mission
+        stored = vehicle.missions[mavutil.mavlink.MAV_MISSION_TYPE_MISSION]
+        vehicle.missions[mavutil.mavlink.MAV_MISSION_TYPE_MISSION] = stored[:-5]
+
+    steps = (
+        ("first upload", items, None),
+        ("unchanged", items, None),
+        ("one waypoint edited", edited, None),
+        ("changed by other GCS", edited, replace_on_vehicle),
+    )
+    results = {}
+    for label, mission, before in steps:
+        if before is not None:
+            before()
+        synced, outcome = run(view.sync_mission(mission, cache))
+        on_vehicle = vehicle.missions[mavutil.mavlink.MAV_MISSION_TYPE_MISSION]
+        ok = outcome is not None and [m.z for m in on_vehicle] == [float(item['z']) for item in mission]
+        # The same step as a plain full upload, for comparison
+        full, _ = run(view.upload_mission(mission))
+        results[label] = (full, synced, outcome.method if outcome else 'failed', ok)
+    loop_thread.stop()
+    link.close()
+
+    print()
+    for label, (full, synced, method, ok) in results.items():
+        print(f"  {label:22s} full upload {full:6.2f} s   sync {synced:6.2f} s ({method}) "
+              f"{'✅' if ok else '❌'}")
+    return results
+
+
+def bench_mission_download(item_count=300, latency=0.05, loss=0.03):
+    """Mission download time: one request at a time vs a request window, and from the cache (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication
+    from modules.mission_transfer import request_mission_state, download_mission, mission_checksum
+
+    print("\n" + "=" * 60)
+    print(f"Mission download: {item_count} items, {1000 * latency:.0f} ms one-way latency")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    items = _survey_items(item_count)
+    loop_thread = AsyncLoopThread()
+
+    def run(coro):
+        start = time.perf_counter()
+        future = loop_thread.submit(coro)
+        _wait_futures([future], timeout=120)
+        return time.perf_counter() - start, future.result() if future.done() and not future.exception() else None
+
+    async def fetch(view, window):
+        state = await request_mission_state(view)
+        return await download_mission(view, state.count, window=window)
+
+    def intact(mission):
+        return mission is not None and mission_checksum(mission.to_items()) == mission_checksum(items)
+
+    results = {}
+    for label, window, vehicle_kwargs in (("one at a time", 1, {}), ("window of 8", 8, {}),
+                                          (f"window of 8, {100 * loss:.0f}% loss", 8, {'loss': loss})):
+        link = SimulatedLink(latency=latency, **vehicle_kwargs)
+        view = link.vehicle_commands(loop_thread)
+        run(view.upload_mission(items))
+        elapsed, mission = run(fetch(view, window))
+        results[label] = (elapsed, intact(mission))
+        link.close()
+
+    # Reconnect to a known vehicle: without opaque_id the cache cannot prove the mission, so it is read
+    link = SimulatedLink(latency=latency, uid=0x1234)
+    view = link.vehicle_commands(loop_thread)
+    cache = MissionCache(tempfile.mkdtemp())
+    run(view.sync_mission(items, cache))
+    elapsed, loaded = run(view.load_mission(cache))
+    results['reconnect, no opaque_id'] = (elapsed, loaded is not None and not loaded[1] and intact(loaded[0]))
+    link.close()
+    loop_thread.stop()
+
+    print()
+    for label, (elapsed, ok) in results.items():
+        print(f"  {label:26s} {elapsed:6.2f} s   {'✅ intact' if ok else '❌ failed'}")
+    return results
+
+
+def bench_waypoint_model(point_count=10000, lookups=2000):
+    """Waypoint list edits in one batch vs row by row, and nearest-waypoint lookups: grid vs scan"""
+    import numpy as np
+    from PyQt5.QtCore import QCoreApplication
+    from modules.waypoint_model import WaypointListModel, EARTH_RADIUS
+
+    print("\n" + "=" * 60)
+    print(f"Waypoint model: {point_count} waypoints, {lookups} nearest-waypoint lookups")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    rng = np.random.default_rng(7)
+    lat = 17.60 + 0.05 * rng.random(point_count)
+    lon = 78.12 + 0.05 * rng.random(point_count)
+    markers = [{'lat': a, 'lng': b, 'altitude': 30, 'speed': 5, 'commandType': 'waypoint', 'holdTime': 0}
+               for a, b in zip(lat.tolist(), lon.tolist())]
+
+    signals = {'inserts': 0}
+
+    def fresh_model():
+        model = WaypointListModel()
+        model.rowsInserted.connect(lambda *args: signals.__setitem__('inserts', signals['inserts'] + 1))
+        signals['inserts'] = 0
+        return model
+
+    model = fresh_model()
+    start = time.perf_counter()
+    for marker in markers:
+        model.appendWaypoints([marker])
+    row_by_row = (time.perf_counter() - start, signals['inserts'])
+
+    model = fresh_model()
+    start = time.perf_counter()
+    model.appendWaypoints(markers)
+    batched = (time.perf_counter() - start, signals['inserts'])
+
+    start = time.perf_counter()
+    model.moveWaypoints(0, point_count // 2, point_count)
+    model.removeWaypoints(0, point_count // 4)
+    edits = time.perf_counter() - start
+
+    # Hit testing within 15 m (a 12 px click radius at zoom 18) - every lookup checked against a scan
+    points = model.points
+    queries = np.column_stack((17.60 + 0.05 * rng.random(lookups), 78.12 + 0.05 * rng.random(lookups)))
+    start = time.perf_counter()
+    model.nearestWaypoint(*queries[0], 15.0)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    hits = [model.nearestWaypoint(q_lat, q_lon, 15.0) for q_lat, q_lon in queries.tolist()]
+    grid_time = time.perf_counter() - start
+
+    lat0 = math.radians(points['lat'].mean())
+    start = time.perf_counter()
+    scanned = []
+    for q_lat, q_lon in queries.tolist():
+        dx = np.radians(points['lon'] - q_lon) * math.cos(lat0) * EARTH_RADIUS
+        dy = np.radians(points['lat'] - q_lat) * EARTH_RADIUS
+        distance = np.hypot(dx, dy)
+        best = int(np.argmin(distance))
+        scanned.append(best if distance[best] <= 15.0 else -1)
+    scan_time = time.perf_counter() - start
+    agree = hits == scanned
+
+    print(f"  insert row by row   {1000 * row_by_row[0]:8.1f} ms   {row_by_row[1]} rowsInserted signals")
+    print(f"  insert as one batch {1000 * batched[0]:8.1f} ms   {batched[1]} rowsInserted signal")
+    print(f"  move + remove batch {1000 * edits:8.1f} ms")
+    print(f"  grid build          {1000 * build:8.1f} ms")
+    print(f"  nearest, grid       {1e6 * grid_time / lookups:8.1f} us/lookup")
+    print(f"  nearest, full scan  {1e6 * scan_time / lookups:8.1f} us/lookup   "
+          f"{'✅ same answers' if agree else '❌ answers differ'} ({sum(h >= 0 for h in hits)} hits)")
+    return {'row_by_row': row_by_row, 'batched': batched, 'grid': grid_time, 'scan': scan_time, 'agree': agree}
+
+
+def bench_mission_validation(point_count=10000, runs=20):
+    """Whole-mission validation time: NumPy arrays vs a per-leg Python loop"""
+    import numpy as np
+    from modules.mission_validation import validate_mission, BatteryState, EARTH_RADIUS
+
+    print("\n" + "=" * 60)
+    print(f"Mission validation: {point_count} waypoints")
+    print("=" * 60)
+    rng = np.random.default_rng(3)
+    lat = 17.60 + np.cumsum(rng.normal(0, 2e-4, point_count))
+    lon = 78.12 + np.cumsum(rng.normal(0, 2e-4, point_count))
+    alt = np.clip(40 + np.cumsum(rng.normal(0, 1.0, point_count)), 5, 110)
+    speed = np.full(point_count, 8.0)
+    battery = BatteryState(95.0, 16.4, 18.0)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        report = validate_mission(lat, lon, alt, speed, battery=battery)
+        timings.append(time.perf_counter() - start)
+    vectorised = sorted(timings)[len(timings) // 2]
+
+    # The same legs one at a time
+    start = time.perf_counter()
+    total = 0.0
+    points = list(zip(lat.tolist(), lon.tolist(), alt.tolist()))
+    for (lat1, lon1, _), (lat2, lon2, _) in zip(points, points[1:]):
+        phi1, phi2 = math.radians(lat1), math.radians(lat2)
+        a = (math.sin((phi2 - phi1) / 2) ** 2
+             + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+        total += 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+    python_loop = time.perf_counter() - start
+
+    print(f"  vectorised (median of {runs}) {1000 * vectorised:7.2f} ms   full check")
+    print(f"  Python loop                {1000 * python_loop:7.2f} ms   leg lengths only")
+    print(f"  {report.total_distance / 1000:.1f} km, {report.flight_time / 60:.0f} min, "
+          f"{report.battery_used:.0f}% battery, {len(report.errors)} errors, {len(report.warnings)} warnings"
+          f"   {'✅ distances agree' if abs(total - report.total_distance) < 1e-3 else '❌ distances differ'}")
+    return {'vectorised': vectorised, 'python_loop': python_loop}
+
+
+def bench_path_simplify(point_count=20000, tolerances=(0.5, 1.0, 2.0, 5.0)):
+    """Douglas-Peucker on an imported GPS trace: waypoints left and deviation per tolerance"""
+    import numpy as np
+    from modules.path_simplify import simplify_path
+
+    print("\n" + "=" * 60)
+    print(f"Path simplification: {point_count}-point GPS trace (1 Hz, 5 m/s, 0.3 m noise)")
+    print("=" * 60)
+    rng = np.random.default_rng(11)
+    # A wandering survey track sampled once a second, with GPS noise
+    heading = np.cumsum(rng.normal(0, 0.05, point_count))
+    north = np.cumsum(5.0 * np.cos(heading)) + rng.normal(0, 0.3, point_count)
+    east = np.cumsum(5.0 * np.sin(heading)) + rng.normal(0, 0.3, point_count)
+    lat = 17.60 + np.degrees(north / 6371000.0)
+    lon = 78.12 + np.degrees(east / (6371000.0 * math.cos(math.radians(17.60))))
+    alt = 40 + 0.5 * np.sin(np.arange(point_count) / 200.0)
+
+    results = {}
+    for tolerance in tolerances:
+        start = time.perf_counter()
+        result = simplify_path(lat, lon, alt, tolerance)
+        elapsed = time.perf_counter() - start
+        results[tolerance] = (result.count, result.max_deviation, elapsed)
+        ok = result.max_deviation <= tolerance + 1e-6
+        print(f"  tolerance {tolerance:4.1f} m   {result.count:6d} waypoints "
+              f"({100 * result.count / point_count:4.1f}%)   max deviation {result.max_deviation:4.2f} m   "
+              f"{1000 * elapsed:6.1f} ms   {'✅' if ok else '❌'}")
+    return results
+
+
+def bench_param_cache(param_count=1000, latency=0.05, param_rate=200):
+    """Parameter load on reconnect: full PARAM_REQUEST_LIST vs the per-vehicle cache (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication
+    from modules.param_sync import ParamCache
+
+    print("\n" + "=" * 60)
+    print(f"Parameter cache: {param_count} parameters streamed at {param_rate}/s, "
+          f"{1000 * latency:.0f} ms one-way latency")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    params = {f"PARAM_{i:04d}": float(i % 97) for i in range(param_count)}
+    loop_thread = AsyncLoopThread()
+
+    def run(coro):
+        start = time.perf_counter()
+        future = loop_thread.submit(coro)
+        _wait_futures([future], timeout=120)
+        return time.perf_counter() - start, future.result() if future.done() and not future.exception() else None
+
+    def intact(loaded, vehicle):
+        return loaded is not None and {name: float(record['value']) for name, record in loaded[0].items()} == \
+            {name: float(struct.unpack('<f', struct.pack('<f', value))[0]) for name, value in vehicle.params.items()}
+
+    results = {}
+    for kind, vehicle_kwargs in (("_HASH_CHECK", {'param_hash': True, 'autopilot': mavutil.mavlink.MAV_AUTOPILOT_PX4}),
+                                 ("ArduPilot", {'ftp': True})):
+        link = SimulatedLink(latency=latency, params=params, uid=0x1234abcd, param_rate=param_rate,
+                                     **vehicle_kwargs)
+        vehicle = link.vehicle
+        view = link.vehicle_commands(loop_thread)
+        cache = ParamCache(tempfile.mkdtemp())
+        elapsed, fetched = run(view.fetch_params())
+        results[f"{kind}: full fetch"] = (elapsed, fetched is not None and len(fetched) == param_count, None)
+        run(view.load_params(cache))
+        elapsed, loaded = run(view.load_params(cache))
+        results[f"{kind}: unchanged"] = (elapsed, intact(loaded, vehicle), loaded and loaded[1])
+        vehicle.params['PARAM_0000'] = 42.0     # changed by another GCS
+        elapsed, loaded = run(view.load_params(cache))
+        results[f"{kind}: changed"] = (elapsed, intact(loaded, vehicle), loaded and loaded[1])
+        link.close()
+    loop_thread.stop()
+
+    print()
+    for label, (elapsed, ok, from_cache) in results.items():
+        source = "" if from_cache is None else ("from cache" if from_cache else "fetched")
+        print(f"  {label:26s} {elapsed:6.2f} s  {source:10s} {'✅ intact' if ok else '❌ failed'}")
+    return results
+
+
+def _legacy_fetch_params(drone, hub, no_data_timeout=3, complete_ratio=0.95):
+    """The list download used before gap filling: done at 95% (or 1000 parameters) after 3 s of silence"""
+    collected = {}
+    total = None
+    with hub.subscribe(['PARAM_VALUE'], maxsize=4096) as events:
+        drone.mav.param_request_list_send(drone.target_system, drone.target_component)
+        last_param = time.monotonic()
+        while True:
+            msg = events.get(timeout=0.5)
+            if msg is not None:
+                last_param = time.monotonic()
+                total = int(msg.param_count)
+                collected.setdefault(msg.param_id, float(msg.param_value))
+                if len(collected) >= total:
+                    return collected, total
+            elif time.monotonic() - last_param > no_data_timeout:
+                if total and (len(collected) >= total * complete_ratio or len(collected) > 1000):
+                    return collected, total
+                if not collected:
+                    return collected, total
+
+
+def bench_param_download(param_count=1000, latency=0.05, loss=0.03, param_rate=200):
+    """Parameter list download with loss: legacy 95% heuristic vs bitmap gap fill (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication
+
+    print("\n" + "=" * 60)
+    print(f"Parameter download: {param_count} parameters streamed at {param_rate}/s, "
+          f"{1000 * latency:.0f} ms one-way latency, {100 * loss:.0f}% loss")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    params = {f"PARAM_{i:04d}": float(i % 97) for i in range(param_count)}
+    vehicle_kwargs = {'latency': latency, 'loss': loss, 'params': params, 'param_rate': param_rate}
+
+    results = {}
+    link = SimulatedLink(**vehicle_kwargs)
+    start = time.perf_counter()
+    collected, _ = _legacy_fetch_params(link.drone, link.hub)
+    results['legacy (95% heuristic)'] = (time.perf_counter() - start, len(collected), 0)
+    link.close()
+
+    loop_thread = AsyncLoopThread()
+    link = SimulatedLink(**vehicle_kwargs)
+    view = link.vehicle_commands(loop_thread)
+    start = time.perf_counter()
+    future = loop_thread.submit(view.fetch_params())
+    _wait_futures([future], timeout=120)
+    elapsed = time.perf_counter() - start
+    collected = future.result() if future.done() and not future.exception() else {}
+    reads = sum(1 for msg in link.vehicle.received if msg.get_type() == 'PARAM_REQUEST_READ')
+    lists = sum(1 for msg in link.vehicle.received if msg.get_type() == 'PARAM_REQUEST_LIST')
+    results['bitmap gap fill'] = (elapsed, len(collected), reads)
+    link.close()
+    loop_thread.stop()
+
+    print()
+    for label, (elapsed, count, reads) in results.items():
+        print(f"  {label:24s} {elapsed:6.2f} s   {count}/{param_count} parameters "
+              f"{'✅' if count == param_count else '❌'}   {reads} PARAM_REQUEST_READ")
+    print(f"  PARAM_REQUEST_LIST sent by gap fill: {lists}")
+    return results
+
+
+def bench_param_ftp(param_count=1000, latency=0.05, loss=0.03, param_rate=200):
+    """Parameter download: PARAM_REQUEST_LIST stream vs @PARAM/param.pck over MAVFTP (simulated vehicle)"""
+    from PyQt5.QtCore import QCoreApplication
+
+    # The same link bandwidth for both: a PARAM_VALUE frame is 33 bytes, an FTP frame 262
+    ftp_rate = param_rate * 33 / 262
+    print("\n" + "=" * 60)
+    print(f"Parameter download over MAVFTP: {param_count} parameters, {param_rate} PARAM_VALUE/s "
+          f"or {ftp_rate:.0f} FTP packets/s, {1000 * latency:.0f} ms one-way latency")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    params = {f"PARAM_{i:04d}": float(i % 97) for i in range(param_count)}
+    expected = {name: float(struct.unpack('<f', struct.pack('<f', value))[0]) for name, value in params.items()}
+    loop_thread = AsyncLoopThread()
+
+    cases = (
+        ("PARAM_REQUEST_LIST", {}, 'fetch_params'),
+        ("MAVFTP param.pck", {'ftp': True}, 'download_params'),
+        (f"MAVFTP, {100 * loss:.0f}% loss", {'ftp': True, 'loss': loss}, 'download_params'),
+        ("no FTP: fallback to list", {}, 'download_params'),
+    )
+    results = {}
+    for label, vehicle_kwargs, method in cases:
+        link = SimulatedLink(latency=latency, params=params, param_rate=param_rate, ftp_rate=ftp_rate,
+                                     **vehicle_kwargs)
+        view = link.vehicle_commands(loop_thread)
+        start = time.perf_counter()
+        future = loop_thread.submit(getattr(view, method)())
+        _wait_futures([future], timeout=120)
+        elapsed = time.perf_counter() - start
+        collected = future.result() if future.done() and not future.exception() else {}
+        ok = {name: float(record['value']) for name, record in collected.items()} == expected
+        results[label] = (elapsed, ok)
+        link.close()
+    loop_thread.stop()
+
+    print()
+    for label, (elapsed, ok) in results.items():
+        print(f"  {label:26s} {elapsed:6.2f} s   {'✅ complete' if ok else '❌ failed'}")
+    return results
+
+
+def bench_param_table(param_count=1000, batch=50, updates=200):
+    """Parameter table: streaming inserts row by row vs batched, one value change vs a full rebuild"""
+    from PyQt5.QtCore import QCoreApplication
+    from modules.param_model import ParamTableModel, ParamFilterModel
+
+    print("\n" + "=" * 60)
+    print(f"Parameter table: {param_count} parameters, sorted/filtered proxy attached")
+    print("=" * 60)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    records = [{'name': f"GRP{i % 40:02d}_PARAM_{i:04d}", 'value': str(float(i)), 'type': 'FLOAT', 'index': i,
+                'default': '0'} for i in range(param_count)]
+    signals = {'inserts': 0, 'changed_rows': 0, 'resets': 0}
+
+    def fresh_table():
+        table = ParamTableModel()
+        view = ParamFilterModel(table)
+        table.rowsInserted.connect(lambda *args: signals.__setitem__('inserts', signals['inserts'] + 1))
+        table.dataChanged.connect(lambda first, last, *args: signals.__setitem__(
+            'changed_rows', signals['changed_rows'] + last.row() - first.row() + 1))
+        table.modelReset.connect(lambda: signals.__setitem__('resets', signals['resets'] + 1))
+        for key in signals:
+            signals[key] = 0
+        return table, view
+
+    table, view = fresh_table()
+    start = time.perf_counter()
+    for record in records:
+        table.upsert_records([record])
+    row_by_row = (time.perf_counter() - start, signals['inserts'])
+
+    table, view = fresh_table()
+    start = time.perf_counter()
+    for first in range(0, param_count, batch):
+        table.upsert_records(records[first:first + batch])
+    batched = (time.perf_counter() - start, signals['inserts'])
+
+    # One parameter set: the old screen rebuilt every row on parametersUpdated
+    names = [record['name'] for record in records]
+    for key in signals:
+        signals[key] = 0
+    start = time.perf_counter()
+    for i in range(updates):
+        table.beginResetModel()
+        table.endResetModel()
+    rebuild = (time.perf_counter() - start) / updates
+    for key in signals:
+        signals[key] = 0
+    start = time.perf_counter()
+    for i in range(updates):
+        table.set_value(names[(i * 37) % param_count], float(i) + 0.5)
+    single = ((time.perf_counter() - start) / updates, signals['changed_rows'] / updates)
+
+    start = time.perf_counter()
+    for text in ("g", "gr", "grp", "grp1", "grp12", "grp12_p", ""):
+        view.filterText = text
+    keystroke = (time.perf_counter() - start) / 7
+
+    print(f"  stream, row by row   {1000 * row_by_row[0]:8.1f} ms   {row_by_row[1]} rowsInserted signals")
+    print(f"  stream, batches of {batch} {1000 * batched[0]:7.1f} ms   {batched[1]} rowsInserted signals")
+    print(f"  one value, rebuild   {1000 * rebuild:8.2f} ms   {param_count} rows re-read")
+    print(f"  one value, row       {1000 * single[0]:8.2f} ms   {single[1]:.0f} row changed")
+    print(f"  filter keystroke     {1000 * keystroke:8.2f} ms")
+    return {'row_by_row': row_by_row, 'batched': batched, 'rebuild': rebuild, 'single': single,
+            'keystroke': keystroke}
+
+
+def bench_param_search(runs=200):
+    """Parameter search: index build and queries vs a substring scan of every name and description"""
+    from modules.param_search import ParamSearchIndex
+
+    groups = ('ATC', 'BATT', 'BATT2', 'COMPASS', 'EK3', 'GPS', 'INS', 'LOG', 'MOT', 'PSC', 'RC1', 'RC2',
+              'RC3', 'RC4', 'SERVO1', 'SERVO2', 'SERVO3', 'SERVO4', 'WPNAV', 'FENCE', 'ARMING', 'SR0', 'SR1',
+              'RNGFND1', 'PLND', 'PRX', 'AHRS', 'FLTMODE', 'LAND', 'RTL')
+    words = ('RAT', 'RLL', 'PIT', 'YAW', 'ACCEL', 'ANG', 'CAPACITY', 'MONITOR', 'VOLT', 'CURR', 'MIN', 'MAX',
+             'TRIM', 'REVERSED', 'FUNCTION', 'OFS', 'DEC', 'ENABLE', 'TYPE', 'RATE', 'SPEED', 'RADIUS', 'ALT',
+             'GAIN', 'FILT', 'P', 'I', 'D', 'FF', 'IMAX')
+    rng = random.Random(7)
+    names = set()
+    while len(names) < 1500:
+        parts = [rng.choice(groups)] + rng.sample(words, rng.choice((1, 2, 2, 3)))
+        names.add("_".join(parts)[:16])
+    names = sorted(names)
+    descriptions = [f"{name.split('_')[1].lower()} setting of the {name.split('_')[0].lower()} subsystem, "
+                    f"{'battery monitoring' if name.startswith('BATT') else 'flight control'}" for name in names]
+
+    print("\n" + "=" * 60)
+    print(f"Parameter search: {len(names)} parameters with descriptions")
+    print("=" * 60)
+    index = ParamSearchIndex()
+    start = time.perf_counter()
+    for row, (name, description) in enumerate(zip(names, descriptions)):
+        index.add(row, name, description)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for row in range(len(names) - 50, len(names)):
+        index.add(row, names[row], descriptions[row])
+    incremental = (time.perf_counter() - start) / 50
+
+    def scan(query):
+        # The old screen: every name (and here description) tested on each keystroke
+        query = query.lower()
+        return [row for row, (name, description) in enumerate(zip(names, descriptions))
+                if query in name.lower() or query in description.lower()]
+
+    print(f"  build                {1000 * build:8.2f} ms")
+    print(f"  add one row          {1e6 * incremental:8.1f} us")
+    print(f"  {'query':<16} {'index':>9} {'scan':>9}  matches  first")
+    results = {'build': build, 'incremental': incremental, 'queries': {}}
+    for query in ("b", "ba", "batt", "batt_cap", "capa", "rat_rll", "rat p", "servo3 rev", "battery",
+                  "BATT_CAPCITY"):
+        start = time.perf_counter()
+        for _ in range(runs):
+            found = index.search(query)
+        indexed = (time.perf_counter() - start) / runs
+        start = time.perf_counter()
+        for _ in range(runs):
+            scanned = scan(query)
+        linear = (time.perf_counter() - start) / runs
+        first = names[found[0]] if found else "-"
+        print(f"  {query!r:<16} {1e6 * indexed:7.1f}us {1e6 * linear:7.1f}us  {len(found):7d}  {first}"
+              f"{'' if scanned or not found else '  (scan finds none)'}")
+        results['queries'][query] = (indexed, linear, len(found), len(scanned))
+    return results
+
+
+BENCHMARKS = {
+    'receive_loop': bench_receive_loop,
+    'decode_handlers': bench_decode_handlers,
+    'link_process': bench_link_process,
+    'prefilter': bench_prefilter,
+    'vehicle_setup': bench_vehicle_setup,
+    'stream_rates': bench_stream_rates,
+    'link_recovery': bench_link_recovery,
+    'command_transactions': bench_command_transactions,
+    'outbound_writer': bench_outbound_writer,
+    'takeoff': bench_takeoff,
+    'concurrent_waits': bench_concurrent_waits,
+    'mission_upload': bench_mission_upload,
+    'mission_sync': bench_mission_sync,
+    'mission_download': bench_mission_download,
+    'waypoint_model': bench_waypoint_model,
+    'mission_validation': bench_mission_validation,
+    'path_simplify': bench_path_simplify,
+    'param_cache': bench_param_cache,
+    'param_download': bench_param_download,
+    'param_ftp': bench_param_ftp,
+    'param_table': bench_param_table,
+    'param_search': bench_param_search,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MAVLink performance benchmarks")
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    args = parser.parse_args(argv)
+
+    for name in args.names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print(f"❌ Unknown benchmark: {name}")
+            return 1
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,10 @@
 import time
 from collections import defaultdict
 
-def diagnose_mavlink_messages(drone_connection, duration=10):
+def diagnose_mavlink_messages(message_hub, duration=10):
     """
-    Diagnose what MAVLink messages are being received from the drone
+    Diagnose what MAVLink messages are being received from the drone.
+    Listens through the DroneModel message hub so MAVLinkThread keeps every message.
     """
     print(f"[MAVLink Diagnostic] Monitoring messages for {duration} seconds...")
     
@@ -12,11 +13,12 @@ def diagnose_mavlink_messages(drone_connection, duration=10):
     magnetometer_sources = []
     
     start_time = time.time()
+    message_sub = message_hub.subscribe(maxsize=4096)
     
     while time.time() - start_time < duration:
         try:
             # Get any message
-            msg = drone_connection.recv_match(blocking=False, timeout=0.1)
+            msg = message_sub.get(timeout=0.1)
             
             if msg:
                 msg_type = msg.get_type()
@@ -82,6 +84,8 @@ def diagnose_mavlink_messages(drone_connection, duration=10):
             print(f"[MAVLink Diagnostic] Error: {e}")
             time.sleep(0.01)
     
+    message_sub.close()
+    
     # Print results
     print(f"\n[MAVLink Diagnostic] Results after {duration} seconds:")
     print("=" * 50)
@@ -114,7 +118,7 @@ def run_diagnostic(self):
         return
     
     print("[CompassCalibrationModel] Running MAVLink diagnostic...")
-    message_counts, mag_sources = diagnose_mavlink_messages(self._drone_model.drone_connection)
+    message_counts, mag_sources = diagnose_mavlink_messages(self._drone_model.message_hub)
     
     if mag_sources:
         # Found magnetometer data - update the reading method
@@ -0,0 +1,187 @@
+"""
+MAVLink Message Hub - single reader, many subscribers
+MAVLinkThread is the only code that reads from the pymavlink connection.
+Every other module subscribes here instead of calling recv_match itself.
+"""
+import time
+import queue
+import threading
+
+
+class MessageSubscription:
+    """Bounded per-subscriber queue of decoded MAVLink messages"""
+
+    def __init__(self, hub, msg_types=None, sysid=None, compid=None, maxsize=256):
+        self._hub = hub
+        # None means "every message type"
+        self.msg_types = frozenset(msg_types) if msg_types else None
+        self.sysid = sysid
+        self.compid = compid
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def matches(self, msg):
+        if self.sysid is not None and msg.get_srcSystem() != self.sysid:
+            return False
+        if self.compid is not None and msg.get_srcComponent() != self.compid:
+            return False
+        return True
+
+    def put(self, msg):
+        """Called by the hub. Drops the oldest message when the queue is full."""
+        while True:
+            try:
+                self._queue.put_nowait(msg)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Return the next message, or None on timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_nowait(self):
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        """Return every queued message (oldest first) without blocking"""
+        messages = []
+        while True:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def latest(self):
+        """Return only the newest queued message, discarding older ones"""
+        messages = self.drain()
+        return messages[-1] if messages else None
+
+    def wait_for(self, predicate=None, timeout=None):
+        """Block until a message satisfying predicate arrives, or timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            msg = self.get(timeout=remaining)
+            if msg is None:
+                return None
+            if predicate is None or predicate(msg):
+                return msg
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class MAVLinkMessageHub:
+    """Dispatches decoded messages from the reader thread to subscribers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_type = {}
+        self._wildcard = []
+        # Called with no arguments whenever the set of subscribed types changes
+        self._listeners = []
+        print("[MAVLinkHub] Initialized.")
+
+    def subscribe(self, msg_types=None, sysid=None, compid=None, maxsize=256):
+        """
+        Register a subscriber.
+        msg_types: a type name, a list of type names, or None for every message.
+        sysid/compid: optional source filters.
+        """
+        if isinstance(msg_types, str):
+            msg_types = [msg_types]
+
+        return self.register(MessageSubscription(self, msg_types, sysid, compid, maxsize))
+
+    def register(self, subscription):
+        """Register an already constructed subscription (e.g. an asyncio-backed one)"""
+        with self._lock:
+            if subscription.msg_types is None:
+                self._wildcard = self._wildcard + [subscription]
+            else:
+                for msg_type in subscription.msg_types:
+                    self._by_type[msg_type] = self._by_type.get(msg_type, []) + [subscription]
+
+        self._notify_listeners()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription.msg_types is None:
+                self._wildcard = [s for s in self._wildcard if s is not subscription]
+            else:
+                for msg_type in subscription.msg_types:
+                    remaining = [s for s in self._by_type.get(msg_type, []) if s is not subscription]
+                    if remaining:
+                        self._by_type[msg_type] = remaining
+                    else:
+                        self._by_type.pop(msg_type, None)
+        self._notify_listeners()
+
+    def has_subscribers(self, msg_type):
+        return bool(self._wildcard) or msg_type in self._by_type
+
+    def subscribed_types(self):
+        """Type names with at least one subscriber, or None when a wildcard subscriber exists"""
+        if self._wildcard:
+            return None
+        return frozenset(self._by_type)
+
+    def add_listener(self, callback):
+        with self._lock:
+            self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback):
+        with self._lock:
+            self._listeners = [c for c in self._listeners if c is not callback]
+
+    def _notify_listeners(self):
+        for callback in self._listeners:
+            callback()
+
+    def dispatch(self, msg):
+        """Called from the reader thread for every decoded message"""
+        # Lists are replaced (never mutated) under the lock, so reading them here is safe
+        subscribers = self._by_type.get(msg.get_type())
+        if subscribers:
+            for subscription in subscribers:
+                if subscription.matches(msg):
+                    subscription.put(msg)
+        for subscription in self._wildcard:
+            if subscription.matches(msg):
+                subscription.put(msg)
+
+    def clear(self):
+        """Drop every subscriber (used when the link is torn down)"""
+        with self._lock:
+            subscriptions = list(self._wildcard)
+            for subscribers in self._by_type.values():
+                subscriptions.extend(subscribers)
+            self._by_type = {}
+            self._wildcard = []
+        for subscription in subscriptions:
+            subscription.closed = True
+        self._notify_listeners()
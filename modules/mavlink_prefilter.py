@@ -0,0 +1,117 @@
+"""
+MAVLink header prefilter - skip decoding of message types nobody consumes
+Installed on the connection's parser: the msgid is read straight from the
+v1/v2 frame header and only wanted msgids reach pymavlink's full decode
+(CRC, struct unpack, message object). Skipped frames are counted per msgid
+and can still be recorded or forwarded raw.
+"""
+import struct
+import time
+
+from pymavlink import mavutil
+
+
+PROTOCOL_MARKER_V1 = 0xFE
+PROTOCOL_MARKER_V2 = 0xFD
+
+
+def msgids_for_types(msg_types):
+    """Map message type names (e.g. 'ATTITUDE') to numeric msgids, ignoring unknown names"""
+    msgids = set()
+    for msg_type in msg_types:
+        msgid = getattr(mavutil.mavlink, 'MAVLINK_MSG_ID_' + msg_type, None)
+        if msgid is not None:
+            msgids.add(msgid)
+    return msgids
+
+
+class MessagePrefilter:
+    """
+    Wraps connection.mav.decode. Frames whose msgid is not in the wanted set
+    return None from the parser instead of a decoded message.
+    """
+
+    def __init__(self, connection, raw_sink=None):
+        self.connection = connection
+        # Optional callable(msgid, frame_bytes) for skipped frames (forwarding)
+        self.raw_sink = raw_sink
+        # None means "decode everything" (e.g. a wildcard subscriber exists)
+        self.wanted = None
+        self.skipped_counts = {}
+        self.skipped_total = 0
+        self._skipped_pending = False
+        self.parser = None
+        self._decode = None
+
+    def install(self):
+        """Hook the connection's current parser (pymavlink replaces it on a v1->v2 switch)"""
+        parser = self.connection.mav
+        if parser is self.parser:
+            return
+        self.uninstall()
+        self.parser = parser
+        self._decode = parser.decode
+        parser.decode = self.decode
+
+    def uninstall(self):
+        if self.parser is not None:
+            self.parser.__dict__.pop('decode', None)
+            self.parser = None
+            self._decode = None
+
+    def set_wanted(self, msgids):
+        """msgids to decode; None disables filtering. Safe to call from any thread."""
+        self.wanted = None if msgids is None else frozenset(msgids)
+
+    def take_skipped(self):
+        """True once after the parser skipped a frame (more data may be buffered)"""
+        skipped = self._skipped_pending
+        self._skipped_pending = False
+        return skipped
+
+    def decode(self, msgbuf):
+        wanted = self.wanted
+        if wanted is None:
+            return self._decode(msgbuf)
+
+        if msgbuf[0] == PROTOCOL_MARKER_V2:
+            if len(msgbuf) < 10:
+                return self._decode(msgbuf)
+            msgid = msgbuf[7] | (msgbuf[8] << 8) | (msgbuf[9] << 16)
+            seq, src_system, src_component = msgbuf[4], msgbuf[5], msgbuf[6]
+        else:
+            if len(msgbuf) < 6:
+                return self._decode(msgbuf)
+            msgid = msgbuf[5]
+            seq, src_system, src_component = msgbuf[2], msgbuf[3], msgbuf[4]
+
+        if msgid in wanted:
+            return self._decode(msgbuf)
+
+        self._skip(msgid, seq, (src_system, src_component), msgbuf)
+        return None
+
+    def _skip(self, msgid, seq, src_tuple, msgbuf):
+        self.skipped_counts[msgid] = self.skipped_counts.get(msgid, 0) + 1
+        self.skipped_total += 1
+        self._skipped_pending = True
+
+        # Keep pymavlink's sequence tracking intact so packet_loss() stays correct
+        connection = self.connection
+        connection.last_seq[src_tuple] = seq
+        connection.mav_count += 1
+
+        logfile = getattr(connection, 'logfile', None)
+        if logfile:
+            usec = int(time.time() * 1.0e6) & ~3
+            logfile.write(struct.pack('>Q', usec) + bytes(msgbuf))
+        if self.raw_sink is not None:
+            self.raw_sink(msgid, bytes(msgbuf))
+
+    def stats(self):
+        """Skipped frame counts keyed by message type name (or msgid when unknown)"""
+        names = {}
+        for msgid, count in self.skipped_counts.items():
+            msg_class = mavutil.mavlink.mavlink_map.get(msgid)
+            names[msg_class.msgname if msg_class is not None else msgid] = count
+        return names
@@ -0,0 +1,470 @@
+"""
+Out-of-process MAVLink I/O engine
+The link reader/decoder (MAVLinkThread.run) runs in a separate process so GUI
+stalls cannot starve it. The latest telemetry is published through a
+shared-memory block; low-rate events are forwarded raw over a pipe and
+re-dispatched to the parent's message hub by a pipe-reader thread, like the
+in-process MAVLinkThread, so blocking hub waits work on any thread.
+"""
+import importlib
+import math
+import queue
+import struct
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from pymavlink import mavutil
+
+
+# Messages forwarded over the pipe (everything else only reaches shared memory)
+DEFAULT_FORWARD_TYPES = frozenset([
+    'STATUSTEXT', 'PARAM_VALUE', 'COMMAND_ACK', 'COMMAND_LONG', 'HEARTBEAT',
+    'MISSION_COUNT', 'MISSION_ACK', 'MISSION_REQUEST', 'MISSION_REQUEST_INT',
+    'MISSION_ITEM_INT', 'MISSION_CURRENT', 'AUTOPILOT_VERSION', 'FILE_TRANSFER_PROTOCOL',
+    'COMPASS_CAL_PROGRESS', 'COMPASS_CAL_REPORT', 'MAG_CAL_PROGRESS', 'MAG_CAL_REPORT',
+])
+
+
+def _dialect_module(mavlink20):
+    """The current pymavlink dialect for one wire protocol version"""
+    version = 'v20' if mavlink20 else 'v10'
+    return importlib.import_module(f'pymavlink.dialects.{version}.{mavutil.current_dialect}')
+
+
+class TelemetryBlock:
+    """
+    Fixed-layout telemetry snapshot in shared memory, guarded by a seqlock.
+    One writer (the link process), any number of readers.
+    """
+
+    # Consistent-read attempts before read() settles for the last snapshot
+    # (a writer that died mid-write leaves the sequence odd forever)
+    READ_RETRIES = 1000
+
+    NUMERIC_KEYS = (
+        'lat', 'lon', 'alt', 'rel_alt',
+        'roll', 'pitch', 'yaw',
+        'heading', 'groundspeed', 'airspeed',
+        'battery_remaining', 'voltage_battery', 'current_battery',
+    )
+    # seq, numeric fields (NaN = None), armed, mode, decoded message counter
+    LAYOUT = struct.Struct('<I%ddB16sQ' % len(NUMERIC_KEYS))
+    SIZE = LAYOUT.size
+
+    def __init__(self, name=None, create=False):
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=self.SIZE)
+        self._owner = create
+        self._seq = 0
+        self._last = None
+        if create:
+            self._shm.buf[:self.SIZE] = bytes(self.SIZE)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def write(self, record, message_count):
+        """Writer side: publish a full snapshot of the telemetry record"""
+        numeric = [math.nan if record.get(key) is None else float(record[key]) for key in self.NUMERIC_KEYS]
+        mode = str(record.get('mode') or 'UNKNOWN').encode('ascii', 'replace')[:16]
+        buf = self._shm.buf
+        # Odd sequence number = write in progress
+        self._seq += 1
+        struct.pack_into('<I', buf, 0, self._seq)
+        self.LAYOUT.pack_into(buf, 0, self._seq, *numeric, bool(record.get('armed')), mode, message_count)
+        self._seq += 1
+        struct.pack_into('<I', buf, 0, self._seq)
+
+    def read(self):
+        """Reader side: return (telemetry dict, decoded message count)"""
+        buf = self._shm.buf
+        for _ in range(self.READ_RETRIES):
+            seq_before = struct.unpack_from('<I', buf, 0)[0]
+            if seq_before & 1:
+                continue
+            values = self.LAYOUT.unpack_from(buf, 0)
+            if values[0] == seq_before:
+                break
+        else:
+            if self._last is not None:
+                return self._last
+            values = self.LAYOUT.unpack_from(bytes(self.SIZE), 0)
+
+        numeric = values[1:1 + len(self.NUMERIC_KEYS)]
+        record = {
+            key: (None if math.isnan(value) else value)
+            for key, value in zip(self.NUMERIC_KEYS, numeric)
+        }
+        record['armed'] = bool(values[-3])
+        record['mode'] = values[-2].rstrip(b'\x00').decode('ascii', 'replace') or 'UNKNOWN'
+        self._last = (record, values[-1])
+        return self._last
+
+    def close(self):
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class _EventForwarder:
+    """
+    Stands in for the message hub (and DroneCommander) inside the link process.
+    Frames are queued and sent by a separate thread, so a stalled GUI process
+    (full pipe) never blocks decoding; the oldest events are dropped instead.
+    """
+
+    def __init__(self, conn, forward_types, maxsize=4096):
+        self._conn = conn
+        self._forward_types = forward_types
+        self._listeners = []
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.message_count = 0
+        self.dropped = 0
+        self._sender = threading.Thread(target=self._send_worker, daemon=True)
+        self._sender.start()
+
+    def dispatch(self, msg):
+        self.message_count += 1
+        forward_types = self._forward_types
+        if forward_types is None or msg.get_type() in forward_types:
+            self.send('msg', bytes(msg.get_msgbuf()))
+
+    # Same interface as MAVLinkMessageHub, so the prefilter decodes forwarded types
+    def subscribed_types(self):
+        return self._forward_types
+
+    def set_forward_types(self, forward_types):
+        """None forwards every message (the GUI has a wildcard subscriber)"""
+        self._forward_types = None if forward_types is None else frozenset(forward_types)
+        for callback in self._listeners:
+            callback()
+
+    def add_listener(self, callback):
+        self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback):
+        self._listeners = [c for c in self._listeners if c is not callback]
+
+    def send(self, kind, payload):
+        while True:
+            try:
+                self._queue.put_nowait((kind, payload))
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def close(self):
+        """Flush queued events, then stop the sender thread"""
+        self._queue.put(None)
+        self._sender.join(timeout=2)
+
+    def _send_worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._conn.send(item)
+            except (BrokenPipeError, OSError):
+                return
+
+    def add_parameter_to_queue(self, msg):
+        # PARAM_VALUE is already forwarded by dispatch(); the parent routes it
+        pass
+
+
+def _link_process_main(uri, baud, shm_name, conn, forward_types):
+    """Entry point of the link process"""
+    from modules.mavlink_thread import MAVLinkThread
+    from modules.outbound_writer import OutboundWriter
+
+    try:
+        drone = mavutil.mavlink_connection(uri, baud=baud)
+        heartbeat = drone.wait_heartbeat(timeout=10)
+        if heartbeat is None:
+            conn.send(('failed', 'No heartbeat received'))
+            drone.close()
+            return
+    except Exception as e:
+        conn.send(('failed', str(e)))
+        return
+
+    conn.send(('connected', {
+        'target_system': drone.target_system,
+        'target_component': drone.target_component,
+        'mav_type': heartbeat.type,
+        'autopilot': heartbeat.autopilot,
+        'mavlink20': drone.WIRE_PROTOCOL_VERSION == "2.0",
+    }))
+
+    # Frames from the parent and from the reader share one prioritised writer
+    writer = OutboundWriter(drone)
+    writer.install()
+    block = TelemetryBlock(shm_name)
+    forwarder = _EventForwarder(conn, forward_types)
+    # Every decode pass goes straight to shared memory; the parent applies its own rate cap
+    reader = MAVLinkThread(
+        drone, drone_commander=forwarder, message_hub=forwarder, telemetry_rate_hz=0,
+        on_telemetry=lambda changes: block.write(reader.current_telemetry_components, forwarder.message_count)
+    )
+
+    def command_worker():
+        # Frames encoded by the parent are written to the link from here
+        while reader.running:
+            try:
+                kind, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            if kind == 'write':
+                drone.write(payload)
+            elif kind == 'forward':
+                forwarder.set_forward_types(payload)
+            elif kind == 'stop':
+                break
+        reader.running = False
+
+    threading.Thread(target=command_worker, daemon=True).start()
+
+    reader.run()
+
+    if forwarder.dropped:
+        print(f"[MAVLinkProcessLink] ⚠️ {forwarder.dropped} events dropped while the GUI was not reading")
+    forwarder.send('closed', None)
+    forwarder.close()
+    block.close()
+    writer.uninstall()
+    drone.close()
+
+
+class _PipeWriter:
+    """File-like object for the parent's MAVLink encoder: frames go to the link process"""
+
+    def __init__(self, link):
+        self._link = link
+
+    def write(self, buf):
+        self._link.send_command('write', bytes(buf))
+
+
+class ProcessLinkConnection:
+    """
+    Parent-side stand-in for the pymavlink connection object.
+    Supports what the rest of the app uses: .mav.*_send, target ids,
+    mode_mapping(), flightmode, motors_armed(), location(), the HEARTBEAT
+    type/autopilot through field() and close().
+    """
+
+    def __init__(self, link, info):
+        self._link = link
+        self.target_system = info['target_system']
+        self.target_component = info['target_component']
+        self.source_system = 255
+        self.source_component = 0
+        self.port = None
+        self._mav_type = info['mav_type']
+        self._autopilot = info['autopilot']
+
+        # Encode with the vehicle's protocol version; the process-wide dialect is left alone
+        self.mav = _dialect_module(info['mavlink20']).MAVLink(_PipeWriter(link),
+                                                               srcSystem=self.source_system,
+                                                               srcComponent=self.source_component)
+
+    def mode_mapping(self):
+        if self._autopilot == mavutil.mavlink.MAV_AUTOPILOT_PX4:
+            return mavutil.px4_map
+        return mavutil.mode_mapping_byname(self._mav_type)
+
+    def field(self, msg_type, name, default=None):
+        # Only the HEARTBEAT fields known from the handshake
+        if msg_type != 'HEARTBEAT':
+            return default
+        return {'type': self._mav_type, 'autopilot': self._autopilot}.get(name, default)
+
+    @property
+    def flightmode(self):
+        return self._link.snapshot.get('mode', 'UNKNOWN')
+
+    def motors_armed(self):
+        return bool(self._link.snapshot.get('armed'))
+
+    def location(self, relative_alt=False):
+        snapshot = self._link.snapshot
+        if snapshot.get('lat') is None:
+            return None
+        alt = snapshot.get('rel_alt') if relative_alt else snapshot.get('alt')
+        return mavutil.location(snapshot['lat'], snapshot['lon'], alt or 0, snapshot.get('heading') or 0)
+
+    def close(self):
+        self._link.stop()
+
+
+class MAVLinkProcessLink(QObject):
+    """
+    GUI-side owner of the link process. Exposes the same signals as
+    MAVLinkThread so DroneModel can use either one.
+    """
+    telemetryUpdated = pyqtSignal(dict)
+    statusTextChanged = pyqtSignal(str)
+    current_msg = pyqtSignal(object)
+    connectionSuccess = pyqtSignal(object)
+    connectionFailed = pyqtSignal(str)
+    linkClosed = pyqtSignal()
+    # Link lifecycle events from the pipe reader, handled on the GUI thread
+    _linkEvent = pyqtSignal(str, object)
+
+    def __init__(self, uri, baud, poll_rate_hz=30.0, forward_types=DEFAULT_FORWARD_TYPES):
+        super().__init__()
+        self.uri = uri
+        self.baud = baud
+        self.drone_commander = None
+        self.message_hub = None
+        self.snapshot = {}
+        self.message_count = 0
+        self._forward_types = frozenset(forward_types)
+        self._block = None
+        self._process = None
+        self.connection = None
+        self._send_lock = threading.Lock()
+        self._drone = None
+        self._reader = None
+
+        self._linkEvent.connect(self._handle_link_event)
+        self._poll_timer = QTimer()
+        self._poll_timer.setInterval(max(1, int(1000 / poll_rate_hz)))
+        self._poll_timer.timeout.connect(self.poll)
+
+    def start(self):
+        """Spawn the link process; connectionSuccess/connectionFailed report the outcome"""
+        print(f"[MAVLinkProcessLink] Starting link process for {self.uri}...")
+        ctx = multiprocessing.get_context('spawn')
+        self._block = TelemetryBlock(create=True)
+        self.connection, child_conn = ctx.Pipe(duplex=True)
+        self._process = ctx.Process(
+            target=_link_process_main,
+            args=(self.uri, self.baud, self._block.name, child_conn, self._forward_types),
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._reader = threading.Thread(target=self._read_pipe, args=(self.connection,),
+                                        name='MAVLinkProcessLinkReader', daemon=True)
+        self._reader.start()
+        self._poll_timer.start()
+
+    def attach(self, drone_commander=None, message_hub=None):
+        self.drone_commander = drone_commander
+        self.message_hub = message_hub
+        if message_hub is not None:
+            # Forward whatever the GUI side subscribes to at runtime (e.g. RC_CHANNELS)
+            message_hub.add_listener(self._sync_forward_types)
+            self._sync_forward_types()
+
+    def _sync_forward_types(self):
+        if self.connection is None or self.message_hub is None:
+            return
+        hub_types = self.message_hub.subscribed_types()
+        forward_types = None if hub_types is None else sorted(self._forward_types | hub_types)
+        self.send_command('forward', forward_types)
+
+    def send_command(self, kind, payload):
+        """Send to the link process; callable from any thread"""
+        with self._send_lock:
+            connection = self.connection
+            if connection is None:
+                return
+            try:
+                connection.send((kind, payload))
+            except (BrokenPipeError, OSError):
+                pass
+
+    def poll(self):
+        """GUI-thread tick: diff the shared telemetry snapshot"""
+        if self._drone is None or self._block is None:
+            return
+        snapshot, self.message_count = self._block.read()
+        changes = {key: value for key, value in snapshot.items() if self.snapshot.get(key) != value}
+        if changes:
+            self.snapshot = snapshot
+            self.telemetryUpdated.emit(changes)
+
+    def _read_pipe(self, connection):
+        """Pipe-reader thread: forwarded messages go to the hub from here, never via the GUI thread"""
+        # v2 parser: accepts MAVLink 1 and 2 frames alike
+        parser = _dialect_module(True).MAVLink(None)
+        parser.robust_parsing = True
+        while True:
+            try:
+                kind, payload = connection.recv()
+            except (EOFError, OSError):
+                print("[MAVLinkProcessLink] ⚠️ Link process pipe closed")
+                self._linkEvent.emit('closed', None)
+                return
+            if kind == 'msg':
+                for msg in parser.parse_buffer(payload) or []:
+                    self._dispatch(msg)
+            else:
+                self._linkEvent.emit(kind, payload)
+                if kind in ('failed', 'closed'):
+                    return
+
+    def _dispatch(self, msg):
+        message_hub = self.message_hub
+        if message_hub is not None:
+            message_hub.dispatch(msg)
+        self.current_msg.emit(msg)
+        msg_type = msg.get_type()
+        if msg_type == 'STATUSTEXT':
+            self.statusTextChanged.emit(msg.text)
+        elif msg_type == 'PARAM_VALUE' and self.drone_commander is not None:
+            self.drone_commander.add_parameter_to_queue(msg)
+
+    def _handle_link_event(self, kind, payload):
+        if kind == 'connected':
+            print(f"[MAVLinkProcessLink] ✅ Link process connected: {payload}")
+            self._drone = ProcessLinkConnection(self, payload)
+            self.connectionSuccess.emit(self._drone)
+        elif kind == 'failed':
+            print(f"[MAVLinkProcessLink] ❌ Link process failed: {payload}")
+            self._on_closed()
+            self.connectionFailed.emit(payload)
+        elif kind == 'closed':
+            self._on_closed()
+
+    def _on_closed(self):
+        was_connected = self._drone is not None
+        self._poll_timer.stop()
+        self._drone = None
+        self.connection = None
+        if was_connected:
+            self.linkClosed.emit()
+
+    def stop(self):
+        print("[MAVLinkProcessLink] Stopping link process...")
+        self._poll_timer.stop()
+        if self.message_hub is not None:
+            self.message_hub.remove_listener(self._sync_forward_types)
+        self.send_command('stop', None)
+        if self._process is not None:
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self._reader is not None:
+            # Ends at the 'closed' event or when the pipe closes with the process
+            self._reader.join(timeout=2)
+            self._reader = None
+        if self._block is not None:
+            self._block.close()
+            self._block = None
+        self._drone = None
+        self.connection = None
+        print("[MAVLinkProcessLink] Link process stopped.")
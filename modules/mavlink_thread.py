@@ -1,20 +1,32 @@
 import math
 import time
+import selectors
 from PyQt5.QtCore import pyqtSignal, QThread
 from pymavlink import mavutil
 from pymavlink.dialects.v20 import ardupilotmega as mavlink_dialect
 from pymavlink.dialects.v20 import common as mavlink_common
 from pymavlink.dialects.v20 import ardupilotmega as mavutil_ardupilot
+from modules.telemetry_publisher import TelemetryPublisher
+from modules.mavlink_prefilter import MessagePrefilter, msgids_for_types
+
+# Field groups marked dirty together by the handlers
+POSITION_KEYS = ('lat', 'lon', 'alt', 'rel_alt')
+ATTITUDE_KEYS = ('roll', 'pitch', 'yaw')
+HUD_KEYS = ('heading', 'groundspeed', 'airspeed')
+BATTERY_KEYS = ('battery_remaining', 'voltage_battery', 'current_battery')
 
 class MAVLinkThread(QThread):
     telemetryUpdated = pyqtSignal(dict)
     statusTextChanged = pyqtSignal(str)
     current_msg = pyqtSignal(object)
     
-    def __init__(self, drone, drone_commander=None):
+    def __init__(self, drone, drone_commander=None, message_hub=None, telemetry_rate_hz=30.0, prefilter=True,
+                 on_telemetry=None):
         super().__init__()
         self.drone = drone
         self.drone_commander = drone_commander
+        # Single reader: every other module receives messages through this hub
+        self.message_hub = message_hub
         self.running = True
         self.current_telemetry_components = {
             'mode': "UNKNOWN", 'armed': False,
@@ -28,220 +40,82 @@ class MAVLinkThread(QThread):
             'current_battery': None     # Amperes
         }
         
+        # Coalesces changes: at most telemetry_rate_hz partial updates per second,
+        # immediate flush for armed/mode. on_telemetry replaces telemetryUpdated
+        # (e.g. the link process writes shared memory instead)
+        self._publisher = TelemetryPublisher(
+            self.current_telemetry_components,
+            on_telemetry or self.telemetryUpdated.emit,
+            max_rate_hz=telemetry_rate_hz
+        )
+        
         # Debug: Check if drone_commander was passed
         if self.drone_commander is not None:
             print("[MAVLinkThread] ✅ Initialized with DroneCommander support")
         else:
             print("[MAVLinkThread] ⚠️ Initialized WITHOUT DroneCommander (parameters won't work)")
         
+        # Parameter routing counter (debug logging)
+        self._param_msg_count = 0
+        
+        # Cached inverse of drone.mode_mapping() for HEARTBEAT decoding
+        self._mode_map = None
+        self._inv_mode_map = {}
+        self._register_handlers()
+        
+        # Skip decoding of msgids that no handler, hub subscriber or declared consumer needs
+        self._consumer_types = set()
+        self._prefilter = MessagePrefilter(drone) if prefilter and drone is not None else None
+        
+        # Upper bound on one select() wait so stop() is honoured promptly
+        self.select_timeout = 0.5
+        # Used only when the link exposes no file descriptor
+        self.fallback_poll_interval = 0.005
+        
         print("[MAVLinkThread] Initialized (Event-driven).")
 
     def run(self):
-        print("[MAVLinkThread] Thread started. Continuously listening for MAVLink messages...")
+        print("[MAVLinkThread] Thread started. Waiting for MAVLink data on the link...")
         
-        # Counters for debugging
-        param_msg_count = 0
-        start_time = time.time()
-        last_param_log_time = time.time()
+        selector = self._create_selector()
+        if selector is None:
+            print("[MAVLinkThread] ⚠️ Link has no pollable file descriptor - using short sleep polling")
+        
+        prefilter = self._prefilter
+        if prefilter is not None:
+            prefilter.install()
+            self._refresh_prefilter()
+            if self.message_hub is not None:
+                self.message_hub.add_listener(self._refresh_prefilter)
         
         while self.running:
             try:
-                msg = self.drone.recv_match(blocking=False, timeout=1)
+                # Wake up early when a coalesced telemetry flush is due
+                timeout = self.select_timeout
+                flush_in = self._publisher.time_until_flush()
+                if flush_in is not None:
+                    timeout = min(timeout, flush_in)
+                
+                if selector is not None:
+                    # Sleep in the kernel until the link has bytes (zero CPU while idle)
+                    selector.select(timeout=timeout)
+                else:
+                    time.sleep(min(timeout, self.fallback_poll_interval))
                 
-                if msg:
-                    self.current_msg.emit(msg)
-                    msg_type = msg.get_type()
-                    msg_dict = msg.to_dict()
-                    telemetry_component_changed = False
-
-                    # ========== HEARTBEAT - Armed Status & Flight Mode ==========
-                    if msg_type == "HEARTBEAT":
-                        mode_map = self.drone.mode_mapping()
-                        inv_mode_map = {v: k for k, v in mode_map.items()}
-                        new_mode = inv_mode_map.get(msg_dict['custom_mode'], "UNKNOWN")
-                        new_armed_status = bool(
-                            msg_dict['base_mode'] & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
-                        )
-                        
-                        # Update mode if changed
-                        if self.current_telemetry_components['mode'] != new_mode:
-                            print(f"[MAVLinkThread] 🔄 MODE CHANGED: {self.current_telemetry_components['mode']} → {new_mode}")
-                            self.current_telemetry_components['mode'] = new_mode
-                            telemetry_component_changed = True
-                        
-                        # Update armed status if changed
-                        if self.current_telemetry_components['armed'] != new_armed_status:
-                            print(f"[MAVLinkThread] 🔄 ARMED STATUS CHANGED: {self.current_telemetry_components['armed']} → {new_armed_status}")
-                            self.current_telemetry_components['armed'] = new_armed_status
-                            telemetry_component_changed = True
-
-                    # ========== COMMAND_ACK - Command Acknowledgments ==========
-                    elif msg_type == "COMMAND_ACK":
-                        # Log ARM/DISARM acknowledgments
-                        if msg.command == mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
-                            if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                                print(f"[MAVLinkThread] ✅ ARM/DISARM command ACCEPTED")
-                                
-                            elif msg.result == mavutil.mavlink.MAV_RESULT_DENIED:
-                                print(f"[MAVLinkThread] ❌ ARM/DISARM command DENIED (result: {msg.result})")
-                                
-                            elif msg.result == mavutil.mavlink.MAV_RESULT_FAILED:
-                                print(f"[MAVLinkThread] ❌ ARM/DISARM command FAILED (result: {msg.result})")
-                                
-                            elif msg.result == mavutil.mavlink.MAV_RESULT_TEMPORARILY_REJECTED:
-                                print(f"[MAVLinkThread] ⚠️ ARM/DISARM command TEMPORARILY_REJECTED")
-                            
-                            else:
-                                print(f"[MAVLinkThread] ⚠️ ARM/DISARM unknown result: {msg.result}")
-
-                    # ========== GLOBAL_POSITION_INT - GPS Position ==========
-                    elif msg_type == "GLOBAL_POSITION_INT":
-                        new_lat = msg_dict['lat'] / 1e7
-                        new_lon = msg_dict['lon'] / 1e7
-                        new_alt = msg_dict['alt'] / 1000.0
-                        new_rel_alt = msg_dict['relative_alt'] / 1000.0
-
-                        if (
-                            self.current_telemetry_components['lat'] != new_lat
-                            or self.current_telemetry_components['lon'] != new_lon
-                            or self.current_telemetry_components['alt'] != new_alt
-                            or self.current_telemetry_components['rel_alt'] != new_rel_alt
-                        ):
-                            self.current_telemetry_components.update({
-                                'lat': new_lat,
-                                'lon': new_lon,
-                                'alt': new_alt,
-                                'rel_alt': new_rel_alt,
-                            })
-                            telemetry_component_changed = True
-
-                    # ========== ATTITUDE - Roll/Pitch/Yaw ==========
-                    elif msg_type == "ATTITUDE":
-                        new_roll = math.degrees(msg_dict['roll'])
-                        new_pitch = math.degrees(msg_dict['pitch'])
-                        new_yaw = math.degrees(msg_dict['yaw'])
-                        if (
-                            self.current_telemetry_components['roll'] != new_roll
-                            or self.current_telemetry_components['pitch'] != new_pitch
-                            or self.current_telemetry_components['yaw'] != new_yaw
-                        ):
-                            self.current_telemetry_components.update({
-                                'roll': new_roll,
-                                'pitch': new_pitch,
-                                'yaw': new_yaw,
-                            })
-                            telemetry_component_changed = True
-
-                    # ========== VFR_HUD - Speed & Heading ==========
-                    elif msg_type == "VFR_HUD":
-                        new_heading = msg_dict['heading']
-                        new_groundspeed = msg_dict['groundspeed']
-                        new_airspeed = msg_dict['airspeed']
-                        if (
-                            self.current_telemetry_components['heading'] != new_heading
-                            or self.current_telemetry_components['groundspeed'] != new_groundspeed
-                            or self.current_telemetry_components['airspeed'] != new_airspeed
-                        ):
-                            self.current_telemetry_components.update({
-                                'heading': new_heading,
-                                'groundspeed': new_groundspeed,
-                                'airspeed': new_airspeed,
-                            })
-                            telemetry_component_changed = True
-
-                    # ========== SYS_STATUS - Battery Info ==========
-                    elif msg_type == "SYS_STATUS":
-                        new_battery_remaining = msg_dict.get('battery_remaining')
-                        new_voltage_battery = msg_dict.get('voltage_battery')
-                        new_current_battery = msg_dict.get('current_battery')
-
-                        if new_voltage_battery not in (None, 65535):
-                            new_voltage_battery /= 1000.0
-                        else:
-                            new_voltage_battery = None
-
-                        if new_current_battery not in (None, -1):
-                            new_current_battery /= 100.0
-                        else:
-                            new_current_battery = None
-
-                        if new_battery_remaining == -1:
-                            new_battery_remaining = None
-
-                        if (
-                            self.current_telemetry_components['battery_remaining'] != new_battery_remaining
-                            or self.current_telemetry_components['voltage_battery'] != new_voltage_battery
-                            or self.current_telemetry_components['current_battery'] != new_current_battery
-                        ):
-                            self.current_telemetry_components.update({
-                                'battery_remaining': new_battery_remaining,
-                                'voltage_battery': new_voltage_battery,
-                                'current_battery': new_current_battery,
-                            })
-                            telemetry_component_changed = True
-
-                    # ========== STATUSTEXT - Status Messages ==========
-                    elif msg_type == "STATUSTEXT":
-                        self.statusTextChanged.emit(msg.text)
-
-                    # ==========================================
-                    # ✅ PARAM_VALUE - Parameter Messages (FIXED)
-                    # ==========================================
-                    elif msg_type == "PARAM_VALUE":
-                        param_msg_count += 1
-                        
-                        # Detailed logging for first 10 parameters
-                        if param_msg_count <= 10:
-                            try:
-                                # ✅ Handle both bytes and string
-                                param_id = msg.param_id
-                                if isinstance(param_id, bytes):
-                                    param_id = param_id.decode('utf-8').strip('\x00')
-                                elif isinstance(param_id, str):
-                                    param_id = param_id.strip('\x00')
-                                else:
-                                    param_id = str(param_id).strip('\x00')
-                                
-                                param_value = msg.param_value
-                                param_index = msg.param_index
-                                param_count = msg.param_count
-                                
-                                print(f"[MAVLinkThread] 📥 PARAM_VALUE #{param_msg_count}:")
-                                print(f"  - ID: {param_id}")
-                                print(f"  - Value: {param_value}")
-                                print(f"  - Index: {param_index}/{param_count}")
-                            except Exception as e:
-                                print(f"[MAVLinkThread] ⚠️ Error parsing param: {e}")
-                                import traceback
-                                traceback.print_exc()
-                        
-                        # Progress updates every 100 parameters (reduced logging)
-                        if param_msg_count % 100 == 0:
-                            print(f"[MAVLinkThread] 📥 Received {param_msg_count} PARAM_VALUE messages so far")
-                        
-                        # Route to DroneCommander
-                        if self.drone_commander is not None:
-                            try:
-                                self.drone_commander.add_parameter_to_queue(msg)
-                                
-                                # Confirm routing for first few
-                                if param_msg_count <= 5:
-                                    print(f"[MAVLinkThread] ✅ Routed to DroneCommander queue")
-                                    
-                            except Exception as e:
-                                print(f"[MAVLinkThread] ❌ Error routing parameter: {e}")
-                                import traceback
-                                traceback.print_exc()
-                        else:
-                            # This is a critical error!
-                            if param_msg_count == 1:
-                                print("[MAVLinkThread] ❌ CRITICAL: drone_commander is None!")
-                                print("[MAVLinkThread] ❌ Parameters cannot be collected!")
-                                print("[MAVLinkThread] ❌ Make sure to pass drone_commander when creating MAVLinkThread")
-
-                    # ========== EMIT TELEMETRY UPDATE ==========
-                    if telemetry_component_changed:
-                        self.telemetryUpdated.emit(self.current_telemetry_components.copy())
+                if prefilter is not None:
+                    prefilter.install()
+                
+                # Drain and decode every buffered frame in one pass
+                while self.running:
+                    msg = self.drone.recv_msg()
+                    if msg is None:
+                        # A skipped frame also yields None - keep draining
+                        if prefilter is not None and prefilter.take_skipped():
+                            continue
+                        break
+                    self._handle_message(msg)
+                
+                self._publisher.flush_if_due()
 
             except Exception as e:
                 print(f"[MAVLinkThread] Error reading telemetry: {e}")
@@ -252,6 +126,268 @@ class MAVLinkThread(QThread):
                 if hasattr(self, "on_disconnect_callback") and self.on_disconnect_callback:
                     self.on_disconnect_callback()
                 time.sleep(0.1)
+        
+        if selector is not None:
+            selector.close()
+        if prefilter is not None:
+            if self.message_hub is not None:
+                self.message_hub.remove_listener(self._refresh_prefilter)
+            prefilter.uninstall()
+
+    def _create_selector(self):
+        """Register the serial/UDP/TCP file descriptor of the link, if it has one"""
+        fd = getattr(self.drone, 'fd', None)
+        if fd is None:
+            # e.g. serial ports on Windows
+            return None
+        try:
+            selector = selectors.DefaultSelector()
+            selector.register(fd, selectors.EVENT_READ)
+            return selector
+        except (OSError, ValueError) as e:
+            print(f"[MAVLinkThread] ⚠️ Cannot poll link fd {fd}: {e}")
+            return None
+
+    def _register_handlers(self):
+        """Handler table keyed by numeric msgid - no to_dict() or type-string compares per message.
+        Handlers update current_telemetry_components in place and mark changed keys dirty."""
+        mavlink = mavutil.mavlink
+        self._handlers = {
+            mavlink.MAVLINK_MSG_ID_HEARTBEAT: self._on_heartbeat,
+            mavlink.MAVLINK_MSG_ID_COMMAND_ACK: self._on_command_ack,
+            mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT: self._on_global_position_int,
+            mavlink.MAVLINK_MSG_ID_ATTITUDE: self._on_attitude,
+            mavlink.MAVLINK_MSG_ID_VFR_HUD: self._on_vfr_hud,
+            mavlink.MAVLINK_MSG_ID_SYS_STATUS: self._on_sys_status,
+            mavlink.MAVLINK_MSG_ID_STATUSTEXT: self._on_statustext,
+            mavlink.MAVLINK_MSG_ID_PARAM_VALUE: self._on_param_value,
+        }
+
+    def _handle_message(self, msg):
+        """Decode one message into telemetry and route it to subscribers"""
+        if self.message_hub is not None:
+            self.message_hub.dispatch(msg)
+        self.current_msg.emit(msg)
+
+        handler = self._handlers.get(msg.get_msgId())
+        if handler is not None:
+            handler(msg)
+
+    def addConsumerTypes(self, msg_types):
+        """Declare message types needed by current_msg receivers so the prefilter decodes them"""
+        self._consumer_types.update(msg_types)
+        self._refresh_prefilter()
+
+    def _refresh_prefilter(self):
+        if self._prefilter is None:
+            return
+        hub_types = self.message_hub.subscribed_types() if self.message_hub is not None else frozenset()
+        if hub_types is None:
+            # Wildcard subscriber - every message must be decoded
+            self._prefilter.set_wanted(None)
+            return
+        wanted = set(self._handlers)
+        wanted.update(msgids_for_types(hub_types))
+        wanted.update(msgids_for_types(self._consumer_types))
+        self._prefilter.set_wanted(wanted)
+
+    def skippedMessageCounts(self):
+        """Frames skipped by the prefilter, keyed by message type"""
+        return self._prefilter.stats() if self._prefilter is not None else {}
+
+    def setTelemetryRate(self, rate_hz):
+        """Maximum number of telemetryUpdated emissions per second"""
+        self._publisher.max_rate_hz = rate_hz
+
+    # ========== HEARTBEAT - Armed Status & Flight Mode ==========
+    def _on_heartbeat(self, msg):
+        telemetry = self.current_telemetry_components
+        changed = []
+
+        mode_map = self.drone.mode_mapping()
+        if mode_map != self._mode_map:
+            self._mode_map = mode_map
+            self._inv_mode_map = {v: k for k, v in (mode_map or {}).items()}
+        new_mode = self._inv_mode_map.get(msg.custom_mode, "UNKNOWN")
+        new_armed_status = bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+
+        # Update mode if changed
+        if telemetry['mode'] != new_mode:
+            print(f"[MAVLinkThread] 🔄 MODE CHANGED: {telemetry['mode']} → {new_mode}")
+            telemetry['mode'] = new_mode
+            changed.append('mode')
+
+        # Update armed status if changed
+        if telemetry['armed'] != new_armed_status:
+            print(f"[MAVLinkThread] 🔄 ARMED STATUS CHANGED: {telemetry['armed']} → {new_armed_status}")
+            telemetry['armed'] = new_armed_status
+            changed.append('armed')
+
+        if changed:
+            # Urgent keys - the publisher flushes immediately
+            self._publisher.mark_dirty(changed)
+
+    # ========== COMMAND_ACK - Command Acknowledgments ==========
+    def _on_command_ack(self, msg):
+        # Log ARM/DISARM acknowledgments
+        if msg.command == mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
+            if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+                print(f"[MAVLinkThread] ✅ ARM/DISARM command ACCEPTED")
+
+            elif msg.result == mavutil.mavlink.MAV_RESULT_DENIED:
+                print(f"[MAVLinkThread] ❌ ARM/DISARM command DENIED (result: {msg.result})")
+
+            elif msg.result == mavutil.mavlink.MAV_RESULT_FAILED:
+                print(f"[MAVLinkThread] ❌ ARM/DISARM command FAILED (result: {msg.result})")
+
+            elif msg.result == mavutil.mavlink.MAV_RESULT_TEMPORARILY_REJECTED:
+                print(f"[MAVLinkThread] ⚠️ ARM/DISARM command TEMPORARILY_REJECTED")
+
+            else:
+                print(f"[MAVLinkThread] ⚠️ ARM/DISARM unknown result: {msg.result}")
+
+    # ========== GLOBAL_POSITION_INT - GPS Position ==========
+    def _on_global_position_int(self, msg):
+        telemetry = self.current_telemetry_components
+        new_lat = msg.lat / 1e7
+        new_lon = msg.lon / 1e7
+        new_alt = msg.alt / 1000.0
+        new_rel_alt = msg.relative_alt / 1000.0
+
+        if (
+            telemetry['lat'] != new_lat
+            or telemetry['lon'] != new_lon
+            or telemetry['alt'] != new_alt
+            or telemetry['rel_alt'] != new_rel_alt
+        ):
+            telemetry['lat'] = new_lat
+            telemetry['lon'] = new_lon
+            telemetry['alt'] = new_alt
+            telemetry['rel_alt'] = new_rel_alt
+            self._publisher.mark_dirty(POSITION_KEYS)
+
+    # ========== ATTITUDE - Roll/Pitch/Yaw ==========
+    def _on_attitude(self, msg):
+        telemetry = self.current_telemetry_components
+        new_roll = math.degrees(msg.roll)
+        new_pitch = math.degrees(msg.pitch)
+        new_yaw = math.degrees(msg.yaw)
+
+        if (
+            telemetry['roll'] != new_roll
+            or telemetry['pitch'] != new_pitch
+            or telemetry['yaw'] != new_yaw
+        ):
+            telemetry['roll'] = new_roll
+            telemetry['pitch'] = new_pitch
+            telemetry['yaw'] = new_yaw
+            self._publisher.mark_dirty(ATTITUDE_KEYS)
+
+    # ========== VFR_HUD - Speed & Heading ==========
+    def _on_vfr_hud(self, msg):
+        telemetry = self.current_telemetry_components
+        new_heading = msg.heading
+        new_groundspeed = msg.groundspeed
+        new_airspeed = msg.airspeed
+
+        if (
+            telemetry['heading'] != new_heading
+            or telemetry['groundspeed'] != new_groundspeed
+            or telemetry['airspeed'] != new_airspeed
+        ):
+            telemetry['heading'] = new_heading
+            telemetry['groundspeed'] = new_groundspeed
+            telemetry['airspeed'] = new_airspeed
+            self._publisher.mark_dirty(HUD_KEYS)
+
+    # ========== SYS_STATUS - Battery Info ==========
+    def _on_sys_status(self, msg):
+        telemetry = self.current_telemetry_components
+        new_battery_remaining = msg.battery_remaining
+        new_voltage_battery = msg.voltage_battery
+        new_current_battery = msg.current_battery
+
+        if new_voltage_battery != 65535:
+            new_voltage_battery /= 1000.0
+        else:
+            new_voltage_battery = None
+
+        if new_current_battery != -1:
+            new_current_battery /= 100.0
+        else:
+            new_current_battery = None
+
+        if new_battery_remaining == -1:
+            new_battery_remaining = None
+
+        if (
+            telemetry['battery_remaining'] != new_battery_remaining
+            or telemetry['voltage_battery'] != new_voltage_battery
+            or telemetry['current_battery'] != new_current_battery
+        ):
+            telemetry['battery_remaining'] = new_battery_remaining
+            telemetry['voltage_battery'] = new_voltage_battery
+            telemetry['current_battery'] = new_current_battery
+            self._publisher.mark_dirty(BATTERY_KEYS)
+
+    # ========== STATUSTEXT - Status Messages ==========
+    def _on_statustext(self, msg):
+        self.statusTextChanged.emit(msg.text)
+
+    # ==========================================
+    # ✅ PARAM_VALUE - Parameter Messages (FIXED)
+    # ==========================================
+    def _on_param_value(self, msg):
+        self._param_msg_count += 1
+
+        # Detailed logging for first 10 parameters
+        if self._param_msg_count <= 10:
+            try:
+                # ✅ Handle both bytes and string
+                param_id = msg.param_id
+                if isinstance(param_id, bytes):
+                    param_id = param_id.decode('utf-8').strip('\x00')
+                elif isinstance(param_id, str):
+                    param_id = param_id.strip('\x00')
+                else:
+                    param_id = str(param_id).strip('\x00')
+
+                param_value = msg.param_value
+                param_index = msg.param_index
+                param_count = msg.param_count
+
+                print(f"[MAVLinkThread] 📥 PARAM_VALUE #{self._param_msg_count}:")
+                print(f"  - ID: {param_id}")
+                print(f"  - Value: {param_value}")
+                print(f"  - Index: {param_index}/{param_count}")
+            except Exception as e:
+                print(f"[MAVLinkThread] ⚠️ Error parsing param: {e}")
+                import traceback
+                traceback.print_exc()
+
+        # Progress updates every 100 parameters (reduced logging)
+        if self._param_msg_count % 100 == 0:
+            print(f"[MAVLinkThread] 📥 Received {self._param_msg_count} PARAM_VALUE messages so far")
+
+        # Route to DroneCommander
+        if self.drone_commander is not None:
+            try:
+                self.drone_commander.add_parameter_to_queue(msg)
+
+                # Confirm routing for first few
+                if self._param_msg_count <= 5:
+                    print(f"[MAVLinkThread] ✅ Routed to DroneCommander queue")
+
+            except Exception as e:
+                print(f"[MAVLinkThread] ❌ Error routing parameter: {e}")
+                import traceback
+                traceback.print_exc()
+        else:
+            # This is a critical error!
+            if self._param_msg_count == 1:
+                print("[MAVLinkThread] ❌ CRITICAL: drone_commander is None!")
+                print("[MAVLinkThread] ❌ Parameters cannot be collected!")
+                print("[MAVLinkThread] ❌ Make sure to pass drone_commander when creating MAVLinkThread")
 
     def stop(self):
         print("[MAVLinkThread] Stopping thread...")
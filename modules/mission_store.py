@@ -0,0 +1,165 @@
+"""
+Mission Store - array-backed mission lists for transfers and QML
+MissionArray keeps a mission as one NumPy structured array (38 bytes per
+item, the MISSION_ITEM_INT fields) plus a received mask, so downloads fill
+it in any order. MissionItemsModel exposes one to WaypointDashboard.qml
+and MapView.qml.
+"""
+import numpy as np
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtProperty, pyqtSignal, pyqtSlot
+from pymavlink import mavutil
+
+from modules.command_manager import command_name
+
+
+MISSION_ITEM_DTYPE = np.dtype([
+    ('seq', '<u2'), ('frame', 'u1'), ('command', '<u2'), ('current', 'u1'), ('autocontinue', 'u1'),
+    ('param1', '<f4'), ('param2', '<f4'), ('param3', '<f4'), ('param4', '<f4'),
+    ('x', '<i4'), ('y', '<i4'), ('z', '<f4'),
+])
+
+_FIELDS = MISSION_ITEM_DTYPE.names
+
+
+class MissionArray:
+    """One mission list; x/y are degE7 as transferred"""
+
+    def __init__(self, count, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+        self.mission_type = mission_type
+        self.items = np.zeros(count, dtype=MISSION_ITEM_DTYPE)
+        self.items['seq'] = np.arange(count)
+        self.received = np.zeros(count, dtype=bool)
+
+    @classmethod
+    def from_items(cls, items, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+        """From item dicts (build_mission_items / the mission cache)"""
+        mission = cls(len(items), mission_type)
+        for name in _FIELDS:
+            if name in ('x', 'y'):
+                mission.items[name] = np.round(np.array([item[name] for item in items], dtype=np.float64) * 1e7)
+            else:
+                mission.items[name] = [item[name] for item in items]
+        mission.received[:] = True
+        return mission
+
+    def __len__(self):
+        return len(self.items)
+
+    def set_message(self, msg):
+        """Store a MISSION_ITEM_INT; returns False when its seq is out of range"""
+        if not 0 <= msg.seq < len(self.items):
+            return False
+        self.items[msg.seq] = tuple(getattr(msg, name) for name in _FIELDS)
+        self.received[msg.seq] = True
+        return True
+
+    @property
+    def complete(self):
+        return bool(self.received.all())
+
+    def missing(self):
+        """Sequence numbers not received yet"""
+        return np.flatnonzero(~self.received)
+
+    def latitudes(self):
+        return self.items['x'] * 1e-7
+
+    def longitudes(self):
+        return self.items['y'] * 1e-7
+
+    def to_items(self):
+        """Item dicts, as used by the transfer and the mission cache"""
+        items = []
+        for row in self.items.tolist():
+            item = dict(zip(_FIELDS, row))
+            item['x'] = item['x'] / 1e7
+            item['y'] = item['y'] / 1e7
+            items.append(item)
+        return items
+
+    def path(self):
+        """[[lat, lon], ...] of the items that have a position"""
+        positioned = (self.items['x'] != 0) | (self.items['y'] != 0)
+        return np.column_stack((self.latitudes()[positioned], self.longitudes()[positioned])).tolist()
+
+
+class MissionItemsModel(QAbstractListModel):
+    """The vehicle's mission for QML; 'verified' is false while it is shown from the cache unchecked"""
+
+    SeqRole = Qt.UserRole + 1
+    CommandRole = Qt.UserRole + 2
+    CommandNameRole = Qt.UserRole + 3
+    LatitudeRole = Qt.UserRole + 4
+    LongitudeRole = Qt.UserRole + 5
+    AltitudeRole = Qt.UserRole + 6
+    CurrentRole = Qt.UserRole + 7
+
+    countChanged = pyqtSignal()
+    verifiedChanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mission = MissionArray(0)
+        self._verified = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._mission)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._mission):
+            return None
+        item = self._mission.items[index.row()]
+        if role == self.SeqRole:
+            return int(item['seq'])
+        elif role == self.CommandRole:
+            return int(item['command'])
+        elif role == self.CommandNameRole:
+            return command_name(int(item['command'])).replace('MAV_CMD_', '')
+        elif role == self.LatitudeRole:
+            return int(item['x']) / 1e7
+        elif role == self.LongitudeRole:
+            return int(item['y']) / 1e7
+        elif role == self.AltitudeRole:
+            return float(item['z'])
+        elif role == self.CurrentRole:
+            return bool(item['current'])
+        return None
+
+    def roleNames(self):
+        return {
+            self.SeqRole: b'seq',
+            self.CommandRole: b'command',
+            self.CommandNameRole: b'commandName',
+            self.LatitudeRole: b'latitude',
+            self.LongitudeRole: b'longitude',
+            self.AltitudeRole: b'altitude',
+            self.CurrentRole: b'current',
+        }
+
+    @property
+    def mission(self):
+        return self._mission
+
+    def set_mission(self, mission, verified):
+        """Replace the list (GUI thread only)"""
+        old_count = len(self._mission)
+        self.beginResetModel()
+        self._mission = mission
+        self.endResetModel()
+        if len(mission) != old_count:
+            self.countChanged.emit()
+        if verified != self._verified:
+            self._verified = verified
+            self.verifiedChanged.emit()
+
+    @pyqtProperty(int, notify=countChanged)
+    def count(self):
+        return len(self._mission)
+
+    @pyqtProperty(bool, notify=verifiedChanged)
+    def verified(self):
+        return self._verified
+
+    @pyqtSlot(result='QVariantList')
+    def path(self):
+        return self._mission.path()
@@ -0,0 +1,178 @@
+"""
+Mission Sync - upload only what the vehicle does not already have
+The GCS remembers, per autopilot (AUTOPILOT_VERSION identity) and mission
+type, the last list it put on the vehicle (items, CRC32 and the vehicle's
+opaque_id). The cache is trusted only when the vehicle reports the same
+opaque_id, which changes with every edit on the vehicle: the upload is then
+skipped or only the changed range is sent (MISSION_WRITE_PARTIAL_LIST), and
+downloads are answered from the cache. A vehicle or dialect without
+opaque_id always gets a full upload or download - the item count and a few
+items cannot prove that another GCS did not change the rest. With a
+dialect that has no opaque_id the cache is not used at all, so no identity
+request or MISSION_COUNT probe delays the transfer.
+"""
+import json
+import os
+
+from pymavlink import mavutil
+
+from modules.async_commands import CommandError
+from modules.mission_store import MissionArray
+from modules.mission_transfer import (
+    upload_mission, download_mission, request_mission_state, end_mission_download, mission_checksum, item_checksum
+)
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.tihanfly', 'missions')
+
+# Whether the MAVLink dialect reports opaque_id in MISSION_COUNT/MISSION_ACK
+HAS_OPAQUE_ID = 'opaque_id' in mavutil.mavlink.MAVLink_mission_count_message.fieldnames
+
+
+class MissionCache:
+    """Last synchronised mission per vehicle and mission type, persisted as JSON"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._vehicles = {}     # key -> {mission type (str): entry}
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self, key):
+        if key not in self._vehicles:
+            try:
+                with open(self._path(key)) as f:
+                    self._vehicles[key] = json.load(f)
+            except (OSError, ValueError):
+                self._vehicles[key] = {}
+        return self._vehicles[key]
+
+    def get(self, key, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+        """{'checksum', 'opaque_id', 'items'} or None"""
+        return self._load(key).get(str(mission_type))
+
+    def store(self, key, items, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION, opaque_id=0):
+        entry = {
+            'checksum': mission_checksum(items, mission_type),
+            'opaque_id': opaque_id,
+            'items': [dict(item) for item in items],
+        }
+        self._load(key)[str(mission_type)] = entry
+        self._save(key)
+        return entry
+
+    def forget(self, key, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+        if self._load(key).pop(str(mission_type), None) is not None:
+            self._save(key)
+
+    def _save(self, key):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(self._vehicles[key], f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"[MissionSync] ⚠️ Could not save mission cache: {e}")
+
+
+def _matches_cache(state, entry):
+    """Whether a started download (its MissionState) is provably the cached entry"""
+    return bool(entry is not None and state.opaque_id and state.opaque_id == entry.get('opaque_id'))
+
+
+async def vehicle_holds(vehicle, entry, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+    """Whether the vehicle still has the cached mission entry (same opaque_id)"""
+    state = await request_mission_state(vehicle, mission_type)
+    if state is None:
+        return False
+    holds = _matches_cache(state, entry)
+    end_mission_download(vehicle, mission_type, mavutil.mavlink.MAV_MISSION_ACCEPTED if holds
+                         else mavutil.mavlink.MAV_MISSION_OPERATION_CANCELLED)
+    return holds
+
+
+async def load_mission(vehicle, cache, key, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                       on_cached=None, **download_options):
+    """
+    The vehicle's mission as (MissionArray, from_cache); downloaded unless the
+    vehicle reports the cached opaque_id. key None (vehicle without identity)
+    bypasses the cache. on_cached(mission) gets the cached, unverified mission
+    as soon as it is known.
+    """
+    entry = cache.get(key, mission_type) if key and HAS_OPAQUE_ID else None
+    if entry is not None and on_cached is not None:
+        on_cached(MissionArray.from_items(entry['items'], mission_type))
+    state = await request_mission_state(vehicle, mission_type)
+    if state is None:
+        raise CommandError("No MISSION_COUNT from vehicle")
+    try:
+        if _matches_cache(state, entry):
+            end_mission_download(vehicle, mission_type)
+            print(f"[MissionSync] ✅ Vehicle mission unchanged (opaque_id) - {state.count} items from cache")
+            return MissionArray.from_items(entry['items'], mission_type), True
+        mission = await download_mission(vehicle, state.count, mission_type, **download_options)
+    except BaseException:
+        end_mission_download(vehicle, mission_type, mavutil.mavlink.MAV_MISSION_OPERATION_CANCELLED)
+        raise
+    if key and HAS_OPAQUE_ID:
+        cache.store(key, mission.to_items(), mission_type, state.opaque_id)
+    return mission, False
+
+
+def _changed_range(old_items, new_items):
+    """(first, last) differing seq of two lists of equal length, or None"""
+    if len(old_items) != len(new_items):
+        return None
+    changed = [seq for seq, (old, new) in enumerate(zip(old_items, new_items))
+               if item_checksum(old) != item_checksum(new)]
+    return (changed[0], changed[-1]) if changed else None
+
+
+class SyncResult:
+    """How a sync reached the vehicle: 'unchanged', 'partial' or 'full', and the items sent"""
+
+    def __init__(self, method, sent, total):
+        self.method = method
+        self.sent = sent
+        self.total = total
+
+    def describe(self):
+        if self.method == 'unchanged':
+            return "Mission already on vehicle - upload skipped"
+        if self.method == 'partial':
+            return f"Mission updated: {self.sent} of {self.total} items sent"
+        return f"Mission uploaded: {self.total} items"
+
+
+async def sync_mission(vehicle, items, cache, key, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                       **upload_options):
+    """
+    Make the vehicle's mission equal to items; returns a SyncResult.
+    Less than a full upload only when the vehicle proves (opaque_id) that it
+    still holds the cached list; key None (vehicle without identity) bypasses the cache.
+    """
+    entry = cache.get(key, mission_type) if key and HAS_OPAQUE_ID else None
+    if entry is not None and await vehicle_holds(vehicle, entry, mission_type):
+        if entry['checksum'] == mission_checksum(items, mission_type):
+            print(f"[MissionSync] ✅ Vehicle already has this mission ({len(items)} items)")
+            return SyncResult('unchanged', 0, len(items))
+        changed = _changed_range(entry['items'], items)
+        if changed is not None:
+            first, last = changed
+            print(f"[MissionSync] Items {first}..{last} changed - partial upload")
+            try:
+                state = await upload_mission(vehicle, items, mission_type, partial=changed, **upload_options)
+                cache.store(key, items, mission_type, state.opaque_id)
+                return SyncResult('partial', last - first + 1, len(items))
+            except CommandError as e:
+                # e.g. PX4 has no MISSION_WRITE_PARTIAL_LIST
+                print(f"[MissionSync] Partial upload failed ({e}) - uploading everything")
+    else:
+        print("[MissionSync] Vehicle mission not provably the cached one - full upload")
+
+    state = await upload_mission(vehicle, items, mission_type, **upload_options)
+    if key and HAS_OPAQUE_ID:
+        cache.store(key, items, mission_type, state.opaque_id)
+    return SyncResult('full', len(items), len(items))
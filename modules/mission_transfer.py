@@ -0,0 +1,324 @@
+"""
+Mission Transfer - mission protocol coroutines
+Upload answers the vehicle's MISSION_REQUEST/MISSION_REQUEST_INT as they
+arrive and finishes on its MISSION_ACK, so a transfer costs one round trip
+per item. Download keeps a window of MISSION_REQUEST_INTs in flight and
+re-requests whatever is missing, in any order. Waits are hub messages
+awaited on the async command loop.
+"""
+import asyncio
+import struct
+import time
+import zlib
+
+from pymavlink import mavutil
+
+from modules.async_commands import CommandError
+from modules.mission_store import MissionArray
+
+
+def build_mission_items(waypoints, home_lat, home_lon):
+    """
+    Takeoff at the current position followed by the waypoints (dicts with
+    x=lat, y=lon, z=alt and optionally command, param1; NAV_WAYPOINT otherwise)
+    """
+    takeoff_alt = waypoints[0].get('z', 10.0) if waypoints else 10.0
+    items = [{
+        'seq': 0,
+        'frame': mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
+        'command': mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
+        'current': 1,
+        'autocontinue': 1,
+        'param1': 0, 'param2': 0, 'param3': 0, 'param4': 0,
+        'x': home_lat, 'y': home_lon, 'z': takeoff_alt
+    }]
+    for i, wp in enumerate(waypoints):
+        items.append({
+            'seq': i + 1,
+            'frame': mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
+            'command': wp.get('command', mavutil.mavlink.MAV_CMD_NAV_WAYPOINT),
+            'current': 0,
+            'autocontinue': 1,
+            'param1': wp.get('param1', 0), 'param2': 0, 'param3': 0, 'param4': 0,
+            'x': wp.get('x', 0), 'y': wp.get('y', 0), 'z': wp.get('z', 10)
+        })
+    return items
+
+
+# seq, frame, command, autocontinue, param1..4, x, y (degE7), z - as carried by MISSION_ITEM_INT
+_ITEM_LAYOUT = struct.Struct('<HBHBffffiif')
+
+
+def item_from_message(msg):
+    """Mission item dict (as built by build_mission_items) from a MISSION_ITEM_INT"""
+    return {
+        'seq': msg.seq, 'frame': msg.frame, 'command': msg.command,
+        'current': msg.current, 'autocontinue': msg.autocontinue,
+        'param1': msg.param1, 'param2': msg.param2, 'param3': msg.param3, 'param4': msg.param4,
+        'x': msg.x / 1e7, 'y': msg.y / 1e7, 'z': msg.z
+    }
+
+
+def _item_bytes(item):
+    # 'current' is left out: the vehicle moves it while flying the mission
+    return _ITEM_LAYOUT.pack(
+        item['seq'], item['frame'], item['command'], item['autocontinue'],
+        item['param1'], item['param2'], item['param3'], item['param4'],
+        int(round(item['x'] * 1e7)), int(round(item['y'] * 1e7)), item['z']
+    )
+
+
+def item_checksum(item):
+    """CRC32 of one item at the precision it is transferred with"""
+    return zlib.crc32(_item_bytes(item))
+
+
+def mission_checksum(items, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION):
+    """CRC32 of a whole mission list"""
+    crc = zlib.crc32(bytes([mission_type]))
+    for item in items:
+        crc = zlib.crc32(_item_bytes(item), crc)
+    return crc
+
+
+class MissionState:
+    """Item count and opaque_id (0: not reported by the vehicle or dialect) of an on-vehicle mission"""
+
+    def __init__(self, count, opaque_id=0):
+        self.count = count
+        self.opaque_id = opaque_id
+
+
+def mission_result_name(result):
+    entry = mavutil.mavlink.enums['MAV_MISSION_RESULT'].get(result)
+    return entry.name if entry is not None else str(result)
+
+
+def _mission_type_field(msg_class, mission_type):
+    """mission_type keyword for msg_class; dialects without the field only carry missions"""
+    if 'mission_type' in msg_class.fieldnames:
+        return {'mission_type': mission_type}
+    if mission_type != mavutil.mavlink.MAV_MISSION_TYPE_MISSION:
+        raise CommandError("Fence and rally transfers need the MAVLink 2 dialect")
+    return {}
+
+
+def _is_mission_type(msg, mission_type):
+    return getattr(msg, 'mission_type', mavutil.mavlink.MAV_MISSION_TYPE_MISSION) == mission_type
+
+
+def _encode_item(drone, item, mission_type):
+    return drone.mav.mission_item_int_encode(
+        drone.target_system, drone.target_component,
+        item['seq'], item['frame'], item['command'], item['current'], item['autocontinue'],
+        item['param1'], item['param2'], item['param3'], item['param4'],
+        int(round(item['x'] * 1e7)), int(round(item['y'] * 1e7)), float(item['z']),
+        **_mission_type_field(mavutil.mavlink.MAVLink_mission_item_int_message, mission_type)
+    )
+
+
+async def upload_mission(vehicle, items, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                         request_timeout=1.5, min_retry_timeout=0.2, max_retries=5, on_progress=None,
+                         partial=None):
+    """
+    Upload items as the mission of mission_type (mission, fence or rally).
+    MISSION_COUNT replaces the vehicle's list - or, with partial=(start, end),
+    MISSION_WRITE_PARTIAL_LIST replaces items start..end of a list of the
+    same length already on the vehicle. Then every MISSION_REQUEST or
+    MISSION_REQUEST_INT is answered with the pre-encoded MISSION_ITEM_INT
+    (ArduPilot and PX4 take the int item for both), duplicates included.
+    When the link goes quiet for four smoothed round trips (bounded by
+    min_retry_timeout and request_timeout) the last frame is re-sent, up to
+    max_retries times in a row. on_progress(items requested, total) follows
+    the transfer.
+    Returns the MissionState reported by the final MISSION_ACK.
+    """
+    drone = vehicle.drone
+    total = len(items)
+    first, last = partial if partial is not None else (0, total - 1)
+    encoded = [_encode_item(drone, item, mission_type) for item in items]
+
+    if partial is None:
+        count_fields = _mission_type_field(mavutil.mavlink.MAVLink_mission_count_message, mission_type)
+
+        def send_start():
+            drone.mav.mission_count_send(drone.target_system, drone.target_component, total, **count_fields)
+    else:
+        partial_fields = _mission_type_field(mavutil.mavlink.MAVLink_mission_write_partial_list_message,
+                                             mission_type)
+
+        def send_start():
+            drone.mav.mission_write_partial_list_send(drone.target_system, drone.target_component,
+                                                      first, last, **partial_fields)
+
+    events = vehicle.stream(['MISSION_ACK', 'MISSION_REQUEST', 'MISSION_REQUEST_INT'], maxsize=1024)
+    last_sent = None
+    sent_at = None      # None once re-sent: no round-trip sample (Karn)
+    srtt = None
+    highest = first - 1
+    duplicates = 0
+    retries = 0
+    start = time.monotonic()
+    try:
+        if partial is None:
+            print(f"[MissionTransfer] Sending MISSION_COUNT: {total} (type {mission_type})")
+        else:
+            print(f"[MissionTransfer] Sending MISSION_WRITE_PARTIAL_LIST: {first}..{last} (type {mission_type})")
+        send_start()
+
+        while True:
+            timeout = request_timeout if srtt is None else min(request_timeout, max(min_retry_timeout, 4 * srtt))
+            msg = await events.get(timeout=timeout)
+            if msg is None:
+                retries += 1
+                if retries > max_retries:
+                    raise CommandError(f"Mission upload timed out at item {highest + 1}/{total}")
+                if last_sent is None:
+                    # MISSION_COUNT (or PARTIAL_LIST) or the first request was lost
+                    send_start()
+                else:
+                    drone.mav.send(encoded[last_sent])
+                sent_at = None
+                continue
+            if not _is_mission_type(msg, mission_type):
+                continue
+            retries = 0
+
+            if msg.get_type() == 'MISSION_ACK':
+                if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                    ack = msg
+                    break
+                if msg.type == mavutil.mavlink.MAV_MISSION_INVALID_SEQUENCE:
+                    continue    # answer to a re-sent item; the vehicle keeps requesting
+                raise CommandError(f"Mission rejected: {mission_result_name(msg.type)}")
+
+            seq = msg.seq
+            if not first <= seq <= last:
+                print(f"[MissionTransfer] ⚠️ Request for item {seq} outside {first}..{last}")
+                continue
+            now = time.monotonic()
+            if seq > highest and sent_at is not None:
+                sample = now - sent_at
+                srtt = sample if srtt is None else 0.875 * srtt + 0.125 * sample
+            drone.mav.send(encoded[seq])
+            last_sent = seq
+            sent_at = now
+            if seq <= highest:
+                duplicates += 1
+                continue
+            highest = seq
+            done = seq - first + 1
+            if on_progress is not None:
+                on_progress(done, last - first + 1)
+            if done % 50 == 0 or seq == last:
+                vehicle.feedback(f"Uploading mission: {done}/{last - first + 1}")
+    finally:
+        events.close()
+
+    print(f"[MissionTransfer] ✅ Mission accepted: {last - first + 1} items in {time.monotonic() - start:.2f}s "
+          f"({duplicates} duplicate requests)")
+    return MissionState(total, getattr(ack, 'opaque_id', 0))
+
+
+async def request_mission_state(vehicle, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                                timeout=1.5, retries=3):
+    """
+    Start a download (MISSION_REQUEST_LIST) and return the MissionState of
+    its MISSION_COUNT, or None when the vehicle does not answer. Finish with
+    request_mission_item()s and end_mission_download().
+    """
+    drone = vehicle.drone
+    fields = _mission_type_field(mavutil.mavlink.MAVLink_mission_request_list_message, mission_type)
+    with vehicle.stream('MISSION_COUNT') as events:
+        for _ in range(retries):
+            drone.mav.mission_request_list_send(drone.target_system, drone.target_component, **fields)
+            msg = await events.wait_for(lambda m: _is_mission_type(m, mission_type), timeout=timeout)
+            if msg is not None:
+                return MissionState(msg.count, getattr(msg, 'opaque_id', 0))
+    return None
+
+
+async def request_mission_item(vehicle, seq, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                               timeout=1.5, retries=3):
+    """One item of a started download as an item dict, or None"""
+    drone = vehicle.drone
+    fields = _mission_type_field(mavutil.mavlink.MAVLink_mission_request_int_message, mission_type)
+    with vehicle.stream('MISSION_ITEM_INT') as events:
+        for _ in range(retries):
+            drone.mav.mission_request_int_send(drone.target_system, drone.target_component, seq, **fields)
+            msg = await events.wait_for(lambda m: m.seq == seq and _is_mission_type(m, mission_type),
+                                        timeout=timeout)
+            if msg is not None:
+                return item_from_message(msg)
+    return None
+
+
+def end_mission_download(vehicle, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                         result=mavutil.mavlink.MAV_MISSION_ACCEPTED):
+    drone = vehicle.drone
+    fields = _mission_type_field(mavutil.mavlink.MAVLink_mission_ack_message, mission_type)
+    drone.mav.mission_ack_send(drone.target_system, drone.target_component, result, **fields)
+
+
+async def download_mission(vehicle, count, mission_type=mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                           window=8, request_timeout=1.0, max_attempts=5, on_progress=None):
+    """
+    Fetch the count items of a download started with request_mission_state()
+    into a MissionArray and end the transfer. Up to window requests are in
+    flight; unanswered ones are re-requested after request_timeout. A vehicle
+    that refuses out-of-order requests (PX4 answers with a MISSION_ACK error)
+    is restarted with one request at a time.
+    """
+    drone = vehicle.drone
+    loop = asyncio.get_running_loop()
+    fields = _mission_type_field(mavutil.mavlink.MAVLink_mission_request_int_message, mission_type)
+    mission = MissionArray(count, mission_type)
+    in_flight = {}      # seq -> time requested
+    attempts = {}
+    start = time.monotonic()
+
+    def request(seq):
+        attempts[seq] = attempts.get(seq, 0) + 1
+        if attempts[seq] > max_attempts:
+            raise CommandError(f"Mission download failed: no answer for item {seq}")
+        drone.mav.mission_request_int_send(drone.target_system, drone.target_component, seq, **fields)
+        in_flight[seq] = loop.time()
+
+    with vehicle.stream(['MISSION_ITEM_INT', 'MISSION_ACK'], maxsize=1024) as events:
+        while not mission.complete:
+            now = loop.time()
+            for seq, requested_at in list(in_flight.items()):
+                if now - requested_at > request_timeout:
+                    del in_flight[seq]
+            for seq in mission.missing():
+                if len(in_flight) >= window:
+                    break
+                if int(seq) not in in_flight:
+                    request(int(seq))
+
+            expires = min(in_flight.values()) + request_timeout - loop.time()
+            msg = await events.get(timeout=max(0.0, expires))
+            if msg is None or not _is_mission_type(msg, mission_type):
+                continue
+            if msg.get_type() == 'MISSION_ACK':
+                if window == 1:
+                    raise CommandError(f"Mission download refused: {mission_result_name(msg.type)}")
+                print(f"[MissionTransfer] Vehicle refused pipelined requests "
+                      f"({mission_result_name(msg.type)}) - one at a time")
+                window = 1
+                in_flight.clear()
+                if await request_mission_state(vehicle, mission_type) is None:
+                    raise CommandError("Mission download failed: no MISSION_COUNT")
+                continue
+            if msg.seq >= count or mission.received[msg.seq]:
+                continue    # stray or duplicate answer
+            mission.set_message(msg)
+            in_flight.pop(msg.seq, None)
+            if on_progress is not None:
+                on_progress(int(mission.received.sum()), count)
+
+    end_mission_download(vehicle, mission_type)
+    retries = sum(attempts.values()) - count
+    print(f"[MissionTransfer] ✅ Downloaded {count} items in {time.monotonic() - start:.2f}s "
+          f"({retries} re-requests)")
+    return mission
@@ -0,0 +1,259 @@
+"""
+Mission Validation - feasibility check of a planned mission
+The whole waypoint list is checked at once as NumPy arrays: haversine leg
+lengths, the climb/descent rate each leg needs at its speed, altitude limits,
+turn angles, total distance, flight time and the battery it takes (from the
+SYS_STATUS battery_remaining/current_battery telemetry). 10,000 waypoints
+take a few milliseconds, so MissionValidator re-runs it on every edit of
+droneModel.waypointList.
+"""
+import time
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtProperty, pyqtSignal, pyqtSlot
+from pymavlink import mavutil
+
+from modules.waypoint_model import EARTH_RADIUS
+
+
+DEFAULT_LIMITS = {
+    'min_altitude': 2.0,           # m above home, except for LAND
+    'max_altitude': 120.0,         # m above home
+    'max_climb_rate': 2.5,         # m/s (ArduCopter WPNAV_SPEED_UP)
+    'max_descent_rate': 1.5,       # m/s (WPNAV_SPEED_DN)
+    'max_turn_angle': 120.0,       # degrees
+    'battery_reserve': 20.0,       # % left on landing
+    'battery_capacity': 5000.0,    # mAh (BATT_CAPACITY when known)
+    'cruise_current': 15.0,        # A, used while the reported draw is an idle one
+    'flying_current': 3.0,         # A, reported draw above this is taken as flight draw
+    'nominal_voltage': 14.8,       # V, when voltage_battery is not reported
+    'default_speed': 5.0,          # m/s
+}
+
+MAX_LISTED_ISSUES = 5
+
+
+class BatteryState:
+    """battery_remaining (%), voltage_battery (V), current_battery (A); None when not reported"""
+
+    def __init__(self, remaining=None, voltage=None, current=None):
+        self.remaining = remaining
+        self.voltage = voltage
+        self.current = current
+
+    @classmethod
+    def from_telemetry(cls, telemetry):
+        remaining = telemetry.get('battery_remaining')
+        voltage = telemetry.get('voltage_battery')
+        if not remaining and not voltage:
+            # Placeholder zeros until the first SYS_STATUS
+            remaining = None
+        return cls(remaining, voltage, telemetry.get('current_battery'))
+
+
+class MissionReport:
+    """Per-leg arrays and totals of one validation"""
+
+    def __init__(self):
+        self.leg_lengths = np.zeros(0)     # m, horizontal
+        self.leg_times = np.zeros(0)       # s
+        self.climb_rates = np.zeros(0)     # m/s as flown, + up
+        self.turn_angles = np.zeros(0)     # degrees, at each inner waypoint
+        self.total_distance = 0.0
+        self.flight_time = 0.0
+        self.energy_wh = None
+        self.battery_used = None           # % of capacity
+        self.battery_after = None          # % left on landing
+        self.errors = []
+        self.warnings = []
+        self.elapsed = 0.0
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def summary(self):
+        """Plain values for QML"""
+        return {
+            'valid': self.valid,
+            'legs': len(self.leg_lengths),
+            'totalDistance': self.total_distance,
+            'flightTime': self.flight_time,
+            'energyWh': -1.0 if self.energy_wh is None else self.energy_wh,
+            'batteryUsed': -1.0 if self.battery_used is None else self.battery_used,
+            'batteryAfter': -1.0 if self.battery_after is None else self.battery_after,
+            'maxClimbRate': max(0.0, float(self.climb_rates.max())) if len(self.climb_rates) else 0.0,
+            'maxDescentRate': max(0.0, float(-self.climb_rates.min())) if len(self.climb_rates) else 0.0,
+            'maxTurnAngle': float(self.turn_angles.max()) if len(self.turn_angles) else 0.0,
+            'errors': list(self.errors),
+            'warnings': list(self.warnings),
+            'elapsedMs': 1000.0 * self.elapsed,
+        }
+
+
+def _rows(indices):
+    listed = ', '.join(str(int(i) + 1) for i in indices[:MAX_LISTED_ISSUES])
+    return listed + (f" (+{len(indices) - MAX_LISTED_ISSUES} more)" if len(indices) > MAX_LISTED_ISSUES else "")
+
+
+def leg_geometry(lat, lon):
+    """Haversine lengths (m) and initial bearings (rad) of the legs between consecutive points"""
+    phi = np.radians(lat)
+    lam = np.radians(lon)
+    dphi = np.diff(phi)
+    dlam = np.diff(lam)
+    cos_phi = np.cos(phi)
+    a = np.sin(dphi / 2) ** 2 + cos_phi[:-1] * cos_phi[1:] * np.sin(dlam / 2) ** 2
+    lengths = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    bearings = np.arctan2(np.sin(dlam) * cos_phi[1:],
+                          cos_phi[:-1] * np.sin(phi[1:]) - np.sin(phi[:-1]) * cos_phi[1:] * np.cos(dlam))
+    return lengths, bearings
+
+
+def validate_mission(lat, lon, alt, speed=None, hold_time=None, command=None, battery=None, limits=None):
+    """Check a waypoint list given as arrays (speeds in m/s, hold times in s); returns a MissionReport"""
+    started = time.perf_counter()
+    limits = dict(DEFAULT_LIMITS, **(limits or {}))
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    alt = np.asarray(alt, dtype=np.float64)
+    count = len(lat)
+    speed = np.full(count, limits['default_speed']) if speed is None else np.asarray(speed, dtype=np.float64)
+    hold_time = np.zeros(count) if hold_time is None else np.asarray(hold_time, dtype=np.float64)
+    report = MissionReport()
+
+    # Altitude limits (LAND may go below the minimum)
+    landing = np.zeros(count, dtype=bool) if command is None else \
+        np.asarray(command) == mavutil.mavlink.MAV_CMD_NAV_LAND
+    too_low = np.flatnonzero((alt < limits['min_altitude']) & ~landing)
+    too_high = np.flatnonzero(alt > limits['max_altitude'])
+    if len(too_low):
+        report.errors.append(f"Below {limits['min_altitude']:.0f} m: waypoint {_rows(too_low)}")
+    if len(too_high):
+        report.errors.append(f"Above {limits['max_altitude']:.0f} m: waypoint {_rows(too_high)}")
+    slow = np.flatnonzero(speed <= 0)
+    if len(slow):
+        report.warnings.append(f"No speed set: waypoint {_rows(slow)} (using {limits['default_speed']:.0f} m/s)")
+        speed = np.where(speed > 0, speed, limits['default_speed'])
+
+    if count >= 2:
+        lengths, bearings = leg_geometry(lat, lon)
+        climbs = np.diff(alt)
+        # Each leg is flown at its destination's speed, slowed down where the climb needs longer
+        horizontal_times = lengths / speed[1:]
+        vertical_times = np.where(climbs >= 0, climbs / limits['max_climb_rate'],
+                                  -climbs / limits['max_descent_rate'])
+        leg_times = np.maximum(horizontal_times, vertical_times)
+        # Rate the leg's speed would need; straight up/down legs are flown at the limit anyway
+        needed = np.divide(climbs, horizontal_times, out=np.zeros_like(climbs), where=lengths > 0.5)
+        steep_up = np.flatnonzero(needed > limits['max_climb_rate'])
+        steep_down = np.flatnonzero(needed < -limits['max_descent_rate'])
+        if len(steep_up):
+            report.warnings.append(f"Climb faster than {limits['max_climb_rate']} m/s needed to waypoint "
+                                   f"{_rows(steep_up + 1)} - the vehicle will slow down")
+        if len(steep_down):
+            report.warnings.append(f"Descent faster than {limits['max_descent_rate']} m/s needed to waypoint "
+                                   f"{_rows(steep_down + 1)} - the vehicle will slow down")
+
+        # Turn at each inner waypoint between two legs that have a direction
+        turns = np.degrees(np.abs((np.diff(bearings) + np.pi) % (2 * np.pi) - np.pi))
+        moving = lengths > 0.5
+        turns = np.where(moving[:-1] & moving[1:], turns, 0.0)
+        sharp = np.flatnonzero(turns > limits['max_turn_angle'])
+        if len(sharp):
+            report.warnings.append(f"Turn sharper than {limits['max_turn_angle']:.0f}° at waypoint {_rows(sharp + 1)}")
+
+        report.leg_lengths = lengths
+        report.leg_times = leg_times
+        report.climb_rates = np.divide(climbs, leg_times, out=np.zeros_like(climbs), where=leg_times > 0)
+        report.turn_angles = turns
+        report.total_distance = float(lengths.sum())
+        report.flight_time = float(leg_times.sum())
+    report.flight_time += float(hold_time.sum())
+
+    _estimate_energy(report, battery, limits)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _estimate_energy(report, battery, limits):
+    if battery is None:
+        return
+    # Flight draw: the reported current while flying, else the configured cruise current
+    draw = battery.current if battery.current is not None and battery.current > limits['flying_current'] \
+        else limits['cruise_current']
+    voltage = battery.voltage if battery.voltage else limits['nominal_voltage']
+    charge_ah = draw * report.flight_time / 3600.0
+    report.energy_wh = charge_ah * voltage
+    report.battery_used = 100.0 * charge_ah * 1000.0 / limits['battery_capacity']
+    if battery.remaining is None:
+        report.warnings.append("Battery level unknown - energy not checked")
+        return
+    report.battery_after = battery.remaining - report.battery_used
+    if report.battery_after < limits['battery_reserve']:
+        report.errors.append(f"Needs {report.battery_used:.0f}% battery, {battery.remaining:.0f}% left "
+                             f"(reserve {limits['battery_reserve']:.0f}%)")
+
+
+def validate_items(items, speed=None, battery=None, limits=None):
+    """Check mission item dicts (build_mission_items); hold times are param1 of NAV_WAYPOINT/LOITER_TIME"""
+    count = len(items)
+    command = np.fromiter((item['command'] for item in items), dtype=np.int64, count=count)
+    param1 = np.fromiter((item['param1'] for item in items), dtype=np.float64, count=count)
+    holds = np.isin(command, (mavutil.mavlink.MAV_CMD_NAV_WAYPOINT, mavutil.mavlink.MAV_CMD_NAV_LOITER_TIME))
+    return validate_mission(
+        np.fromiter((item['x'] for item in items), dtype=np.float64, count=count),
+        np.fromiter((item['y'] for item in items), dtype=np.float64, count=count),
+        np.fromiter((item['z'] for item in items), dtype=np.float64, count=count),
+        speed, np.where(holds, param1, 0.0), command, battery, limits
+    )
+
+
+class MissionValidator(QObject):
+    """Re-validates a WaypointListModel after every edit and on battery telemetry; report is a plain map"""
+
+    reportChanged = pyqtSignal()
+
+    def __init__(self, waypoint_list, telemetry, parent=None):
+        super().__init__(parent)
+        self._waypoints = waypoint_list
+        self._telemetry = telemetry
+        self._limits = {}
+        self._report = MissionReport()
+        self._summary = self._report.summary()
+        for signal in (waypoint_list.modelReset, waypoint_list.rowsInserted, waypoint_list.rowsRemoved,
+                       waypoint_list.rowsMoved, waypoint_list.dataChanged):
+            signal.connect(self.revalidate)
+
+    @property
+    def last_report(self):
+        return self._report
+
+    def set_limits(self, **limits):
+        self._limits.update(limits)
+        self.revalidate()
+
+    def check_items(self, items, speed=None):
+        """validate_items with this validator's limits and the current battery telemetry"""
+        return validate_items(items, speed, BatteryState.from_telemetry(self._telemetry), self._limits)
+
+    @pyqtSlot(float)
+    def setBatteryCapacity(self, capacity_mah):
+        if capacity_mah > 0:
+            self.set_limits(battery_capacity=capacity_mah)
+
+    @pyqtSlot()
+    def revalidate(self, *args):
+        points = self._waypoints.points
+        if len(points) == 0:
+            self._report = MissionReport()
+        else:
+            self._report = validate_mission(points['lat'], points['lon'], points['altitude'], points['speed'],
+                                            points['hold_time'], points['command'],
+                                            BatteryState.from_telemetry(self._telemetry), self._limits)
+        self._summary = self._report.summary()
+        self.reportChanged.emit()
+
+    @pyqtProperty('QVariantMap', notify=reportChanged)
+    def report(self):
+        return self._summary
@@ -0,0 +1,274 @@
+"""
+Outbound Writer - every MAVLink frame leaves through one thread
+Installed on a connection, it takes over connection.write: frames encoded by
+any thread are queued by priority (control > normal > bulk), frames queued
+together are coalesced into one write() and, on a rate-limited link (serial
+radio), bulk traffic only gets a share of the bandwidth so control commands
+never wait behind a parameter or mission transfer.
+"""
+import struct
+import threading
+import time
+from collections import deque
+
+from pymavlink import mavutil
+
+from modules.mavlink_prefilter import PROTOCOL_MARKER_V1, PROTOCOL_MARKER_V2
+
+
+PRIORITY_CONTROL = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = ('control', 'normal', 'bulk')
+
+_mav = mavutil.mavlink
+
+CONTROL_MESSAGES = frozenset(getattr(_mav, 'MAVLINK_MSG_ID_' + name) for name in (
+    'HEARTBEAT', 'SET_MODE', 'MANUAL_CONTROL', 'RC_CHANNELS_OVERRIDE',
+))
+
+CONTROL_COMMANDS = frozenset(getattr(_mav, name) for name in (
+    'MAV_CMD_COMPONENT_ARM_DISARM', 'MAV_CMD_NAV_LAND', 'MAV_CMD_NAV_RETURN_TO_LAUNCH',
+    'MAV_CMD_DO_SET_MODE', 'MAV_CMD_DO_FLIGHTTERMINATION', 'MAV_CMD_NAV_TAKEOFF',
+))
+
+BULK_MESSAGES = frozenset(getattr(_mav, 'MAVLINK_MSG_ID_' + name) for name in (
+    'PARAM_SET', 'PARAM_REQUEST_READ', 'PARAM_REQUEST_LIST',
+    'MISSION_ITEM', 'MISSION_ITEM_INT', 'MISSION_COUNT', 'MISSION_REQUEST_LIST',
+    'MISSION_REQUEST', 'MISSION_REQUEST_INT', 'MISSION_CLEAR_ALL',
+    'FILE_TRANSFER_PROTOCOL', 'LOG_REQUEST_LIST', 'LOG_REQUEST_DATA',
+))
+
+_COMMAND_MSGIDS = (_mav.MAVLINK_MSG_ID_COMMAND_LONG, _mav.MAVLINK_MSG_ID_COMMAND_INT)
+_COMMAND_OFFSETS = {
+    _mav.MAVLINK_MSG_ID_COMMAND_LONG: 28,     # after param1..7 (float)
+    _mav.MAVLINK_MSG_ID_COMMAND_INT: 28,      # after param1..4, x, y (int32), z
+}
+
+
+def frame_priority(frame):
+    """Priority of one encoded frame, read from its header (and command id)"""
+    if frame[0] == PROTOCOL_MARKER_V2 and len(frame) >= 10:
+        msgid = frame[7] | (frame[8] << 8) | (frame[9] << 16)
+        payload = frame[10:10 + frame[1]]
+    elif frame[0] == PROTOCOL_MARKER_V1 and len(frame) >= 6:
+        msgid = frame[5]
+        payload = frame[6:6 + frame[1]]
+    else:
+        return PRIORITY_NORMAL
+
+    if msgid in CONTROL_MESSAGES:
+        return PRIORITY_CONTROL
+    if msgid in BULK_MESSAGES:
+        return PRIORITY_BULK
+    if msgid in _COMMAND_MSGIDS:
+        offset = _COMMAND_OFFSETS[msgid]
+        # MAVLink 2 truncates trailing zero bytes of the payload
+        payload = bytes(payload).ljust(offset + 2, b'\x00')
+        command = struct.unpack_from('<H', payload, offset)[0]
+        if command in CONTROL_COMMANDS:
+            return PRIORITY_CONTROL
+    return PRIORITY_NORMAL
+
+
+def link_rate_for(connection):
+    """Usable bytes/s of a serial link (8N1 = 10 bits per byte); None for network links"""
+    if isinstance(connection, mavutil.mavserial) and getattr(connection, 'baud', None):
+        return connection.baud / 10.0
+    return None
+
+
+class _Budget:
+    """Token bucket in bytes; rate None = unlimited"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def allows(self, size):
+        return self.rate is None or self.tokens >= min(size, self.capacity)
+
+    def charge(self, size):
+        if self.rate is not None:
+            self.tokens -= size
+
+    def wait_for(self, size):
+        if self.rate is None or self.tokens >= size:
+            return 0.0
+        return (min(size, self.capacity) - self.tokens) / self.rate
+
+
+class OutboundWriter:
+    """
+    Single writer for one connection. Any thread may send through
+    connection.mav.*_send() once installed; frames are written by this
+    writer's thread only.
+    """
+
+    def __init__(self, connection, link_rate=None, bulk_share=0.8, burst_seconds=0.1,
+                 max_batch_bytes=1400):
+        self.connection = connection
+        # bytes/s the link carries (None = unlimited, e.g. UDP/TCP)
+        self.link_rate = link_rate if link_rate is not None else link_rate_for(connection)
+        self.bulk_share = bulk_share
+        # One UDP datagram per write by default
+        self.max_batch_bytes = max_batch_bytes
+
+        burst = max(280.0, (self.link_rate or 0) * burst_seconds)
+        self._link_budget = _Budget(self.link_rate, burst)
+        self._bulk_budget = _Budget(self.link_rate * bulk_share if self.link_rate else None, burst)
+
+        self._queues = tuple(deque() for _ in PRIORITY_NAMES)
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._write = None
+        self._mav = None
+        self._mav_send = None
+        self._thread = None
+        self._running = False
+
+        # Per-priority accounting
+        self.frames = [0] * len(PRIORITY_NAMES)
+        self.bytes = [0] * len(PRIORITY_NAMES)
+        self.max_wait = [0.0] * len(PRIORITY_NAMES)
+        self.writes = 0
+        self.started_at = None
+
+    # ---------- lifecycle ----------
+
+    def install(self):
+        """Route connection.write through the queue and start the writer thread"""
+        if self._thread is not None:
+            return
+        self._write = self.connection.write
+        self.connection.write = self.write
+        self._guard_encoder()
+        self._running = True
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='MAVLinkWriter', daemon=True)
+        self._thread.start()
+        print(f"[OutboundWriter] ✅ Installed (link rate: "
+              f"{'unlimited' if self.link_rate is None else f'{self.link_rate:.0f} B/s'})")
+
+    def uninstall(self, flush_timeout=1.0):
+        """Flush what is queued (bounded by flush_timeout) and give connection.write back"""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + flush_timeout
+        with self._cond:
+            while any(self._queues) and time.monotonic() < deadline:
+                self._cond.wait(0.02)
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self.connection.__dict__.pop('write', None)
+        self._unguard_encoder()
+
+    def _guard_encoder(self):
+        # Sequence numbers are assigned while encoding: serialise mav.send across threads
+        mav = self.connection.mav
+        if mav is self._mav:
+            return
+        self._unguard_encoder()
+        self._mav = mav
+        self._mav_send = mav.send
+
+        def send(mavmsg, force_mavlink1=False):
+            with self._send_lock:
+                return self._mav_send(mavmsg, force_mavlink1=force_mavlink1)
+
+        mav.send = send
+
+    def _unguard_encoder(self):
+        if self._mav is not None:
+            self._mav.__dict__.pop('send', None)
+            self._mav = None
+            self._mav_send = None
+
+    # ---------- producers (any thread) ----------
+
+    def write(self, buf):
+        # pymavlink replaces connection.mav on a MAVLink 1 -> 2 switch
+        if self.connection.mav is not self._mav:
+            self._guard_encoder()
+        frame = bytes(buf)
+        priority = frame_priority(frame)
+        with self._cond:
+            self._queues[priority].append((time.monotonic(), frame))
+            self._cond.notify()
+
+    def queued(self):
+        with self._cond:
+            return [len(queue) for queue in self._queues]
+
+    # ---------- writer thread ----------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not any(self._queues):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                batch, wait = self._take_batch()
+                if not batch:
+                    # Budget exhausted: sleep until enough bytes are available
+                    self._cond.wait(wait)
+                    continue
+            try:
+                self._write(b''.join(batch))
+                self.writes += 1
+            except Exception as e:
+                print(f"[OutboundWriter] ⚠️ Write failed: {e}")
+            with self._cond:
+                self._cond.notify_all()
+
+    def _take_batch(self):
+        now = time.monotonic()
+        self._link_budget.refill(now)
+        self._bulk_budget.refill(now)
+        batch = []
+        size = 0
+        wait = 0.05
+        for priority, queue in enumerate(self._queues):
+            while queue:
+                frame = queue[0][1]
+                if batch and size + len(frame) > self.max_batch_bytes:
+                    return batch, 0.0
+                budgets = [self._link_budget] if priority != PRIORITY_BULK else [self._link_budget, self._bulk_budget]
+                # Control frames always go; they only push the budget into debt
+                if priority != PRIORITY_CONTROL and not all(b.allows(len(frame)) for b in budgets):
+                    wait = min(wait, max(b.wait_for(len(frame)) for b in budgets))
+                    break
+                queued_at, frame = queue.popleft()
+                for budget in budgets:
+                    budget.charge(len(frame))
+                batch.append(frame)
+                size += len(frame)
+                self.frames[priority] += 1
+                self.bytes[priority] += len(frame)
+                self.max_wait[priority] = max(self.max_wait[priority], now - queued_at)
+        return batch, max(wait, 0.001)
+
+    # ---------- accounting ----------
+
+    def stats(self):
+        """Frames, bytes, average bytes/s and worst queueing delay per priority"""
+        elapsed = max(1e-6, time.monotonic() - (self.started_at or time.monotonic()))
+        return {
+            name: {
+                'frames': self.frames[index],
+                'bytes': self.bytes[index],
+                'bytes_per_s': self.bytes[index] / elapsed,
+                'max_wait_ms': 1000 * self.max_wait[index],
+            }
+            for index, name in enumerate(PRIORITY_NAMES)
+        }
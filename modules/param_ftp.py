@@ -0,0 +1,125 @@
+"""
+Param FTP - the whole parameter set as one file
+ArduPilot serves its parameters as the virtual file @PARAM/param.pck over
+MAVFTP: a 6-byte header (magic, count, total) and one packed entry per
+parameter - type and flags, the length of the name prefix shared with the
+previous entry, the rest of the name, the value and, with ?withdefaults=1,
+the default when it differs. Zero bytes between entries are padding.
+A vehicle without MAVFTP falls back to PARAM_REQUEST_LIST.
+"""
+import struct
+
+from pymavlink import mavutil
+
+from modules.mavftp import FtpError, read_file
+from modules.param_transfer import fetch_params, make_param_record
+
+
+PARAM_FILE = '@PARAM/param.pck?withdefaults=1'
+
+MAGIC = 0x671b
+MAGIC_DEFAULTS = 0x671c
+HEADER = struct.Struct('<HHH')
+FLAG_DEFAULT = 1
+
+# AP_Param type -> (struct format, MAV_PARAM_TYPE)
+PACKED_TYPES = {
+    1: ('<b', mavutil.mavlink.MAV_PARAM_TYPE_INT8),
+    2: ('<h', mavutil.mavlink.MAV_PARAM_TYPE_INT16),
+    3: ('<i', mavutil.mavlink.MAV_PARAM_TYPE_INT32),
+    4: ('<f', mavutil.mavlink.MAV_PARAM_TYPE_REAL32),
+}
+MAV_TO_PACKED = {mav_type: packed for packed, (_, mav_type) in PACKED_TYPES.items()}
+
+
+def unpack_param_file(data):
+    """[(name, MAV_PARAM_TYPE, value, default or None)] in index order, and the vehicle's total"""
+    if len(data) < HEADER.size:
+        raise FtpError("Parameter file truncated")
+    magic, count, total = HEADER.unpack_from(data)
+    if magic not in (MAGIC, MAGIC_DEFAULTS):
+        raise FtpError(f"Not a parameter file (magic {magic:#06x})")
+    with_defaults = magic == MAGIC_DEFAULTS
+    entries = []
+    name = b''
+    pos = HEADER.size
+    end = len(data)
+    while pos < end:
+        if data[pos] == 0:
+            pos += 1        # padding
+            continue
+        if pos + 2 > end:
+            raise FtpError("Parameter file truncated")
+        kind, lengths = data[pos], data[pos + 1]
+        packed = kind & 0x0F
+        if packed not in PACKED_TYPES:
+            raise FtpError(f"Unknown parameter type {packed} in parameter file")
+        fmt, mav_type = PACKED_TYPES[packed]
+        width = struct.calcsize(fmt)
+        common = lengths & 0x0F
+        suffix = (lengths >> 4) + 1
+        has_default = with_defaults and (kind >> 4) & FLAG_DEFAULT
+        pos += 2
+        name = name[:common] + data[pos:pos + suffix]
+        pos += suffix
+        if pos + width * (2 if has_default else 1) > end:
+            raise FtpError("Parameter file truncated")
+        value = struct.unpack_from(fmt, data, pos)[0]
+        pos += width
+        default = None
+        if has_default:
+            default = struct.unpack_from(fmt, data, pos)[0]
+            pos += width
+        elif with_defaults:
+            default = value
+        entries.append((name.decode('ascii'), mav_type, value, default))
+    if len(entries) != count:
+        raise FtpError(f"Parameter file holds {len(entries)} of {count} entries")
+    return entries, total
+
+
+def pack_param_file(entries):
+    """param.pck for [(name, MAV_PARAM_TYPE, value, default or None)]; defaults included when any is given"""
+    with_defaults = any(default is not None for *_, default in entries)
+    out = bytearray(HEADER.pack(MAGIC_DEFAULTS if with_defaults else MAGIC, len(entries), len(entries)))
+    previous = b''
+    for name, mav_type, value, default in entries:
+        name = name.encode('ascii')
+        packed = MAV_TO_PACKED.get(int(mav_type), 4)
+        fmt = PACKED_TYPES[packed][0]
+        if fmt != '<f':
+            value, default = int(value), None if default is None else int(default)
+        common = 0
+        while common < min(len(name) - 1, len(previous), 15) and name[common] == previous[common]:
+            common += 1
+        suffix = name[common:]
+        flags = FLAG_DEFAULT if default is not None and default != value else 0
+        out += bytes((packed | flags << 4, common | (len(suffix) - 1) << 4)) + suffix
+        out += struct.pack(fmt, value)
+        if flags:
+            out += struct.pack(fmt, default)
+        previous = name
+    return bytes(out)
+
+
+async def fetch_params_ftp(vehicle, path=PARAM_FILE, **read_options):
+    """Every parameter from param.pck; returns {name: record} like fetch_params, raises FtpError"""
+    vehicle.feedback("Loading parameters over MAVFTP...")
+    entries, total = unpack_param_file(await read_file(vehicle, path, **read_options))
+    if len(entries) != total:
+        raise FtpError(f"Parameter file holds {len(entries)} of {total} parameters")
+    return {name: make_param_record(name, value, mav_type, index, total, default)
+            for index, (name, mav_type, value, default) in enumerate(entries)}
+
+
+async def download_params(vehicle, ftp=True, **list_options):
+    """Every parameter: param.pck over MAVFTP, else the PARAM_REQUEST_LIST stream"""
+    if ftp:
+        try:
+            # A vehicle without MAVFTP stays silent: give up on the open quickly
+            params = await fetch_params_ftp(vehicle, open_timeout=0.5)
+            print(f"[ParamFTP] ✅ {len(params)} parameters from {PARAM_FILE}")
+            return params
+        except FtpError as e:
+            print(f"[ParamFTP] ⚠️ {e} - falling back to PARAM_REQUEST_LIST")
+    return await fetch_params(vehicle, **list_options)
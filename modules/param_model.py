@@ -0,0 +1,277 @@
+"""
+Param Model - vehicle parameters as a table for Parameters.qml
+ParamTableModel keeps the set in compact arrays (names in a list, value,
+default, type, index and synced flag in one NumPy structured array) and
+reports changes row by row: a changed value emits dataChanged for that row
+only, and parameters arriving while the list streams are appended in
+batches. ParamFilterModel sorts it for the view and filters it through a
+ParamSearchIndex, listing matches best first while a search is typed.
+"""
+import numpy as np
+from PyQt5.QtCore import (QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, pyqtProperty,
+                          pyqtSignal, pyqtSlot)
+
+from modules.param_search import ParamSearchIndex
+
+
+PARAM_DTYPE = np.dtype([
+    ('value', '<f8'), ('default', '<f8'), ('float', '?'), ('index', '<i4'), ('synced', '?'),
+])
+
+COLUMNS = ('name', 'value', 'default', 'type', 'index')
+
+
+def _row_values(record):
+    default = record.get('default')
+    return (float(record['value']), float(default) if default else 0.0, record.get('type', 'FLOAT') == 'FLOAT',
+            int(record.get('index', -1)), bool(record.get('synced', True)))
+
+
+def _runs(rows):
+    """Sorted rows as (first, last) runs of consecutive rows"""
+    rows = np.asarray(rows)
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    return zip(rows[np.r_[0, breaks + 1]], rows[np.r_[breaks, len(rows) - 1]])
+
+
+class ParamTableModel(QAbstractTableModel):
+    """Columns name, value, default, type, index; the roles below for QML delegates"""
+
+    NameRole = Qt.UserRole + 1
+    ValueRole = Qt.UserRole + 2
+    DefaultRole = Qt.UserRole + 3
+    TypeRole = Qt.UserRole + 4
+    IndexRole = Qt.UserRole + 5
+    SyncedRole = Qt.UserRole + 6
+
+    countChanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names = []
+        self._rows = {}         # name -> row
+        self._params = np.zeros(0, dtype=PARAM_DTYPE)
+
+    # ---------- Qt model ----------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._names):
+            return None
+        row = index.row()
+        param = self._params[row]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            column = COLUMNS[index.column()]
+            if role == Qt.EditRole and column in ('value', 'default'):
+                return float(param[column])     # numeric sort
+            role = self.NameRole + index.column()
+        if role == self.NameRole:
+            return self._names[row]
+        elif role == self.ValueRole:
+            return str(float(param['value']))
+        elif role == self.DefaultRole:
+            return str(float(param['default']))
+        elif role == self.TypeRole:
+            return "FLOAT" if param['float'] else "INT32"
+        elif role == self.IndexRole:
+            return int(param['index'])
+        elif role == self.SyncedRole:
+            return bool(param['synced'])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(COLUMNS):
+            return COLUMNS[section].capitalize()
+        return None
+
+    def roleNames(self):
+        return {
+            self.NameRole: b'name',
+            self.ValueRole: b'value',
+            self.DefaultRole: b'default',
+            self.TypeRole: b'type',
+            self.IndexRole: b'paramIndex',
+            self.SyncedRole: b'synced',
+        }
+
+    def _rows_changed(self, rows):
+        for first, last in _runs(rows):
+            self.dataChanged.emit(self.index(int(first), 0), self.index(int(last), len(COLUMNS) - 1))
+
+    # ---------- updates (GUI thread) ----------
+
+    def upsert_records(self, records):
+        """Update existing rows (dataChanged for the changed ones) and append new ones in one insert"""
+        changed = []
+        new_names = []
+        new_values = []
+        for record in records:
+            name = record['name']
+            values = _row_values(record)
+            row = self._rows.get(name)
+            if row is None:
+                self._rows[name] = len(self._names) + len(new_names)
+                new_names.append(name)
+                new_values.append(values)
+            elif self._params[row].tolist() != values:
+                self._params[row] = values
+                changed.append(row)
+        if changed:
+            self._rows_changed(sorted(changed))
+        if new_names:
+            first = len(self._names)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_names) - 1)
+            self._names.extend(new_names)
+            self._params = np.concatenate((self._params, np.array(new_values, dtype=PARAM_DTYPE)))
+            self.endInsertRows()
+            self.countChanged.emit()
+
+    def replace_records(self, records):
+        """The complete set: rows of other names are dropped, the rest updated in place"""
+        records = list(records)
+        names = {record['name'] for record in records}
+        if names.issuperset(self._names):
+            self.upsert_records(records)
+            return
+        self.beginResetModel()
+        self._names = [record['name'] for record in records]
+        self._rows = {name: row for row, name in enumerate(self._names)}
+        self._params = np.array([_row_values(record) for record in records], dtype=PARAM_DTYPE)
+        self.endResetModel()
+        self.countChanged.emit()
+
+    def set_value(self, name, value, synced=True):
+        """One parameter's value; returns False for an unknown name"""
+        row = self._rows.get(name)
+        if row is None:
+            return False
+        param = self._params[row:row + 1]
+        if param['value'][0] != float(value) or param['synced'][0] != synced:
+            param['value'] = float(value)
+            param['synced'] = synced
+            self._rows_changed([row])
+        return True
+
+    def clear(self):
+        self.replace_records([])
+
+    def names(self):
+        """Parameter names by row"""
+        return list(self._names)
+
+    # ---------- QML ----------
+
+    @pyqtProperty(int, notify=countChanged)
+    def count(self):
+        return len(self._names)
+
+    @pyqtSlot(str, result=int)
+    def rowOf(self, name):
+        return self._rows.get(name, -1)
+
+    @pyqtSlot(int, result='QVariantMap')
+    def get(self, row):
+        if not 0 <= row < len(self._names):
+            return {}
+        index = self.index(row, 0)
+        return {role_name.decode(): self.data(index, role) for role, role_name in self.roleNames().items()}
+
+    @pyqtSlot(str, bool, result=bool)
+    def setSynced(self, name, synced):
+        row = self._rows.get(name)
+        return row is not None and self.set_value(name, self._params['value'][row], synced)
+
+
+class ParamFilterModel(QSortFilterProxyModel):
+    """Column sort over a ParamTableModel; with filterText, the search matches by relevance"""
+
+    filterTextChanged = pyqtSignal()
+    countChanged = pyqtSignal()
+
+    def __init__(self, table, parent=None):
+        super().__init__(parent)
+        self._filter_text = ""
+        self._index = ParamSearchIndex()
+        self._ranks = None          # source row -> position in the search results, None without a search
+        self._descriptions = {}     # name -> description, kept across parameter sets
+        self.setSourceModel(table)
+        self.setSortRole(Qt.EditRole)
+        self.setDynamicSortFilter(True)
+        self.sort(COLUMNS.index('index'), Qt.AscendingOrder)
+        table.rowsInserted.connect(self._index_rows)
+        table.modelReset.connect(self._reindex)
+        self._reindex()
+        for signal in (self.rowsInserted, self.rowsRemoved, self.modelReset, self.layoutChanged):
+            signal.connect(self.countChanged)
+
+    # ---------- search ----------
+
+    def _index_rows(self, parent, first, last):
+        names = self.sourceModel().names()
+        for row in range(first, last + 1):
+            self._index.add(row, names[row], self._descriptions.get(names[row], ""))
+        if self._ranks is not None:
+            self._search()
+
+    def _reindex(self):
+        self._index.clear()
+        for row, name in enumerate(self.sourceModel().names()):
+            self._index.add(row, name, self._descriptions.get(name, ""))
+        if self._ranks is not None:
+            self._search()
+
+    def _search(self):
+        if self._filter_text.strip():
+            self._ranks = {row: rank for rank, row in enumerate(self._index.search(self._filter_text))}
+        else:
+            self._ranks = None
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._ranks is None or source_row in self._ranks
+
+    def lessThan(self, left, right):
+        if self._ranks is None:
+            return super().lessThan(left, right)
+        # Best match first whichever way the column sorts
+        left_rank, right_rank = self._ranks.get(left.row(), -1), self._ranks.get(right.row(), -1)
+        return left_rank < right_rank if self.sortOrder() == Qt.AscendingOrder else left_rank > right_rank
+
+    @pyqtProperty(int, notify=countChanged)
+    def count(self):
+        return self.rowCount()
+
+    @pyqtProperty(str, notify=filterTextChanged)
+    def filterText(self):
+        return self._filter_text
+
+    @filterText.setter
+    def filterText(self, text):
+        if text != self._filter_text:
+            self._filter_text = text
+            self._search()
+            self.filterTextChanged.emit()
+
+    @pyqtSlot('QVariantMap')
+    def setDescriptions(self, descriptions):
+        """Parameter descriptions by name, searched along with the names"""
+        self._descriptions.update(descriptions)
+        for row, name in enumerate(self.sourceModel().names()):
+            if name in descriptions:
+                self._index.set_description(row, descriptions[name])
+        if self._ranks is not None:
+            self._search()
+
+    @pyqtSlot(str, bool)
+    def sortBy(self, column, ascending=True):
+        if column in COLUMNS:
+            self.sort(COLUMNS.index(column), Qt.AscendingOrder if ascending else Qt.DescendingOrder)
+
+    @pyqtSlot(int, result='QVariantMap')
+    def get(self, row):
+        return self.sourceModel().get(self.mapToSource(self.index(row, 0)).row())
@@ -0,0 +1,167 @@
+"""
+Param Search - ranked parameter lookup as you type
+ParamSearchIndex keeps three indexes over a parameter set, by table row:
+a prefix trie over each name and over the rest of the name from each '_'
+(so "CAPA" finds BATT_CAPACITY and "RAT_RLL" finds ATC_RAT_RLL_P), a
+prefix trie over description words, and name trigrams for typo-tolerant
+matches. Rows are added and removed incrementally; a query walks the
+tries instead of scanning every parameter.
+"""
+import re
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Score of one query word by where it matched
+SCORE_NAME = 4          # the name starts with it
+SCORE_TOKEN = 3         # the name after one of its '_' starts with it
+SCORE_DESCRIPTION = 1   # a description word starts with it
+FUZZY_MIN_SIMILARITY = 0.4
+
+
+class _TrieNode:
+    __slots__ = ('children', 'rows')
+
+    def __init__(self):
+        self.children = {}
+        self.rows = {}          # row -> number of its keys through this node
+
+
+class _PrefixTrie:
+    """Keys to rows; rows(prefix) is every row with a key starting with prefix"""
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, key, row):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            node.rows[row] = node.rows.get(row, 0) + 1
+
+    def remove(self, key, row):
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None or row not in child.rows:
+                return
+            if child.rows[row] > 1:
+                child.rows[row] -= 1
+            else:
+                del child.rows[row]
+                if not child.rows:
+                    del node.children[char]
+                    return
+            node = child
+
+    def rows(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return ()
+        return node.rows.keys()
+
+
+def _trigrams(text):
+    text = f" {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ParamSearchIndex:
+    """Name/description search over table rows; search() returns rows best match first"""
+
+    def __init__(self):
+        self._names = {}            # row -> name
+        self._descriptions = {}     # row -> description
+        self._name_trie = _PrefixTrie()
+        self._token_trie = _PrefixTrie()
+        self._description_trie = _PrefixTrie()
+        self._trigrams = {}         # trigram -> rows
+        self._gram_counts = {}      # row -> number of trigrams of its name
+
+    def __len__(self):
+        return len(self._names)
+
+    @staticmethod
+    def _tokens(name):
+        """The name from each '_' on: atc_rat_rll_p -> rat_rll_p, rll_p, p"""
+        return {name[i + 1:] for i, char in enumerate(name) if char == '_' and i + 1 < len(name)}
+
+    def add(self, row, name, description=""):
+        if row in self._names:
+            self.remove(row)
+        key = name.lower()
+        self._names[row] = name
+        self._name_trie.add(key, row)
+        for token in self._tokens(key):
+            self._token_trie.add(token, row)
+        grams = _trigrams(key)
+        for trigram in grams:
+            self._trigrams.setdefault(trigram, set()).add(row)
+        self._gram_counts[row] = len(grams)
+        self.set_description(row, description)
+
+    def remove(self, row):
+        name = self._names.pop(row, None)
+        if name is None:
+            return
+        key = name.lower()
+        self._name_trie.remove(key, row)
+        for token in self._tokens(key):
+            self._token_trie.remove(token, row)
+        for trigram in _trigrams(key):
+            rows = self._trigrams[trigram]
+            rows.discard(row)
+            if not rows:
+                del self._trigrams[trigram]
+        del self._gram_counts[row]
+        self.set_description(row, "")
+
+    def set_description(self, row, description):
+        for word in set(_WORD.findall(self._descriptions.pop(row, "").lower())):
+            self._description_trie.remove(word, row)
+        if description and row in self._names:
+            self._descriptions[row] = description
+            for word in set(_WORD.findall(description.lower())):
+                self._description_trie.add(word, row)
+
+    def clear(self):
+        self.__init__()
+
+    def _word_scores(self, word):
+        scores = dict.fromkeys(self._description_trie.rows(word), SCORE_DESCRIPTION)
+        scores.update(dict.fromkeys(self._token_trie.rows(word), SCORE_TOKEN))
+        scores.update(dict.fromkeys(self._name_trie.rows(word), SCORE_NAME))
+        return scores
+
+    def _fuzzy(self, query):
+        """Rows whose name shares enough trigrams with query, as {row: Dice similarity}"""
+        grams = _trigrams(query)
+        shared = {}
+        for gram in grams:
+            for row in self._trigrams.get(gram, ()):
+                shared[row] = shared.get(row, 0) + 1
+        similarities = {row: 2 * count / (len(grams) + self._gram_counts[row]) for row, count in shared.items()}
+        return {row: similarity for row, similarity in similarities.items() if similarity >= FUZZY_MIN_SIMILARITY}
+
+    def search(self, query, limit=None, fuzzy=True):
+        """Rows matching every word of query (name, after-'_' or description prefix), best first"""
+        words = query.lower().split()
+        if not words:
+            return sorted(self._names)
+        scores = None
+        for word in words:
+            word_scores = self._word_scores(word)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {row: score + word_scores[row] for row, score in scores.items() if row in word_scores}
+            if not scores:
+                break
+        if fuzzy and not scores:
+            # Nothing matched exactly: a typo, ranked by trigram similarity
+            scores = self._fuzzy(query.lower().replace(' ', '_'))
+        names = self._names
+        ranked = sorted(scores, key=lambda row: (-scores[row], len(names[row]), names[row]))
+        return ranked if limit is None else ranked[:limit]
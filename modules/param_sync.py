@@ -0,0 +1,143 @@
+"""
+Param Sync - parameters from disk when the vehicle still has them
+The last full parameter set of each autopilot is kept on disk, keyed by
+its AUTOPILOT_VERSION identity (uid, else uid2, with the board version).
+On reconnect the vehicle's _HASH_CHECK - a CRC32 over every parameter
+name and value, answered to PARAM_REQUEST_READ('_HASH_CHECK', -1) - is
+compared with the one it reported for the cached set; the parameters are
+only downloaded again when they differ. ArduPilot has no _HASH_CHECK: it
+gets a plain full download with neither probe - over MAVFTP it costs about
+as much as reading a few values, and a sample cannot show that another GCS
+left the rest alone.
+"""
+import json
+import os
+import struct
+
+from pymavlink import mavutil
+
+from modules.param_ftp import download_params
+from modules.param_transfer import decode_param_id
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.tihanfly', 'params')
+
+HASH_PARAM = '_HASH_CHECK'
+
+
+def hash_from_value(param_value):
+    """The uint32 hash carried in the float param_value of the _HASH_CHECK PARAM_VALUE"""
+    return struct.unpack('<I', struct.pack('<f', param_value))[0]
+
+
+def identity_key(msg):
+    """Cache key from AUTOPILOT_VERSION, or None when it carries no unique id"""
+    board = f"board{msg.board_version:08x}"
+    if msg.uid:
+        return f"uid{msg.uid:016x}-{board}"
+    uid2 = bytes(getattr(msg, 'uid2', None) or b'')
+    if any(uid2):
+        return f"uid2{uid2.hex()}-{board}"
+    return None
+
+
+class ParamCache:
+    """Last full parameter set per autopilot, persisted as JSON"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._entries = {}
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """{'hash', 'count', 'params'} or None"""
+        if key not in self._entries:
+            try:
+                with open(self._path(key)) as f:
+                    self._entries[key] = json.load(f)
+            except (OSError, ValueError):
+                self._entries[key] = None
+        return self._entries[key]
+
+    def store(self, key, params, vehicle_hash):
+        entry = {'hash': vehicle_hash, 'count': len(params), 'params': params}
+        self._entries[key] = entry
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(entry, f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"[ParamSync] ⚠️ Could not save parameter cache: {e}")
+        return entry
+
+    def forget(self, key):
+        self._entries.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+async def request_identity(vehicle, timeout=1.0, retries=2):
+    """Cache key of the vehicle from AUTOPILOT_VERSION, or None"""
+    drone = vehicle.drone
+    with vehicle.stream('AUTOPILOT_VERSION') as events:
+        for _ in range(retries):
+            drone.mav.command_long_send(drone.target_system, drone.target_component,
+                                        mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE, 0,
+                                        mavutil.mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION, 0, 0, 0, 0, 0, 0)
+            msg = await events.get(timeout=timeout)
+            if msg is not None:
+                return identity_key(msg)
+    return None
+
+
+async def request_param(vehicle, name=None, index=-1, timeout=1.0, retries=2):
+    """PARAM_VALUE of one parameter, by name or by index; None when it does not arrive"""
+    drone = vehicle.drone
+    with vehicle.stream('PARAM_VALUE') as events:
+        for _ in range(retries):
+            drone.mav.param_request_read_send(drone.target_system, drone.target_component,
+                                              (name or '').encode('ascii'), index)
+            msg = await events.wait_for(
+                lambda m: decode_param_id(m.param_id) == name if name else m.param_index == index,
+                timeout=timeout)
+            if msg is not None:
+                return msg
+    return None
+
+
+async def request_hash(vehicle, timeout=0.5, retries=2):
+    """The vehicle's _HASH_CHECK, or None when it has none"""
+    msg = await request_param(vehicle, HASH_PARAM, timeout=timeout, retries=retries)
+    return None if msg is None else hash_from_value(msg.param_value)
+
+
+async def load_params(vehicle, cache, **fetch_options):
+    """Parameters as (params, from_cache, cache key); the full list is only fetched when the cached set is stale"""
+    if vehicle.autopilot == mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA:
+        # Nothing could validate a cached set: no slower than a plain download
+        print("[ParamSync] ArduPilot has no _HASH_CHECK - fetching all")
+        return await download_params(vehicle, **fetch_options), False, None
+    # sysid/compid is not unique across airframes: no identity, no cache
+    key = await request_identity(vehicle)
+    entry = cache.get(key) if key else None
+    vehicle_hash = await request_hash(vehicle) if key else None
+    if entry is not None and vehicle_hash is not None and entry['hash'] == vehicle_hash:
+        print(f"[ParamSync] ✅ Parameters unchanged - {entry['count']} from cache ({key})")
+        return entry['params'], True, key
+    reason = 'not identified' if key is None else 'not cached' if entry is None else 'no _HASH_CHECK' if vehicle_hash is None else 'changed'
+    print(f"[ParamSync] Parameters of {key or 'vehicle'} {reason} - fetching all")
+
+    params = await download_params(vehicle, **fetch_options)
+    # The hash may come with the list; it is not a parameter
+    params.pop(HASH_PARAM, None)
+    total = next(iter(params.values()))['count'] if params else 0
+    # Without a hash the set could never be trusted again
+    if params and len(params) >= total and vehicle_hash is not None:
+        cache.store(key, params, vehicle_hash)
+    return params, False, key
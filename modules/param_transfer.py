@@ -0,0 +1,153 @@
+"""
+Parameter Transfer - parameter protocol coroutines
+The full list is requested once with PARAM_REQUEST_LIST and collected from
+the hub's PARAM_VALUE stream on the async command loop. Received indices
+are tracked in a bitmap against param_count; when the stream stalls, only
+the missing indices are read with PARAM_REQUEST_READ, several in flight,
+until the set is complete. Single writes (PARAM_SET) complete on their echo.
+"""
+import asyncio
+import time
+
+import numpy as np
+
+from modules.async_commands import CommandError
+
+
+def param_record(param_id, msg):
+    """Entry of DroneCommander.parameters for one PARAM_VALUE"""
+    return make_param_record(param_id, msg.param_value, msg.param_type, msg.param_index, msg.param_count)
+
+
+def make_param_record(name, value, param_type, index, count, default=None):
+    return {
+        "name": name,
+        "value": str(float(value)),
+        "type": "FLOAT" if int(param_type) in [9, 10] else "INT32",
+        "index": int(index),
+        "count": int(count),
+        "synced": True,
+        "default": "0" if default is None else str(float(default)),
+        "units": "",
+        "range": "",
+        "description": ""
+    }
+
+
+def decode_param_id(param_id):
+    if isinstance(param_id, bytes):
+        param_id = param_id.decode('utf-8')
+    return str(param_id).strip('\x00')
+
+
+async def fetch_params(vehicle, initial_timeout=10, stall_timeout=1.0, window=8, request_timeout=1.0,
+                       max_attempts=5, on_param=None):
+    """
+    Collect every parameter; returns {name: record}. Once the list stream has
+    been silent for stall_timeout, up to window PARAM_REQUEST_READs for missing
+    indices are in flight; unanswered ones are re-sent after request_timeout.
+    on_param(record) is called for each parameter as it arrives.
+    Raises CommandError when none arrive or an index stays unanswered.
+    """
+    drone = vehicle.drone
+    loop = asyncio.get_running_loop()
+    collected = {}
+    total = None
+    received = None     # bitmap of param_index
+    in_flight = {}      # index -> time requested
+    attempts = {}
+    filling = False
+    start = loop.time()
+    last_param = start
+
+    def request(index):
+        attempts[index] = attempts.get(index, 0) + 1
+        if attempts[index] > max_attempts:
+            raise CommandError(f"❌ No answer for parameter {index} - {len(collected)}/{total} received")
+        drone.mav.param_request_read_send(drone.target_system, drone.target_component, b'', index)
+        in_flight[index] = loop.time()
+
+    with vehicle.stream('PARAM_VALUE', maxsize=4096) as events:
+        print("[ParamTransfer] 📤 Sending PARAM_REQUEST_LIST...")
+        drone.mav.param_request_list_send(drone.target_system, drone.target_component)
+        vehicle.feedback("Requesting parameters from drone...")
+
+        while received is None or not received.all():
+            now = loop.time()
+            if received is None:
+                if now - start > initial_timeout:
+                    raise CommandError("❌ No parameters received - check connection")
+                timeout = initial_timeout - (now - start)
+            elif not filling and now - last_param < stall_timeout:
+                timeout = stall_timeout - (now - last_param)
+            else:
+                # Stream stalled: read the gaps by index
+                if not filling:
+                    filling = True
+                    print(f"[ParamTransfer] 🔍 Stream stalled at {len(collected)}/{total} - "
+                          f"requesting {total - len(collected)} missing by index")
+                for index, requested_at in list(in_flight.items()):
+                    if now - requested_at > request_timeout:
+                        del in_flight[index]
+                for index in np.flatnonzero(~received):
+                    if len(in_flight) >= window:
+                        break
+                    if int(index) not in in_flight:
+                        request(int(index))
+                timeout = min(in_flight.values()) + request_timeout - now
+
+            msg = await events.get(timeout=max(0.0, timeout))
+            if msg is None:
+                continue
+            last_param = loop.time()
+            if received is None:
+                total = int(msg.param_count)
+                received = np.zeros(total, dtype=bool)
+                print(f"[ParamTransfer] 📊 Total parameters expected: {total}")
+                vehicle.feedback(f"Loading {total} parameters...")
+            index = int(msg.param_index)
+            if index >= total or received[index]:
+                continue    # _HASH_CHECK (index 65535), stray or duplicate
+            received[index] = True
+            in_flight.pop(index, None)
+            param_id = decode_param_id(msg.param_id)
+            collected[param_id] = param_record(param_id, msg)
+            if on_param is not None:
+                on_param(collected[param_id])
+            if len(collected) % 100 == 0:
+                progress_pct = len(collected) * 100 // total
+                print(f"[ParamTransfer] 📥 Progress: {len(collected)}/{total} ({progress_pct}%)")
+                vehicle.feedback(f"Received {len(collected)}/{total} parameters ({progress_pct}%)...")
+
+    rereads = sum(attempts.values())
+    print(f"[ParamTransfer] ✅ All {total} parameters in {loop.time() - start:.1f}s "
+          f"({len(attempts)} missed, {rereads} PARAM_REQUEST_READs)")
+    return collected
+
+
+async def set_param(vehicle, name, value, param_type, timeout=1.0, max_attempts=3):
+    """
+    PARAM_SET and wait for the PARAM_VALUE echo carrying the new value; returns
+    that PARAM_VALUE. An echo with another value may answer someone else's
+    read, so the write is re-sent until max_attempts before it is judged.
+    Raises CommandError when the value never comes back.
+    """
+    drone = vehicle.drone
+    encoded = name.encode('ascii')
+    last_value = None
+    with vehicle.stream('PARAM_VALUE') as events:
+        for _ in range(max_attempts):
+            drone.mav.param_set_send(drone.target_system, drone.target_component, encoded, value, param_type)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while True:
+                msg = await events.wait_for(lambda m: decode_param_id(m.param_id) == name,
+                                            timeout=max(0.0, deadline - loop.time()))
+                if msg is None:
+                    break
+                if abs(msg.param_value - value) < 1e-6 * max(1.0, abs(value)):
+                    return msg
+                last_value = msg.param_value
+    if last_value is not None:
+        raise CommandError(f"⚠️ '{name}' not changed: vehicle still reports {last_value:g}")
+    raise CommandError(f"⏱️ Timeout setting parameter '{name}'")
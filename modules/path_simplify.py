@@ -0,0 +1,128 @@
+"""
+Path Simplify - thin dense tracks before they become mission items
+Douglas-Peucker over NumPy arrays in local metres: a waypoint is dropped
+when the simplified path passes within the cross-track tolerance of it
+(and within the altitude tolerance of its altitude). Waypoints that carry
+a command other than NAV_WAYPOINT, or a hold time, are always kept and
+split the track into independently simplified runs.
+"""
+import math
+
+import numpy as np
+from pymavlink import mavutil
+
+from modules.waypoint_model import EARTH_RADIUS
+
+
+class SimplifyResult:
+    """Kept indices of a simplification and the largest deviation of a dropped point (m)"""
+
+    def __init__(self, keep, original_count, max_deviation, max_altitude_deviation):
+        self.keep = keep
+        self.original_count = original_count
+        self.max_deviation = max_deviation
+        self.max_altitude_deviation = max_altitude_deviation
+
+    @property
+    def count(self):
+        return len(self.keep)
+
+    @property
+    def removed(self):
+        return self.original_count - len(self.keep)
+
+    def summary(self):
+        """Plain values for QML"""
+        return {
+            'originalCount': self.original_count,
+            'count': self.count,
+            'removed': self.removed,
+            'maxDeviation': self.max_deviation,
+            'maxAltitudeDeviation': self.max_altitude_deviation,
+        }
+
+    def describe(self):
+        if self.removed == 0:
+            return f"{self.count} waypoints - nothing to simplify"
+        return (f"Simplified {self.original_count} → {self.count} waypoints "
+                f"(max deviation {self.max_deviation:.1f} m)")
+
+
+def local_metres(lat, lon):
+    """Equirectangular x (east), y (north) in metres about the first point"""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if len(lat) == 0:
+        return lat.copy(), lon.copy()
+    scale = math.cos(math.radians(float(lat.mean()))) * EARTH_RADIUS
+    return np.radians(lon - lon[0]) * scale, np.radians(lat - lat[0]) * EARTH_RADIUS
+
+
+def _segment_offsets(x, y, z, first, last, points):
+    """Cross-track and altitude offsets of points from the segments first-last (element-wise)"""
+    dx, dy = x[last] - x[first], y[last] - y[first]
+    px, py = x[points] - x[first], y[points] - y[first]
+    length_sq = dx * dx + dy * dy
+    t = np.clip(np.divide(px * dx + py * dy, length_sq, out=np.zeros_like(px), where=length_sq > 0), 0.0, 1.0)
+    horizontal = np.hypot(px - t * dx, py - t * dy)
+    vertical = np.abs(z[points] - (z[first] + t * (z[last] - z[first])))
+    return horizontal, vertical
+
+
+def _douglas_peucker(x, y, z, first, last, tolerance, altitude_tolerance, keep):
+    # Every open segment of one recursion level is split in the same pass
+    while len(first):
+        open_ = last - first >= 2
+        first, last = first[open_], last[open_]
+        if not len(first):
+            return
+        sizes = last - first - 1
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        segment = np.repeat(np.arange(len(first)), sizes)
+        inner = first[segment] + 1 + np.arange(len(segment)) - starts[segment]
+        horizontal, vertical = _segment_offsets(x, y, z, first[segment], last[segment], inner)
+        error = np.maximum(horizontal / tolerance, vertical / altitude_tolerance)
+        worst = np.maximum.reduceat(error, starts)
+        # First point of each segment that reaches its maximum
+        at_max = np.flatnonzero(error == worst[segment])
+        _, first_hit = np.unique(segment[at_max], return_index=True)
+        split = inner[at_max[first_hit]]
+        cut = worst > 1.0
+        split, first, last = split[cut], first[cut], last[cut]
+        keep[split] = True
+        first, last = np.concatenate((first, split)), np.concatenate((split, last))
+
+
+def simplify_path(lat, lon, alt, tolerance, altitude_tolerance=None, command=None, hold_time=None):
+    """
+    Douglas-Peucker simplification with a cross-track tolerance in metres
+    (altitude tolerance defaults to the same). Returns a SimplifyResult.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    count = len(lat)
+    x, y = local_metres(lat, lon)
+    z = np.asarray(alt, dtype=np.float64)
+    altitude_tolerance = tolerance if altitude_tolerance is None else altitude_tolerance
+    if count <= 2 or tolerance <= 0:
+        return SimplifyResult(np.arange(count), count, 0.0, 0.0)
+
+    # Anchors: the ends, commands and holds are never dropped
+    keep = np.zeros(count, dtype=bool)
+    keep[[0, -1]] = True
+    if command is not None:
+        keep |= np.asarray(command) != mavutil.mavlink.MAV_CMD_NAV_WAYPOINT
+    if hold_time is not None:
+        keep |= np.asarray(hold_time) > 0
+    anchors = np.flatnonzero(keep)
+    _douglas_peucker(x, y, z, anchors[:-1], anchors[1:], tolerance, max(altitude_tolerance, 1e-9), keep)
+
+    kept = np.flatnonzero(keep)
+    dropped = np.flatnonzero(~keep)
+    max_deviation = max_altitude_deviation = 0.0
+    if len(dropped):
+        # Each dropped point against the simplified segment it now lies on
+        after = np.searchsorted(kept, dropped)
+        horizontal, vertical = _segment_offsets(x, y, z, kept[after - 1], kept[after], dropped)
+        max_deviation = float(horizontal.max())
+        max_altitude_deviation = float(vertical.max())
+    return SimplifyResult(kept, count, max_deviation, max_altitude_deviation)
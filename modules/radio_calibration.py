@@ -56,6 +56,10 @@ class RadioCalibrationModel(QObject):
             "Channel 17", "Channel 18"
         ]
         
+        # Hub subscription for RC_CHANNELS while calibrating
+        self._rc_sub = None
+        self._seed_pending = False
+        
         # Timer for updating radio channel data
         self._update_timer = QTimer()
         self._update_timer.timeout.connect(self._update_radio_channels)
@@ -126,24 +130,18 @@ class RadioCalibrationModel(QObject):
         self._step1_samples = 0
         self._step2_samples = 0
         
-        # Initialize calibration values from current readings
-        current_values = self._get_current_radio_values()
-        for i in range(18):
-            current_value = current_values[i] if current_values[i] > 0 else (1000 if i == 2 else 1500)
-            self._channel_min[i] = current_value
-            self._channel_max[i] = current_value
-            self._channel_trim[i] = current_value
-            self._step1_min[i] = current_value
-            self._step1_max[i] = current_value
-        
-        # Special handling for throttle (channel 3, index 2)
-        self._channel_min[2] = min(self._channel_min[2], 1000)
-        self._channel_trim[2] = self._channel_min[2]
+        # Initialize calibration values with defaults until the first reading arrives
+        self._seed_calibration([0] * 18)
         
         self._set_status_message("Step 1: Move all sticks, knobs and switches to their extreme positions")
         
-        # Start the calibration process
-        self._start_rc_calibration_mavlink()
+        # RC_CHANNELS frames are delivered by MAVLinkThread through the hub; the
+        # update timer drains them and the first one seeds the calibration values
+        self._rc_sub = self._drone_model.message_hub.subscribe('RC_CHANNELS', maxsize=512)
+        self._seed_pending = True
+        # 50Hz RC_CHANNELS while calibrating, only through the manager (released on stop)
+        self._drone_model.streamRates.request('radio_calibration', {'RC_CHANNELS': 50})
+        print("[RadioCalibration] Started RC calibration mode - requesting 50Hz RC_CHANNELS")
         
         # Start timers
         self._update_timer.start(20)  # Update every 20ms for responsive UI
@@ -158,9 +156,6 @@ class RadioCalibrationModel(QObject):
         """Stop radio calibration process"""
         print("[RadioCalibration] Stopping radio calibration...")
         
-        if self._calibration_active:
-            self._stop_rc_calibration_mavlink()
-        
         self._calibration_active = False
         self._calibration_step = 0
         self._calibration_progress = 0
@@ -170,6 +165,11 @@ class RadioCalibrationModel(QObject):
         self._calibration_timer.stop()
         self._step_timer.stop()
         
+        if self._rc_sub is not None:
+            self._rc_sub.close()
+            self._rc_sub = None
+        self._drone_model.streamRates.release('radio_calibration')
+        
         self._set_status_message("Radio calibration stopped")
         self.calibrationStatusChanged.emit()
     
@@ -225,34 +225,19 @@ class RadioCalibrationModel(QObject):
         
         self.calibrationStatusChanged.emit()
     
-    def _get_current_radio_values(self):
-        """Get current radio channel values from drone"""
-        current_values = [0] * 18
-        
-        if not self._drone_model.drone_connection:
-            return current_values
-        
-        try:
-            connection = self._drone_model.drone_connection
-            
-            # Try to get latest RC_CHANNELS message
-            msg = connection.recv_match(type='RC_CHANNELS', blocking=False, timeout=0.1)
-            
-            if msg:
-                current_values = [
-                    msg.chan1_raw, msg.chan2_raw, msg.chan3_raw, msg.chan4_raw,
-                    msg.chan5_raw, msg.chan6_raw, msg.chan7_raw, msg.chan8_raw,
-                    msg.chan9_raw, msg.chan10_raw, msg.chan11_raw, msg.chan12_raw,
-                    msg.chan13_raw, msg.chan14_raw, msg.chan15_raw, msg.chan16_raw,
-                    msg.chan17_raw, msg.chan18_raw
-                ]
-                
-                print(f"[RadioCalibration] Current values - Ch1:{current_values[0]}, Ch2:{current_values[1]}, Ch3:{current_values[2]}, Ch4:{current_values[3]}")
-        
-        except Exception as e:
-            print(f"[RadioCalibration] Could not get current radio values: {e}")
+    def _seed_calibration(self, current_values):
+        """Start min/max/trim of every channel at its current reading (defaults where there is none)"""
+        for i in range(18):
+            current_value = current_values[i] if current_values[i] > 0 else (1000 if i == 2 else 1500)
+            self._channel_min[i] = current_value
+            self._channel_max[i] = current_value
+            self._channel_trim[i] = current_value
+            self._step1_min[i] = current_value
+            self._step1_max[i] = current_value
         
-        return current_values
+        # Special handling for throttle (channel 3, index 2)
+        self._channel_min[2] = min(self._channel_min[2], 1000)
+        self._channel_trim[2] = self._channel_min[2]
     
     @pyqtSlot()
     def saveCalibration(self):
@@ -371,66 +356,14 @@ class RadioCalibrationModel(QObject):
                 progress = 66 + min(33, (self._step2_samples / self._required_samples) * 33)
                 self._set_calibration_progress(int(progress))
     
-    def _start_rc_calibration_mavlink(self):
-        """Start RC calibration using MAVLink commands"""
-        if not self._drone_model.drone_connection:
-            return
-        
-        try:
-            connection = self._drone_model.drone_connection
-            
-            # Request RC_CHANNELS messages at higher rate during calibration (50Hz)
-            connection.mav.command_long_send(
-                connection.target_system,
-                connection.target_component,
-                mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
-                0,
-                mavutil.mavlink.MAVLINK_MSG_ID_RC_CHANNELS,  # RC_CHANNELS message
-                20000,  # 20ms interval (50Hz)
-                0, 0, 0, 0, 0
-            )
-            
-            print("[RadioCalibration] Started RC calibration mode - requesting 50Hz RC_CHANNELS")
-            
-        except Exception as e:
-            print(f"[RadioCalibration ERROR] Failed to start RC calibration: {e}")
-    
-    def _stop_rc_calibration_mavlink(self):
-        """Stop RC calibration using MAVLink commands"""
-        if not self._drone_model.drone_connection:
-            return
-        
-        try:
-            connection = self._drone_model.drone_connection
-            
-            # Reset RC_CHANNELS message rate to normal (5Hz)
-            connection.mav.command_long_send(
-                connection.target_system,
-                connection.target_component,
-                mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
-                0,
-                mavutil.mavlink.MAVLINK_MSG_ID_RC_CHANNELS,  # RC_CHANNELS message
-                200000,  # 200ms interval (5Hz) - normal rate
-                0, 0, 0, 0, 0
-            )
-            
-            print("[RadioCalibration] Stopped RC calibration mode - reset to 5Hz RC_CHANNELS")
-            
-        except Exception as e:
-            print(f"[RadioCalibration ERROR] Failed to stop RC calibration: {e}")
-    
     def _update_radio_channels(self):
         """Update radio channel values from drone with proper channel mapping"""
-        if not self._calibration_active or not self._drone_model.drone_connection:
+        if not self._calibration_active or not self._drone_model.drone_connection or self._rc_sub is None:
             return
         
         try:
-            connection = self._drone_model.drone_connection
-            
-            # Get latest RC_CHANNELS message
-            msg = connection.recv_match(type='RC_CHANNELS', blocking=False, timeout=0.01)
-            
-            if msg:
+            # Process every RC_CHANNELS frame queued since the last tick so no extreme is missed
+            for msg in self._rc_sub.drain():
                 # Extract channel values in correct order
                 # IMPORTANT: These correspond directly to RC channels 1-18
                 new_channels = [
@@ -454,6 +387,11 @@ class RadioCalibrationModel(QObject):
                     msg.chan18_raw   # Channel 18
                 ]
                 
+                if self._seed_pending:
+                    self._seed_pending = False
+                    self._seed_calibration([0 if value == 65535 else value for value in new_channels])
+                    print(f"[RadioCalibration] Current values - Ch1:{new_channels[0]}, Ch2:{new_channels[1]}, Ch3:{new_channels[2]}, Ch4:{new_channels[3]}")
+                
                 # Update channel values and calibration data
                 channels_updated = 0
                 for i, value in enumerate(new_channels):
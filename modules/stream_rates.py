@@ -0,0 +1,266 @@
+"""
+Stream Rate Manager - telemetry stream rates driven by what is on screen
+Consumers (HUD, map, calibration screens...) request message rates; the
+vehicle gets MAV_CMD_SET_MESSAGE_INTERVAL for the highest requested rate of
+each message, streams nobody needs are switched off, and commands are
+skipped when the vehicle already reports the wanted interval.
+"""
+import time
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, pyqtProperty, QTimer
+from pymavlink import mavutil
+
+
+# High-rate default streams that are switched off unless someone requests them.
+# Streams read without a rate request are left alone: the IMU messages
+# (magnetometer detection in mavlink_diagnostic), AHRS (compass calibration)
+# and VIBRATION.
+DROPPABLE_STREAMS = (
+    'SCALED_PRESSURE', 'SERVO_OUTPUT_RAW', 'RC_CHANNELS', 'MEMINFO', 'POWER_STATUS',
+    'NAV_CONTROLLER_OUTPUT', 'SYSTEM_TIME',
+)
+
+INTERVAL_DISABLED = -1
+
+
+def _msgid(name_or_id):
+    if isinstance(name_or_id, int):
+        return name_or_id
+    return getattr(mavutil.mavlink, 'MAVLINK_MSG_ID_' + str(name_or_id))
+
+
+def _msgname(msgid):
+    msg_class = mavutil.mavlink.mavlink_map.get(msgid)
+    return msg_class.msgname if msg_class is not None else str(msgid)
+
+
+class _RateJob:
+    """Bring one message stream to a target interval"""
+
+    def __init__(self, msgid, target):
+        self.msgid = msgid
+        self.target = target
+        self.state = None   # 'query' (GET_MESSAGE_INTERVAL sent) or 'set'
+        self.sent_at = None
+        self.first_sent_at = None
+        self.attempts = 0
+
+
+class StreamRateManager(QObject):
+    ratesChanged = pyqtSignal()
+
+    def __init__(self, droppable=DROPPABLE_STREAMS, query_timeout=0.3,
+                 retry_interval=0.5, max_attempts=3, poll_interval_ms=20):
+        super().__init__()
+        self._requests = {}          # consumer -> {msgid: hz}
+        self._known = {}             # msgid -> interval (us) reported/confirmed by the vehicle
+        self._managed = set()        # msgids this manager has changed on the vehicle
+        self._jobs = {}              # msgid -> _RateJob
+        self._acked_at = {}          # msgid -> when a SET ACK was attributed to it
+        self._droppable = frozenset(_msgid(name) for name in droppable)
+        self.query_timeout = query_timeout
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+
+        self._drone = None
+        self._hub = None
+        self._sub = None
+        self.commands_sent = 0
+        self.commands_skipped = 0
+
+        self._timer = QTimer()
+        self._timer.setInterval(poll_interval_ms)
+        self._timer.timeout.connect(self._poll)
+
+    # ---------- link ----------
+
+    def attach(self, drone, message_hub):
+        """Start managing a (re)connected vehicle; every wanted interval is re-checked"""
+        self._drone = drone
+        self._hub = message_hub
+        self._known.clear()
+        self._acked_at.clear()
+        self._jobs.clear()
+        self._apply()
+
+    def detach(self):
+        self._timer.stop()
+        if self._sub is not None:
+            self._sub.close()
+            self._sub = None
+        self._jobs.clear()
+        self._drone = None
+        self._hub = None
+
+    # ---------- consumers ----------
+
+    def request(self, consumer, rates):
+        """rates: {message name or msgid: Hz}. Replaces the consumer's previous request."""
+        self._requests[consumer] = {_msgid(key): float(hz) for key, hz in rates.items() if hz}
+        print(f"[StreamRates] {consumer} requested {dict(rates)}")
+        self.ratesChanged.emit()
+        self._apply()
+
+    def release(self, consumer):
+        if self._requests.pop(consumer, None) is not None:
+            print(f"[StreamRates] {consumer} released its streams")
+            self.ratesChanged.emit()
+            self._apply()
+
+    @pyqtSlot(str, 'QVariantMap')
+    def requestRates(self, consumer, rates):
+        self.request(consumer, rates)
+
+    @pyqtSlot(str)
+    def releaseRates(self, consumer):
+        self.release(consumer)
+
+    @pyqtProperty('QVariantMap', notify=ratesChanged)
+    def requestedRates(self):
+        """Aggregated rates in Hz, keyed by message name (for display)"""
+        return {_msgname(msgid): hz for msgid, hz in self._max_rates().items()}
+
+    def _max_rates(self):
+        rates = {}
+        for consumer_rates in self._requests.values():
+            for msgid, hz in consumer_rates.items():
+                rates[msgid] = max(hz, rates.get(msgid, 0.0))
+        return rates
+
+    def desired_intervals(self):
+        """msgid -> interval in microseconds (-1 = stream off)"""
+        intervals = {msgid: int(round(1e6 / hz)) for msgid, hz in self._max_rates().items()}
+        for msgid in self._droppable | self._managed:
+            intervals.setdefault(msgid, INTERVAL_DISABLED)
+        return intervals
+
+    # ---------- vehicle ----------
+
+    def _apply(self):
+        if self._drone is None:
+            return
+        for msgid, target in self.desired_intervals().items():
+            job = self._jobs.get(msgid)
+            if job is not None:
+                if job.target != target:
+                    job.target = target
+                    job.attempts = 0
+                    if job.state == 'set':
+                        self._send_set(job)
+                continue
+            if self._known.get(msgid) == target:
+                self.commands_skipped += 1
+                continue
+            job = _RateJob(msgid, target)
+            self._jobs[msgid] = job
+            self._ensure_polling()
+            if msgid in self._known:
+                self._send_set(job)
+            else:
+                self._send_query(job)
+
+    def _ensure_polling(self):
+        if self._sub is None:
+            # Subscribe before the first command is sent
+            self._sub = self._hub.subscribe(['COMMAND_ACK', 'MESSAGE_INTERVAL'], maxsize=512)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _send_query(self, job):
+        job.state = 'query'
+        job.sent_at = time.monotonic()
+        job.first_sent_at = job.first_sent_at or job.sent_at
+        self._command(mavutil.mavlink.MAV_CMD_GET_MESSAGE_INTERVAL, job.msgid)
+
+    def _send_set(self, job):
+        job.state = 'set'
+        job.sent_at = time.monotonic()
+        job.first_sent_at = job.first_sent_at or job.sent_at
+        job.attempts += 1
+        self._managed.add(job.msgid)
+        self._command(mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL, job.msgid, job.target)
+
+    def _command(self, command, param1=0, param2=0):
+        self.commands_sent += 1
+        self._drone.mav.command_long_send(
+            self._drone.target_system,
+            self._drone.target_component,
+            command,
+            0, param1, param2, 0, 0, 0, 0, 0
+        )
+
+    def _poll(self):
+        if self._sub is None:
+            return
+        for msg in self._sub.drain():
+            if msg.get_type() == 'MESSAGE_INTERVAL':
+                self._on_message_interval(msg)
+            else:
+                self._on_command_ack(msg)
+
+        now = time.monotonic()
+        for job in list(self._jobs.values()):
+            if job.state == 'query' and now - job.sent_at >= self.query_timeout:
+                # No reply to GET_MESSAGE_INTERVAL - just set it
+                self._send_set(job)
+            elif job.state == 'set' and now - job.sent_at >= self.retry_interval:
+                if job.attempts >= self.max_attempts:
+                    print(f"[StreamRates] ❌ {_msgname(job.msgid)} interval not acknowledged")
+                    del self._jobs[job.msgid]
+                else:
+                    self._send_set(job)
+                self._recheck_acked_since(job.first_sent_at)
+
+        if not self._jobs:
+            self._timer.stop()
+            self._sub.close()
+            self._sub = None
+
+    def _recheck_acked_since(self, since):
+        """
+        A SET ACK went missing, so ACKs matched oldest-first since then may
+        belong to other streams. Forget those intervals; _apply() re-queries
+        them with GET_MESSAGE_INTERVAL, whose reply names the stream.
+        """
+        suspects = [msgid for msgid, acked_at in self._acked_at.items() if acked_at >= since]
+        for msgid in suspects:
+            del self._acked_at[msgid]
+            self._known.pop(msgid, None)
+        if suspects:
+            self._apply()
+
+    def _on_message_interval(self, msg):
+        self._known[msg.message_id] = msg.interval_us
+        self._acked_at.pop(msg.message_id, None)
+        job = self._jobs.get(msg.message_id)
+        if job is None or job.state != 'query':
+            return
+        if msg.interval_us == job.target:
+            self.commands_skipped += 1
+            del self._jobs[job.msgid]
+        else:
+            self._send_set(job)
+
+    def _on_command_ack(self, msg):
+        if msg.command == mavutil.mavlink.MAV_CMD_GET_MESSAGE_INTERVAL:
+            if msg.result != mavutil.mavlink.MAV_RESULT_ACCEPTED:
+                # GET unsupported: set the oldest queried stream straight away
+                job = self._oldest('query')
+                if job is not None:
+                    self._send_set(job)
+            return
+        if msg.command != mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL:
+            return
+        # ACKs carry only the command id: outstanding SETs are matched oldest first
+        job = self._oldest('set')
+        if job is None:
+            return
+        if msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            self._known[job.msgid] = job.target
+            self._acked_at[job.msgid] = time.monotonic()
+        else:
+            print(f"[StreamRates] ⚠️ {_msgname(job.msgid)} interval rejected (result {msg.result})")
+        del self._jobs[job.msgid]
+
+    def _oldest(self, state):
+        jobs = [job for job in self._jobs.values() if job.state == state]
+        return min(jobs, key=lambda job: job.sent_at) if jobs else None
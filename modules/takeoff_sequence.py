@@ -0,0 +1,247 @@
+"""
+Takeoff Sequence - event-driven GUIDED takeoff coroutine
+Each stage advances on what the vehicle reports instead of fixed sleeps:
+PARAM_VALUE echoes for the failsafe parameters, the HEARTBEAT mode and armed
+flag, the COMMAND_ACK of NAV_TAKEOFF and the altitude gain in
+GLOBAL_POSITION_INT. Every stage has a timeout. Cancelling the task stops
+the sequence at any point; on a cancel or a failed stage before NAV_TAKEOFF
+is accepted the vehicle is disarmed and put back in its previous mode,
+after that it holds GUIDED.
+"""
+import asyncio
+import time
+from pymavlink import mavutil
+
+from modules.async_commands import CommandError
+
+
+# Failsafes/arming checks disabled before a GUIDED takeoff (SITL)
+TAKEOFF_PARAMS = (
+    ('FS_THR_ENABLE', 0),
+    ('FS_GCS_ENABLE', 0),
+    ('FS_BATT_ENABLE', 0),
+    ('ARMING_CHECK', 0),
+)
+
+# Stage name -> timeout in seconds
+STAGE_TIMEOUTS = {
+    'params': 3.0,
+    'mode': 5.0,
+    'arm': 5.0,
+    'takeoff': 3.0,
+    'climb': 30.0,
+}
+
+AIRBORNE_GAIN = 1.0   # metres above the starting altitude
+CLIMB_FEEDBACK_STEP = 0.5   # metres climbed between progress messages
+ABORT_TIMEOUT = 3.0   # seconds per command when cleaning up after a cancel
+
+
+class TakeoffReport:
+    """Timestamps (time.monotonic) of one takeoff"""
+
+    def __init__(self, started_at):
+        self.started_at = started_at
+        self.armed_at = None
+        self.airborne_at = None
+
+    @property
+    def arm_to_airborne(self):
+        return self.airborne_at - self.armed_at
+
+    @property
+    def total(self):
+        return self.airborne_at - self.started_at
+
+
+class _TakeoffEvents:
+    """The sequence's message stream; remembers the latest altitude and armed state"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.alt = None
+        self.armed = None
+
+    async def next(self):
+        msg = await self.stream.get()
+        msg_type = msg.get_type()
+        if msg_type == 'GLOBAL_POSITION_INT':
+            self.alt = msg.relative_alt / 1000.0
+        elif msg_type == 'HEARTBEAT' and msg.autopilot != mavutil.mavlink.MAV_AUTOPILOT_INVALID:
+            self.armed = bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+        return msg
+
+
+async def run_takeoff(vehicle, target_altitude, params=TAKEOFF_PARAMS, timeouts=None,
+                      param_retry_interval=0.5, on_armed=None, report=None):
+    """
+    Configure, switch to GUIDED, arm, take off and wait for the climb.
+    Returns a TakeoffReport; raises CommandError (with operator text) on failure.
+    """
+    timeouts = dict(STAGE_TIMEOUTS, **(timeouts or {}))
+    report = report or TakeoffReport(time.monotonic())
+    print(f"\n[TakeoffSequence] ===== TAKEOFF SEQUENCE STARTED (target {target_altitude} m) =====")
+
+    mode_mapping = vehicle.drone.mode_mapping()
+    guided_mode = mode_mapping.get('GUIDED')
+    if guided_mode is None:
+        raise CommandError("❌ GUIDED mode not available for this vehicle")
+    previous_mode = mode_mapping.get(vehicle.drone.flightmode)
+
+    # Subscribe before anything is sent
+    events = _TakeoffEvents(vehicle.stream(['PARAM_VALUE', 'HEARTBEAT', 'GLOBAL_POSITION_INT']))
+    vehicle.request_rates('takeoff', {'GLOBAL_POSITION_INT': 10})
+    reached = None
+    ground_alt = None
+    try:
+        async def stage(name, text, coro):
+            nonlocal reached
+            reached = name
+            print(f"[TakeoffSequence] ▶ {name}")
+            vehicle.feedback(text)
+            try:
+                return await asyncio.wait_for(coro, timeouts[name])
+            except asyncio.TimeoutError:
+                raise CommandError(f"❌ Takeoff timeout ({name})") from None
+
+        await stage('params', "⚙️ Configuring parameters...",
+                    _set_params(vehicle, events, params, param_retry_interval))
+
+        await stage('mode', "🎯 Switching to GUIDED mode...", _enter_guided(vehicle, events, guided_mode))
+        print("[TakeoffSequence] ✅ GUIDED mode confirmed")
+        vehicle.feedback("✅ GUIDED mode confirmed")
+
+        await stage('arm', "🔐 Arming drone...", _arm(vehicle, events))
+        report.armed_at = time.monotonic()
+        print("[TakeoffSequence] ✅ Armed confirmed")
+        vehicle.feedback("✅ Drone armed")
+        if on_armed is not None:
+            on_armed()
+
+        ground_alt = events.alt if events.alt is not None else 0.0
+        await stage('takeoff', f"🚁 Taking off to {target_altitude}m...", _command_takeoff(vehicle, target_altitude))
+        await stage('climb', "🚁 Climbing...", _climb(vehicle, events, target_altitude, ground_alt))
+        report.airborne_at = time.monotonic()
+    except asyncio.CancelledError:
+        await _abort(vehicle, events, reached, guided_mode, previous_mode)
+        raise
+    except CommandError:
+        # A failed stage leaves the vehicle as safe as a cancel does
+        await _abort(vehicle, events, reached, guided_mode, previous_mode, "failed")
+        raise
+    finally:
+        events.stream.close()
+        vehicle.release_rates('takeoff')
+
+    print(f"[TakeoffSequence] ✅ Takeoff successful! (airborne {report.arm_to_airborne:.1f}s after arming, "
+          f"{report.total:.1f}s total)")
+    return report
+
+
+async def _set_params(vehicle, events, params, retry_interval):
+    drone = vehicle.drone
+    pending = dict(params)
+
+    def send(param_id, value):
+        drone.mav.param_set_send(drone.target_system, drone.target_component,
+                                 param_id.encode('ascii'), value, mavutil.mavlink.MAV_PARAM_TYPE_INT32)
+
+    loop = asyncio.get_running_loop()
+    for param_id, value in params:
+        send(param_id, value)
+    resend_at = loop.time() + retry_interval
+    while pending:
+        try:
+            msg = await asyncio.wait_for(events.next(), max(0.0, resend_at - loop.time()))
+        except asyncio.TimeoutError:
+            # Echo missing: resend what is still unconfirmed
+            for param_id, value in pending.items():
+                send(param_id, value)
+            resend_at = loop.time() + retry_interval
+            continue
+        if msg.get_type() != 'PARAM_VALUE':
+            continue
+        param_id = msg.param_id
+        if isinstance(param_id, bytes):
+            param_id = param_id.decode('utf-8')
+        param_id = param_id.strip('\x00')
+        if param_id in pending and abs(msg.param_value - pending[param_id]) < 1e-6:
+            del pending[param_id]
+
+
+async def _enter_guided(vehicle, events, guided_mode):
+    outcome = await vehicle.command(mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+                                    (mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, guided_mode))
+    if not outcome.accepted:
+        raise CommandError(f"❌ Failed to enter GUIDED mode: {outcome.describe()}")
+    # Confirmation comes with the next HEARTBEAT - ask for it now
+    vehicle.request_heartbeat()
+    while True:
+        msg = await events.next()
+        if (msg.get_type() == 'HEARTBEAT' and msg.autopilot != mavutil.mavlink.MAV_AUTOPILOT_INVALID
+                and msg.custom_mode == guided_mode):
+            return
+
+
+async def _arm(vehicle, events):
+    outcome = await vehicle.arm()
+    if not outcome.accepted:
+        raise CommandError(f"❌ Failed to arm: {outcome.describe()}")
+    vehicle.request_heartbeat()
+    while True:
+        msg = await events.next()
+        if msg.get_type() == 'HEARTBEAT' and events.armed:
+            return
+
+
+async def _command_takeoff(vehicle, target_altitude):
+    outcome = await vehicle.command(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF, (0, 0, 0, 0, 0, 0, target_altitude))
+    if not outcome.accepted:
+        raise CommandError(f"❌ Takeoff failed: {outcome.describe()}")
+
+
+async def _climb(vehicle, events, target_altitude, ground_alt):
+    reported_step = None
+    while True:
+        msg = await events.next()
+        msg_type = msg.get_type()
+        if msg_type == 'HEARTBEAT' and events.armed is False:
+            raise CommandError("❌ Disarmed during takeoff")
+        if msg_type != 'GLOBAL_POSITION_INT':
+            continue
+        gain = events.alt - ground_alt
+        # One message per CLIMB_FEEDBACK_STEP instead of one per position report
+        step = int(gain / CLIMB_FEEDBACK_STEP)
+        if gain > 0 and target_altitude > 0 and step != reported_step:
+            reported_step = step
+            progress_pct = min(100, int((gain / target_altitude) * 100))
+            vehicle.feedback(f"🚁 Climbing: {events.alt:.1f}m ({progress_pct}%)")
+        if gain > AIRBORNE_GAIN:
+            return
+
+
+async def _abort(vehicle, events, reached, guided_mode, previous_mode, outcome_text="cancelled"):
+    """Cancelled or failed: disarm and restore the previous mode on the ground, hold GUIDED once taking off"""
+    if reached == 'climb':
+        # NAV_TAKEOFF was accepted: the vehicle may already be lifting off
+        altitude = f" at {events.alt:.1f}m" if events.alt is not None else ""
+        print(f"[TakeoffSequence] ⏹ Takeoff {outcome_text} after liftoff{altitude} - holding GUIDED")
+        vehicle.feedback(f"⏹ Takeoff {outcome_text} - holding GUIDED{altitude}")
+        return
+    print(f"[TakeoffSequence] ⏹ Takeoff {outcome_text} on the ground ({reached or 'not started'})")
+    disarm = reached in ('arm', 'takeoff', 'climb')
+    try:
+        if disarm:
+            # The arm command may be accepted before its HEARTBEAT is seen: always disarm
+            outcome = await asyncio.wait_for(vehicle.disarm(), ABORT_TIMEOUT)
+            print(f"[TakeoffSequence] Disarm: {outcome.describe()}")
+        if reached is not None and reached != 'params' and previous_mode not in (None, guided_mode):
+            outcome = await asyncio.wait_for(
+                vehicle.command(mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+                                (mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, previous_mode)),
+                ABORT_TIMEOUT)
+            print(f"[TakeoffSequence] Mode restore: {outcome.describe()}")
+    except asyncio.TimeoutError:
+        print(f"[TakeoffSequence] ⚠️ No answer while cleaning up the {outcome_text} takeoff")
+    vehicle.feedback(f"⏹ Takeoff {outcome_text} - drone disarmed on the ground" if disarm
+                     else f"⏹ Takeoff {outcome_text}")
@@ -1,215 +1,104 @@
-import math
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtProperty
-from pymavlink import mavutil
+
+
+# Telemetry key -> notify group. A change only re-evaluates the QML
+# bindings of its own group (e.g. roll repaints the HUD, not the battery widget).
+FIELD_GROUPS = {
+    'roll': 'attitude', 'pitch': 'attitude', 'yaw': 'attitude',
+    'lat': 'position', 'lon': 'position', 'alt': 'position', 'rel_alt': 'position',
+    'heading': 'speed', 'groundspeed': 'speed', 'airspeed': 'speed',
+    'battery_remaining': 'battery', 'voltage_battery': 'battery', 'current_battery': 'battery',
+    'mode': 'status', 'armed': 'status', 'safety_armed': 'status',
+    'ekf_ok': 'health',
+    'gps_status': 'gps', 'satellites_visible': 'gps', 'gps_fix_type': 'gps',
+}
+
+
+# Value of a typed field before the vehicle first reports it (QML gets no undefined)
+TYPE_DEFAULTS = {bool: False, str: ""}
+
+
+def _field(key, notify, prop_type='QVariant'):
+    default = TYPE_DEFAULTS.get(prop_type)
+
+    def fget(self):
+        value = self._values.get(key)
+        return default if value is None else value
+    return pyqtProperty(prop_type, fget=fget, notify=notify)
 
 
 class Telemetry(QObject):
-    rollChanged = pyqtSignal()
-    pitchChanged = pyqtSignal()
-    yawChanged = pyqtSignal()
-    groundspeedChanged = pyqtSignal()
-    airspeedChanged = pyqtSignal()
-    altitudeChanged = pyqtSignal()
-    latitudeChanged = pyqtSignal()  # Added for GPS
-    longitudeChanged = pyqtSignal()  # Added for GPS
-
-    def __init__(self):
-        super().__init__()
-        self._roll = 0.0
-        self._pitch = 0.0
-        self._yaw = 0.0
-        self._groundspeed = 0.0
-        self._airspeed = 0.0
-        self._altitude = 0.0
-        self._latitude = 0.0  # Added for GPS
-        self._longitude = 0.0  # Added for GPS
-
-    @pyqtProperty(float, notify=rollChanged)
-    def roll(self):
-        return self._roll
-    
-    @roll.setter
-    def roll(self, val):
-        if self._roll != val:
-            self._roll = val
-            self.rollChanged.emit()
-
-    @pyqtProperty(float, notify=pitchChanged)
-    def pitch(self):
-        return self._pitch
-    
-    @pitch.setter
-    def pitch(self, val):
-        if self._pitch != val:
-            self._pitch = val
-            self.pitchChanged.emit()
-
-    @pyqtProperty(float, notify=yawChanged)
-    def yaw(self):
-        return self._yaw
-    
-    @yaw.setter
-    def yaw(self, val):
-        if self._yaw != val:
-            self._yaw = val
-            self.yawChanged.emit()
-
-    @pyqtProperty(float, notify=groundspeedChanged)
-    def groundspeed(self):
-        return self._groundspeed
-    
-    @groundspeed.setter
-    def groundspeed(self, val):
-        if self._groundspeed != val:
-            self._groundspeed = val
-            self.groundspeedChanged.emit()
-
-    @pyqtProperty(float, notify=airspeedChanged)
-    def airspeed(self):
-        return self._airspeed
-    
-    @airspeed.setter
-    def airspeed(self, val):
-        if self._airspeed != val:
-            self._airspeed = val
-            self.airspeedChanged.emit()
-
-    @pyqtProperty(float, notify=altitudeChanged)
-    def altitude(self):
-        return self._altitude
-    
-    @altitude.setter
-    def altitude(self, val):
-        if self._altitude != val:
-            self._altitude = val
-            self.altitudeChanged.emit()
-
-    @pyqtProperty(float, notify=latitudeChanged)
-    def latitude(self):
-        return self._latitude
-    
-    @latitude.setter
-    def latitude(self, val):
-        if self._latitude != val:
-            self._latitude = val
-            self.latitudeChanged.emit()
-
-    @pyqtProperty(float, notify=longitudeChanged)
-    def longitude(self):
-        return self._longitude
-    
-    @longitude.setter
-    def longitude(self, val):
-        if self._longitude != val:
-            self._longitude = val
-            self.longitudeChanged.emit()
-    
-   
-
-#class MAVLinkThread(QThread):
-    telemetryUpdated = pyqtSignal(dict)
-    statusTextChanged = pyqtSignal(str)
-
-    def __init__(self, drone):
+    """Per-field telemetry for QML, with one notify signal per field group"""
+
+    attitudeChanged = pyqtSignal()
+    positionChanged = pyqtSignal()
+    speedChanged = pyqtSignal()
+    batteryChanged = pyqtSignal()
+    statusChanged = pyqtSignal()
+    healthChanged = pyqtSignal()
+    gpsChanged = pyqtSignal()
+
+    # Attitude (degrees)
+    roll = _field('roll', attitudeChanged)
+    pitch = _field('pitch', attitudeChanged)
+    yaw = _field('yaw', attitudeChanged)
+
+    # Position (degrees / metres)
+    lat = _field('lat', positionChanged)
+    lon = _field('lon', positionChanged)
+    alt = _field('alt', positionChanged)
+    rel_alt = _field('rel_alt', positionChanged)
+
+    # Speed & heading
+    heading = _field('heading', speedChanged)
+    groundspeed = _field('groundspeed', speedChanged)
+    airspeed = _field('airspeed', speedChanged)
+
+    # Battery
+    battery_remaining = _field('battery_remaining', batteryChanged)
+    voltage_battery = _field('voltage_battery', batteryChanged)
+    current_battery = _field('current_battery', batteryChanged)
+
+    # Vehicle status
+    mode = _field('mode', statusChanged, str)
+    armed = _field('armed', statusChanged, bool)
+    safety_armed = _field('safety_armed', statusChanged, bool)
+
+    # EKF / GPS health
+    ekf_ok = _field('ekf_ok', healthChanged, bool)
+    gps_status = _field('gps_status', gpsChanged)
+    satellites_visible = _field('satellites_visible', gpsChanged)
+    gps_fix_type = _field('gps_fix_type', gpsChanged)
+
+    def __init__(self, initial=None):
         super().__init__()
-        self.drone = drone
-        self.running = True
-        self.current_telemetry_components = {
-            'mode': "UNKNOWN", 'armed': False,
-            'lat': None, 'lon': None, 'alt': None, 'rel_alt': None,
-            'roll': None, 'pitch': None, 'yaw': None,
-            'heading': None,
-            'groundspeed': 0.0, 'airspeed': 0.0
+        self._values = dict(initial or {})
+        self._signals = {
+            'attitude': self.attitudeChanged,
+            'position': self.positionChanged,
+            'speed': self.speedChanged,
+            'battery': self.batteryChanged,
+            'status': self.statusChanged,
+            'health': self.healthChanged,
+            'gps': self.gpsChanged,
         }
-        print("[MAVLinkThread] Initialized (Event-driven).")
-
-    def run(self):
-        print("[MAVLinkThread] Thread started. Continuously listening for MAVLink messages...")
-        while self.running:
-            # Try to receive a message without blocking, or with a very minimal timeout
-            msg = self.drone.recv_match(blocking=False, timeout=1)
-            
-            if msg:
-                msg_type = msg.get_type()
-                msg_dict = msg.to_dict()
-                
-                telemetry_component_changed = False
-
-                if msg_type == "HEARTBEAT":
-                    mode_map = self.drone.mode_mapping()
-                    inv_mode_map = {v: k for k, v in mode_map.items()}
-                    new_mode = inv_mode_map.get(msg_dict['custom_mode'], "UNKNOWN")
-                    new_armed_status = bool(msg_dict['base_mode'] & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
-                    if self.current_telemetry_components['mode'] != new_mode:
-                        self.current_telemetry_components['mode'] = new_mode
-                        telemetry_component_changed = True
-                    if self.current_telemetry_components['armed'] != new_armed_status:
-                        self.current_telemetry_components['armed'] = new_armed_status
-                        telemetry_component_changed = True
-
-                elif msg_type == "GLOBAL_POSITION_INT":
-                    new_lat = msg_dict['lat'] / 1e7
-                    new_lon = msg_dict['lon'] / 1e7
-                    new_alt = msg_dict['alt'] / 1000.0
-                    new_rel_alt = msg_dict['relative_alt'] / 1000.0
-
-                    if (self.current_telemetry_components['lat'] != new_lat or
-                        self.current_telemetry_components['lon'] != new_lon or
-                        self.current_telemetry_components['alt'] != new_alt or
-                        self.current_telemetry_components['rel_alt'] != new_rel_alt):
-                        
-                        self.current_telemetry_components.update({
-                            'lat': new_lat,
-                            'lon': new_lon,
-                            'alt': new_alt,
-                            'rel_alt': new_rel_alt
-                        })
-                        telemetry_component_changed = True
-
-                elif msg_type == "ATTITUDE":
-                    new_roll = math.degrees(msg_dict['roll'])
-                    new_pitch = math.degrees(msg_dict['pitch'])
-                    new_yaw = math.degrees(msg_dict['yaw'])
-                    if (self.current_telemetry_components['roll'] != new_roll or
-                        self.current_telemetry_components['pitch'] != new_pitch or
-                        self.current_telemetry_components['yaw'] != new_yaw):
-                        self.current_telemetry_components.update({
-                            'roll': new_roll,
-                            'pitch': new_pitch,
-                            'yaw': new_yaw,
-                        })
-                        telemetry_component_changed = True
-
-                elif msg_type == "VFR_HUD":
-                    new_heading = msg_dict['heading']
-                    new_groundspeed = msg_dict['groundspeed']
-                    new_airspeed = msg_dict['airspeed']
-                    
-                    if (self.current_telemetry_components['heading'] != new_heading or
-                        self.current_telemetry_components['groundspeed'] != new_groundspeed or
-                        self.current_telemetry_components['airspeed'] != new_airspeed):
-                        self.current_telemetry_components.update({
-                            'heading': new_heading,
-                            'groundspeed': new_groundspeed,
-                            'airspeed': new_airspeed,
-                        })
-                        telemetry_component_changed = True
-
-                elif msg_type == "STATUSTEXT":
-                    self.statusTextChanged.emit(msg.text)
-
-                if telemetry_component_changed:
-                    self.telemetryUpdated.emit(self.current_telemetry_components.copy())
-
-            
-
-            else:
-                self.msleep(250) # Yield control briefly
-
-    def stop(self):
-        print("[MAVLinkThread] Stopping thread...")
-        self.running = False
-        self.quit()
-        self.wait()
-        print("[MAVLinkThread] Thread stopped.")
 
+    def update(self, changes):
+        """Apply a partial telemetry dict and emit each affected group once"""
+        dirty_groups = set()
+        for key, value in changes.items():
+            if self._values.get(key) != value:
+                self._values[key] = value
+                group = FIELD_GROUPS.get(key)
+                if group is not None:
+                    dirty_groups.add(group)
+
+        for group in dirty_groups:
+            self._signals[group].emit()
+        return dirty_groups
+
+    def reset(self, values):
+        """Replace every value (used on disconnect) and notify all groups"""
+        self._values = dict(values)
+        for signal in self._signals.values():
+            signal.emit()
@@ -0,0 +1,62 @@
+"""
+Telemetry Publisher - coalesces telemetry changes before they cross to the GUI thread
+Handlers mark fields dirty; at most max_rate_hz flushes per second are emitted,
+each carrying only the keys that changed. Urgent fields flush immediately.
+"""
+import time
+
+
+class TelemetryPublisher:
+    """Collects dirty telemetry keys and emits them as a partial dict"""
+
+    DEFAULT_URGENT_KEYS = ('armed', 'mode')
+
+    def __init__(self, record, emit, max_rate_hz=30.0, urgent_keys=DEFAULT_URGENT_KEYS):
+        self._record = record
+        self._emit = emit
+        self._dirty = set()
+        self._urgent_keys = frozenset(urgent_keys)
+        self._last_flush = 0.0
+        self.max_rate_hz = max_rate_hz
+
+    @property
+    def max_rate_hz(self):
+        return self._max_rate_hz
+
+    @max_rate_hz.setter
+    def max_rate_hz(self, value):
+        self._max_rate_hz = float(value)
+        self._min_interval = 1.0 / self._max_rate_hz if self._max_rate_hz > 0 else 0.0
+
+    @property
+    def pending(self):
+        return bool(self._dirty)
+
+    def mark_dirty(self, keys):
+        """Record changed keys; flushes at once when an urgent key changed"""
+        self._dirty.update(keys)
+        if not self._urgent_keys.isdisjoint(keys):
+            self.flush()
+
+    def time_until_flush(self, now=None):
+        """Seconds until the next flush is allowed, or None when nothing is pending"""
+        if not self._dirty:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._last_flush + self._min_interval - now)
+
+    def flush_if_due(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self._dirty and now - self._last_flush >= self._min_interval:
+            self.flush(now)
+            return True
+        return False
+
+    def flush(self, now=None):
+        if not self._dirty:
+            return
+        record = self._record
+        changes = {key: record[key] for key in self._dirty}
+        self._dirty.clear()
+        self._last_flush = time.monotonic() if now is None else now
+        self._emit(changes)
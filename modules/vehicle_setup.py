@@ -0,0 +1,243 @@
+"""
+Vehicle setup pipeline - runs once per connection without blocking the GUI
+All parameter writes and message-interval commands are sent back-to-back;
+PARAM_VALUE / COMMAND_ACK responses are matched from the message hub and
+only unacknowledged steps are retried.
+"""
+import time
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from pymavlink import mavutil
+
+
+# (param_id, value, param_type, status text shown when confirmed)
+DEFAULT_PARAM_WRITES = [
+    ('BRD_SAFETYENABLE', 0, mavutil.mavlink.MAV_PARAM_TYPE_INT8, "🔓 Safety switch bypassed"),
+    ('FLTMODE_CH', 0, mavutil.mavlink.MAV_PARAM_TYPE_INT8, "🔒 RC mode switch DISABLED"),
+]
+
+
+class _SetupStep:
+    """One write that is complete when its acknowledgement arrives"""
+
+    def __init__(self, kind, key, send, description=None):
+        self.kind = kind              # 'param' or 'command'
+        self.key = key                # param_id, or MAV_CMD id
+        self.send = send
+        self.description = description
+        self.attempts = 0
+        self.sent_at = None
+        self.last_value = None        # value of the last non-matching PARAM_VALUE echo
+        self.done = False
+        self.ok = False
+
+
+class VehicleSetupPipeline(QObject):
+    """
+    Sends the connect-time configuration and tracks its acknowledgements.
+    Runs on the GUI thread from a QTimer; nothing blocks.
+    """
+    stepConfirmed = pyqtSignal(str)             # status text of a confirmed step
+    setupFinished = pyqtSignal(bool, list)      # success, descriptions of failed steps
+
+    def __init__(self, drone, message_hub, param_writes=None, message_rates=None,
+                 retry_interval=0.5, max_attempts=4, poll_interval_ms=20):
+        super().__init__()
+        self._drone = drone
+        self._hub = message_hub
+        self.param_writes = DEFAULT_PARAM_WRITES if param_writes is None else param_writes
+        # (msgid, interval in microseconds); stream rates are normally left to StreamRateManager
+        self.message_rates = message_rates or []
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+
+        self._steps = []
+        self._save_step = None
+        self._sub = None
+        self._started_at = None
+        self.elapsed = None
+        self.running = False
+
+        self._timer = QTimer()
+        self._timer.setInterval(poll_interval_ms)
+        self._timer.timeout.connect(self._poll)
+
+    def start(self):
+        """Send every write at once and start matching responses"""
+        print("[VehicleSetup] 🚀 Sending vehicle setup...")
+        self._started_at = time.monotonic()
+        self.running = True
+        # Subscribe before sending so no response can be missed
+        self._sub = self._hub.subscribe(['PARAM_VALUE', 'COMMAND_ACK'], maxsize=512)
+
+        for param_id, value, param_type, description in self.param_writes:
+            self._steps.append(_SetupStep(
+                'param', param_id,
+                lambda p=param_id, v=value, t=param_type: self._send_param(p, v, t),
+                description
+            ))
+
+        for msg_id, interval in self.message_rates:
+            self._steps.append(_SetupStep(
+                'command', mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
+                lambda m=msg_id, i=interval: self._send_command(
+                    mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL, m, i),
+                f"message {msg_id} interval"
+            ))
+
+        for step in self._steps:
+            self._send_step(step)
+
+        self._timer.start()
+
+    def cancel(self):
+        if self.running:
+            print("[VehicleSetup] Setup cancelled")
+        self._stop()
+
+    def _stop(self):
+        self.running = False
+        self._timer.stop()
+        if self._sub is not None:
+            self._sub.close()
+            self._sub = None
+
+    # ---------- sending ----------
+
+    def _send_step(self, step):
+        step.attempts += 1
+        step.sent_at = time.monotonic()
+        step.send()
+
+    def _send_param(self, param_id, value, param_type):
+        self._drone.mav.param_set_send(
+            self._drone.target_system,
+            self._drone.target_component,
+            param_id.encode('ascii'),
+            value,
+            param_type
+        )
+
+    def _send_command(self, command, param1=0, param2=0):
+        self._drone.mav.command_long_send(
+            self._drone.target_system,
+            self._drone.target_component,
+            command,
+            0, param1, param2, 0, 0, 0, 0, 0
+        )
+
+    # ---------- matching ----------
+
+    def _poll(self):
+        if self._sub is None:
+            return
+        for msg in self._sub.drain():
+            if msg.get_type() == 'PARAM_VALUE':
+                self._on_param_value(msg)
+            else:
+                self._on_command_ack(msg)
+
+        if self._save_step is None and self._params_done():
+            if self._params_ok():
+                self._queue_save()
+            else:
+                self._skip_save()
+
+        now = time.monotonic()
+        for step in self._pending():
+            if step.done or now - step.sent_at < self.retry_interval:
+                continue
+            if step.attempts >= self.max_attempts:
+                if step.last_value is not None:
+                    print(f"[VehicleSetup] ❌ {step.description} not applied, vehicle still reports "
+                          f"{step.last_value} after {step.attempts} attempts")
+                else:
+                    print(f"[VehicleSetup] ❌ No acknowledgement for {step.description} after {step.attempts} attempts")
+                step.done = True
+                continue
+            # ACKs of equal commands are indistinguishable, so a lost one means
+            # the whole group is resent (these commands are idempotent)
+            for retry in self._same_command(step):
+                print(f"[VehicleSetup] 🔁 Retrying {retry.description} (attempt {retry.attempts + 1})")
+                retry.done = False
+                retry.ok = False
+                self._send_step(retry)
+
+        if not self._pending() and self._save_step is not None:
+            self._finish()
+
+    def _on_param_value(self, msg):
+        param_id = msg.param_id
+        if isinstance(param_id, bytes):
+            param_id = param_id.decode('utf-8')
+        param_id = param_id.strip('\x00')
+
+        for step in self._pending():
+            if step.kind == 'param' and step.key == param_id:
+                expected = next(value for pid, value, _, _ in self.param_writes if pid == param_id)
+                if abs(msg.param_value - expected) < 1e-6:
+                    self._complete(step, True)
+                else:
+                    # An echo still carrying the old value can be a reply to someone
+                    # else's read: keep retrying and judge only at max_attempts
+                    step.last_value = msg.param_value
+                return
+
+    def _on_command_ack(self, msg):
+        # ACKs carry only the command id: equal commands are matched oldest first
+        for step in self._pending():
+            if step.kind == 'command' and step.key == msg.command:
+                if msg.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+                    step.sent_at = time.monotonic()
+                    return
+                self._complete(step, msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED)
+                return
+
+    def _complete(self, step, ok):
+        step.done = True
+        step.ok = ok
+        if ok:
+            print(f"[VehicleSetup] ✅ {step.description} confirmed ({1000 * (time.monotonic() - step.sent_at):.0f} ms)")
+            if step.kind == 'param' or step is self._save_step:
+                self.stepConfirmed.emit(step.description)
+        else:
+            print(f"[VehicleSetup] ❌ {step.description} rejected by vehicle")
+
+    def _same_command(self, step):
+        if step.kind != 'command':
+            return [step]
+        return [other for other in self._steps if other.kind == 'command' and other.key == step.key]
+
+    def _pending(self):
+        return [step for step in self._steps if not step.done]
+
+    def _params_done(self):
+        return all(step.done for step in self._steps if step.kind == 'param')
+
+    def _params_ok(self):
+        return all(step.ok for step in self._steps if step.kind == 'param')
+
+    def _skip_save(self):
+        # A write failed: leave storage untouched and report it instead of saving
+        print("[VehicleSetup] ⚠️ Parameter writes failed, settings not saved")
+        self._save_step = _SetupStep('command', mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE, None,
+                                     "💾 Settings not saved")
+        self._save_step.done = True
+        self._steps.append(self._save_step)
+
+    def _queue_save(self):
+        # Persist only after every parameter write has been confirmed
+        self._save_step = _SetupStep(
+            'command', mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE,
+            lambda: self._send_command(mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE, 1),
+            "💾 Settings saved"
+        )
+        self._steps.append(self._save_step)
+        self._send_step(self._save_step)
+
+    def _finish(self):
+        self.elapsed = time.monotonic() - self._started_at
+        failed = [step.description for step in self._steps if not step.ok]
+        self._stop()
+        print(f"[VehicleSetup] {'✅' if not failed else '⚠️'} Setup finished in {1000 * self.elapsed:.0f} ms"
+              f"{'' if not failed else f' - failed: {failed}'}")
+        self.setupFinished.emit(not failed, failed)
@@ -0,0 +1,494 @@
+"""
+Simulated vehicle - a minimal MAVLink autopilot stand-in on local UDP
+Used by the benchmarks to exercise the GCS side without hardware:
+sends HEARTBEAT, answers PARAM_SET/PARAM_REQUEST_* with PARAM_VALUE and
+COMMAND_LONG with COMMAND_ACK, with an optional one-way latency and random
+loss. Arms, switches mode and climbs after NAV_TAKEOFF, reporting
+GLOBAL_POSITION_INT, and accepts mission uploads (MISSION_COUNT or
+MISSION_WRITE_PARTIAL_LIST, then one MISSION_REQUEST_INT per item,
+re-requested when an item does not arrive) and downloads. Optionally
+answers REQUEST_MESSAGE(AUTOPILOT_VERSION) with a uid and reports a
+PX4-style _HASH_CHECK over its parameters (heartbeating as another autopilot), and serves @PARAM/param.pck
+over MAVFTP (open, read, burst read).
+SimulatedLink is the GCS side the benchmarks and tests share: connection,
+reader thread and message hub against one SimulatedVehicle.
+"""
+import heapq
+import random
+import selectors
+import socket
+import struct
+import threading
+import time
+import zlib
+
+from pymavlink import mavutil
+
+from modules import mavftp
+from modules.param_ftp import pack_param_file
+
+
+def free_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class SimulatedVehicle:
+    """Autopilot stand-in that talks to a GCS listening on udpin:127.0.0.1:<port>"""
+
+    def __init__(self, port, latency=0.0, heartbeat_hz=1.0, params=None,
+                 system=1, component=1, drop_first=None, in_progress=None,
+                 position_hz=5.0, climb_rate=2.5, loss=0.0, seed=1, mission_request_timeout=1.0,
+                 mission_request_int=True, uid=0, board_version=0, param_hash=False,
+                 param_rate=None, ftp=False, ftp_rate=None, readonly=(), armed_in_heartbeat=True,
+                 autopilot=mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA):
+        self.port = port
+        self.latency = latency
+        self.heartbeat_hz = heartbeat_hz
+        self.system = system
+        self.component = component
+        self.params = dict(params or {'BRD_SAFETYENABLE': 1.0, 'FLTMODE_CH': 5.0, 'SYSID_THISMAV': 1.0})
+        # Params whose PARAM_SET is echoed with the value unchanged
+        self.readonly = set(readonly)
+        # False: accept arming but never show it in HEARTBEAT (tests the GCS's confirmation wait)
+        self.armed_in_heartbeat = armed_in_heartbeat
+        # MAV_AUTOPILOT in HEARTBEAT; the GCS skips the _HASH_CHECK probe for ArduPilot
+        self.autopilot = autopilot
+        # {msg type: n} - ignore the first n incoming messages of that type (tests retries);
+        # 'COMMAND_LONG:<command id>' narrows it to one command
+        # AUTOPILOT_VERSION identity; param_hash answers PARAM_REQUEST_READ('_HASH_CHECK')
+        self.uid = uid
+        self.board_version = board_version
+        self.param_hash = param_hash
+        # PARAM_VALUE/s of a PARAM_REQUEST_LIST reply (None: all at once), like a slow radio link
+        self.param_rate = param_rate
+        # MAVFTP server for @PARAM/param.pck; ftp_rate: burst packets/s (None: all at once)
+        self.ftp = ftp
+        self.ftp_rate = ftp_rate
+        self._ftp_file = None
+        self.drop_first = dict(drop_first or {})
+        # {command id: seconds} - commands that report MAV_RESULT_IN_PROGRESS before completing
+        self.in_progress = dict(in_progress or {})
+        self.message_intervals = {}
+        # Fraction of frames lost in each direction (heartbeats and positions excepted)
+        self.loss = loss
+        self._random = random.Random(seed)
+        # mission type -> list of received MISSION_ITEM_INT
+        self.missions = {}
+        self.mission_request_timeout = mission_request_timeout
+        # False: request items with the older MISSION_REQUEST
+        self.mission_request_int = mission_request_int
+        self._upload = None
+        self._last_uploaded = None     # (mission type, seq of the final item) of the last upload
+        self.position_hz = position_hz
+        self.climb_rate = climb_rate
+        self.relative_alt = 0.0
+        self.target_alt = 0.0
+        self.custom_mode = 0
+        self.base_mode = mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
+        self.received = []
+        self._conn = None
+        self._thread = None
+        self._running = False
+        self._outbox = []
+        self._outbox_seq = 0
+
+    def start(self):
+        self._conn = mavutil.mavlink_connection(
+            f'udpout:127.0.0.1:{self.port}',
+            source_system=self.system, source_component=self.component
+        )
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ---------- outgoing ----------
+
+    def send_later(self, build, delay=0.0):
+        """Queue build(mav) to be sent after the simulated latency (plus delay)"""
+        if self.loss and self._random.random() < self.loss:
+            return
+        self._outbox_seq += 1
+        heapq.heappush(self._outbox, (time.monotonic() + self.latency + delay, self._outbox_seq, build))
+
+    def _send_heartbeat(self, mav):
+        base_mode = self.base_mode
+        if not self.armed_in_heartbeat:
+            base_mode &= ~mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+        mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_QUADROTOR,
+            self.autopilot,
+            base_mode, self.custom_mode,
+            mavutil.mavlink.MAV_STATE_STANDBY
+        )
+
+    def _send_position(self, mav):
+        mav.global_position_int_send(
+            int(1000 * (time.monotonic() % 4e6)), 473977420, 85455940,
+            int(1000 * (488.0 + self.relative_alt)), int(1000 * self.relative_alt),
+            0, 0, int(-100 * self.climb_rate) if self.relative_alt < self.target_alt else 0, 0
+        )
+
+    @property
+    def armed(self):
+        return bool(self.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+
+    def _fly(self, dt):
+        if not self.armed:
+            self.target_alt = 0.0
+            self.relative_alt = 0.0
+        elif self.relative_alt < self.target_alt:
+            self.relative_alt = min(self.target_alt, self.relative_alt + self.climb_rate * dt)
+
+    def _send_param(self, mav, name):
+        names = sorted(self.params)
+        mav.param_value_send(
+            name.encode('ascii'), self.params[name],
+            mavutil.mavlink.MAV_PARAM_TYPE_REAL32,
+            len(names), names.index(name)
+        )
+
+    def _hash_value(self):
+        """CRC32 over each name and 4-byte value in index order, carried in a float"""
+        crc = 0
+        for name in sorted(self.params):
+            for data in (name.encode('ascii'), struct.pack('<f', self.params[name])):
+                crc = zlib.crc32(data, crc ^ 0xFFFFFFFF) ^ 0xFFFFFFFF
+        return struct.unpack('<f', struct.pack('<I', crc))[0]
+
+    def _send_hash(self, mav):
+        mav.param_value_send(b'_HASH_CHECK', self._hash_value(), mavutil.mavlink.MAV_PARAM_TYPE_UINT32,
+                             len(self.params), 65535)
+
+    def _send_autopilot_version(self, mav):
+        mav.autopilot_version_send(0, 0, 0, 0, self.board_version, [0] * 8, [0] * 8, [0] * 8, 0, 0, self.uid)
+
+    # ---------- incoming ----------
+
+    def _run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._conn.fd, selectors.EVENT_READ)
+        # The first heartbeat tells the GCS (udpin) where to send replies
+        next_heartbeat = time.monotonic()
+        next_position = next_heartbeat
+        last_step = next_heartbeat
+        while self._running:
+            now = time.monotonic()
+            self._fly(now - last_step)
+            last_step = now
+            if now >= next_heartbeat:
+                self._send_heartbeat(self._conn.mav)
+                next_heartbeat = now + 1.0 / self.heartbeat_hz
+            if self.position_hz and now >= next_position:
+                self._send_position(self._conn.mav)
+                next_position = now + 1.0 / self.position_hz
+
+            upload = self._upload
+            if upload is not None and now - upload['requested_at'] > self.mission_request_timeout:
+                self._request_next_item()
+
+            while self._outbox and self._outbox[0][0] <= now:
+                _, _, build = heapq.heappop(self._outbox)
+                build(self._conn.mav)
+
+            timeout = min(next_heartbeat, next_position) - now if self.position_hz else next_heartbeat - now
+            if self._outbox:
+                timeout = min(timeout, self._outbox[0][0] - now)
+            selector.select(timeout=max(0.0, min(timeout, 0.05)))
+
+            while True:
+                msg = self._conn.recv_msg()
+                if msg is None:
+                    break
+                self._handle(msg)
+        selector.close()
+
+    def _handle(self, msg):
+        msg_type = msg.get_type()
+        if msg_type == 'BAD_DATA':
+            return
+        self.received.append(msg)
+        if self.loss and self._random.random() < self.loss:
+            return
+        for key in (msg_type, f'{msg_type}:{getattr(msg, "command", "")}'):
+            if self.drop_first.get(key, 0) > 0:
+                self.drop_first[key] -= 1
+                return
+
+        handler = getattr(self, '_on_' + msg_type.lower(), None)
+        if handler is not None:
+            handler(msg)
+
+    def _on_param_set(self, msg):
+        name = msg.param_id
+        if isinstance(name, bytes):
+            name = name.decode('ascii')
+        name = name.strip('\x00')
+        if name not in self.readonly:
+            self.params[name] = msg.param_value
+        self.send_later(lambda mav: self._send_param(mav, name))
+
+    def _on_param_request_read(self, msg):
+        names = sorted(self.params)
+        if 0 <= msg.param_index < len(names):
+            name = names[msg.param_index]
+        else:
+            name = msg.param_id
+            if isinstance(name, bytes):
+                name = name.decode('ascii')
+            name = name.strip('\x00')
+        if name in self.params:
+            self.send_later(lambda mav: self._send_param(mav, name))
+        elif name == '_HASH_CHECK' and self.param_hash:
+            self.send_later(self._send_hash)
+
+    def _on_param_request_list(self, msg):
+        spacing = 1.0 / self.param_rate if self.param_rate else 0.0
+        for i, name in enumerate(sorted(self.params)):
+            self.send_later(lambda mav, name=name: self._send_param(mav, name), i * spacing)
+
+    def _on_command_long(self, msg):
+        result = mavutil.mavlink.MAV_RESULT_ACCEPTED
+        if msg.command == mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
+            if msg.param1:
+                self.base_mode |= mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+            else:
+                self.base_mode &= ~mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+        elif msg.command == mavutil.mavlink.MAV_CMD_DO_SET_MODE:
+            self.custom_mode = int(msg.param2)
+        elif msg.command == mavutil.mavlink.MAV_CMD_NAV_TAKEOFF:
+            if self.armed:
+                self.target_alt = msg.param7
+            else:
+                result = mavutil.mavlink.MAV_RESULT_FAILED
+        elif msg.command == mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE:
+            if int(msg.param1) == mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT:
+                self.send_later(self._send_heartbeat)
+            elif int(msg.param1) == mavutil.mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION and self.uid:
+                self.send_later(self._send_autopilot_version)
+        elif msg.command == mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL:
+            self.message_intervals[int(msg.param1)] = int(msg.param2)
+        elif msg.command == mavutil.mavlink.MAV_CMD_GET_MESSAGE_INTERVAL:
+            msgid = int(msg.param1)
+            interval = self.message_intervals.get(msgid, 0)
+            self.send_later(lambda mav: mav.message_interval_send(msgid, interval))
+        duration = self.in_progress.get(msg.command)
+        if duration:
+            self._report_progress(msg.command, result, duration)
+            return
+        self.send_later(lambda mav: mav.command_ack_send(msg.command, result))
+
+    def _on_file_transfer_protocol(self, msg):
+        if not self.ftp:
+            return
+        request = mavftp.FtpPacket.decode(msg.payload)
+        target = (msg.get_srcSystem(), msg.get_srcComponent())
+
+        def reply(opcode, data=b'', offset=0, burst_complete=0, seq=request.seq + 1, delay=0.0):
+            packet = mavftp.FtpPacket(seq, 0, opcode, data, request.opcode, burst_complete, offset)
+            self.send_later(lambda mav: mav.file_transfer_protocol_send(0, *target, packet.encode()), delay)
+
+        def nack(error):
+            reply(mavftp.OP_NACK, bytes((error,)), request.offset)
+
+        if request.opcode == mavftp.OP_OPEN_FILE_RO:
+            if request.data.decode('ascii', 'replace').split('?')[0] != '@PARAM/param.pck':
+                return nack(mavftp.ERR_FILE_NOT_FOUND)
+            self._ftp_file = pack_param_file([(name, mavutil.mavlink.MAV_PARAM_TYPE_REAL32, value, None)
+                                              for name, value in sorted(self.params.items())])
+            reply(mavftp.OP_ACK, struct.pack('<I', len(self._ftp_file)))
+        elif request.opcode in (mavftp.OP_READ_FILE, mavftp.OP_BURST_READ_FILE):
+            file = self._ftp_file
+            if file is None or request.session != 0:
+                return nack(mavftp.ERR_INVALID_SESSION)
+            if request.offset >= len(file):
+                return nack(mavftp.ERR_EOF)
+            if request.opcode == mavftp.OP_READ_FILE:
+                return reply(mavftp.OP_ACK, file[request.offset:request.offset + mavftp.MAX_DATA], request.offset)
+            # Burst: the rest of the file, one packet after another
+            spacing = 1.0 / self.ftp_rate if self.ftp_rate else 0.0
+            offsets = range(request.offset, len(file), mavftp.MAX_DATA)
+            for i, offset in enumerate(offsets):
+                reply(mavftp.OP_ACK, file[offset:offset + mavftp.MAX_DATA], offset,
+                      burst_complete=int(i == len(offsets) - 1), seq=request.seq + 1 + i, delay=i * spacing)
+        elif request.opcode in (mavftp.OP_TERMINATE_SESSION, mavftp.OP_RESET_SESSIONS):
+            self._ftp_file = None
+            reply(mavftp.OP_ACK)
+        else:
+            nack(mavftp.ERR_UNKNOWN_COMMAND)
+
+    def _report_progress(self, command, result, duration, steps=4):
+        """IN_PROGRESS ACKs with rising progress, then the final result"""
+        in_progress = mavutil.mavlink.MAV_RESULT_IN_PROGRESS
+        # The progress field only exists in the MAVLink 2 message
+        has_progress = 'progress' in mavutil.mavlink.MAVLink_command_ack_message.fieldnames
+        for step in range(steps):
+            extra = {'progress': int(100 * step / steps)} if has_progress else {}
+            self.send_later(lambda mav, extra=extra: mav.command_ack_send(command, in_progress, **extra),
+                            duration * step / steps)
+        self.send_later(lambda mav: mav.command_ack_send(command, result), duration)
+
+    # ---------- mission protocol ----------
+
+    @staticmethod
+    def _mission_type_field(msg_class, mission_type):
+        return {'mission_type': mission_type} if 'mission_type' in msg_class.fieldnames else {}
+
+    def _send_mission_ack(self, target, result, mission_type):
+        fields = self._mission_type_field(mavutil.mavlink.MAVLink_mission_ack_message, mission_type)
+        self.send_later(lambda mav: mav.mission_ack_send(target[0], target[1], result, **fields))
+
+    def _request_next_item(self):
+        upload = self._upload
+        upload['requested_at'] = time.monotonic()
+        seq = len(upload['items'])
+        fields = self._mission_type_field(mavutil.mavlink.MAVLink_mission_request_int_message, upload['type'])
+        if self.mission_request_int:
+            self.send_later(lambda mav: mav.mission_request_int_send(upload['target'][0], upload['target'][1],
+                                                                     seq, **fields))
+        else:
+            self.send_later(lambda mav: mav.mission_request_send(upload['target'][0], upload['target'][1],
+                                                                 seq, **fields))
+
+    def _on_mission_count(self, msg):
+        mission_type = getattr(msg, 'mission_type', mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+        target = (msg.get_srcSystem(), msg.get_srcComponent())
+        if msg.count == 0:
+            self.missions[mission_type] = []
+            self._upload = None
+            self._send_mission_ack(target, mavutil.mavlink.MAV_MISSION_ACCEPTED, mission_type)
+            return
+        self._upload = {'type': mission_type, 'count': msg.count, 'items': [], 'target': target}
+        self._request_next_item()
+
+    def _on_mission_write_partial_list(self, msg):
+        mission_type = getattr(msg, 'mission_type', mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+        target = (msg.get_srcSystem(), msg.get_srcComponent())
+        stored = self.missions.get(mission_type, [])
+        if not 0 <= msg.start_index <= msg.end_index < len(stored):
+            self._send_mission_ack(target, mavutil.mavlink.MAV_MISSION_ERROR, mission_type)
+            return
+        self._upload = {'type': mission_type, 'count': msg.end_index + 1, 'target': target,
+                        'items': stored[:msg.start_index], 'tail': stored[msg.end_index + 1:]}
+        self._request_next_item()
+
+    def _on_mission_item_int(self, msg):
+        upload = self._upload
+        mission_type = getattr(msg, 'mission_type', mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+        if upload is None:
+            # The final item again: our MISSION_ACK was lost
+            if self._last_uploaded == (mission_type, msg.seq):
+                self._send_mission_ack((msg.get_srcSystem(), msg.get_srcComponent()),
+                                       mavutil.mavlink.MAV_MISSION_ACCEPTED, mission_type)
+            return
+        if mission_type != upload['type']:
+            return
+        if msg.seq != len(upload['items']):
+            # Duplicate or out of order: ask again for the item that is missing
+            self._request_next_item()
+            return
+        upload['items'].append(msg)
+        if len(upload['items']) < upload['count']:
+            self._request_next_item()
+            return
+        self.missions[mission_type] = upload['items'] + upload.get('tail', [])
+        self._last_uploaded = (mission_type, msg.seq)
+        self._upload = None
+        self._send_mission_ack(upload['target'], mavutil.mavlink.MAV_MISSION_ACCEPTED, mission_type)
+
+    def _on_mission_request_list(self, msg):
+        mission_type = getattr(msg, 'mission_type', mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+        count = len(self.missions.get(mission_type, []))
+        target = (msg.get_srcSystem(), msg.get_srcComponent())
+        fields = self._mission_type_field(mavutil.mavlink.MAVLink_mission_count_message, mission_type)
+        self.send_later(lambda mav: mav.mission_count_send(target[0], target[1], count, **fields))
+
+    def _on_mission_request_int(self, msg):
+        mission_type = getattr(msg, 'mission_type', mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+        stored = self.missions.get(mission_type, [])
+        if 0 <= msg.seq < len(stored):
+            item = stored[msg.seq]
+            target = (msg.get_srcSystem(), msg.get_srcComponent())
+            fields = self._mission_type_field(mavutil.mavlink.MAVLink_mission_item_int_message, mission_type)
+            self.send_later(lambda mav: mav.mission_item_int_send(
+                target[0], target[1], item.seq, item.frame, item.command, item.current, item.autocontinue,
+                item.param1, item.param2, item.param3, item.param4, item.x, item.y, item.z, **fields))
+
+    def _on_mission_clear_all(self, msg):
+        mission_type = getattr(msg, 'mission_type', mavutil.mavlink.MAV_MISSION_TYPE_MISSION)
+        self.missions[mission_type] = []
+        self._send_mission_ack((msg.get_srcSystem(), msg.get_srcComponent()),
+                               mavutil.mavlink.MAV_MISSION_ACCEPTED, mission_type)
+
+
+class SimulatedLink:
+    """
+    GCS connection, MAVLinkThread reader and message hub against a
+    SimulatedVehicle on a free local port. Use as a context manager.
+    """
+
+    def __init__(self, **vehicle_kwargs):
+        from modules.mavlink_hub import MAVLinkMessageHub
+
+        self.port = free_udp_port()
+        self._vehicle_kwargs = vehicle_kwargs
+        self.drone = mavutil.mavlink_connection(f'udpin:127.0.0.1:{self.port}')
+        self.vehicle = SimulatedVehicle(self.port, **vehicle_kwargs)
+        self.vehicle.start()
+        self.drone.wait_heartbeat(timeout=5)
+        self.hub = MAVLinkMessageHub()
+        self.thread = None
+        self.reader = None
+        self.start_reader(self.drone)
+
+    def start_reader(self, drone):
+        """Read drone into the hub (e.g. the connection reopened after a link loss)"""
+        from modules.mavlink_thread import MAVLinkThread
+
+        self.drone = drone
+        self.thread = MAVLinkThread(drone, message_hub=self.hub)
+        self.reader = threading.Thread(target=self.thread.run, daemon=True)
+        self.reader.start()
+
+    def stop_reader(self):
+        """Stop reading and close the connection, as DroneModel does on link loss"""
+        if self.thread is not None:
+            self.thread.running = False
+            self.reader.join(timeout=2)
+            self.thread = None
+            self.reader = None
+        self.drone.close()
+
+    def restart_vehicle(self):
+        """A fresh vehicle on the same port (after vehicle.stop())"""
+        self.vehicle = SimulatedVehicle(self.port, **self._vehicle_kwargs)
+        self.vehicle.start()
+        return self.vehicle
+
+    def vehicle_commands(self, loop_thread, commands=None, **options):
+        """VehicleCommands for the coroutine API on loop_thread"""
+        from modules.async_commands import VehicleCommands
+        return VehicleCommands(self.drone, self.hub, commands, loop_thread, **options)
+
+    def close(self):
+        self.stop_reader()
+        self.vehicle.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
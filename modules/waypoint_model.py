@@ -0,0 +1,331 @@
+"""
+Waypoint Model - the mission being edited, for QML
+WaypointListModel keeps the planned waypoints in one NumPy structured array
+and changes it in batches: inserting, removing or moving any number of rows
+is a single beginInsertRows/beginRemoveRows/beginMoveRows. WaypointGrid is
+a uniform grid over the points (local metres) for nearest-waypoint hit
+testing; the model rebuilds it lazily after an edit.
+"""
+import math
+
+import numpy as np
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtProperty, pyqtSignal, pyqtSlot
+from pymavlink import mavutil
+
+
+EARTH_RADIUS = 6371000.0   # metres
+
+WAYPOINT_DTYPE = np.dtype([
+    ('lat', '<f8'), ('lon', '<f8'), ('altitude', '<f4'), ('speed', '<f4'), ('hold_time', '<f4'),
+    ('command', '<u2'),
+])
+
+# Marker commandType (NavigationControls.qml) -> MAV_CMD
+COMMAND_TYPES = {
+    'waypoint': mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
+    'takeoff': mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
+    'land': mavutil.mavlink.MAV_CMD_NAV_LAND,
+    'return': mavutil.mavlink.MAV_CMD_NAV_RETURN_TO_LAUNCH,
+    'loiter': mavutil.mavlink.MAV_CMD_NAV_LOITER_UNLIM,
+    'circle': mavutil.mavlink.MAV_CMD_NAV_LOITER_TURNS,
+    'follow': mavutil.mavlink.MAV_CMD_NAV_LOITER_TIME,
+}
+_COMMAND_NAMES = {command: name for name, command in COMMAND_TYPES.items()}
+
+DEFAULT_ALTITUDE = 10.0
+DEFAULT_SPEED = 5.0
+
+
+def command_for_type(command_type):
+    return COMMAND_TYPES.get(command_type, mavutil.mavlink.MAV_CMD_NAV_WAYPOINT)
+
+
+def type_for_command(command):
+    return _COMMAND_NAMES.get(int(command), 'waypoint')
+
+
+def points_from_markers(markers):
+    """Structured array from marker dicts ({lat, lng, altitude, speed, commandType, holdTime})"""
+    points = np.zeros(len(markers), dtype=WAYPOINT_DTYPE)
+    if not markers:
+        return points
+    points['lat'] = [float(m.get('lat', 0.0)) for m in markers]
+    points['lon'] = [float(m.get('lng', m.get('lon', 0.0))) for m in markers]
+    points['altitude'] = [float(m.get('altitude') or DEFAULT_ALTITUDE) for m in markers]
+    points['speed'] = [float(m.get('speed') or DEFAULT_SPEED) for m in markers]
+    points['hold_time'] = [float(m.get('holdTime') or 0.0) for m in markers]
+    points['command'] = [command_for_type(m.get('commandType')) for m in markers]
+    return points
+
+
+class WaypointGrid:
+    """Uniform grid over points projected to local metres (equirectangular about their mean latitude)"""
+
+    def __init__(self, lat, lon):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.size = len(lat)
+        self._lat0 = float(lat.mean()) if self.size else 0.0
+        self._lon0 = float(lon.mean()) if self.size else 0.0
+        self._x, self._y = self._project(lat, lon)
+        if self.size == 0:
+            return
+        self._x_min, self._y_min = float(self._x.min()), float(self._y.min())
+        extent = max(float(self._x.max()) - self._x_min, float(self._y.max()) - self._y_min)
+        # About one point per cell
+        self.cell = max(extent / math.sqrt(self.size), 1.0)
+        self._nx = int(extent // self.cell) + 1
+        self._ny = self._nx
+        keys = self._cell_y(self._y) * self._nx + self._cell_x(self._x)
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+
+    def _project(self, lat, lon):
+        scale = math.cos(math.radians(self._lat0)) * EARTH_RADIUS
+        x = np.radians(np.asarray(lon, dtype=np.float64) - self._lon0) * scale
+        y = np.radians(np.asarray(lat, dtype=np.float64) - self._lat0) * EARTH_RADIUS
+        return x, y
+
+    def _cell_x(self, x):
+        return np.clip(((x - self._x_min) // self.cell).astype(np.int64), 0, self._nx - 1)
+
+    def _cell_y(self, y):
+        return np.clip(((y - self._y_min) // self.cell).astype(np.int64), 0, self._ny - 1)
+
+    def within(self, lat, lon, radius):
+        """Indices of the points within radius metres of (lat, lon)"""
+        if self.size == 0:
+            return np.empty(0, dtype=np.int64)
+        x, y = self._project(lat, lon)
+        x, y = float(x), float(y)
+        x_lo, x_hi = self._cell_x(np.array([x - radius, x + radius]))
+        y_lo, y_hi = self._cell_y(np.array([y - radius, y + radius]))
+        # One contiguous key range per grid row
+        row_keys = np.arange(y_lo, y_hi + 1, dtype=np.int64) * self._nx
+        starts = np.searchsorted(self._keys, row_keys + x_lo, side='left')
+        ends = np.searchsorted(self._keys, row_keys + x_hi, side='right')
+        if not (ends > starts).any():
+            return np.empty(0, dtype=np.int64)
+        candidates = self._order[np.concatenate([np.arange(s, e) for s, e in zip(starts, ends) if e > s])]
+        distance_sq = (self._x[candidates] - x) ** 2 + (self._y[candidates] - y) ** 2
+        return candidates[distance_sq <= radius * radius]
+
+    def nearest(self, lat, lon, max_distance):
+        """(index, distance in metres) of the closest point within max_distance, or (-1, None)"""
+        found = self.within(lat, lon, max_distance)
+        if len(found) == 0:
+            return -1, None
+        x, y = self._project(lat, lon)
+        distance = np.hypot(self._x[found] - float(x), self._y[found] - float(y))
+        best = int(np.argmin(distance))
+        return int(found[best]), float(distance[best])
+
+
+class WaypointListModel(QAbstractListModel):
+    """Planned waypoints (NavigationControls.qml markers), edited in batches"""
+
+    LatitudeRole = Qt.UserRole + 1
+    LongitudeRole = Qt.UserRole + 2
+    AltitudeRole = Qt.UserRole + 3
+    SpeedRole = Qt.UserRole + 4
+    HoldTimeRole = Qt.UserRole + 5
+    CommandRole = Qt.UserRole + 6
+    CommandTypeRole = Qt.UserRole + 7
+
+    countChanged = pyqtSignal()
+
+    _ROLE_FIELDS = {
+        LatitudeRole: 'lat',
+        LongitudeRole: 'lon',
+        AltitudeRole: 'altitude',
+        SpeedRole: 'speed',
+        HoldTimeRole: 'hold_time',
+        CommandRole: 'command',
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._points = np.zeros(0, dtype=WAYPOINT_DTYPE)
+        self._grid = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._points)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._points):
+            return None
+        point = self._points[index.row()]
+        if role == self.CommandTypeRole:
+            return type_for_command(point['command'])
+        field = self._ROLE_FIELDS.get(role)
+        if field is None:
+            return None
+        return int(point[field]) if field == 'command' else float(point[field])
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.row() >= len(self._points):
+            return False
+        if role == self.CommandTypeRole:
+            field, value = 'command', command_for_type(value)
+        else:
+            field = self._ROLE_FIELDS.get(role)
+            if field is None:
+                return False
+        self._points[field][index.row()] = value
+        if field in ('lat', 'lon'):
+            self._grid = None
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def roleNames(self):
+        return {
+            self.LatitudeRole: b'latitude',
+            self.LongitudeRole: b'longitude',
+            self.AltitudeRole: b'altitude',
+            self.SpeedRole: b'speed',
+            self.HoldTimeRole: b'holdTime',
+            self.CommandRole: b'command',
+            self.CommandTypeRole: b'commandType',
+        }
+
+    @property
+    def points(self):
+        """The waypoints as a structured array (read-only view)"""
+        view = self._points.view()
+        view.flags.writeable = False
+        return view
+
+    @pyqtProperty(int, notify=countChanged)
+    def count(self):
+        return len(self._points)
+
+    # --- batch edits -------------------------------------------------------
+
+    def insert_points(self, row, points):
+        """Insert a WAYPOINT_DTYPE array before row (GUI thread only)"""
+        row = max(0, min(int(row), len(self._points)))
+        if len(points) == 0:
+            return False
+        self.beginInsertRows(QModelIndex(), row, row + len(points) - 1)
+        self._points = np.concatenate((self._points[:row], points, self._points[row:]))
+        self._grid = None
+        self.endInsertRows()
+        self.countChanged.emit()
+        return True
+
+    def insert_arrays(self, row, lat, lon, altitude=DEFAULT_ALTITUDE, speed=DEFAULT_SPEED, hold_time=0.0,
+                      command=mavutil.mavlink.MAV_CMD_NAV_WAYPOINT):
+        """Insert waypoints from coordinate arrays; the other columns broadcast"""
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        points = np.zeros(len(lat), dtype=WAYPOINT_DTYPE)
+        points['lat'] = lat
+        points['lon'] = lon
+        points['altitude'] = altitude
+        points['speed'] = speed
+        points['hold_time'] = hold_time
+        points['command'] = command
+        return self.insert_points(row, points)
+
+    def set_points(self, points):
+        """Replace every waypoint (one model reset)"""
+        old_count = len(self._points)
+        self.beginResetModel()
+        self._points = np.array(points, dtype=WAYPOINT_DTYPE)
+        self._grid = None
+        self.endResetModel()
+        if len(self._points) != old_count:
+            self.countChanged.emit()
+
+    @pyqtSlot(int, 'QVariantList', result=bool)
+    def insertWaypoints(self, row, markers):
+        return self.insert_points(row, points_from_markers(markers))
+
+    @pyqtSlot('QVariantList', result=bool)
+    def appendWaypoints(self, markers):
+        return self.insert_points(len(self._points), points_from_markers(markers))
+
+    @pyqtSlot(int, int, result=bool)
+    def removeWaypoints(self, row, count):
+        if count <= 0 or row < 0 or row + count > len(self._points):
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        self._points = np.delete(self._points, np.s_[row:row + count])
+        self._grid = None
+        self.endRemoveRows()
+        self.countChanged.emit()
+        return True
+
+    @pyqtSlot(int, int, int, result=bool)
+    def moveWaypoints(self, source, count, destination):
+        """Move count rows starting at source before row destination (numbered before the move)"""
+        if count <= 0 or source < 0 or source + count > len(self._points):
+            return False
+        if not self.beginMoveRows(QModelIndex(), source, source + count - 1, QModelIndex(), destination):
+            return False
+        block = self._points[source:source + count]
+        rest = np.delete(self._points, np.s_[source:source + count])
+        at = destination if destination < source else destination - count
+        self._points = np.concatenate((rest[:at], block, rest[at:]))
+        self._grid = None
+        self.endMoveRows()
+        return True
+
+    @pyqtSlot(int, float, float, result=bool)
+    def setPosition(self, row, lat, lon):
+        if not 0 <= row < len(self._points):
+            return False
+        self._points['lat'][row] = lat
+        self._points['lon'][row] = lon
+        self._grid = None
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [self.LatitudeRole, self.LongitudeRole])
+        return True
+
+    @pyqtSlot(int, str, 'QVariant', result=bool)
+    def setValue(self, row, role_name, value):
+        """setData by role name (e.g. 'altitude', 'commandType') for QML editors"""
+        roles = {name.decode(): role for role, name in self.roleNames().items()}
+        if role_name not in roles:
+            return False
+        return self.setData(self.index(row), value, roles[role_name])
+
+    @pyqtSlot('QVariantList')
+    def loadMarkers(self, markers):
+        """Replace the list with the map's markers"""
+        self.set_points(points_from_markers(markers))
+
+    @pyqtSlot()
+    def clear(self):
+        self.set_points(np.zeros(0, dtype=WAYPOINT_DTYPE))
+
+    # --- conversions and lookups ----------------------------------------------
+
+    @pyqtSlot(result='QVariantList')
+    def toMarkers(self):
+        """Marker dicts for the map page's setMarkers()"""
+        return [{'lat': lat, 'lng': lon, 'altitude': alt, 'speed': speed,
+                 'commandType': type_for_command(command), 'holdTime': hold}
+                for lat, lon, alt, speed, hold, command in self._points.tolist()]
+
+    def mission_waypoints(self):
+        """Waypoint dicts for build_mission_items (hold time goes in param1; speed is for the mission check)"""
+        return [{'x': lat, 'y': lon, 'z': alt, 'command': command, 'param1': hold, 'speed': speed}
+                for lat, lon, alt, speed, hold, command in self._points.tolist()]
+
+    def grid(self):
+        if self._grid is None:
+            self._grid = WaypointGrid(self._points['lat'], self._points['lon'])
+        return self._grid
+
+    @pyqtSlot(float, float, float, result=int)
+    def nearestWaypoint(self, lat, lon, max_distance):
+        """Row of the waypoint closest to (lat, lon) within max_distance metres, or -1"""
+        return self.grid().nearest(lat, lon, max_distance)[0]
+
+    @pyqtSlot(float, float, float, result='QVariantList')
+    def waypointsWithin(self, lat, lon, radius):
+        """Rows within radius metres of (lat, lon), in list order"""
+        return sorted(int(row) for row in self.grid().within(lat, lon, radius))
@@ -0,0 +1,67 @@
+"""
+Shared fixtures: a Qt application, the asyncio command loop and
+SimulatedLink (GCS side against a simulated vehicle on local UDP).
+Run from the project root:  python -m pytest tests
+"""
+import os
+import sys
+import time
+
+import pytest
+
+# Add parent directory to path when pytest is run from elsewhere
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QCoreApplication
+
+from modules.async_commands import AsyncLoopThread
+from modules.vehicle_simulator import SimulatedLink
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def process_events_until(predicate, timeout=5.0):
+    """Run Qt events until predicate() is true; returns its last value"""
+    app = QCoreApplication.instance()
+    deadline = time.monotonic() + timeout
+    while True:
+        result = predicate()
+        if result or time.monotonic() >= deadline:
+            return result
+        app.processEvents()
+        time.sleep(0.002)
+
+
+@pytest.fixture
+def process_until(qapp):
+    return process_events_until
+
+
+@pytest.fixture
+def sim_link():
+    """Factory: sim_link(**vehicle_kwargs) -> SimulatedLink, closed after the test"""
+    links = []
+
+    def start(**vehicle_kwargs):
+        link = SimulatedLink(**vehicle_kwargs)
+        links.append(link)
+        return link
+
+    yield start
+    for link in links:
+        link.close()
+
+
+@pytest.fixture
+def loop_thread(qapp):
+    loop_thread = AsyncLoopThread(name='TestAsync')
+    loop_thread.start()
+    yield loop_thread
+    loop_thread.stop()
@@ -0,0 +1,38 @@
+"""CommandManager transactions against a simulated vehicle"""
+from pymavlink import mavutil
+
+from modules.command_manager import CommandManager
+
+ARM = mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM
+
+
+def send_and_wait(link, process_until, manager, command, params, **kwargs):
+    manager.attach(link.drone, link.hub)
+    future = manager.send(command, params, **kwargs)
+    assert process_until(future.done, timeout=5)
+    return future.result()
+
+
+def test_latency_from_first_send_includes_retries(sim_link, process_until):
+    link = sim_link(drop_first={f'COMMAND_LONG:{ARM}': 1})
+    manager = CommandManager(ack_timeout=0.3)
+    outcome = send_and_wait(link, process_until, manager, ARM, (1,))
+    manager.detach()
+
+    assert outcome.accepted and outcome.attempts == 2
+    stats = manager.latency_stats()['MAV_CMD_COMPONENT_ARM_DISARM']
+    # The answered retransmission was quick; the operator waited a full ack timeout longer
+    assert stats['last_send']['max_ms'] < 250
+    assert stats['first_send']['max_ms'] >= 300
+    assert abs(1000 * outcome.latency - stats['first_send']['max_ms']) < 50
+
+
+def test_timeout_after_max_attempts(sim_link, process_until):
+    link = sim_link(drop_first={f'COMMAND_LONG:{ARM}': 10})
+    manager = CommandManager(ack_timeout=0.1, max_attempts=3)
+    outcome = send_and_wait(link, process_until, manager, ARM, (1,))
+    manager.detach()
+
+    assert outcome.result is None and outcome.reason == 'timeout'
+    assert outcome.attempts == 3 and manager.retransmissions == 2
+    assert manager.latency_stats() == {}
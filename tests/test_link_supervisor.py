@@ -0,0 +1,75 @@
+"""LinkSupervisor loss detection and reconnection against a simulated vehicle"""
+import time
+
+from PyQt5.QtCore import QTimer
+
+from modules.drone_module import ConnectionWorker
+from modules.link_supervisor import LinkSupervisor
+
+HEARTBEAT_HZ = 5.0
+HEARTBEAT_TIMEOUT = 1.0
+OUTAGE = 1.5
+
+
+def make_supervisor():
+    return LinkSupervisor(
+        lambda uri, baud, timeout: ConnectionWorker(uri, baud, heartbeat_timeout=max(1.0, timeout)),
+        heartbeat_timeout=HEARTBEAT_TIMEOUT
+    )
+
+
+def test_reconnects_within_bound_after_outage(sim_link, process_until):
+    link = sim_link(heartbeat_hz=HEARTBEAT_HZ)
+    supervisor = make_supervisor()
+    times = {}
+    states = []
+
+    def resume_vehicle():
+        times['resumed'] = time.monotonic()
+        link.restart_vehicle()
+
+    def lost(reason):
+        times['lost'] = time.monotonic()
+        link.stop_reader()
+        QTimer.singleShot(int(OUTAGE * 1000), resume_vehicle)
+
+    def reconnected(drone, offline):
+        times['reconnected'] = time.monotonic()
+        link.start_reader(drone)
+
+    supervisor.linkStateChanged.connect(states.append)
+    supervisor.linkLost.connect(lost)
+    supervisor.reconnected.connect(reconnected)
+    supervisor.start(f'udpin:127.0.0.1:{link.port}', 57600, link.hub, link.drone.target_system)
+    try:
+        assert process_until(lambda: supervisor.state == supervisor.CONNECTED, timeout=1)
+        times['stopped'] = time.monotonic()
+        link.vehicle.stop()
+
+        assert process_until(lambda: 'reconnected' in times, timeout=OUTAGE + 10), states
+        # Loss is declared one heartbeat timeout after the last heartbeat
+        assert times['lost'] - times['stopped'] < HEARTBEAT_TIMEOUT + 0.5
+        # A pending attempt or the next backoff step picks up the resumed vehicle
+        assert times['reconnected'] - times['resumed'] < HEARTBEAT_TIMEOUT + supervisor.initial_backoff * 2
+        assert states == ['connected', 'lost', 'reconnecting', 'connected']
+
+        # Telemetry flows through the same hub again
+        with link.hub.subscribe('HEARTBEAT', maxsize=4) as sub:
+            assert process_until(sub.drain, timeout=2)
+    finally:
+        supervisor.stop()
+
+
+def test_read_error_is_lost_immediately(sim_link, process_until):
+    link = sim_link(heartbeat_hz=HEARTBEAT_HZ)
+    supervisor = make_supervisor()
+    reasons = []
+    supervisor.linkLost.connect(reasons.append)
+    supervisor.start(f'udpin:127.0.0.1:{link.port}', 57600, link.hub, link.drone.target_system)
+    try:
+        supervisor.link_error("serial port removed")
+        assert process_until(lambda: reasons, timeout=0.5) == ["serial port removed"]
+        assert supervisor.state == supervisor.RECONNECTING
+    finally:
+        supervisor.stop()
+    assert supervisor.state == supervisor.DISCONNECTED
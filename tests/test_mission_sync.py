@@ -0,0 +1,107 @@
+"""Mission cache trust: only a vehicle-proven mission is served from the cache"""
+from pymavlink import mavutil
+
+from modules import mission_sync
+from modules.mission_sync import MissionCache, _matches_cache
+from modules.mission_transfer import MissionState, build_mission_items
+
+MISSION = mavutil.mavlink.MAV_MISSION_TYPE_MISSION
+
+
+def identity_requests(vehicle):
+    return [msg for msg in vehicle.received if msg.get_type() == 'COMMAND_LONG'
+            and msg.command == mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE
+            and int(msg.param1) == mavutil.mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION]
+
+
+def survey(count=20, altitude=30.0):
+    waypoints = [{'x': 47.397742 + 1e-4 * i, 'y': 8.545594, 'z': altitude} for i in range(count - 1)]
+    return build_mission_items(waypoints, 47.397742, 8.545594)
+
+
+def run(loop_thread, process_until, coro):
+    future = loop_thread.submit(coro)
+    assert process_until(future.done, timeout=30)
+    return future.result()
+
+
+def test_changed_waypoint_on_vehicle_gets_full_upload(sim_link, loop_thread, process_until, tmp_path):
+    link = sim_link(uid=0x1234)
+    vehicle = link.vehicle_commands(loop_thread)
+    cache = MissionCache(str(tmp_path))
+    items = survey()
+    assert run(loop_thread, process_until, vehicle.sync_mission(items, cache)).method == 'full'
+
+    # Another GCS edits one waypoint in the middle: count, first and last unchanged
+    link.vehicle.missions[MISSION][7].z = 99.0
+    result = run(loop_thread, process_until, vehicle.sync_mission(items, cache))
+    assert result.method == 'full'
+    assert [item.z for item in link.vehicle.missions[MISSION]] == [float(item['z']) for item in items]
+
+
+def test_download_reads_the_vehicle_not_the_cache(sim_link, loop_thread, process_until, tmp_path, monkeypatch):
+    monkeypatch.setattr(mission_sync, 'HAS_OPAQUE_ID', True)
+    link = sim_link(uid=0x1234)
+    vehicle = link.vehicle_commands(loop_thread)
+    cache = MissionCache(str(tmp_path))
+    run(loop_thread, process_until, vehicle.sync_mission(survey(), cache))
+    link.vehicle.missions[MISSION][7].z = 99.0
+
+    cached = []
+    mission, from_cache = run(loop_thread, process_until, vehicle.load_mission(cache, on_cached=cached.append))
+    assert len(cached) == 1
+    assert not from_cache
+    assert mission.to_items()[7]['z'] == 99.0
+
+
+def test_sync_without_opaque_id_uploads_directly(sim_link, loop_thread, process_until, tmp_path):
+    assert not mission_sync.HAS_OPAQUE_ID     # the bundled pymavlink dialect
+    link = sim_link(uid=0x1234)
+    cache = MissionCache(str(tmp_path))
+    run(loop_thread, process_until, link.vehicle_commands(loop_thread).sync_mission(survey(), cache))
+    assert identity_requests(link.vehicle) == []
+    assert not any(msg.get_type() == 'MISSION_REQUEST_LIST' for msg in link.vehicle.received)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_is_keyed_by_autopilot_identity(sim_link, loop_thread, process_until, tmp_path, monkeypatch):
+    monkeypatch.setattr(mission_sync, 'HAS_OPAQUE_ID', True)
+    cache = MissionCache(str(tmp_path))
+    first = sim_link(uid=0x1111)
+    run(loop_thread, process_until, first.vehicle_commands(loop_thread).sync_mission(survey(10), cache))
+    first.close()
+    # Same sys/comp ids, another airframe
+    second = sim_link(uid=0x2222)
+    run(loop_thread, process_until, second.vehicle_commands(loop_thread).sync_mission(survey(12), cache))
+
+    entries = sorted(path.name for path in tmp_path.iterdir())
+    assert len(entries) == 2 and all(name.startswith('uid') for name in entries)
+
+
+def test_no_identity_bypasses_the_cache(sim_link, loop_thread, process_until, tmp_path, monkeypatch):
+    monkeypatch.setattr(mission_sync, 'HAS_OPAQUE_ID', True)
+    link = sim_link()
+    cache = MissionCache(str(tmp_path))
+    run(loop_thread, process_until, link.vehicle_commands(loop_thread).sync_mission(survey(), cache))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_only_a_matching_opaque_id_proves_the_cache():
+    entry = {'opaque_id': 0xABCD, 'items': []}
+    assert _matches_cache(MissionState(20, 0xABCD), entry)
+    assert not _matches_cache(MissionState(20, 0xABCE), entry)
+    assert not _matches_cache(MissionState(20, 0), {'opaque_id': 0, 'items': []})
+    assert not _matches_cache(MissionState(20, 0xABCD), None)
+
+
+def test_download_without_opaque_id_skips_the_cache(sim_link, loop_thread, process_until, tmp_path):
+    link = sim_link(uid=0x1234)
+    vehicle = link.vehicle_commands(loop_thread)
+    cache = MissionCache(str(tmp_path))
+    run(loop_thread, process_until, vehicle.sync_mission(survey(), cache))
+
+    cached = []
+    mission, from_cache = run(loop_thread, process_until, vehicle.load_mission(cache, on_cached=cached.append))
+    assert cached == [] and not from_cache and len(mission) == 20
+    assert identity_requests(link.vehicle) == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,99 @@
+"""param.pck encoding and the MAVFTP parameter download against a simulated vehicle"""
+import struct
+
+import pytest
+from pymavlink import mavutil
+
+from modules import mavftp
+from modules.mavftp import FtpError
+from modules.param_ftp import HEADER, MAGIC, pack_param_file, unpack_param_file
+
+INT8 = mavutil.mavlink.MAV_PARAM_TYPE_INT8
+INT16 = mavutil.mavlink.MAV_PARAM_TYPE_INT16
+INT32 = mavutil.mavlink.MAV_PARAM_TYPE_INT32
+REAL32 = mavutil.mavlink.MAV_PARAM_TYPE_REAL32
+
+PARAMS = {f"PARAM_{i:04d}": float(i % 97) for i in range(300)}
+
+
+def float32(value):
+    return struct.unpack('<f', struct.pack('<f', value))[0]
+
+
+def test_round_trip_without_defaults():
+    entries = [('ARMING_CHECK', INT8, 1, None), ('ATC_ANG_PIT_P', REAL32, float32(4.5), None),
+               ('ATC_ANG_RLL_P', REAL32, float32(4.75), None), ('BATT_CAPACITY', INT32, 5200, None),
+               ('WPNAV_SPEED', INT16, -300, None)]
+    data = pack_param_file(entries)
+    assert HEADER.unpack_from(data)[0] == MAGIC
+    assert unpack_param_file(data) == (entries, len(entries))
+
+
+def test_round_trip_with_defaults():
+    entries = [('ATC_RAT_PIT_I', REAL32, float32(0.135), float32(0.135)),
+               ('ATC_RAT_PIT_P', REAL32, float32(0.2), float32(0.135)),
+               ('FLTMODE1', INT8, 5, 0)]
+    unpacked, total = unpack_param_file(pack_param_file(entries))
+    assert unpacked == entries and total == 3
+
+
+def test_padding_between_entries_is_skipped():
+    data = pack_param_file([('A_ONE', INT8, 1, None), ('A_TWO', INT8, 2, None)])
+    first_end = HEADER.size + 2 + len('A_ONE') + 1
+    padded = data[:first_end] + b'\x00' * 5 + data[first_end:]
+    assert [entry[0] for entry in unpack_param_file(padded)[0]] == ['A_ONE', 'A_TWO']
+
+
+def test_truncated_file_raises():
+    data = pack_param_file([('BATT_CAPACITY', INT32, 5200, None), ('WPNAV_SPEED', INT16, 500, None)])
+    for cut in (3, HEADER.size + 1, len(data) - 1):
+        with pytest.raises(FtpError, match="truncated|holds"):
+            unpack_param_file(data[:cut])
+
+
+def test_bad_magic_raises():
+    data = bytearray(pack_param_file([('BATT_CAPACITY', INT32, 5200, None)]))
+    data[0:2] = struct.pack('<H', 0x1234)
+    with pytest.raises(FtpError, match="Not a parameter file"):
+        unpack_param_file(bytes(data))
+
+
+def download(link, loop_thread, process_until):
+    future = loop_thread.submit(link.vehicle_commands(loop_thread).download_params())
+    assert process_until(future.done, timeout=60)
+    return {name: float(record['value']) for name, record in future.result().items()}
+
+
+def sent_opcodes(vehicle):
+    return [mavftp.FtpPacket.decode(msg.payload).opcode for msg in vehicle.received
+            if msg.get_type() == 'FILE_TRANSFER_PROTOCOL']
+
+
+def test_lost_chunks_are_read_again(sim_link, loop_thread, process_until):
+    link = sim_link(params=PARAMS, ftp=True, loss=0.1, seed=3)
+    assert download(link, loop_thread, process_until) == {name: float32(value) for name, value in PARAMS.items()}
+    opcodes = sent_opcodes(link.vehicle)
+    assert mavftp.OP_BURST_READ_FILE in opcodes
+    # Gaps left by lost burst packets are filled with single reads
+    assert mavftp.OP_READ_FILE in opcodes
+    # The session the open created is closed afterwards
+    assert process_until(lambda: sent_opcodes(link.vehicle)[-1] == mavftp.OP_TERMINATE_SESSION, timeout=2)
+    assert not any(msg.get_type() == 'PARAM_REQUEST_LIST' for msg in link.vehicle.received)
+
+
+def test_falls_back_to_param_list_without_mavftp(sim_link, loop_thread, process_until):
+    link = sim_link(params=PARAMS)
+    assert download(link, loop_thread, process_until) == {name: float32(value) for name, value in PARAMS.items()}
+    assert mavftp.OP_OPEN_FILE_RO in sent_opcodes(link.vehicle)
+    # No session was opened, so none is terminated
+    assert mavftp.OP_TERMINATE_SESSION not in sent_opcodes(link.vehicle)
+    assert any(msg.get_type() == 'PARAM_REQUEST_LIST' for msg in link.vehicle.received)
+
+
+def test_refused_open_terminates_no_session(sim_link, loop_thread, process_until):
+    link = sim_link(params=PARAMS, ftp=True)
+    future = loop_thread.submit(mavftp.read_file(link.vehicle_commands(loop_thread), '@SYS/missing.txt'))
+    assert process_until(future.done, timeout=10)
+    with pytest.raises(FtpError, match="refused"):
+        future.result()
+    assert sent_opcodes(link.vehicle) == [mavftp.OP_OPEN_FILE_RO]
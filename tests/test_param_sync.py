@@ -0,0 +1,61 @@
+"""Parameter cache trust: only a matching _HASH_CHECK serves parameters from disk"""
+from pymavlink import mavutil
+
+from modules.param_sync import ParamCache, HASH_PARAM
+from modules.param_transfer import decode_param_id
+
+PX4 = mavutil.mavlink.MAV_AUTOPILOT_PX4
+
+PARAMS = {f"PARAM_{i:03d}": float(i % 7) for i in range(60)}
+
+
+def load(vehicle, cache, loop_thread, process_until):
+    future = loop_thread.submit(vehicle.load_params(cache))
+    assert process_until(future.done, timeout=30)
+    params, from_cache, key = future.result()
+    return {name: float(record['value']) for name, record in params.items()}, from_cache, key
+
+
+def test_hash_match_loads_from_cache(sim_link, loop_thread, process_until, tmp_path):
+    link = sim_link(params=PARAMS, uid=0x42, param_hash=True, ftp=True, autopilot=PX4)
+    vehicle = link.vehicle_commands(loop_thread)
+    cache = ParamCache(str(tmp_path))
+    assert load(vehicle, cache, loop_thread, process_until)[1] is False
+    values, from_cache, key = load(vehicle, cache, loop_thread, process_until)
+    assert from_cache and key.startswith('uid') and values == PARAMS
+
+    link.vehicle.params['PARAM_031'] = 42.0      # changed by another GCS
+    values, from_cache, _ = load(vehicle, cache, loop_thread, process_until)
+    assert not from_cache and values['PARAM_031'] == 42.0
+
+
+def probes(vehicle):
+    return [msg for msg in vehicle.received
+            if (msg.get_type() == 'COMMAND_LONG' and msg.command == mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE
+                and msg.param1 == mavutil.mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION)
+            or (msg.get_type() == 'PARAM_REQUEST_READ' and decode_param_id(msg.param_id) == HASH_PARAM)]
+
+
+def test_ardupilot_every_load_is_a_full_download_without_probes(sim_link, loop_thread, process_until, tmp_path):
+    link = sim_link(params=PARAMS, uid=0x42, ftp=True)
+    vehicle = link.vehicle_commands(loop_thread)
+    cache = ParamCache(str(tmp_path))
+    load(vehicle, cache, loop_thread, process_until)
+
+    # Same count, an unsampled value edited offline
+    link.vehicle.params['PARAM_031'] = 42.0
+    values, from_cache, _ = load(vehicle, cache, loop_thread, process_until)
+    assert not from_cache and values['PARAM_031'] == 42.0
+    assert list(tmp_path.iterdir()) == []
+    assert probes(link.vehicle) == []
+
+
+def test_without_identity_nothing_is_cached(sim_link, loop_thread, process_until, tmp_path):
+    # No uid: sysid/compid alone could hand this vehicle another airframe's parameters
+    link = sim_link(params=PARAMS, param_hash=True, ftp=True, autopilot=PX4)
+    vehicle = link.vehicle_commands(loop_thread)
+    cache = ParamCache(str(tmp_path))
+    load(vehicle, cache, loop_thread, process_until)
+    values, from_cache, key = load(vehicle, cache, loop_thread, process_until)
+    assert not from_cache and key is None and values == PARAMS
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,48 @@
+"""Single parameter writes (set_param) against a simulated vehicle"""
+import pytest
+from pymavlink import mavutil
+
+from modules.async_commands import CommandError
+
+REAL32 = mavutil.mavlink.MAV_PARAM_TYPE_REAL32
+
+
+def set_param(link, loop_thread, process_until, name, value, **options):
+    future = loop_thread.submit(link.vehicle_commands(loop_thread).set_param(name, value, REAL32, **options))
+    assert process_until(future.done, timeout=10)
+    return future.result()
+
+
+def test_write_completes_on_its_echo(sim_link, loop_thread, process_until):
+    link = sim_link()
+    msg = set_param(link, loop_thread, process_until, 'FLTMODE_CH', 6.0)
+    assert msg.param_value == 6.0 and link.vehicle.params['FLTMODE_CH'] == 6.0
+
+
+def test_lost_write_is_resent(sim_link, loop_thread, process_until):
+    link = sim_link(drop_first={'PARAM_SET': 1})
+    msg = set_param(link, loop_thread, process_until, 'FLTMODE_CH', 6.0, timeout=0.3)
+    assert msg.param_value == 6.0
+    assert sum(m.get_type() == 'PARAM_SET' for m in link.vehicle.received) == 2
+
+
+def test_stale_echo_is_not_the_answer(sim_link, loop_thread, process_until):
+    link = sim_link(latency=0.05)
+    future = loop_thread.submit(link.vehicle_commands(loop_thread).set_param('FLTMODE_CH', 6.0, REAL32))
+    # Someone else's read returns the old value first
+    process_until(lambda: any(m.get_type() == 'PARAM_SET' for m in link.vehicle.received), timeout=2)
+    link.hub.dispatch(mavutil.mavlink.MAVLink_param_value_message(b'FLTMODE_CH', 5.0, REAL32, 3, 1))
+    assert process_until(future.done, timeout=10)
+    assert future.result().param_value == 6.0
+
+
+def test_refused_write_raises(sim_link, loop_thread, process_until):
+    link = sim_link(readonly=['FLTMODE_CH'])
+    with pytest.raises(CommandError, match="still reports 5"):
+        set_param(link, loop_thread, process_until, 'FLTMODE_CH', 6.0, timeout=0.2)
+
+
+def test_unanswered_write_times_out(sim_link, loop_thread, process_until):
+    link = sim_link(drop_first={'PARAM_SET': 10})
+    with pytest.raises(CommandError, match="Timeout"):
+        set_param(link, loop_thread, process_until, 'FLTMODE_CH', 6.0, timeout=0.2)
@@ -0,0 +1,130 @@
+"""Takeoff coroutine against a simulated vehicle"""
+import asyncio
+
+import pytest
+from pymavlink import mavutil
+
+from modules.async_commands import CommandError
+from modules.command_manager import CommandManager
+
+ARM = mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM
+TAKEOFF = mavutil.mavlink.MAV_CMD_NAV_TAKEOFF
+GUIDED = 4
+STABILIZE = 0
+
+
+@pytest.fixture
+def takeoff(sim_link, loop_thread, process_until):
+    """takeoff(altitude, vehicle kwargs, takeoff options) -> (future, feedback, link)"""
+    managers = []
+
+    def start(target_altitude=5.0, vehicle_kwargs=None, **options):
+        link = sim_link(**(vehicle_kwargs or {}))
+        # flightmode comes from the reader's first HEARTBEAT
+        assert process_until(lambda: link.drone.flightmode == 'STABILIZE', timeout=3)
+        commands = CommandManager(ack_timeout=0.3)
+        commands.attach(link.drone, link.hub)
+        managers.append(commands)
+        feedback = []
+        vehicle = link.vehicle_commands(loop_thread, commands, feedback=feedback.append)
+        future = loop_thread.submit(vehicle.takeoff(target_altitude, **options), name='takeoff')
+        return future, feedback, link
+
+    yield start
+    for commands in managers:
+        commands.detach()
+
+
+def stages(feedback):
+    return [text for text in feedback if not text.startswith("🚁 Climbing:")]
+
+
+def test_stage_order(takeoff, process_until):
+    future, feedback, link = takeoff(5.0)
+    assert process_until(future.done, timeout=15)
+    report = future.result()
+    assert report.started_at < report.armed_at < report.airborne_at
+    assert stages(feedback) == [
+        "⚙️ Configuring parameters...",
+        "🎯 Switching to GUIDED mode...",
+        "✅ GUIDED mode confirmed",
+        "🔐 Arming drone...",
+        "✅ Drone armed",
+        "🚁 Taking off to 5.0m...",
+        "🚁 Climbing...",
+    ]
+    assert link.vehicle.params['ARMING_CHECK'] == 0
+    assert link.vehicle.custom_mode == GUIDED and link.vehicle.armed
+
+
+def test_climb_feedback_follows_altitude_steps(takeoff, process_until):
+    future, feedback, link = takeoff(5.0, vehicle_kwargs={'position_hz': 20.0, 'climb_rate': 1.0})
+    assert process_until(future.done, timeout=15)
+    future.result()
+    climbing = [text for text in feedback if text.startswith("🚁 Climbing:")]
+    # Position reports every 0.05 m of climb; one message per 0.5 m step up to the 1 m airborne gain
+    assert 1 <= len(climbing) <= 3
+
+
+def test_rejected_takeoff_fails(takeoff, process_until):
+    # The vehicle never accepts NAV_TAKEOFF
+    future, feedback, link = takeoff(5.0, vehicle_kwargs={'drop_first': {f'COMMAND_LONG:{TAKEOFF}': 100}})
+    assert process_until(future.done, timeout=15)
+    with pytest.raises(CommandError, match="Takeoff failed"):
+        future.result()
+
+
+def disarm_commands(vehicle):
+    return [msg for msg in vehicle.received
+            if msg.get_type() == 'COMMAND_LONG' and msg.command == ARM and msg.param1 == 0]
+
+
+def test_rejected_takeoff_disarms_and_restores_mode(takeoff, process_until):
+    future, feedback, link = takeoff(5.0, vehicle_kwargs={'drop_first': {f'COMMAND_LONG:{TAKEOFF}': 100}})
+    assert process_until(future.done, timeout=15)
+    with pytest.raises(CommandError):
+        future.result()
+    assert disarm_commands(link.vehicle)
+    assert not link.vehicle.armed and link.vehicle.custom_mode == STABILIZE
+    assert feedback[-1] == "⏹ Takeoff failed - drone disarmed on the ground"
+
+
+def test_unconfirmed_arm_times_out_and_disarms(takeoff, process_until):
+    # ARM is accepted but no HEARTBEAT ever shows the vehicle armed
+    future, feedback, link = takeoff(5.0, vehicle_kwargs={'armed_in_heartbeat': False}, timeouts={'arm': 1.0})
+    assert process_until(future.done, timeout=15)
+    with pytest.raises(CommandError, match=r"timeout \(arm\)"):
+        future.result()
+    assert disarm_commands(link.vehicle)
+    assert not link.vehicle.armed and link.vehicle.custom_mode == STABILIZE
+
+
+def test_stage_timeout(takeoff, process_until):
+    # PARAM_SET echoes never arrive
+    future, feedback, link = takeoff(5.0, vehicle_kwargs={'drop_first': {'PARAM_SET': 1000}},
+                                     timeouts={'params': 0.5})
+    assert process_until(future.done, timeout=5)
+    with pytest.raises(CommandError, match=r"timeout \(params\)"):
+        future.result()
+    assert not link.vehicle.armed
+
+
+def test_cancel_on_the_ground_disarms_and_restores_mode(takeoff, loop_thread, process_until):
+    # Armed, but NAV_TAKEOFF is not acknowledged while the operator cancels
+    future, feedback, link = takeoff(5.0, vehicle_kwargs={'drop_first': {f'COMMAND_LONG:{TAKEOFF}': 100}})
+    assert process_until(lambda: link.vehicle.armed, timeout=10)
+    assert loop_thread.cancel('takeoff')
+    assert process_until(lambda: feedback[-1].startswith("⏹"), timeout=5)
+    assert feedback[-1] == "⏹ Takeoff cancelled - drone disarmed on the ground"
+    assert not link.vehicle.armed
+    assert link.vehicle.custom_mode == STABILIZE
+    assert future.cancelled()
+
+
+def test_cancel_during_climb_holds_guided(takeoff, loop_thread, process_until):
+    future, feedback, link = takeoff(5.0, vehicle_kwargs={'climb_rate': 0.2})
+    assert process_until(lambda: "🚁 Climbing..." in feedback, timeout=10)
+    assert loop_thread.cancel('takeoff')
+    assert process_until(lambda: feedback[-1].startswith("⏹"), timeout=5)
+    assert feedback[-1].startswith("⏹ Takeoff cancelled - holding GUIDED")
+    assert link.vehicle.armed and link.vehicle.custom_mode == GUIDED
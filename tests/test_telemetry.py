@@ -0,0 +1,24 @@
+"""Per-field telemetry: typed defaults and which updates notify the whole dict"""
+from modules.drone_module import DroneModel
+from modules.telemetry import Telemetry
+
+
+def test_typed_fields_have_a_value_before_the_first_report(qapp):
+    telemetry = Telemetry()
+    assert telemetry.armed is False and telemetry.safety_armed is False and telemetry.ekf_ok is False
+    assert telemetry.mode == ""
+    assert telemetry.roll is None
+
+
+def test_live_fields_do_not_notify_the_telemetry_dict(qapp):
+    model = DroneModel()
+    coarse, attitude = [], []
+    model.telemetryChanged.connect(lambda: coarse.append(True))
+    model.liveTelemetry.attitudeChanged.connect(lambda: attitude.append(True))
+
+    model.updateTelemetry({'roll': 1.5, 'pitch': -0.5})
+    assert attitude == [True] and coarse == []
+    assert model.liveTelemetry.roll == 1.5
+
+    model.updateTelemetry({'vibration_x': 0.2})     # not a per-field key
+    assert coarse == [True]
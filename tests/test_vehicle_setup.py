@@ -0,0 +1,49 @@
+"""VehicleSetupPipeline against a simulated vehicle"""
+from pymavlink import mavutil
+
+from modules.vehicle_setup import VehicleSetupPipeline
+
+
+def run_pipeline(link, **options):
+    pipeline = VehicleSetupPipeline(link.drone, link.hub, **options)
+    results = []
+    pipeline.setupFinished.connect(lambda success, failed: results.append((success, failed)))
+    pipeline.start()
+    return pipeline, results
+
+
+def storage_commands(vehicle):
+    return [msg for msg in vehicle.received if msg.get_type() == 'COMMAND_LONG'
+            and msg.command == mavutil.mavlink.MAV_CMD_PREFLIGHT_STORAGE]
+
+
+def test_writes_confirmed_then_saved(sim_link, process_until):
+    link = sim_link()
+    pipeline, results = run_pipeline(link)
+    assert process_until(lambda: results, timeout=5)
+    assert results == [(True, [])]
+    assert link.vehicle.params['BRD_SAFETYENABLE'] == 0
+    assert link.vehicle.params['FLTMODE_CH'] == 0
+    assert len(storage_commands(link.vehicle)) == 1
+
+
+def test_failed_write_is_reported_and_not_saved(sim_link, process_until):
+    link = sim_link(readonly=['FLTMODE_CH'])
+    pipeline, results = run_pipeline(link, retry_interval=0.1, max_attempts=3)
+    assert process_until(lambda: results, timeout=5)
+    success, failed = results[0]
+    assert not success
+    assert "🔒 RC mode switch DISABLED" in failed
+    assert "💾 Settings not saved" in failed
+    assert storage_commands(link.vehicle) == []
+
+
+def test_stale_echo_does_not_fail_the_write(sim_link, process_until):
+    link = sim_link(latency=0.05)
+    pipeline, results = run_pipeline(link, retry_interval=0.5)
+    # Someone else's read of FLTMODE_CH returns the old value before our write's echo
+    link.hub.dispatch(mavutil.mavlink.MAVLink_param_value_message(
+        b'FLTMODE_CH', 5.0, mavutil.mavlink.MAV_PARAM_TYPE_REAL32, 3, 1))
+    assert process_until(lambda: results, timeout=5)
+    assert results == [(True, [])]
+    assert len(storage_commands(link.vehicle)) == 1